@@ -0,0 +1,121 @@
+"""Microbenchmark for Deduplicator expiry with many live buckets.
+
+Fills the deduplicator with `--live` distinct messages, then feeds a flood of
+entries (mostly repeats of live messages, some new ones, timestamps advancing
+so a steady trickle of buckets expires) through process_many in adapter-sized
+batches. Compares the deadline heap with the previous implementation, which
+scanned every live bucket on every entry and keyed buckets by an MD5 digest.
+
+Usage:
+    python benchmarks/bench_dedup.py [--live 50000] [--entries 200000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from server.models import LogEntry, LogLevel, LogSource  # noqa: E402
+from server.processing.deduplicator import Deduplicator, _DedupBucket  # noqa: E402
+
+_BASE = datetime(2026, 2, 7, 14, 0, 0, tzinfo=timezone.utc)
+_BATCH = 100
+
+
+class _LegacyDeduplicator(Deduplicator):
+    """The previous behavior: MD5 keys and a full scan of buckets per entry."""
+
+    @staticmethod
+    def _make_key(entry: LogEntry) -> str:
+        raw = f"{entry.process}:{entry.message}"
+        return hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+
+    def _track(self, key, entry: LogEntry) -> None:
+        self._buckets[key] = _DedupBucket(key, entry, entry.timestamp)
+
+    def _repeat(self, bucket: _DedupBucket, now: datetime) -> None:
+        bucket.count += 1
+        bucket.last_seen = now
+
+    def _expire(self, now: datetime) -> list[LogEntry]:
+        expired = [
+            key for key, bucket in self._buckets.items()
+            if (now - bucket.last_seen).total_seconds() >= self.window_seconds
+        ]
+        summaries = []
+        for key in expired:
+            bucket = self._buckets.pop(key)
+            if bucket.count > 1:
+                summaries.append(self._make_summary(bucket))
+        return summaries
+
+
+def _entry(i: int, offset: float) -> LogEntry:
+    return LogEntry(
+        id=f"b{i}",
+        timestamp=_BASE + timedelta(seconds=offset),
+        process=f"Proc{i % 40}",
+        level=LogLevel.INFO,
+        message=f"nw_connection_{i} event ready for endpoint {i * 7 % 1000}",
+        source=LogSource.SIMULATOR,
+    )
+
+
+def build_flood(live: int, entries: int, seed: int = 3) -> tuple[list[LogEntry], list[LogEntry]]:
+    """(preload with `live` distinct messages, flood of `entries`)."""
+    rng = random.Random(seed)
+    preload = [_entry(i, i / live) for i in range(live)]
+    flood = []
+    next_new = live
+    for n in range(entries):
+        offset = 1 + n * 2e-4  # ~5000 entries/s; the window is 5s
+        if rng.random() < 0.1:
+            flood.append(_entry(next_new, offset))
+            next_new += 1
+        else:
+            flood.append(_entry(rng.randrange(live), offset))
+    return preload, flood
+
+
+async def _run(dedup: Deduplicator, preload: list[LogEntry], flood: list[LogEntry]) -> float:
+    # Preloading through process_many would take the legacy version O(live²)
+    for entry in preload:
+        dedup._track(dedup._make_key(entry), entry)
+    start = time.perf_counter()
+    for i in range(0, len(flood), _BATCH):
+        await dedup.process_many(flood[i : i + _BATCH])
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--live", type=int, default=50_000, help="Distinct live messages")
+    parser.add_argument("--entries", type=int, default=200_000, help="Flood entries")
+    parser.add_argument("--legacy-entries", type=int, default=500,
+                        help="Flood entries for the (much slower) previous implementation")
+    args = parser.parse_args()
+
+    async def emit(batch: list[LogEntry]) -> None:
+        pass
+
+    preload, flood = build_flood(args.live, args.entries)
+    print(f"{args.live:,} live buckets")
+    for name, dedup, count in (
+        ("legacy full scan", _LegacyDeduplicator(on_batch=emit), args.legacy_entries),
+        ("deadline heap", Deduplicator(on_batch=emit), args.entries),
+    ):
+        elapsed = await _run(dedup, preload, flood[:count])
+        print(f"  {name:<18} {count / elapsed:>12,.0f} entries/s  "
+              f"({count:,} entries in {elapsed:.3f}s, {len(dedup._buckets):,} live after)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
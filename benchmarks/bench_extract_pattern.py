@@ -0,0 +1,118 @@
+"""Microbenchmark for classifier.extract_pattern.
+
+Compares the single-pass tokenizer (uncached and cached) with the previous
+multi-pass implementation on a synthetic corpus shaped like iOS simulator and
+device logs: mostly repeated messages from chatty frameworks, with numbers,
+UUIDs, hex addresses and IPs varying per line. Also checks that both
+implementations produce the same templates for the corpus.
+
+Usage:
+    python benchmarks/bench_extract_pattern.py [--lines 200000] [--distinct 0.2]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from server.processing.classifier import extract_pattern  # noqa: E402
+
+# The multi-pass implementation extract_pattern replaced, for comparison
+_LEGACY_REPLACEMENTS = [
+    (re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"),
+     "<UUID>"),
+    (re.compile(r"0x[0-9a-fA-F]+"), "<HEX>"),
+    (re.compile(r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}(:\d+)?"), "<IP>"),
+    (re.compile(r"/[A-F0-9]{8}-[A-F0-9]{4}-[A-F0-9]{4}-[A-F0-9]{4}-[A-F0-9]{12}/"), "/<ID>/"),
+    (re.compile(r"(?<![a-zA-Z])\d+(\.\d+)?(?![a-zA-Z])"), "<N>"),
+]
+
+
+def legacy_extract_pattern(message: str) -> str:
+    result = message
+    for pattern, replacement in _LEGACY_REPLACEMENTS:
+        result = pattern.sub(replacement, result)
+    result = re.sub(r"(<N>[,.\s]*)+", "<N> ", result)
+    return result.strip()
+
+
+_TEMPLATES = [
+    "Task <{uuid}>.<{n}> finished with error [-1001] Error Domain=NSURLErrorDomain Code=-1001",
+    "nw_connection_receive_internal_block_invoke [C{n}] Receive reply failed with error "
+    "\"Operation canceled\"",
+    "Connection {n}: received failure notification",
+    "[{n}] Connection to {ip} failed: timed out after {f} seconds",
+    "<UIImageView: {hex}; frame = ({n} {n}; {n} {n}); userInteractionEnabled = NO>",
+    "Loaded {n} items from /var/mobile/Containers/Data/Application/{uuid_upper}/Documents/db",
+    "Slow frame: {f}ms (budget {f}ms)",
+    "HTTP {status} for GET https://api.example.com/v{n}/users/{n}",
+    "Failed to fetch user profile",
+    "Sync completed successfully",
+    "CoreData: annotation: fetch request took {f}s for {n} rows",
+    "deny({n}) mach-lookup com.apple.analyticsd",
+    "Memory warning: {n} MB resident, {n} MB dirty",
+    "Token refreshed for session {uuid}",
+    "WebSocket {hex} closed with code {n}",
+]
+
+
+def build_corpus(lines: int, distinct: float, seed: int = 7) -> list[str]:
+    """Generate log messages; `distinct` is the fraction of unique lines."""
+    rng = random.Random(seed)
+
+    def render(template: str) -> str:
+        return template.format(
+            uuid=uuid.UUID(int=rng.getrandbits(128)),
+            uuid_upper=str(uuid.UUID(int=rng.getrandbits(128))).upper(),
+            n=rng.randint(0, 5000),
+            f=round(rng.uniform(0, 120), 2),
+            hex=hex(rng.getrandbits(40)),
+            ip=f"10.0.{rng.randint(0, 255)}.{rng.randint(1, 254)}:{rng.randint(80, 9000)}",
+            status=rng.choice([200, 401, 404, 500, 502]),
+        )
+
+    unique = [render(rng.choice(_TEMPLATES)) for _ in range(max(1, int(lines * distinct)))]
+    return [rng.choice(unique) for _ in range(lines)]
+
+
+def _time(name: str, fn, corpus: list[str]) -> float:
+    start = time.perf_counter()
+    for message in corpus:
+        fn(message)
+    elapsed = time.perf_counter() - start
+    print(f"  {name:<24} {len(corpus) / elapsed:>12,.0f} msgs/s  ({elapsed:.3f}s)")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200_000)
+    parser.add_argument("--distinct", type=float, default=0.2,
+                        help="Fraction of corpus lines that are unique messages")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.lines, args.distinct)
+    mismatches = [m for m in set(corpus) if extract_pattern(m) != legacy_extract_pattern(m)]
+    print(f"{len(corpus):,} lines, {len(set(corpus)):,} distinct, "
+          f"{len(mismatches)} template mismatches vs legacy")
+    for message in mismatches[:5]:
+        print(f"    {message!r}")
+
+    uncached = extract_pattern.__wrapped__
+    legacy = _time("legacy multi-pass", legacy_extract_pattern, corpus)
+    single = _time("single pass", uncached, corpus)
+    extract_pattern.cache_clear()
+    cached = _time("single pass + LRU", extract_pattern, corpus)
+    print(f"  speedup: {legacy / single:.1f}x uncached, {legacy / cached:.1f}x cached "
+          f"({extract_pattern.cache_info().hits:,} cache hits)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Benchmark log-flood ingest with and without the ingest worker pool.
+
+Feeds a flood of idevicesyslog lines, in adapter-sized chunks, through the
+server's real pipeline (noise filter, deduplicator, partitioned store with
+its template, rollup, error-group and fan-out listeners) while a probe
+requests GET /health every few milliseconds on the same event loop. Reports
+sustained lines/s and the probe's latency percentiles, first with parsing
+on the event loop, then with `--workers` ingest workers.
+
+Usage:
+    python benchmarks/bench_ingest.py [--lines 200000] [--rate 0] [--workers 2]
+
+--rate caps the flood at that many lines/s (0 = as fast as possible).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+
+from server.config import ServerConfig  # noqa: E402
+from server.main import create_app  # noqa: E402
+from server.processing.deduplicator import Deduplicator  # noqa: E402
+from server.processing.ingest_pool import IngestPool  # noqa: E402
+from server.sources.syslog import SyslogAdapter  # noqa: E402
+
+_CHUNK_LINES = 400  # About one 64 KiB read of idevicesyslog output
+_PROBE_INTERVAL = 0.005
+
+_MESSAGES = [
+    "Task <{u}>.<{n}> finished with error [-1001] Error Domain=NSURLErrorDomain Code=-1001",
+    "nw_connection_receive_internal_block_invoke [C{n}] Receive reply failed",
+    "HTTP {s} for GET https://api.example.com/v2/users/{n}",
+    "Loaded {n} items from cache in {f}ms",
+    "Slow frame: {f}ms (budget 16.67ms)",
+    "[{n}] Connection to 10.0.{n}.{s} failed: timed out",
+    "Sync completed successfully",
+    "Memory warning: {n} MB resident",
+]
+_LEVELS = ["Debug", "Debug", "Info", "Notice", "Warning", "Error"]
+
+
+def build_flood(lines: int, seed: int = 11) -> list[list[bytes]]:
+    """Syslog lines from a few dozen processes, in read-sized chunks."""
+    rng = random.Random(seed)
+    out = []
+    for i in range(lines):
+        message = rng.choice(_MESSAGES).format(
+            u=rng.getrandbits(64), n=rng.randint(0, 5000), s=rng.choice([200, 404, 500]),
+            f=round(rng.uniform(0, 90), 2),
+        )
+        out.append(
+            f"Feb  7 14:{i // 60000 % 60:02d}:{i // 1000 % 60:02d} iPhone "
+            f"Proc{rng.randrange(40)}(CFNetwork)[{rng.randint(100, 999)}] "
+            f"<{rng.choice(_LEVELS)}>: {message}".encode()
+        )
+    return [out[i : i + _CHUNK_LINES] for i in range(0, len(out), _CHUNK_LINES)]
+
+
+async def _probe(client: AsyncClient, latencies: list[float], done: asyncio.Event) -> None:
+    while not done.is_set():
+        start = time.perf_counter()
+        await client.get("/health")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(_PROBE_INTERVAL)
+
+
+async def run(chunks: list[list[bytes]], workers: int, rate: float) -> None:
+    app = create_app(
+        config=ServerConfig(api_key="bench", ring_buffer_size=100_000),
+        enable_oslog=False, enable_crash=False, enable_proxy=False,
+    )
+    buffer = app.state.ring_buffer
+    noise = app.state.noise_filter
+    dedup = Deduplicator(on_entry=buffer.append, on_batch=buffer.append_many)
+    noise.on_entry, noise.on_batch = dedup.process, dedup.process_many
+
+    pool = None
+    if workers:
+        pool = IngestPool(workers=workers, on_batch=noise.process_many)
+        pool.start()
+        # Let the workers spawn and import before timing
+        warmup = SyslogAdapter(device_id="warmup", ingest_pool=pool)
+        await warmup.emit_lines(chunks[0][:1])
+        await pool.release(warmup)
+
+    adapter = SyslogAdapter(on_batch=noise.process_many, ingest_pool=pool)
+    latencies: list[float] = []
+    done = asyncio.Event()
+    total = sum(len(chunk) for chunk in chunks)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://b") as client:
+        probe = asyncio.create_task(_probe(client, latencies, done))
+        start = time.perf_counter()
+        for i, chunk in enumerate(chunks):
+            if rate:
+                delay = start + i * _CHUNK_LINES / rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await adapter.emit_lines(chunk)
+            await asyncio.sleep(0)
+        if pool is not None:
+            await pool.release(adapter)
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe
+    if pool is not None:
+        await pool.stop()
+
+    latencies.sort()
+    p = statistics.quantiles(latencies, n=100)
+    name = f"{workers} ingest workers" if workers else "event loop"
+    print(f"  {name:<18} {total / elapsed:>10,.0f} lines/s   /health p50 {p[49] * 1e3:6.1f} ms"
+          f"  p99 {p[98] * 1e3:7.1f} ms  max {latencies[-1] * 1e3:7.1f} ms  "
+          f"({len(latencies)} probes, {buffer.size:,} stored)")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200_000)
+    parser.add_argument("--rate", type=float, default=0, help="Flood lines/s (0 = unlimited)")
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    chunks = build_flood(args.lines)
+    rate = f"{args.rate:,.0f} lines/s" if args.rate else "unthrottled"
+    print(f"{args.lines:,} syslog lines, {rate}")
+    for workers in (0, args.workers):
+        await run(chunks, workers, args.rate)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,197 @@
+"""Microbenchmark for decoding simctl's pretty-printed `log stream` JSON.
+
+Builds a multi-MB stream shaped like `xcrun simctl spawn <UDID> log stream
+--style json` output (one pretty-printed object per event, with escapes and
+braces inside messages), or reads a recorded one with --stream, and cuts it
+into 64 KiB read_chunks-sized chunks. Compares SimulatorLogAdapter.parse_chunk,
+which feeds each raw chunk to the JsonStreamDecoder, with the previous
+parse_lines, which got the chunk split into lines (read_line_batches),
+tracked braces and string escapes one character at a time in Python and
+json.loads-ed each reassembled object. Reports both whole parse throughput
+and splitting plus json decoding alone.
+
+Record a real stream with:
+    xcrun simctl spawn booted log stream --style json --level debug > sim.json
+
+Usage:
+    python benchmarks/bench_json_stream.py [--events 20000] [--stream sim.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from server.models import LogEntry  # noqa: E402
+from server.sources import READ_CHUNK_SIZE  # noqa: E402
+from server.sources.json_stream import JsonStreamDecoder  # noqa: E402
+from server.sources.simulator_log import SimulatorLogAdapter  # noqa: E402
+
+_UDID = "43B500A9-1234-5678-9ABC-DEF012345678"
+
+_MESSAGES = (
+    "Task <{id}>.<1> finished with error [-1001] Error Domain=NSURLErrorDomain Code=-1001",
+    'Loaded view controller "{id}" with payload {{"items": [1, 2, 3], "ok": true}}',
+    "nw_connection_{id} [C{id}] event: path:satisfied @0.{id}s, uuid: 6F0C-{id}",
+    'Keychain lookup failed for \\"com.example.token.{id}\\" (status -25300)',
+    "CoreData: sql: SELECT Z_PK FROM ZITEM WHERE ZID = {id}\n  rows: 1",
+)
+
+
+def _split_objects(lines: list[bytes], state: list) -> list[str]:
+    """The previous brace tracker: complete objects' text, one char at a time."""
+    obj_chars, brace_depth, in_string, escape_next = state
+    objects = []
+    for raw_line in lines:
+        line = raw_line.decode("utf-8", errors="replace").rstrip()
+        for ch in line:
+            if escape_next:
+                escape_next = False
+                if brace_depth > 0:
+                    obj_chars.append(ch)
+                continue
+            if ch == "\\" and in_string:
+                escape_next = True
+                if brace_depth > 0:
+                    obj_chars.append(ch)
+                continue
+            if ch == '"' and not escape_next:
+                if brace_depth > 0:
+                    in_string = not in_string
+                    obj_chars.append(ch)
+                continue
+            if in_string:
+                obj_chars.append(ch)
+                continue
+            if ch == "{":
+                brace_depth += 1
+                obj_chars.append(ch)
+            elif ch == "}":
+                brace_depth -= 1
+                obj_chars.append(ch)
+                if brace_depth == 0:
+                    objects.append("".join(obj_chars))
+                    obj_chars.clear()
+                    in_string = False
+                    escape_next = False
+            elif brace_depth > 0:
+                obj_chars.append(ch)
+        if brace_depth > 0:
+            obj_chars.append("\n")
+    state[1:] = [brace_depth, in_string, escape_next]
+    return objects
+
+
+def _legacy_decoder():
+    state: list = [[], 0, False, False]
+    return lambda lines: [json.loads(raw) for raw in _split_objects(lines, state)]
+
+
+class _LegacySimulatorLogAdapter(SimulatorLogAdapter):
+    """The previous parse_lines: brace tracking, then json.loads per object."""
+
+    def __init__(self) -> None:
+        super().__init__(udid=_UDID)
+        self._state: list = [[], 0, False, False]
+
+    def parse_lines(self, raw_lines: list[bytes]) -> list[LogEntry]:
+        entries = []
+        for raw in _split_objects(raw_lines, self._state):
+            entry = self._parse_json_line(raw)
+            if entry is not None:
+                entries.append(entry)
+        return entries
+
+
+def build_stream(events: int, seed: int = 5) -> bytes:
+    """A simctl-style stream: preamble, then an array of pretty-printed events."""
+    rng = random.Random(seed)
+    objects = []
+    for i in range(events):
+        event = {
+            "traceID": 1234567890 + i,
+            "eventMessage": rng.choice(_MESSAGES).format(id=i),
+            "eventType": "logEvent",
+            "source": None,
+            "formatString": "%{public}@",
+            "activityIdentifier": 0,
+            "subsystem": f"com.example.app.module{i % 12}",
+            "category": rng.choice(("network", "ui", "storage", "auth")),
+            "threadID": 9000 + i % 16,
+            "senderImageUUID": "6F0C1F5E-3C8A-3D7B-9E0A-2A7C8F1B4D21",
+            "backtrace": {"frames": [{"imageOffset": 10240 + i, "imageUUID": "6F0C1F5E"}]},
+            "bootUUID": "",
+            "processImagePath": f"/Users/dev/Library/Developer/App{i % 3}.app/App{i % 3}",
+            "timestamp": f"2026-02-07 14:{i // 3600 % 60:02d}:{i // 60 % 60:02d}.{i:06d}-0800",
+            "senderImagePath": "/usr/lib/system/libsystem_trace.dylib",
+            "machTimestamp": 987654321000 + i,
+            "messageType": rng.choice(("Default", "Info", "Debug", "Error")),
+            "processImageUUID": "0B4C7E21-8A5D-3F19-B6E2-7D0C9A1E5F43",
+            "processID": 4000 + i % 3,
+            "senderProgramCounter": 37112,
+            "parentActivityIdentifier": 0,
+        }
+        objects.append(json.dumps(event, indent=2, separators=(",", " : ")))
+    text = 'Filtering the log data using "process BEGINSWITH \\"App\\""\n['
+    return (text + ",".join(objects) + "]\n").encode()
+
+
+def read_chunks(stream: bytes, chunk_size: int = READ_CHUNK_SIZE) -> list[bytes]:
+    """Cut a stream into the chunks read_chunks would yield."""
+    return [stream[i:i + chunk_size] for i in range(0, len(stream), chunk_size)]
+
+
+def _legacy_split(fn):
+    """Wrap a line parser to split raw chunks into lines first, like read_line_batches."""
+    partial = b""
+
+    def parse(chunk: bytes) -> list:
+        nonlocal partial
+        lines = (partial + chunk).split(b"\n")
+        partial = lines.pop()
+        return fn(lines) if lines else []
+
+    return parse
+
+
+def _time(fn, chunks: list[bytes]) -> tuple[float, int]:
+    start = time.perf_counter()
+    count = sum(len(fn(chunk)) for chunk in chunks)
+    return time.perf_counter() - start, count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=20_000, help="Generated events")
+    parser.add_argument("--stream", type=Path, help="Recorded log stream output to use instead")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per variant (best is kept)")
+    args = parser.parse_args()
+
+    stream = args.stream.read_bytes() if args.stream else build_stream(args.events)
+    chunks = read_chunks(stream)
+    mb = len(stream) / 1e6
+    print(f"{mb:.1f} MB stream, {len(chunks)} chunks of up to {READ_CHUNK_SIZE // 1024} KiB")
+
+    results: dict[str, float] = {}
+    for name, make in (
+        ("legacy decode", lambda: _legacy_split(_legacy_decoder())),
+        ("decoder decode", lambda: JsonStreamDecoder().feed),
+        ("legacy parse", lambda: _legacy_split(_LegacySimulatorLogAdapter().parse_lines)),
+        ("decoder parse", lambda: SimulatorLogAdapter(udid=_UDID).parse_chunk),
+    ):
+        elapsed, count = min(_time(make(), chunks) for _ in range(args.repeat))
+        results[name] = elapsed
+        print(f"  {name:<20} {mb / elapsed:>8.1f} MB/s  {count / elapsed:>10,.0f} objects/s  "
+              f"({count:,} in {elapsed:.3f}s)")
+    for what in ("decode", "parse"):
+        print(f"  {what}: {results[f'legacy {what}'] / results[f'decoder {what}']:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
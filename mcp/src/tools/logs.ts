@@ -530,7 +530,7 @@ export function registerLogTools(server: McpServer): void {
       exclude_patterns: z
         .array(z.string())
         .optional()
-        .describe("Message patterns to exclude"),
+        .describe("Message keywords to drop from this source"),
     }),
   }, async ({ source, process, exclude_patterns }) => {
       try {
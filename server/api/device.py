@@ -340,15 +340,17 @@ async def start_simulator_logging(request: Request, body: StartSimLogRequest):
     if udid in sim_adapters and sim_adapters[udid].is_running:
         return {"status": "already_running", "udid": udid, "adapter_id": sim_adapters[udid].adapter_id}
 
-    # Get the deduplicator as the entry callback (same pipeline as other adapters)
-    dedup = request.app.state.deduplicator
+    # Get the noise filter as the entry callback (same pipeline as other adapters)
+    noise = request.app.state.noise_filter
 
     adapter = SimulatorLogAdapter(
         udid=udid,
-        on_entry=dedup.process,
+        on_entry=noise.process,
+        on_batch=noise.process_many,
         process_filter=body.process,
         subsystem_filter=body.subsystem,
         level=body.level,
+        ingest_pool=request.app.state.ingest_pool,
     )
 
     await adapter.start()
@@ -424,14 +426,16 @@ async def start_device_logging(request: Request, body: StartDeviceLogRequest):
     if udid in dev_adapters and dev_adapters[udid].is_running:
         return {"status": "already_running", "udid": udid, "adapter_id": dev_adapters[udid].adapter_id}
 
-    # Get the deduplicator as the entry callback (same pipeline as other adapters)
-    dedup = request.app.state.deduplicator
+    # Get the noise filter as the entry callback (same pipeline as other adapters)
+    noise = request.app.state.noise_filter
 
     adapter = PhysicalDeviceLogAdapter(
         udid=udid,
-        on_entry=dedup.process,
+        on_entry=noise.process,
+        on_batch=noise.process_many,
         process_filter=body.process,
         match_filter=body.match,
+        ingest_pool=request.app.state.ingest_pool,
     )
 
     await adapter.start()
@@ -2,31 +2,69 @@
 
 from __future__ import annotations
 
-import asyncio
 import json
+import re
+import zlib
+from collections.abc import AsyncIterator
 from datetime import datetime, timezone
 from typing import Any
 
-from fastapi import APIRouter, Query, Request
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sse_starlette.sse import EventSourceResponse
 
 from server.models import (
+    BufferStats,
+    HistogramPoint,
+    IssueInfo,
+    LogAnomaliesResponse,
     LogEntry,
     LogErrorsResponse,
+    LogHistogramResponse,
+    LogIssuesResponse,
     LogLevel,
     LogQueryParams,
     LogSource,
     LogStreamParams,
     LogSummaryResponse,
+    LogTemplateInfo,
+    LogTemplatesResponse,
+    NoiseAction,
+    NoisePatternInfo,
+    NoisePatternRequest,
+    NoiseStatusResponse,
+    PipelineMetricsResponse,
+    RateLimitInfo,
+    RateLimitRequest,
+    RateLimitStatusResponse,
+    SourceStatus,
+    StreamHubStats,
+    ThrottledKey,
 )
+from server.processing.anomalies import TemplateRates
+from server.processing.deduplicator import Deduplicator
+from server.processing.error_groups import ErrorGroups
+from server.processing.ingest_pool import IngestPool
+from server.processing.noise import NoiseFilter, NoisePattern
+from server.processing.rate_limit import RateLimit, RateLimiter
+from server.processing.resolutions import ResolutionTracker
 from server.processing.summarizer import (
     WINDOW_DURATIONS,
+    generate_rollup_summary,
     generate_summary,
     parse_cursor,
+    parse_cursor_seq,
 )
 
+from server.storage.fanout import FanoutHub
+from server.storage.merge import ListScan, LogScan, merge_exports, merge_scans
+from server.storage.partitioned import PartitionedLogStore
+from server.storage.query_lang import QuerySyntaxError, compile_query
 from server.storage.ring_buffer import RingBuffer
+from server.storage.segments import SegmentStore
+from server.storage.sequence import current_seq
+from server.storage.sqlite_store import SqliteLogStore
 
 router = APIRouter(prefix="/api/v1/logs", tags=["logs"])
 
@@ -44,14 +82,73 @@ def _get_buffers(request: Request, source: LogSource | None) -> list[RingBuffer]
     return [request.app.state.ring_buffer, request.app.state.server_buffer]
 
 
+async def _scan_stores(
+    buffers: list[RingBuffer],
+    params: LogQueryParams,
+    limit: int | None = None,
+    spill: SegmentStore | None = None,
+) -> list[LogScan]:
+    """Scan every store for merge_scans without the in-memory ones changing.
+
+    Disk-backed stores are read first (those awaits may let appends and
+    evictions run); the in-memory buffers are then scanned synchronously, so
+    nothing moves between them before the caller merges. The spill picks up
+    entries evicted during its own read, so each entry is seen exactly once.
+    """
+    scans: list[LogScan] = []
+    for buf in buffers:
+        if isinstance(buf, SqliteLogStore):
+            scans.append(await buf.scan(params, limit=limit))
+    if spill is not None:
+        scans.append(await spill.scan(params))
+    for buf in buffers:
+        if not isinstance(buf, SqliteLogStore):
+            scans.append(buf.scan(params, limit=limit))
+    return scans
+
+
+def _check_query(q: str | None) -> None:
+    """Reject an unparseable `q` query with a 400."""
+    if q:
+        try:
+            compile_query(q)
+        except QuerySyntaxError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid query: {e}")
+
+
 class LogQueryResponse(BaseModel):
     entries: list[LogEntry]
     total: int
     has_more: bool
 
 
+def _query_response(entries: list[LogEntry], total: int, has_more: bool) -> Response:
+    """Build a LogQueryResponse body from each entry's cached JSON bytes."""
+    body = b"".join([
+        b'{"entries":[',
+        b",".join(entry.json_bytes for entry in entries),
+        b'],"total":%d,"has_more":%s}' % (total, b"true" if has_more else b"false"),
+    ])
+    return Response(content=body, media_type="application/json")
+
+
+def _sse_log_event(entry: LogEntry) -> bytes:
+    """Encode a `log` SSE event straight from the entry's cached JSON.
+
+    Serialized JSON never contains raw newlines, so it fits on one data line.
+    """
+    return b"event: log\r\ndata: " + entry.json_bytes + b"\r\n\r\n"
+
+
+def _sse_batch_event(entries: list[LogEntry]) -> bytes:
+    """Encode a `batch` SSE event: a JSON array of entries."""
+    body = b",".join(entry.json_bytes for entry in entries)
+    return b"event: batch\r\ndata: [" + body + b"]\r\n\r\n"
+
+
 class SourcesResponse(BaseModel):
     sources: list[dict[str, Any]]
+    buffer: BufferStats | None = None
 
 
 class FilterRequest(BaseModel):
@@ -76,9 +173,23 @@ async def stream_logs(
     match: str | None = None,
     exclude: str | None = None,
     device_id: str | None = None,
+    q: str | None = None,
 ) -> EventSourceResponse:
-    """Stream log entries in real time via Server-Sent Events."""
+    """Stream log entries in real time via Server-Sent Events.
+
+    `q` takes a query language filter, e.g. `level>=error AND process:MyApp`.
+
+    Events:
+        log: One entry (JSON object).
+        batch: Several entries that arrived together (JSON array), sent
+            when entries are produced faster than one event at a time.
+        dropped: {"dropped": n, "total_dropped": m} — n entries were skipped
+            because this client fell behind. The stream continues.
+        heartbeat: Sent after 15s without entries.
+    """
+    _check_query(q)
     buffers = _get_buffers(request, source)
+    hub: FanoutHub = request.app.state.log_hub
     params = LogStreamParams(
         level=level,
         process=process,
@@ -88,57 +199,29 @@ async def stream_logs(
         match=match,
         exclude=exclude,
         device_id=device_id,
+        q=q,
     )
 
-    min_levels: set[LogLevel] | None = None
-    if params.level is not None:
-        min_levels = set(LogLevel.at_least(params.level))
-
-    def matches_filter(entry: LogEntry) -> bool:
-        if params.device_id and entry.device_id != params.device_id:
-            return False
-        if min_levels and entry.level not in min_levels:
-            return False
-        if params.process and entry.process != params.process:
-            return False
-        if params.subsystem and entry.subsystem != params.subsystem:
-            return False
-        if params.category and entry.category != params.category:
-            return False
-        if params.source and entry.source != params.source:
-            return False
-        if params.match and params.match.lower() not in entry.message.lower():
-            return False
-        if params.exclude and params.exclude.lower() in entry.message.lower():
-            return False
-        return True
-
     async def event_generator():
-        # Subscribe to all relevant buffers and merge into one queue
-        merged: asyncio.Queue[LogEntry] = asyncio.Queue(maxsize=1000)
-        subscriptions = [(buf, buf.subscribe()) for buf in buffers]
-
-        async def forward(queue: asyncio.Queue[LogEntry]) -> None:
-            while True:
-                entry = await queue.get()
-                try:
-                    merged.put_nowait(entry)
-                except asyncio.QueueFull:
-                    pass  # Drop if merged queue is full
-
-        tasks = [asyncio.create_task(forward(q)) for _, q in subscriptions]
+        subscriber = hub.subscribe(params)
         try:
             while True:
                 if await request.is_disconnected():
                     break
-                try:
-                    entry = await asyncio.wait_for(merged.get(), timeout=15.0)
-                    if matches_filter(entry):
-                        yield {
-                            "event": "log",
-                            "data": entry.model_dump_json(),
-                        }
-                except asyncio.TimeoutError:
+                batch, dropped = await subscriber.next_batch(hub.max_batch, timeout=15.0)
+                if dropped:
+                    yield {
+                        "event": "dropped",
+                        "data": json.dumps({
+                            "dropped": dropped,
+                            "total_dropped": subscriber.dropped,
+                        }),
+                    }
+                if len(batch) == 1:
+                    yield _sse_log_event(batch[0])
+                elif batch:
+                    yield _sse_batch_event(batch)
+                elif not dropped:
                     yield {
                         "event": "heartbeat",
                         "data": json.dumps({
@@ -147,14 +230,17 @@ async def stream_logs(
                         }),
                     }
         finally:
-            for task in tasks:
-                task.cancel()
-            for buf, queue in subscriptions:
-                buf.unsubscribe(queue)
+            hub.unsubscribe(subscriber)
 
     return EventSourceResponse(event_generator())
 
 
+@router.get("/stream/stats", response_model=StreamHubStats)
+async def stream_stats(request: Request) -> StreamHubStats:
+    """Delivery and drop counters for connected /stream clients."""
+    return request.app.state.log_hub.stats()
+
+
 # ---------------------------------------------------------------------------
 # Historical Query
 # ---------------------------------------------------------------------------
@@ -167,43 +253,149 @@ async def query_logs(
     until: datetime | None = None,
     level: LogLevel | None = None,
     process: str | None = None,
+    subsystem: str | None = None,
     source: LogSource | None = None,
     search: str | None = None,
+    regex: str | None = None,
     device_id: str | None = None,
+    after_seq: int | None = Query(default=None, ge=0),
+    q: str | None = None,
     limit: int = Query(default=100, ge=1, le=1000),
     offset: int = Query(default=0, ge=0),
-) -> LogQueryResponse:
-    """Query historical log entries with filters and pagination."""
+) -> Response:
+    """Query historical log entries with filters and pagination.
+
+    `search` is a case-insensitive substring match; `regex` is a Python
+    regular expression searched anywhere in the message. `after_seq` returns
+    only entries stored after the given sequence number (see LogEntry.seq).
+    `q` takes a query language filter combining any fields, e.g.
+    `level>=error AND process:MyApp AND NOT message:"heartbeat"`; it applies
+    on top of the other filters. With `since` or `after_seq`, entries already
+    evicted from memory are read back from spill segments on disk.
+    """
+    if regex:
+        try:
+            re.compile(regex)
+        except re.error as e:
+            raise HTTPException(status_code=400, detail=f"Invalid regex: {e}")
+    _check_query(q)
+
     params = LogQueryParams(
         since=since,
         until=until,
         level=level,
         process=process,
+        subsystem=subsystem,
         source=source,
         search=search,
+        regex=regex,
         device_id=device_id,
+        after_seq=after_seq,
+        q=q,
         limit=limit,
         offset=offset,
     )
 
+    # Merge matches from each buffer lazily by timestamp; only the requested
+    # page is materialized
     buffers = _get_buffers(request, source)
-    if len(buffers) == 1:
-        entries, total = await buffers[0].query(params)
-    else:
-        # Merge results from multiple buffers, sorted by timestamp
-        all_entries: list[LogEntry] = []
-        for buf in buffers:
-            buf_entries = await buf.filter_entries(params)
-            all_entries.extend(buf_entries)
-        all_entries.sort(key=lambda e: e.timestamp)
-        total = len(all_entries)
-        entries = all_entries[offset : offset + limit]
-
-    return LogQueryResponse(
-        entries=entries,
-        total=total,
-        has_more=(offset + limit) < total,
+    # Entries evicted from memory since `since`/`after_seq` live on in spill
+    # segments; the sparse index skips every block outside the requested range
+    spill: SegmentStore | None = request.app.state.log_spill
+    if source == LogSource.SERVER or (since is None and after_seq is None):
+        spill = None
+    scans = await _scan_stores(buffers, params, limit=offset + limit, spill=spill)
+    total = sum(scan.total for scan in scans)
+    entries = merge_scans(scans, offset=offset, limit=limit, encode=True)
+
+    return _query_response(entries, total, has_more=(offset + limit) < total)
+
+
+# Content-Encoding and filename suffix per export compression
+_EXPORT_ENCODINGS: dict[str, str] = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def _export_compressor(compression: str) -> Any:
+    """Return a streaming compressor (compress()/flush()) for an export."""
+    if compression == "gzip":
+        return zlib.compressobj(6, zlib.DEFLATED, 31)
+    try:
+        import zstandard
+    except ImportError:
+        raise HTTPException(
+            status_code=400,
+            detail="zstd compression requires the zstandard package "
+            "(pip install zstandard); use compression=gzip instead",
+        )
+    return zstandard.ZstdCompressor().compressobj()
+
+
+@router.get("/export")
+async def export_logs(
+    request: Request,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    level: LogLevel | None = None,
+    process: str | None = None,
+    subsystem: str | None = None,
+    source: LogSource | None = None,
+    search: str | None = None,
+    regex: str | None = None,
+    device_id: str | None = None,
+    after_seq: int | None = Query(default=None, ge=0),
+    q: str | None = None,
+    compression: str | None = Query(default=None, pattern=r"^(gzip|zstd)$"),
+) -> StreamingResponse:
+    """Stream every matching entry as NDJSON, in seq order.
+
+    Takes the same filters as /query, without pagination. The export covers
+    entries stored before the request; the `X-Quern-Export-Seq` header gives
+    that upper bound. To resume an interrupted export, pass the seq of the
+    last line received as `after_seq`. `compression` sets Content-Encoding to
+    gzip or zstd.
+    """
+    if regex:
+        try:
+            re.compile(regex)
+        except re.error as e:
+            raise HTTPException(status_code=400, detail=f"Invalid regex: {e}")
+    _check_query(q)
+    compressor = _export_compressor(compression) if compression else None
+
+    params = LogQueryParams(
+        since=since,
+        until=until,
+        level=level,
+        process=process,
+        subsystem=subsystem,
+        source=source,
+        search=search,
+        regex=regex,
+        device_id=device_id,
+        after_seq=after_seq,
+        q=q,
     )
+    snapshot_seq = current_seq()
+    buffers = _get_buffers(request, source)
+
+    async def body() -> AsyncIterator[bytes]:
+        batches = merge_exports([buf.export(params, end_seq=snapshot_seq) for buf in buffers])
+        async for batch in batches:
+            chunk = b"".join([entry.json_bytes + b"\n" for entry in batch])
+            if compressor is not None:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+        if compressor is not None:
+            yield compressor.flush()
+
+    filename = "quern-logs.ndjson"
+    headers = {"X-Quern-Export-Seq": str(snapshot_seq)}
+    if compression:
+        headers["Content-Encoding"] = compression
+        filename += _EXPORT_ENCODINGS[compression]
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return StreamingResponse(body(), media_type="application/x-ndjson", headers=headers)
 
 
 # ---------------------------------------------------------------------------
@@ -217,31 +409,164 @@ async def get_summary(
     window: str = Query(default="5m", pattern=r"^(30s|1m|5m|15m|1h)$"),
     process: str | None = None,
     since_cursor: str | None = None,
+    q: str | None = None,
 ) -> LogSummaryResponse:
     """Get an LLM-optimized summary of recent log activity.
 
     The response includes a `cursor` field. Pass it back as `since_cursor`
-    on the next call to get only new entries since the last summary.
+    on the next call to get only new entries since the last summary. `q`
+    restricts the summary to entries matching a query language filter.
+    `anomalies` lists the template rate spikes and new templates current
+    now, whatever the window (see GET /anomalies).
     """
+    _check_query(q)
+    rates: TemplateRates = request.app.state.log_rates
+    anomalies = rates.anomalies(process=process)
+    if not since_cursor and not q:
+        # Window summaries come from the ingest-time rollups of both buffers;
+        # the rollups are updated synchronously on append, so current_seq()
+        # is exactly what they cover.
+        cutoff = datetime.now(timezone.utc) - WINDOW_DURATIONS[window]
+        return generate_rollup_summary(
+            request.app.state.log_rollups.window(cutoff),
+            window=window,
+            process=process,
+            cursor_seq=current_seq(),
+            anomalies=anomalies,
+        )
+
+    groups: ErrorGroups | None = request.app.state.log_groups
+    cursor_seq = parse_cursor_seq(since_cursor) if since_cursor else None
+    if groups is not None and cursor_seq is not None and not q:
+        # Deltas come from the incrementally maintained pattern groups, which
+        # like the rollups are updated synchronously on append
+        return generate_rollup_summary(
+            groups.since_seq(cursor_seq),
+            window=window,
+            process=process,
+            cursor_seq=current_seq(),
+            anomalies=anomalies,
+        )
+
     # Summary always reads from both buffers (no source filter)
     buffers = _get_buffers(request, None)
 
-    all_entries: list[LogEntry] = []
-    if since_cursor:
-        cursor_ts = parse_cursor(since_cursor)
+    # Entries appended while we read the stores are excluded here and picked
+    # up by the next delta, so the cursor never skips anything.
+    snapshot_seq = current_seq()
+
+    cursor_ts = parse_cursor(since_cursor) if since_cursor and cursor_seq is None else None
+    if cursor_ts:
+        # Legacy timestamp-only cursor
+        scans: list[LogScan] = []
         for buf in buffers:
-            if cursor_ts:
-                all_entries.extend(await buf.get_after(cursor_ts))
-            else:
-                all_entries.extend(await buf.get_recent(buf.max_size))
+            entries = await buf.get_after(cursor_ts)
+            if q:
+                query = compile_query(q)
+                entries = [e for e in entries if query.matches(e)]
+            scans.append(ListScan(entries))
+    elif since_cursor:
+        scans = await _scan_stores(buffers, LogQueryParams(after_seq=cursor_seq, q=q))
     else:
-        duration = WINDOW_DURATIONS[window]
-        cutoff = datetime.now(timezone.utc) - duration
-        for buf in buffers:
-            all_entries.extend(await buf.get_since(cutoff))
+        cutoff = datetime.now(timezone.utc) - WINDOW_DURATIONS[window]
+        scans = await _scan_stores(buffers, LogQueryParams(since=cutoff, q=q))
+
+    all_entries = [e for e in merge_scans(scans) if e.seq <= snapshot_seq]
+    return generate_summary(
+        all_entries, window=window, process=process, cursor_seq=snapshot_seq,
+        anomalies=anomalies,
+    )
+
+
+# Histogram slot widths, in seconds
+HISTOGRAM_INTERVALS: dict[str, int] = {"1s": 1, "10s": 10, "1m": 60}
+
+
+@router.get("/histogram", response_model=LogHistogramResponse)
+async def get_histogram(
+    request: Request,
+    window: str = Query(default="5m", pattern=r"^(30s|1m|5m|15m|1h)$"),
+    interval: str = Query(default="10s", pattern=r"^(1s|10s|1m)$"),
+    by: str = Query(default="level", pattern=r"^(level|process|source)$"),
+    process: str | None = None,
+) -> LogHistogramResponse:
+    """Get entry counts over time, grouped by level, process or source.
+
+    Backed by the same ingest-time rollups as /summary. Covers both buffers.
+    """
+    now = datetime.now(timezone.utc)
+    series = request.app.state.log_rollups.series(
+        now - WINDOW_DURATIONS[window], now, HISTOGRAM_INTERVALS[interval], by, process,
+    )
+    return LogHistogramResponse(
+        window=window,
+        interval=interval,
+        by=by,
+        points=[
+            HistogramPoint(start=start, total=sum(counts.values()), counts=counts)
+            for start, counts in series
+        ],
+    )
+
+
+# ---------------------------------------------------------------------------
+# Templates
+# ---------------------------------------------------------------------------
+
 
-    all_entries.sort(key=lambda e: e.timestamp)
-    return generate_summary(all_entries, window=window, process=process)
+@router.get("/templates", response_model=LogTemplatesResponse)
+async def list_templates(
+    request: Request,
+    limit: int = Query(default=50, ge=1, le=1000),
+    min_count: int = Query(default=1, ge=1),
+    search: str | None = None,
+) -> LogTemplatesResponse:
+    """List message templates mined at ingest, most frequent first.
+
+    Each entry's `template_id` refers to one of these; use `q=template:<id>`
+    on the query endpoints to fetch a template's entries. `search` is a
+    case-insensitive substring of the template text.
+    """
+    needle = search.lower() if search else None
+    templates = [
+        t for t in request.app.state.log_templates.templates()
+        if t.count >= min_count and (needle is None or needle in t.template.lower())
+    ]
+    return LogTemplatesResponse(
+        templates=[
+            LogTemplateInfo(
+                id=t.id,
+                template=t.template,
+                count=t.count,
+                first_seen=t.first_seen,
+                last_seen=t.last_seen,
+                examples=t.examples,
+            )
+            for t in templates[:limit]
+        ],
+        total=len(templates),
+    )
+
+
+@router.get("/anomalies", response_model=LogAnomaliesResponse)
+async def get_anomalies(
+    request: Request,
+    process: str | None = None,
+    kind: str | None = Query(default=None, pattern=r"^(spike|new)$"),
+    limit: int = Query(default=50, ge=1, le=1000),
+) -> LogAnomaliesResponse:
+    """Templates logging far above their baseline rate, and new templates.
+
+    Tracked incrementally at ingest per (process, template): a spike is a
+    current rate (over ~10s) at least 10x the baseline (over ~10m) from
+    before it started; a template is new for 5 minutes after it first
+    appears (not counting the first 2 minutes after startup).
+    """
+    rates: TemplateRates = request.app.state.log_rates
+    anomalies = [
+        a for a in rates.anomalies(process=process) if kind is None or a.kind == kind
+    ]
+    return LogAnomaliesResponse(anomalies=anomalies[:limit], total=len(anomalies))
 
 
 # ---------------------------------------------------------------------------
@@ -255,29 +580,179 @@ async def get_errors(
     since: datetime | None = None,
     limit: int = Query(default=50, ge=1, le=1000),
     include_crashes: bool = True,
+    q: str | None = None,
 ) -> LogErrorsResponse:
-    """Get error-level entries and crash reports."""
+    """Get error-level entries and crash reports.
+
+    `q` narrows the errors with a query language filter.
+    """
+    _check_query(q)
     # Errors endpoint reads from both buffers (server errors are important!)
     buffers = _get_buffers(request, None)
-    error_levels = set(LogLevel.at_least(LogLevel.ERROR))
+    params = LogQueryParams(level=LogLevel.ERROR, since=since, q=q)
+    fetch = limit if include_crashes else None
+    scans = await _scan_stores(buffers, params, limit=fetch)
+    total = sum(scan.total for scan in scans)
 
-    candidates: list[LogEntry] = []
-    for buf in buffers:
-        if since:
-            candidates.extend(await buf.get_since(since))
-        else:
-            candidates.extend(await buf.get_recent(buf.max_size))
+    if include_crashes:
+        limited = merge_scans(scans, limit=limit)
+    else:
+        # Crashes are rare, so filtering the merged errors is cheap
+        entries = [e for e in merge_scans(scans) if e.source != LogSource.CRASH]
+        total = len(entries)
+        limited = entries[:limit]
 
-    candidates.sort(key=lambda e: e.timestamp)
-    all_entries = [e for e in candidates if e.level in error_levels]
+    return LogErrorsResponse(entries=limited, total=total)
 
-    if not include_crashes:
-        all_entries = [e for e in all_entries if e.source != LogSource.CRASH]
 
-    total = len(all_entries)
-    limited = all_entries[:limit]
+# ---------------------------------------------------------------------------
+# Issues
+# ---------------------------------------------------------------------------
+
+
+@router.get("/issues", response_model=LogIssuesResponse)
+async def get_issues(
+    request: Request,
+    state: str = Query(default="all", pattern=r"^(all|resolved|unresolved)$"),
+    process: str | None = None,
+    device_id: str | None = None,
+    limit: int = Query(default=50, ge=1, le=1000),
+) -> LogIssuesResponse:
+    """List error patterns by process and whether each has been resolved.
+
+    An issue is resolved once its process logs a success message after the
+    issue's latest error, and reopens if the error recurs. State is tracked
+    at ingest over everything stored since startup, most recently seen first.
+    """
+    tracker: ResolutionTracker = request.app.state.log_resolutions
+    every = tracker.issues(device_id=device_id, process=process)
+    resolved_count = sum(1 for issue in every if issue.resolved)
+    issues = every
+    if state != "all":
+        issues = [issue for issue in every if issue.resolved == (state == "resolved")]
+    return LogIssuesResponse(
+        issues=[
+            IssueInfo(
+                device_id=issue.device_id,
+                process=issue.process,
+                pattern=issue.pattern,
+                count=issue.count,
+                first_seen=issue.first_seen,
+                last_seen=issue.last_seen,
+                resolved=issue.resolved,
+                resolved_at=issue.resolved_at,
+                resolution_message=issue.resolution_message,
+            )
+            for issue in issues[:limit]
+        ],
+        total=len(issues),
+        unresolved_count=len(every) - resolved_count,
+        resolved_count=resolved_count,
+    )
 
-    return LogErrorsResponse(entries=limited, total=total)
+
+# ---------------------------------------------------------------------------
+# Noise
+# ---------------------------------------------------------------------------
+
+
+def _noise_info(pattern: NoisePattern) -> NoisePatternInfo:
+    return NoisePatternInfo(
+        name=pattern.name,
+        pattern=pattern.pattern,
+        action=pattern.action,
+        builtin=pattern.builtin,
+        hits=pattern.hits,
+        source=pattern.source,
+    )
+
+
+@router.get("/noise", response_model=NoiseStatusResponse)
+async def get_noise(request: Request) -> NoiseStatusResponse:
+    """List the noise patterns with their actions and hit counts."""
+    noise: NoiseFilter = request.app.state.noise_filter
+    return NoiseStatusResponse(
+        checked=noise.checked,
+        matched=noise.matched,
+        dropped=noise.dropped,
+        patterns=[_noise_info(p) for p in noise.patterns()],
+    )
+
+
+@router.post("/noise", response_model=NoisePatternInfo)
+async def set_noise_pattern(request: Request, body: NoisePatternRequest) -> NoisePatternInfo:
+    """Add a noise pattern, or change an existing one's regex or action.
+
+    Patterns are case-insensitive regexes searched in each message. Entries
+    already stored keep their noise tag; the change applies to new entries.
+    """
+    noise: NoiseFilter = request.app.state.noise_filter
+    try:
+        pattern = noise.set_pattern(body.name, body.pattern, body.action, body.source)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _noise_info(pattern)
+
+
+@router.delete("/noise/{name}")
+async def delete_noise_pattern(request: Request, name: str) -> dict[str, str]:
+    """Remove a noise pattern (built-in ones included)."""
+    noise: NoiseFilter = request.app.state.noise_filter
+    if not noise.remove_pattern(name):
+        raise HTTPException(status_code=404, detail=f"No noise pattern named {name!r}")
+    return {"status": "removed", "name": name}
+
+
+# ---------------------------------------------------------------------------
+# Rate limiting
+# ---------------------------------------------------------------------------
+
+
+def _rate_limit_info(limit: RateLimit, process: str | None = None) -> RateLimitInfo:
+    return RateLimitInfo(process=process, rate=limit.rate, burst=limit.burst)
+
+
+@router.get("/rate-limit", response_model=RateLimitStatusResponse)
+async def get_rate_limit(request: Request) -> RateLimitStatusResponse:
+    """Show the rate limits and which processes they have throttled."""
+    limiter: RateLimiter = request.app.state.rate_limiter
+    return RateLimitStatusResponse(
+        default=_rate_limit_info(limiter.default),
+        overrides=[
+            _rate_limit_info(limit, process) for process, limit in limiter.overrides().items()
+        ],
+        sample_every=limiter.sample_every,
+        suppressed=limiter.suppressed,
+        sampled=limiter.sampled,
+        throttled=[
+            ThrottledKey(device_id=device_id, process=process, subsystem=subsystem, suppressed=n)
+            for (device_id, process, subsystem), n in limiter.throttled()
+        ],
+    )
+
+
+@router.post("/rate-limit", response_model=RateLimitInfo)
+async def set_rate_limit(request: Request, body: RateLimitRequest) -> RateLimitInfo:
+    """Set the default rate limit, or override it for one process.
+
+    A rate of 0 turns limiting off (for that process, with `process`).
+    Without `burst`, the current burst is kept, raised to twice the rate.
+    """
+    limiter: RateLimiter = request.app.state.rate_limiter
+    try:
+        limit = limiter.set_limit(body.rate, body.burst, body.process)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _rate_limit_info(limit, body.process)
+
+
+@router.delete("/rate-limit/{process}")
+async def delete_rate_limit(request: Request, process: str) -> dict[str, str]:
+    """Remove a process's override so the default limit applies again."""
+    limiter: RateLimiter = request.app.state.rate_limiter
+    if not limiter.remove_limit(process):
+        raise HTTPException(status_code=404, detail=f"No rate limit override for {process!r}")
+    return {"status": "removed", "process": process}
 
 
 # ---------------------------------------------------------------------------
@@ -285,12 +760,76 @@ async def get_errors(
 # ---------------------------------------------------------------------------
 
 
+def _source_statuses(request: Request) -> list[SourceStatus]:
+    """Status of every adapter, including on-demand simulator and device logging."""
+    state = request.app.state
+    adapters = [
+        *state.source_adapters.values(),
+        *state.sim_log_adapters.values(),
+        *state.device_log_adapters.values(),
+    ]
+    return [adapter.status() for adapter in adapters]
+
+
+def _buffer_stats(request: Request) -> BufferStats:
+    """Fill and eviction counters for the main log store."""
+    store = request.app.state.ring_buffer
+    stats = BufferStats(
+        size=store.size,
+        max_size=store.max_size,
+        fill_ratio=store.size / store.max_size if store.max_size else 0.0,
+        evicted=store.evictions.total,
+        evictions_per_second=store.evictions.per_second(),
+    )
+    if isinstance(store, PartitionedLogStore):
+        stats.nbytes = store.nbytes
+        stats.max_bytes = store.max_bytes
+        stats.partitions = store.partition_sizes()
+    return stats
+
+
 @router.get("/sources")
 async def list_sources(request: Request) -> SourcesResponse:
-    """List all active log source adapters and their status."""
-    adapters = request.app.state.source_adapters
+    """List all log source adapters with their throughput, and the buffer fill."""
     return SourcesResponse(
-        sources=[adapter.status().model_dump() for adapter in adapters.values()]
+        sources=[status.model_dump() for status in _source_statuses(request)],
+        buffer=_buffer_stats(request),
+    )
+
+
+@router.get("/metrics", response_model=PipelineMetricsResponse)
+async def get_metrics(request: Request) -> PipelineMetricsResponse:
+    """Per-stage ingest pipeline counters and latencies.
+
+    Entries in/out and time spent per call for the noise filter,
+    deduplicator and store (storing includes the store's listeners), the
+    adapters sorted by entries/s (to spot a flooding source), buffer fill
+    and evictions, SSE drops, and the ingest workers when enabled. Latency
+    percentiles are bucket upper bounds. With ingest workers, parsing happens
+    in the workers and shows up in ingest_pool instead.
+    """
+    state = request.app.state
+    noise: NoiseFilter = state.noise_filter
+    limiter: RateLimiter = state.rate_limiter
+    dedup: Deduplicator = state.deduplicator
+    hub: FanoutHub = state.log_hub
+    pool: IngestPool | None = state.ingest_pool
+    sources = sorted(_source_statuses(request), key=lambda s: s.entries_per_second, reverse=True)
+    return PipelineMetricsResponse(
+        stages=[
+            noise.metrics.stats(),
+            limiter.metrics.stats(),
+            dedup.metrics.stats(),
+            state.ring_buffer.metrics.stats(),
+        ],
+        dedup_suppressed=dedup.suppressed,
+        noise_dropped=noise.dropped,
+        rate_limited=limiter.suppressed,
+        sources=sources,
+        buffer=_buffer_stats(request),
+        stream=hub.stats(),
+        stream_dropped_total=hub.dropped_total,
+        ingest_pool=pool.stats() if pool is not None else None,
     )
 
 
@@ -306,8 +845,23 @@ async def set_filter(request: Request, filter_req: FilterRequest) -> dict[str, s
     Current limitation: BaseSourceAdapter only accepts filter args at construction
     (process_filter, subsystem_filter, etc.). There is no reconfigure() method.
     Implementation path: stop the adapter, rebuild it with new filter args, restart
-    it, and re-wire the on_entry callback. The exclude_patterns field would need
-    new support in the adapters or the processing pipeline.
+    it, and re-wire the on_entry callback.
+
+    exclude_patterns are applied now: each keyword becomes a drop pattern in the
+    noise filter scoped to the request's source (named
+    "exclude:<source>:<keyword>", see GET /noise), so `source` must be a
+    LogSource value; anything else is a 400. `process` is accepted but not
+    applied yet.
     """
-    # TODO: Implement dynamic filter reconfiguration (see docstring for plan)
-    return {"status": "accepted", "note": "Filter reconfiguration not yet implemented"}
+    try:
+        source = LogSource(filter_req.source)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Unknown source {filter_req.source!r}")
+    noise: NoiseFilter = request.app.state.noise_filter
+    for keyword in filter_req.exclude_patterns or []:
+        noise.set_pattern(
+            f"exclude:{source.value}:{keyword}", re.escape(keyword), NoiseAction.DROP, source,
+        )
+    if filter_req.process is not None:
+        return {"status": "accepted", "note": "Filter reconfiguration not yet implemented"}
+    return {"status": "applied"}
@@ -23,6 +23,21 @@ class ServerConfig:
     host: str = "0.0.0.0"
     port: int = 9100
     ring_buffer_size: int = 10_000
+    # Memory budget for the ring buffer (None = count cap only)
+    ring_buffer_bytes: int | None = None
+    device_log_quota: int = 2_000  # Ring buffer entries guaranteed to each device
+    keep_raw_lines: bool = True
+    log_store: str = "memory"  # "memory" (RingBuffer) or "sqlite" (SqliteLogStore)
+    log_spill: bool = False  # Spill entries evicted from memory to compressed segments
+    log_spill_dir: Path = CONFIG_DIR / "logs"
+    log_spill_bytes: int = 512 * 1024 * 1024  # Disk budget for spilled segments
+    log_db_path: Path = CONFIG_DIR / "logs.db"
+    log_retention_hours: float = 6.0
+    log_db_max_entries: int = 2_000_000  # Entry cap for the SQLite log store
+    noise_action: str = "tag"  # Built-in noise patterns: "drop", "tag", "exclude" or "off"
+    rate_limit: float = 0.0  # Entries/s per process, device and subsystem (0 = off)
+    rate_limit_burst: int = 2_000
+    ingest_workers: int = 0  # Processes that parse log streams (0 = on the event loop)
     default_device_id: str = "default"
     api_key: str = field(default="", repr=False)
 
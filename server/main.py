@@ -23,7 +23,7 @@ import subprocess
 import sys
 import time
 from contextlib import asynccontextmanager
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import AsyncGenerator
 
@@ -48,7 +48,17 @@ from server.lifecycle.state import (
     write_state,
 )
 from server.lifecycle.watchdog import proxy_watchdog
+from server.models import NoiseAction
+from server.processing.anomalies import TemplateRates
 from server.processing.deduplicator import Deduplicator
+from server.processing.error_groups import ErrorGroups
+from server.processing.ingest_pool import IngestPool
+from server.processing.noise import NoiseFilter
+from server.processing.rate_limit import RateLimiter
+from server.processing.resolutions import ResolutionTracker
+from server.processing.rollups import LogRollups
+from server.processing.summarizer import WINDOW_DURATIONS
+from server.processing.templates import TemplateMiner
 from server.proxy.flow_store import FlowStore
 from server.sources import BaseSourceAdapter
 from server.sources.build import BuildAdapter
@@ -57,7 +67,11 @@ from server.sources.oslog import OslogAdapter
 from server.sources.proxy import ProxyAdapter
 from server.sources.server_log import ServerLogAdapter
 from server.sources.syslog import SyslogAdapter
+from server.storage.fanout import FanoutHub
+from server.storage.partitioned import PartitionedLogStore
 from server.storage.ring_buffer import RingBuffer
+from server.storage.segments import SegmentStore
+from server.storage.sqlite_store import SqliteLogStore
 from server.api.builds import router as builds_router
 from server.api.crashes import router as crashes_router
 from server.api.device import router as device_router
@@ -78,12 +92,37 @@ logger = logging.getLogger("quern-debug-server")
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Manage server startup and shutdown."""
     config: ServerConfig = app.state.config
-    buffer: RingBuffer = app.state.ring_buffer
-
-    # Processing pipeline: adapter → deduplicator → ring buffer
-    dedup = Deduplicator(on_entry=buffer.append)
+    buffer: PartitionedLogStore | SqliteLogStore = app.state.ring_buffer
+    spill: SegmentStore | None = app.state.log_spill
+    if spill is not None:
+        spill.open()
+    if isinstance(buffer, SqliteLogStore):
+        await buffer.open()
+        # Rebuild the summary rollups from entries persisted by a previous run
+        since = datetime.now(timezone.utc) - max(WINDOW_DURATIONS.values())
+        for entry in await buffer.get_since(since):
+            app.state.log_rollups.add(entry)
+            app.state.log_resolutions.add(entry)
+
+    # Processing pipeline:
+    # adapter → noise filter → rate limiter → deduplicator → ring buffer
+    dedup: Deduplicator = app.state.deduplicator
     dedup.start()
-    app.state.deduplicator = dedup
+    limiter: RateLimiter = app.state.rate_limiter
+    limiter.on_entry = dedup.process
+    limiter.on_batch = dedup.process_many
+    limiter.start()
+    noise: NoiseFilter = app.state.noise_filter
+    noise.on_entry = limiter.process
+    noise.on_batch = limiter.process_many
+
+    # Optional ingest workers: log streams are parsed in worker processes,
+    # then enter the pipeline above at the noise filter like any adapter
+    ingest_pool: IngestPool | None = None
+    if config.ingest_workers > 0:
+        ingest_pool = IngestPool(workers=config.ingest_workers, on_batch=noise.process_many)
+        ingest_pool.start()
+    app.state.ingest_pool = ingest_pool
 
     # Server log adapter — dedicated buffer so device syslog can't evict server logs
     server_buffer: RingBuffer = app.state.server_buffer
@@ -91,13 +130,15 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     adapters: dict[str, BaseSourceAdapter] = {"server": server_log}
     await server_log.start()
 
-    # Start source adapters (all feed into the deduplicator)
+    # Start source adapters (all feed into the noise filter)
 
     if app.state.enable_syslog:
         syslog = SyslogAdapter(
             device_id=config.default_device_id,
-            on_entry=dedup.process,
+            on_entry=noise.process,
+            on_batch=noise.process_many,
             process_filter=app.state.process_filter,
+            ingest_pool=ingest_pool,
         )
         adapters["syslog"] = syslog
         await syslog.start()
@@ -106,9 +147,11 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     if app.state.enable_oslog:
         oslog = OslogAdapter(
             device_id=config.default_device_id,
-            on_entry=dedup.process,
+            on_entry=noise.process,
+            on_batch=noise.process_many,
             subsystem_filter=app.state.subsystem_filter,
             process_filter=app.state.process_filter,
+            ingest_pool=ingest_pool,
         )
         adapters["oslog"] = oslog
         await oslog.start()
@@ -117,7 +160,7 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     if app.state.enable_crash:
         crash = CrashAdapter(
             device_id=config.default_device_id,
-            on_entry=dedup.process,
+            on_entry=noise.process,
             watch_dir=app.state.crash_dir,
             extra_watch_dirs=app.state.crash_extra_watch_dirs,
             process_filter=app.state.crash_process_filter,
@@ -142,7 +185,8 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     app.state.flow_store = flow_store
     proxy = ProxyAdapter(
         device_id=config.default_device_id,
-        on_entry=dedup.process,
+        on_entry=noise.process,
+        on_batch=noise.process_many,
         flow_store=flow_store,
         listen_port=app.state.proxy_port,
         local_capture_processes=app.state.local_capture_processes,
@@ -285,7 +329,14 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         await sim_adapter.stop()
     for dev_adapter in app.state.device_log_adapters.values():
         await dev_adapter.stop()
+    if ingest_pool is not None:
+        await ingest_pool.stop()
+    await limiter.stop()
     await dedup.stop()
+    if isinstance(buffer, SqliteLogStore):
+        await buffer.close()
+    if spill is not None:
+        spill.close()
 
     # Restore system proxy if we configured it
     from server.proxy.system_proxy import restore_from_state
@@ -324,8 +375,55 @@ def create_app(
 
     # Store shared state
     app.state.config = config
-    app.state.ring_buffer = RingBuffer(max_size=config.ring_buffer_size)
+    app.state.log_spill = None
+    if config.log_store == "sqlite":
+        app.state.ring_buffer = SqliteLogStore(
+            path=config.log_db_path,
+            retention=timedelta(hours=config.log_retention_hours),
+            max_size=config.log_db_max_entries,
+        )
+    else:
+        if config.log_spill:
+            # Evicted entries go to disk so /query can still reach them
+            app.state.log_spill = SegmentStore(
+                config.log_spill_dir, max_bytes=config.log_spill_bytes,
+            )
+        # One partition per device so a chatty simulator can't evict the others
+        app.state.ring_buffer = PartitionedLogStore(
+            max_size=config.ring_buffer_size,
+            quota=config.device_log_quota,
+            max_bytes=config.ring_buffer_bytes,
+            keep_raw=config.keep_raw_lines,
+        )
+        if app.state.log_spill is not None:
+            app.state.ring_buffer.add_evict_listener(app.state.log_spill.add)
     app.state.server_buffer = RingBuffer(max_size=1_000)
+    app.state.log_hub = FanoutHub()
+    app.state.log_rollups = LogRollups(retention=max(WINDOW_DURATIONS.values()))
+    app.state.log_templates = TemplateMiner()
+    app.state.log_resolutions = ResolutionTracker()
+    app.state.log_rates = TemplateRates(templates=app.state.log_templates)
+    app.state.ingest_pool = None
+    app.state.noise_filter = NoiseFilter(
+        action=None if config.noise_action == "off" else NoiseAction(config.noise_action),
+    )
+    app.state.rate_limiter = RateLimiter(rate=config.rate_limit, burst=config.rate_limit_burst)
+    app.state.deduplicator = Deduplicator(
+        on_entry=app.state.ring_buffer.append, on_batch=app.state.ring_buffer.append_many,
+    )
+    # Cursor-delta summary groups track what's in memory, so they need the
+    # stores' eviction callbacks (the SQLite store has none)
+    groups = ErrorGroups() if config.log_store != "sqlite" else None
+    app.state.log_groups = groups
+    for store in (app.state.ring_buffer, app.state.server_buffer):
+        store.add_ingest_hook(app.state.log_templates.assign)
+        store.add_listener(app.state.log_hub.publish)
+        store.add_listener(app.state.log_rollups.add)
+        store.add_listener(app.state.log_resolutions.add)
+        store.add_listener(app.state.log_rates.add)
+        if groups is not None:
+            store.add_listener(groups.add)
+            store.add_evict_listener(groups.remove)
     app.state.process_filter = process_filter
     app.state.enable_syslog = enable_syslog
     app.state.enable_oslog = enable_oslog
@@ -399,6 +497,18 @@ def create_app(
     return app
 
 
+def _byte_size(value: str) -> int:
+    """Parse a byte count with an optional K/M/G suffix (e.g. "200M")."""
+    units = {"K": 1024, "M": 1024**2, "G": 1024**3}
+    text = value.strip().upper().removesuffix("B")
+    try:
+        if text and text[-1] in units:
+            return int(float(text[:-1]) * units[text[-1]])
+        return int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid byte size: {value!r}") from None
+
+
 def _add_server_flags(parser: argparse.ArgumentParser) -> None:
     """Add shared server flags to a subcommand parser."""
     parser.add_argument("--host", default="0.0.0.0", help="Bind host (default: 0.0.0.0)")
@@ -407,6 +517,65 @@ def _add_server_flags(parser: argparse.ArgumentParser) -> None:
     parser.add_argument(
         "--buffer-size", type=int, default=10_000, help="Ring buffer size (default: 10000)"
     )
+    parser.add_argument(
+        "--buffer-bytes", type=_byte_size, default=None,
+        help="Ring buffer memory budget, e.g. 200M; oldest entries are evicted "
+        "to stay under it (default: no budget, --buffer-size only)",
+    )
+    parser.add_argument(
+        "--device-quota", type=int, default=2_000,
+        help="Ring buffer entries guaranteed to each device; the rest of --buffer-size "
+        "is shared (default: 2000)",
+    )
+    parser.add_argument(
+        "--drop-raw", action="store_true", default=False,
+        help="Don't keep each entry's raw log line in the ring buffer",
+    )
+    parser.add_argument(
+        "--log-store", choices=["memory", "sqlite"], default="memory",
+        help="Log storage backend: in-memory ring buffer or SQLite on disk (default: memory)",
+    )
+    parser.add_argument(
+        "--spill", action="store_true", default=False,
+        help="Spill entries evicted from the in-memory buffer to compressed segments "
+        "in ~/.quern/logs/ instead of dropping them",
+    )
+    parser.add_argument(
+        "--spill-bytes", type=_byte_size, default=512 * 1024 * 1024,
+        help="Disk budget for spilled log segments, e.g. 1G (default: 512M)",
+    )
+    parser.add_argument(
+        "--log-db", default=None, type=Path,
+        help="SQLite log database path for --log-store sqlite (default: ~/.quern/logs.db)",
+    )
+    parser.add_argument(
+        "--log-retention", type=float, default=6.0,
+        help="Hours of logs to keep with --log-store sqlite (default: 6)",
+    )
+    parser.add_argument(
+        "--log-db-max-entries", type=int, default=2_000_000,
+        help="Entries to keep at most with --log-store sqlite; the oldest hours are "
+        "dropped first (default: 2000000)",
+    )
+    parser.add_argument(
+        "--noise", choices=["drop", "tag", "exclude", "off"], default="tag",
+        help="What to do with known iOS noise (sandbox denials, network chatter, ...): "
+        "drop it, tag it, tag it and leave it out of summaries, or nothing (default: tag)",
+    )
+    parser.add_argument(
+        "--rate-limit", type=float, default=0.0,
+        help="Entries/s a single process (per device and subsystem) may log before its "
+        "entries are sampled and summarized; changeable at runtime (default: 0 = off)",
+    )
+    parser.add_argument(
+        "--rate-limit-burst", type=int, default=2_000,
+        help="Entries a process may log at once before --rate-limit applies (default: 2000)",
+    )
+    parser.add_argument(
+        "--ingest-workers", type=int, default=0,
+        help="Parse device/simulator log streams in this many worker processes, "
+        "keeping the API responsive during log floods (default: 0, off)",
+    )
     parser.add_argument("--verbose", "-v", action="store_true", help="Enable debug logging")
     parser.add_argument(
         "--oslog", action="store_true", default=False,
@@ -538,7 +707,21 @@ def _cmd_start(args: argparse.Namespace) -> None:
         host=args.host,
         port=server_port,
         ring_buffer_size=args.buffer_size,
+        ring_buffer_bytes=args.buffer_bytes,
+        device_log_quota=args.device_quota,
+        log_spill=args.spill,
+        log_spill_bytes=args.spill_bytes,
+        keep_raw_lines=not args.drop_raw,
+        log_store=args.log_store,
+        log_retention_hours=args.log_retention,
+        log_db_max_entries=args.log_db_max_entries,
+        noise_action=args.noise,
+        rate_limit=args.rate_limit,
+        rate_limit_burst=args.rate_limit_burst,
+        ingest_workers=args.ingest_workers,
     )
+    if args.log_db is not None:
+        config.log_db_path = args.log_db
 
     enable_syslog = args.syslog is True and not args.no_syslog
     enable_oslog = args.oslog is True and not args.no_oslog
@@ -0,0 +1,129 @@
+"""Counters and latency histograms for the log ingest pipeline.
+
+Each pipeline stage (adapter parsing, noise filter, deduplicator, store)
+owns a StageMetrics and records every call it handles: entries in, entries
+out and the time the stage itself spent, excluding the downstream callbacks
+it awaits. Latencies go into a fixed-bucket histogram, so recording costs a
+bisect and percentiles are approximate (the upper bound of the bucket the
+percentile falls in). EventRate keeps per-second counts for the last minute
+to report rates such as evictions per second.
+
+GET /api/v1/logs/metrics reports them all (see api/logs.py).
+"""
+
+from __future__ import annotations
+
+import bisect
+import time
+from collections import deque
+
+from server.models import LatencyStats, StageStats
+
+# Histogram bucket upper bounds, in seconds (100 µs to 1 s, then overflow)
+LATENCY_BOUNDS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+)
+
+
+class LatencyHistogram:
+    """Counts durations into fixed buckets."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (max for overflow)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return LATENCY_BOUNDS[i] if i < len(LATENCY_BOUNDS) else self.max
+        return self.max
+
+    def stats(self) -> LatencyStats:
+        return LatencyStats(
+            count=self.count,
+            mean_ms=self.total / self.count * 1e3 if self.count else 0.0,
+            p50_ms=self.quantile(0.5) * 1e3,
+            p99_ms=self.quantile(0.99) * 1e3,
+            max_ms=self.max * 1e3,
+            buckets={
+                **{f"le_{bound * 1e3:g}ms": n for bound, n in zip(LATENCY_BOUNDS, self.counts)},
+                "overflow": self.counts[-1],
+            },
+        )
+
+
+class StageMetrics:
+    """Entries in and out of one pipeline stage, and time spent in it."""
+
+    __slots__ = ("name", "entries_in", "entries_out", "latency")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.entries_in = 0
+        self.entries_out = 0
+        self.latency = LatencyHistogram()
+
+    def record(self, entries_in: int, entries_out: int, seconds: float) -> None:
+        """Count one call of the stage."""
+        self.entries_in += entries_in
+        self.entries_out += entries_out
+        self.latency.observe(seconds)
+
+    def stats(self) -> StageStats:
+        return StageStats(
+            name=self.name,
+            entries_in=self.entries_in,
+            entries_out=self.entries_out,
+            latency=self.latency.stats(),
+        )
+
+
+class EventRate:
+    """A running total plus per-second counts for the last `window` seconds."""
+
+    __slots__ = ("total", "window", "_seconds")
+
+    def __init__(self, window: int = 60) -> None:
+        self.total = 0
+        self.window = window
+        # (whole monotonic second, events in it), oldest first
+        self._seconds: deque[list[int]] = deque()
+
+    def add(self, count: int = 1) -> None:
+        self.total += count
+        now = int(time.monotonic())
+        if self._seconds and self._seconds[-1][0] == now:
+            self._seconds[-1][1] += count
+        else:
+            self._seconds.append([now, count])
+            self._trim(now)
+
+    def _trim(self, now: int) -> None:
+        while self._seconds and self._seconds[0][0] <= now - self.window:
+            self._seconds.popleft()
+
+    def per_second(self) -> float:
+        """Average events per second over the window (or since the first event)."""
+        now = int(time.monotonic())
+        self._trim(now)
+        if not self._seconds:
+            return 0.0
+        span = min(self.window, now - self._seconds[0][0] + 1)
+        return sum(n for _, n in self._seconds) / span
@@ -4,6 +4,8 @@ from __future__ import annotations
 
 import enum
 from datetime import datetime
+from functools import cached_property
+from typing import Any
 
 from pydantic import BaseModel, Field
 
@@ -40,6 +42,14 @@ class LogSource(str, enum.Enum):
     SERVER = "server"
 
 
+class NoiseAction(str, enum.Enum):
+    """What the noise filter does with entries matching a noise pattern."""
+
+    DROP = "drop"  # Discard before storage
+    TAG = "tag"  # Store, marked as noise
+    EXCLUDE = "exclude"  # Store, marked as noise, and leave out of summaries
+
+
 class LogEntry(BaseModel):
     """A single structured log entry. This is the core data type that flows through
     the entire system — from source adapters through processing to API responses."""
@@ -60,6 +70,36 @@ class LogEntry(BaseModel):
         description="Number of occurrences this entry represents. "
         "Values > 1 are emitted by the deduplicator for suppressed repeats.",
     )
+    seq: int = Field(
+        default=0,
+        description="Store sequence number, assigned when the entry is stored. "
+        "Monotonic across all log buffers (0 = not stored yet).",
+    )
+    template_id: int = Field(
+        default=0,
+        description="Mined message template (see /api/v1/logs/templates), assigned "
+        "at ingest. IDs are per server run (0 = not mined).",
+    )
+    noise: NoiseAction | None = Field(
+        default=None,
+        description="Set when the entry matched a noise pattern (see /api/v1/logs/noise) "
+        "whose action keeps it: tag or exclude.",
+    )
+
+    @cached_property
+    def json_bytes(self) -> bytes:
+        """This entry serialized as JSON, computed once and reused.
+
+        Entries are not modified after they're stored, so every SSE subscriber
+        and every query response can share the same bytes. Stores may also
+        assign a previously cached value. Setting any field drops the cache.
+        """
+        return self.model_dump_json().encode()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name != "json_bytes":
+            self.__dict__.pop("json_bytes", None)
+        super().__setattr__(name, value)
 
 
 class LogQueryParams(BaseModel):
@@ -67,11 +107,19 @@ class LogQueryParams(BaseModel):
 
     since: datetime | None = None
     until: datetime | None = None
+    after_seq: int | None = Field(default=None, description="Only entries with seq > after_seq")
     level: LogLevel | None = None
     process: str | None = None
+    subsystem: str | None = None
     source: LogSource | None = None
     search: str | None = None
+    regex: str | None = Field(
+        default=None, description="Regular expression matched against messages",
+    )
     device_id: str | None = None
+    q: str | None = Field(
+        default=None, description="Query language filter (see server/storage/query_lang.py)",
+    )
     limit: int = Field(default=100, ge=1, le=1000)
     offset: int = Field(default=0, ge=0)
 
@@ -87,6 +135,49 @@ class LogStreamParams(BaseModel):
     match: str | None = None
     exclude: str | None = None
     device_id: str | None = None
+    q: str | None = Field(
+        default=None, description="Query language filter (see server/storage/query_lang.py)",
+    )
+
+
+class StreamSubscriberStats(BaseModel):
+    """Delivery counters for one SSE log stream connection."""
+
+    id: int
+    filter: dict[str, Any] = Field(description="Non-empty stream filter params")
+    connected_at: datetime
+    delivered: int = 0
+    dropped: int = Field(default=0, description="Entries skipped because the client fell behind")
+    pending: int = 0
+
+
+class StreamHubStats(BaseModel):
+    """Response from GET /api/v1/logs/stream/stats."""
+
+    published: int = Field(description="Entries published to the hub since startup")
+    filter_groups: int = Field(description="Distinct stream filters currently subscribed")
+    subscribers: list[StreamSubscriberStats]
+    dropped: int = Field(description="Total drops across connected subscribers")
+
+
+class LatencyStats(BaseModel):
+    """Time spent in a pipeline stage per call, from a bucketed histogram."""
+
+    count: int = Field(description="Calls recorded")
+    mean_ms: float
+    p50_ms: float = Field(description="Upper bound of the bucket holding the median")
+    p99_ms: float = Field(description="Upper bound of the bucket holding the 99th percentile")
+    max_ms: float
+    buckets: dict[str, int] = Field(description="Calls per bucket, by upper bound")
+
+
+class StageStats(BaseModel):
+    """Entries into and out of one ingest pipeline stage."""
+
+    name: str
+    entries_in: int
+    entries_out: int
+    latency: LatencyStats
 
 
 class SourceStatus(BaseModel):
@@ -97,10 +188,57 @@ class SourceStatus(BaseModel):
     status: str  # "streaming", "watching", "stopped", "error"
     device_id: str = "default"
     entries_captured: int = 0
+    entries_per_second: float = Field(default=0.0, description="Over the last minute")
+    lines_read: int = Field(default=0, description="Raw output lines read (line-based sources)")
+    parse: StageStats | None = Field(
+        default=None, description="Parsing on the event loop (line-based sources)",
+    )
     started_at: datetime | None = None
     error: str | None = None
 
 
+class BufferStats(BaseModel):
+    """Fill and eviction counters for the main log store."""
+
+    size: int
+    max_size: int
+    fill_ratio: float
+    nbytes: int | None = Field(default=None, description="Estimated memory (in-memory store)")
+    max_bytes: int | None = None
+    evicted: int = Field(default=0, description="Entries evicted since startup")
+    evictions_per_second: float = Field(default=0.0, description="Over the last minute")
+    partitions: dict[str, int] = Field(default_factory=dict, description="Entries per device")
+
+
+class IngestPoolStats(BaseModel):
+    """Counters for the ingest worker processes (--ingest-workers)."""
+
+    workers: int
+    streams: int
+    lines_submitted: int
+    entries_emitted: int
+    in_flight: int = Field(description="Chunks queued for or in a worker")
+    round_trip: LatencyStats = Field(description="Chunk submission to results back")
+
+
+class PipelineMetricsResponse(BaseModel):
+    """Response from GET /api/v1/logs/metrics."""
+
+    stages: list[StageStats] = Field(
+        description="noise → rate_limit → dedup → store, in pipeline order",
+    )
+    dedup_suppressed: int = Field(description="Duplicates folded into repeat counts")
+    noise_dropped: int
+    rate_limited: int = Field(description="Entries suppressed by the rate limiter")
+    sources: list[SourceStatus] = Field(description="Busiest (entries/s) first")
+    buffer: BufferStats
+    stream: StreamHubStats
+    stream_dropped_total: int = Field(
+        description="SSE drops since startup, including disconnected clients",
+    )
+    ingest_pool: IngestPoolStats | None = None
+
+
 # ---------------------------------------------------------------------------
 # Summary / errors response models (Phase 1b)
 # ---------------------------------------------------------------------------
@@ -116,6 +254,22 @@ class TopIssue(BaseModel):
     resolved: bool = False
 
 
+class LogAnomaly(BaseModel):
+    """A template from one process logging far above its baseline rate, or new."""
+
+    kind: str = Field(description="spike: rate far above baseline; new: first seen recently")
+    process: str
+    template_id: int
+    template: str
+    level: LogLevel = Field(description="Most severe level logged with this template")
+    first_seen: datetime
+    started_at: datetime = Field(description="When the spike started (new: first seen)")
+    count: int = Field(description="Entries since started_at")
+    rate_per_minute: float = Field(description="Current rate (decayed over ~10s)")
+    baseline_per_minute: float = Field(description="Rate before the spike (decayed over ~10m)")
+    ratio: float = Field(description="rate_per_minute / baseline_per_minute")
+
+
 class LogSummaryResponse(BaseModel):
     """Response from GET /api/v1/logs/summary."""
 
@@ -127,6 +281,41 @@ class LogSummaryResponse(BaseModel):
     warning_count: int
     total_count: int
     top_issues: list[TopIssue]
+    anomalies: list[LogAnomaly] = Field(
+        default_factory=list, description="Current template rate spikes and new templates",
+    )
+
+
+class LogAnomaliesResponse(BaseModel):
+    """Response from GET /api/v1/logs/anomalies."""
+
+    anomalies: list[LogAnomaly]
+    total: int
+
+
+class IssueInfo(BaseModel):
+    """An error pattern from one process and its resolution state."""
+
+    device_id: str
+    process: str
+    pattern: str
+    count: int = Field(description="Occurrences (including repeats) since startup")
+    first_seen: datetime
+    last_seen: datetime
+    resolved: bool
+    resolved_at: datetime | None = Field(
+        default=None, description="Time of the success message that resolved it",
+    )
+    resolution_message: str | None = None
+
+
+class LogIssuesResponse(BaseModel):
+    """Response from GET /api/v1/logs/issues."""
+
+    issues: list[IssueInfo]
+    total: int
+    unresolved_count: int
+    resolved_count: int
 
 
 class LogErrorsResponse(BaseModel):
@@ -136,6 +325,110 @@ class LogErrorsResponse(BaseModel):
     total: int
 
 
+class LogTemplateInfo(BaseModel):
+    """A message template mined at ingest."""
+
+    id: int
+    template: str = Field(description="Message tokens with variable positions as <*>")
+    count: int = Field(description="Entries (including repeats) matched since startup")
+    first_seen: datetime | None = None
+    last_seen: datetime | None = None
+    examples: list[str]
+
+
+class LogTemplatesResponse(BaseModel):
+    """Response from GET /api/v1/logs/templates."""
+
+    templates: list[LogTemplateInfo]
+    total: int
+
+
+class NoisePatternInfo(BaseModel):
+    """A noise pattern and how often it matched."""
+
+    name: str
+    pattern: str = Field(description="Regex, matched case-insensitively")
+    action: NoiseAction
+    builtin: bool
+    hits: int = Field(description="Entries matched since startup")
+    source: LogSource | None = Field(
+        default=None, description="Only entries from this source (None = all sources)"
+    )
+
+
+class NoiseStatusResponse(BaseModel):
+    """Response from GET /api/v1/logs/noise."""
+
+    checked: int = Field(description="Entries checked since startup")
+    matched: int
+    dropped: int
+    patterns: list[NoisePatternInfo]
+
+
+class NoisePatternRequest(BaseModel):
+    """Body of POST /api/v1/logs/noise: add or replace a noise pattern."""
+
+    name: str = Field(min_length=1)
+    pattern: str = Field(min_length=1, description="Regex, matched case-insensitively")
+    action: NoiseAction = NoiseAction.TAG
+    source: LogSource | None = Field(
+        default=None, description="Only apply to entries from this source (None = all sources)"
+    )
+
+
+class RateLimitInfo(BaseModel):
+    """A token-bucket limit: the default, or one process's override."""
+
+    process: str | None = Field(default=None, description="None for the default limit")
+    rate: float = Field(description="Sustained entries/s per (device, process, subsystem)")
+    burst: int
+
+
+class ThrottledKey(BaseModel):
+    """A (device, process, subsystem) that has gone over its limit."""
+
+    device_id: str
+    process: str
+    subsystem: str | None = None
+    suppressed: int
+
+
+class RateLimitStatusResponse(BaseModel):
+    """Response from GET /api/v1/logs/rate-limit."""
+
+    default: RateLimitInfo
+    overrides: list[RateLimitInfo]
+    sample_every: int = Field(description="One in this many over-limit entries is kept")
+    suppressed: int = Field(description="Entries suppressed since startup")
+    sampled: int = Field(description="Over-limit entries kept as samples")
+    throttled: list[ThrottledKey] = Field(description="Most suppressed first")
+
+
+class RateLimitRequest(BaseModel):
+    """Body of POST /api/v1/logs/rate-limit: set the default or a process's limit."""
+
+    process: str | None = Field(default=None, min_length=1)
+    rate: float = Field(ge=0, description="Entries/s (0 = no limit)")
+    burst: int | None = Field(default=None, ge=0)
+
+
+class HistogramPoint(BaseModel):
+    """Entry counts for one time slot of a histogram."""
+
+    start: datetime
+    total: int
+    counts: dict[str, int]
+
+
+class LogHistogramResponse(BaseModel):
+    """Response from GET /api/v1/logs/histogram."""
+
+    window: str
+    interval: str
+    by: str
+    points: list[HistogramPoint]
+
+
 # ---------------------------------------------------------------------------
 # Crash report models (Phase 1c)
 # ---------------------------------------------------------------------------
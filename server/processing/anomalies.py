@@ -0,0 +1,231 @@
+"""Streaming template-rate anomaly detection.
+
+Top issues say which errors are most frequent, not which ones just started.
+TemplateRates is registered as a store listener and keeps two exponentially
+decayed counters per (process, template_id), using the template IDs the
+TemplateMiner stamps at ingest:
+
+- a fast counter (half-life `fast_half_life`, seconds) for the current rate,
+- a slow counter (half-life `slow_half_life`, minutes) for the baseline.
+
+A decayed counter is one float and a timestamp: each entry decays it by
+2^(-elapsed / half-life) and adds its repeat_count, and count × ln 2 /
+half-life estimates the rate. So each entry costs O(1) however many
+templates exist, and it can stay on during floods.
+
+Two kinds of anomaly are flagged as entries arrive:
+
+- spike: the current rate is at least `spike_ratio` times the baseline
+  (floored at `min_baseline` per minute) and at least `min_rate` per minute.
+  The baseline is frozen when the spike starts, so a long spike doesn't
+  raise its own baseline; the spike ends once the rate falls back under
+  `spike_ratio` times it.
+- new: the template was first seen in the last `new_seconds`, after the
+  first `warmup` seconds of ingest (everything is new at startup).
+
+Times are entry timestamps, capped at the wall clock plus `max_skew`: one
+entry stamped hours ahead (local time read as UTC) would otherwise leave
+its template's counters undecayed, and its spike or new flag standing,
+until the clock caught up. Once `max_keys` keys exist, the least recently
+seen is dropped.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from server.models import LogAnomaly, LogEntry, LogLevel, NoiseAction
+from server.processing.templates import TemplateMiner
+
+_LN2 = math.log(2)
+_LEVEL_RANK = {level: i for i, level in enumerate(LogLevel)}
+
+RateKey = tuple[str, int]  # (process, template_id)
+
+
+class TemplateRate:
+    """Decayed counters and anomaly state for one process's template."""
+
+    __slots__ = (
+        "process", "template_id", "example", "level", "first_seen", "updated",
+        "fast", "slow", "total", "new", "spike_started", "spike_baseline", "spike_count",
+    )
+
+    def __init__(
+        self, process: str, template_id: int, entry: LogEntry, now: float, new: bool,
+    ) -> None:
+        self.process = process
+        self.template_id = template_id
+        self.example = entry.message
+        self.level = entry.level
+        self.first_seen = datetime.fromtimestamp(now, timezone.utc)
+        self.updated = now
+        self.fast = 0.0
+        self.slow = 0.0
+        self.total = 0
+        self.new = new  # First seen after warmup
+        self.spike_started: datetime | None = None
+        self.spike_baseline = 0.0  # Baseline rate (per second) when the spike started
+        self.spike_count = 0
+
+
+class TemplateRates:
+    """Flags template rate spikes and new templates as entries are stored.
+
+    Register add() as a store listener, after the TemplateMiner ingest hook.
+
+    Args:
+        templates: The miner whose template_ids entries carry (for the text).
+        fast_half_life: Seconds; half-life of the current-rate counter.
+        slow_half_life: Seconds; half-life of the baseline counter.
+        spike_ratio: Current/baseline rate ratio that starts a spike.
+        min_rate: Entries per minute a template needs for a spike.
+        min_baseline: Floor for the baseline, entries per minute.
+        new_seconds: How long a template counts as new.
+        warmup: Seconds of ingest before templates can count as new.
+        max_keys: (process, template) pairs tracked.
+        max_skew: Seconds an entry's time may be ahead of the wall clock.
+    """
+
+    def __init__(
+        self,
+        templates: TemplateMiner | None = None,
+        fast_half_life: float = 10.0,
+        slow_half_life: float = 600.0,
+        spike_ratio: float = 10.0,
+        min_rate: float = 30.0,
+        min_baseline: float = 0.5,
+        new_seconds: float = 300.0,
+        warmup: float = 120.0,
+        max_keys: int = 10_000,
+        max_skew: float = 60.0,
+    ) -> None:
+        self.templates = templates
+        self.fast_half_life = fast_half_life
+        self.slow_half_life = slow_half_life
+        self.spike_ratio = spike_ratio
+        self.min_rate = min_rate / 60
+        self.min_baseline = min_baseline / 60
+        self.new_seconds = new_seconds
+        self.warmup = warmup
+        self.max_keys = max_keys
+        self.max_skew = max_skew
+        self._rates: OrderedDict[RateKey, TemplateRate] = OrderedDict()
+        # Keys with a spike in progress or first seen after warmup
+        self._flagged: dict[RateKey, TemplateRate] = {}
+        self._started: float | None = None
+
+    def __len__(self) -> int:
+        return len(self._rates)
+
+    def _fast_rate(self, rate: TemplateRate, now: float) -> float:
+        """Current entries/s, decayed to now."""
+        decay = 0.5 ** (max(0.0, now - rate.updated) / self.fast_half_life)
+        return rate.fast * decay * _LN2 / self.fast_half_life
+
+    def _slow_rate(self, rate: TemplateRate, now: float) -> float:
+        decay = 0.5 ** (max(0.0, now - rate.updated) / self.slow_half_life)
+        return rate.slow * decay * _LN2 / self.slow_half_life
+
+    def add(self, entry: LogEntry) -> None:
+        """Count a stored entry against its template's rates."""
+        if not entry.template_id or entry.noise == NoiseAction.EXCLUDE:
+            return
+        now = min(entry.timestamp.timestamp(), time.time() + self.max_skew)
+        if self._started is None:
+            self._started = now
+        key = (entry.process, entry.template_id)
+        rate = self._rates.get(key)
+        if rate is None:
+            new = now - self._started >= self.warmup
+            rate = self._rates[key] = TemplateRate(
+                entry.process, entry.template_id, entry, now, new,
+            )
+            if len(self._rates) > self.max_keys:
+                old_key, _ = self._rates.popitem(last=False)
+                self._flagged.pop(old_key, None)
+            if new:
+                self._flagged[key] = rate
+        else:
+            self._rates.move_to_end(key)
+            elapsed = now - rate.updated
+            if elapsed > 0:
+                rate.fast *= 0.5 ** (elapsed / self.fast_half_life)
+                rate.slow *= 0.5 ** (elapsed / self.slow_half_life)
+                rate.updated = now
+        # The baseline before this entry, so a burst doesn't hide itself
+        baseline = max(rate.slow * _LN2 / self.slow_half_life, self.min_baseline)
+        rate.fast += entry.repeat_count
+        rate.slow += entry.repeat_count
+        rate.total += entry.repeat_count
+        if _LEVEL_RANK[entry.level] > _LEVEL_RANK[rate.level]:
+            rate.level = entry.level
+
+        current = rate.fast * _LN2 / self.fast_half_life
+        if rate.spike_started is not None and current < self.spike_ratio * rate.spike_baseline:
+            rate.spike_started = None
+        if rate.spike_started is not None:
+            rate.spike_count += entry.repeat_count
+        elif (
+            current >= self.min_rate
+            and current >= self.spike_ratio * baseline
+            and now - self._started >= self.warmup
+        ):
+            rate.spike_started = datetime.fromtimestamp(now, timezone.utc)
+            rate.spike_baseline = baseline
+            rate.spike_count = entry.repeat_count
+            self._flagged[key] = rate
+
+    def anomalies(
+        self, now: datetime | None = None, process: str | None = None,
+    ) -> list[LogAnomaly]:
+        """Current anomalies, most severe level first, then highest rate.
+
+        Spikes that have subsided and templates no longer new are dropped.
+        A new template that is also spiking is reported as a spike.
+
+        Args:
+            now: Time to evaluate at (default: now, or the latest entry if later).
+            process: Only anomalies from this process.
+        """
+        now_ts = (now or datetime.now(timezone.utc)).timestamp()
+        found: list[LogAnomaly] = []
+        for key, rate in list(self._flagged.items()):
+            at = max(now_ts, rate.updated)
+            current = self._fast_rate(rate, at)
+            if rate.spike_started is not None and current < self.spike_ratio * rate.spike_baseline:
+                rate.spike_started = None
+            is_new = rate.new and at - rate.first_seen.timestamp() < self.new_seconds
+            if rate.spike_started is None and not is_new:
+                del self._flagged[key]
+                continue
+            if process is None or rate.process == process:
+                found.append(self._describe(rate, current))
+        found.sort(key=lambda a: (-_LEVEL_RANK[a.level], -a.rate_per_minute))
+        return found
+
+    def _describe(self, rate: TemplateRate, current: float) -> LogAnomaly:
+        template = self.templates.get(rate.template_id) if self.templates is not None else None
+        if rate.spike_started is not None:
+            kind, started, count, baseline = (
+                "spike", rate.spike_started, rate.spike_count, rate.spike_baseline,
+            )
+        else:
+            kind, started, count = "new", rate.first_seen, rate.total
+            baseline = max(self._slow_rate(rate, rate.updated), self.min_baseline)
+        return LogAnomaly(
+            kind=kind,
+            process=rate.process,
+            template_id=rate.template_id,
+            template=template.template if template is not None else rate.example,
+            level=rate.level,
+            first_seen=rate.first_seen,
+            started_at=started,
+            count=count,
+            rate_per_minute=round(current * 60, 2),
+            baseline_per_minute=round(baseline * 60, 2),
+            ratio=round(current / baseline, 1),
+        )
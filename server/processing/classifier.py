@@ -8,88 +8,152 @@ Provides two capabilities:
 
 from __future__ import annotations
 
+import functools
 import re
+from collections.abc import Callable, Mapping
 
 from server.models import LogEntry, LogLevel
+from server.storage.text_index import required_literals
 
 # ---------------------------------------------------------------------------
 # Noise patterns: common iOS system messages that are rarely actionable
 # ---------------------------------------------------------------------------
 
-NOISE_PATTERNS: list[re.Pattern[str]] = [
-    re.compile(r"deny\(\d+\) mach-lookup", re.IGNORECASE),
-    re.compile(r"deny\(\d+\) file-read-data", re.IGNORECASE),
-    re.compile(r"Sandbox:.*deny", re.IGNORECASE),
-    re.compile(r"AMFI:.*not valid", re.IGNORECASE),
-    re.compile(r"nw_path_evaluator_evaluate", re.IGNORECASE),
-    re.compile(r"TCP Conn .* event \d+", re.IGNORECASE),
-    re.compile(r"TIC .* event \d+", re.IGNORECASE),
-    re.compile(r"CoreData: annotation:.*", re.IGNORECASE),
-    re.compile(r"Metal API Validation", re.IGNORECASE),
-    re.compile(r"boringssl_", re.IGNORECASE),
-    re.compile(r"SecTrust.*error", re.IGNORECASE),
-]
+# Name → regex, matched case-insensitively
+NOISE_PATTERNS: dict[str, str] = {
+    "sandbox-mach-lookup": r"deny\(\d+\) mach-lookup",
+    "sandbox-file-read": r"deny\(\d+\) file-read-data",
+    "sandbox-deny": r"Sandbox:.*deny",
+    "amfi-not-valid": r"AMFI:.*not valid",
+    "nw-path-evaluator": r"nw_path_evaluator_evaluate",
+    "tcp-conn-event": r"TCP Conn .* event \d+",
+    "tic-event": r"TIC .* event \d+",
+    "coredata-annotation": r"CoreData: annotation:.*",
+    "metal-api-validation": r"Metal API Validation",
+    "boringssl": r"boringssl_",
+    "sectrust-error": r"SecTrust.*error",
+}
+
+
+class NoiseMatcher:
+    """Finds which of a set of noise patterns a message matches.
+
+    The patterns are compiled into one case-insensitive alternation, so a
+    message is searched once rather than once per pattern. Before that, a
+    prefilter checks the message for the longest literal each pattern
+    requires (see required_literals): most messages contain none of them
+    and are rejected by a few substring checks. A pattern with no required
+    literal disables the prefilter.
+
+    Raises re.error if the patterns can't be combined (e.g. a global inline
+    flag like `(?i)` or a group name used twice).
+    """
+
+    def __init__(self, patterns: Mapping[str, str]) -> None:
+        self._names = list(patterns)
+        literals: set[str] = set()
+        self._prefilter = True
+        for text in patterns.values():
+            found = required_literals(text)
+            if found:
+                literals.add(max(found, key=len).lower())
+            else:
+                self._prefilter = False
+        self._literals = tuple(literals)
+        self._regex = re.compile(
+            "|".join(f"(?P<p{i}>{text})" for i, text in enumerate(patterns.values())),
+            re.IGNORECASE,
+        ) if patterns else None
+
+    def match(self, message: str) -> str | None:
+        """Name of the pattern matching earliest in the message, or None."""
+        if self._regex is None:
+            return None
+        if self._prefilter:
+            lowered = message.lower()
+            if not any(literal in lowered for literal in self._literals):
+                return None
+        match = self._regex.search(message)
+        return None if match is None else self._names[int(match.lastgroup[1:])]
+
+
+_BUILTIN_NOISE = NoiseMatcher(NOISE_PATTERNS)
+
+# Messages that mark an earlier error from the same process as resolved
+SUCCESS_KEYWORDS = re.compile(
+    r"\b(succeeded|successfully|success|resolved|connected|refreshed|recovered|completed)\b",
+    re.IGNORECASE,
+)
 
 # ---------------------------------------------------------------------------
 # Template normalization: strip variable parts to create grouping keys
 # ---------------------------------------------------------------------------
 
-# Order matters — UUIDs before plain hex to avoid partial matches
-_TEMPLATE_REPLACEMENTS: list[tuple[re.Pattern[str], str]] = [
-    # UUIDs: 8-4-4-4-12 hex
-    (re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"), "<UUID>"),
+# One pass over the message. At each position the alternatives are tried in
+# order — UUIDs before plain hex, hex and IPs before bare numbers — and a run
+# of numbers separated by common delimiters collapses into a single <N>.
+_TEMPLATE_TOKENS = re.compile(
+    # UUIDs: 8-4-4-4-12 hex (also covers hash directories in app paths)
+    r"(?P<UUID>[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})"
     # Hex addresses: 0x1a2b3c
-    (re.compile(r"0x[0-9a-fA-F]+"), "<HEX>"),
+    r"|(?P<HEX>0x[0-9a-fA-F]+)"
     # IP:port
-    (re.compile(r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}(:\d+)?"), "<IP>"),
-    # Paths with hashes (e.g., /Application/ABC123-DEF456/MyApp)
-    (re.compile(r"/[A-F0-9]{8}-[A-F0-9]{4}-[A-F0-9]{4}-[A-F0-9]{4}-[A-F0-9]{12}/"), "/<ID>/"),
-    # Standalone numbers (integers and decimals), but not inside words
-    (re.compile(r"(?<![a-zA-Z])\d+(\.\d+)?(?![a-zA-Z])"), "<N>"),
-]
+    r"|(?P<IP>\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}(?::\d+)?)"
+    # Standalone numbers (integers and decimals), but not inside words. The
+    # first digit's lookbehind sits after it so every alternative starts with
+    # a character class, which lets the regex engine skip ahead to candidates.
+    r"|(?P<N>\d(?<![a-zA-Z]\d)\d*(?:\.\d+)?(?![a-zA-Z])[,.\s]*"
+    r"(?:(?<![a-zA-Z])\d+(?:\.\d+)?(?![a-zA-Z])[,.\s]*)*)"
+)
+
+_TOKEN_REPLACEMENTS = {"UUID": "<UUID>", "HEX": "<HEX>", "IP": "<IP>", "N": "<N> "}
+
 
+def _replace_token(match: re.Match[str]) -> str:
+    return _TOKEN_REPLACEMENTS[match.lastgroup]
 
+
+@functools.lru_cache(maxsize=8192)
 def extract_pattern(message: str) -> str:
     """Normalize a log message into a template for grouping.
 
     Strips numbers, UUIDs, hex addresses, and IPs so that messages differing
-    only in variable parts produce the same template string.
+    only in variable parts produce the same template string. Chatty processes
+    repeat the same messages, so recent results are cached by message.
     """
-    result = message
-    for pattern, replacement in _TEMPLATE_REPLACEMENTS:
-        result = pattern.sub(replacement, result)
-    # Collapse repeated <N> separated by common delimiters
-    result = re.sub(r"(<N>[,.\s]*)+", "<N> ", result)
-    return result.strip()
+    return _TEMPLATE_TOKENS.sub(_replace_token, message).strip()
 
 
 def is_noise(entry: LogEntry) -> bool:
     """Check whether an entry matches a known iOS noise pattern."""
-    for pattern in NOISE_PATTERNS:
-        if pattern.search(entry.message):
-            return True
-    return False
+    return _BUILTIN_NOISE.match(entry.message) is not None
 
 
-def detect_resolution(entries: list[LogEntry], process: str | None = None) -> list[dict]:
+def detect_resolution(
+    entries: list[LogEntry],
+    process: str | None = None,
+    pattern_of: Callable[[LogEntry], str] | None = None,
+) -> list[dict]:
     """Detect error→success resolution sequences in a list of entries.
 
     Looks for patterns where errors from a process are followed by a
     success-indicating message (containing keywords like "succeeded",
     "resolved", "connected", "refreshed", "recovered").
 
+    Args:
+        entries: Entries in log order.
+        process: If set, only consider entries from this process.
+        pattern_of: Returns an error entry's pattern, for callers that have
+            already extracted it (default: extract_pattern on the message).
+
     Returns a list of resolution dicts with error_pattern, resolved_at, and
     resolution_message.
     """
-    success_keywords = re.compile(
-        r"\b(succeeded|successfully|success|resolved|connected|refreshed|recovered|completed)\b",
-        re.IGNORECASE,
-    )
-
     error_levels = set(LogLevel.at_least(LogLevel.ERROR))
 
-    # Collect errors by process
-    active_errors: dict[str, list[LogEntry]] = {}
+    # Active errors by process, then pattern, so a success message only looks
+    # at its own process's errors
+    active_errors: dict[str, dict[str, list[LogEntry]]] = {}
     resolutions: list[dict] = []
 
     for entry in entries:
@@ -97,17 +161,12 @@ def detect_resolution(entries: list[LogEntry], process: str | None = None) -> li
             continue
 
         if entry.level in error_levels:
-            key = f"{entry.process}:{extract_pattern(entry.message)}"
-            active_errors.setdefault(key, []).append(entry)
-        elif success_keywords.search(entry.message) and active_errors:
-            # Check if this success message is from a process with active errors
-            resolved_keys = [
-                k for k in active_errors if k.startswith(f"{entry.process}:")
-            ]
-            for key in resolved_keys:
-                error_entries = active_errors.pop(key)
+            pattern = pattern_of(entry) if pattern_of else extract_pattern(entry.message)
+            active_errors.setdefault(entry.process, {}).setdefault(pattern, []).append(entry)
+        elif entry.process in active_errors and SUCCESS_KEYWORDS.search(entry.message):
+            for pattern, error_entries in active_errors.pop(entry.process).items():
                 resolutions.append({
-                    "error_pattern": key.split(":", 1)[1],
+                    "error_pattern": pattern,
                     "error_count": sum(e.repeat_count for e in error_entries),
                     "first_error": error_entries[0].timestamp.isoformat(),
                     "resolved_at": entry.timestamp.isoformat(),
@@ -3,35 +3,52 @@
 Suppresses repeated identical messages within a sliding time window.
 When duplicates are detected, a counter is incremented. After the quiet
 period expires, a single summary entry ("repeated N times") is emitted.
+
+Buckets are keyed by the (process, message) pair and expire through a heap
+of deadlines, so checking for expired buckets on every entry costs
+O(expired) rather than O(live buckets). A duplicate only pushes a bucket's
+deadline later, so its heap entry is left alone; when the stale entry
+surfaces, the bucket is rescheduled at its current deadline if it hasn't
+expired yet.
 """
 
 from __future__ import annotations
 
 import asyncio
-import hashlib
+import heapq
+import itertools
 import logging
+import time
 import uuid
 from collections.abc import Callable, Coroutine
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
+from server.metrics import StageMetrics
 from server.models import LogEntry
 
 logger = logging.getLogger(__name__)
 
 
 EntryCallback = Callable[[LogEntry], Coroutine[Any, Any, None]]
+BatchCallback = Callable[[list[LogEntry]], Coroutine[Any, Any, None]]
+
+
+DedupKey = tuple[str, str]
 
 
 class _DedupBucket:
     """Tracks repeat count for a specific message pattern."""
 
-    __slots__ = ("first_entry", "count", "last_seen")
+    __slots__ = ("key", "first_entry", "count", "last_seen", "scheduled")
 
-    def __init__(self, entry: LogEntry) -> None:
+    def __init__(self, key: DedupKey, entry: LogEntry, deadline: datetime) -> None:
+        self.key = key
         self.first_entry = entry
         self.count = 1
         self.last_seen = entry.timestamp
+        # Deadline of the bucket's live heap entry (never later than its real one)
+        self.scheduled = deadline
 
 
 class Deduplicator:
@@ -42,6 +59,8 @@ class Deduplicator:
         window_seconds: How long to track duplicates (default 5s).
         max_suppressed: After this many suppressed duplicates, force-emit
             a summary even if the window hasn't expired (default 100).
+        on_batch: Callback for the entries emitted by process_many(), in one
+            call. Falls back to on_entry per entry when not set.
     """
 
     def __init__(
@@ -50,13 +69,21 @@ class Deduplicator:
         window_seconds: float = 5.0,
         max_suppressed: int = 100,
         flush_interval: float = 2.0,
+        on_batch: BatchCallback | None = None,
     ) -> None:
         self.on_entry = on_entry
+        self.on_batch = on_batch
         self.window_seconds = window_seconds
         self.max_suppressed = max_suppressed
         self._flush_interval = flush_interval
-        self._buckets: dict[str, _DedupBucket] = {}
+        self._window = timedelta(seconds=window_seconds)
+        self._buckets: dict[DedupKey, _DedupBucket] = {}
+        # (deadline, tiebreak, bucket), earliest deadline first
+        self._deadlines: list[tuple[datetime, int, _DedupBucket]] = []
+        self._tiebreak = itertools.count()
         self._flush_task: asyncio.Task | None = None
+        self.metrics = StageMetrics("dedup")
+        self.suppressed = 0
 
     def start(self) -> None:
         """Start the background flush timer.
@@ -89,70 +116,140 @@ class Deduplicator:
             return
 
     @staticmethod
-    def _make_key(entry: LogEntry) -> str:
+    def _make_key(entry: LogEntry) -> DedupKey:
         """Create a dedup key from process + message content."""
-        raw = f"{entry.process}:{entry.message}"
-        return hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+        return (entry.process, entry.message)
 
     async def process(self, entry: LogEntry) -> None:
-        """Process an incoming entry — emit or suppress as appropriate."""
-        now = entry.timestamp
-        key = self._make_key(entry)
-
-        # Flush any expired buckets first
-        await self._flush_expired(now)
-
-        if key in self._buckets:
-            bucket = self._buckets[key]
-            bucket.count += 1
-            bucket.last_seen = now
-
-            # Force-emit if we've suppressed too many
-            if bucket.count >= self.max_suppressed:
-                await self._emit_summary(bucket)
-                del self._buckets[key]
-        else:
-            # New message — emit it immediately and start tracking
-            self._buckets[key] = _DedupBucket(entry)
-            if self.on_entry:
+        """Process an incoming entry — emit or suppress as appropriate.
+
+        Emits the summaries of expired buckets first, then the entry if it's
+        new or a summary if it pushed its bucket past max_suppressed.
+        """
+        out = self._dedupe([entry])
+        if self.on_entry is not None:
+            for emitted in out:
+                await self.on_entry(emitted)
+
+    async def process_many(self, entries: list[LogEntry]) -> None:
+        """Process a batch of entries and emit the survivors in one call.
+
+        Produces the same entries, in the same order, as calling process()
+        for each entry in turn.
+        """
+        await self._emit_many(self._dedupe(entries))
+
+    def _dedupe(self, entries: list[LogEntry]) -> list[LogEntry]:
+        """Deduplicate a batch and return the entries to emit, without emitting.
+
+        The synchronous core of process() and process_many().
+        """
+        start = time.perf_counter()
+        out: list[LogEntry] = []
+        for entry in entries:
+            now = entry.timestamp
+            key = self._make_key(entry)
+            out.extend(self._expire(now))
+
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                self._repeat(bucket, now)
+                if bucket.count >= self.max_suppressed:
+                    out.append(self._make_summary(bucket))
+                    del self._buckets[key]
+            else:
+                self._track(key, entry)
+                out.append(entry)
+        self.metrics.record(len(entries), len(out), time.perf_counter() - start)
+        return out
+
+    def _track(self, key: DedupKey, entry: LogEntry) -> None:
+        """Start a bucket for a message seen for the first time."""
+        deadline = entry.timestamp + self._window
+        bucket = self._buckets[key] = _DedupBucket(key, entry, deadline)
+        heapq.heappush(self._deadlines, (deadline, next(self._tiebreak), bucket))
+
+    def _repeat(self, bucket: _DedupBucket, now: datetime) -> None:
+        """Count a duplicate, extending the bucket's window."""
+        bucket.count += 1
+        self.suppressed += 1
+        bucket.last_seen = now
+        deadline = now + self._window
+        if deadline < bucket.scheduled:
+            # Clocks went backwards: the heap entry would expire it too late
+            bucket.scheduled = deadline
+            heapq.heappush(self._deadlines, (deadline, next(self._tiebreak), bucket))
+
+    async def _emit_many(self, entries: list[LogEntry]) -> None:
+        if not entries:
+            return
+        if self.on_batch is not None:
+            await self.on_batch(entries)
+        elif self.on_entry is not None:
+            for entry in entries:
                 await self.on_entry(entry)
 
+    def _expire(self, now: datetime) -> list[LogEntry]:
+        """Drop buckets whose window has expired and return their summaries."""
+        summaries: list[LogEntry] = []
+        heap = self._deadlines
+        while heap and heap[0][0] <= now:
+            deadline, _, bucket = heapq.heappop(heap)
+            if self._buckets.get(bucket.key) is not bucket or deadline != bucket.scheduled:
+                continue  # Bucket already emitted, or a superseded heap entry
+            current = bucket.last_seen + self._window
+            if current > now:
+                # Repeats arrived since it was scheduled — check again later
+                bucket.scheduled = current
+                heapq.heappush(heap, (current, next(self._tiebreak), bucket))
+                continue
+            del self._buckets[bucket.key]
+            if bucket.count > 1:
+                summaries.append(self._make_summary(bucket))
+        return summaries
+
     async def _flush_expired(self, now: datetime) -> None:
         """Flush buckets whose window has expired."""
-        expired_keys: list[str] = []
-        for key, bucket in self._buckets.items():
-            elapsed = (now - bucket.last_seen).total_seconds()
-            if elapsed >= self.window_seconds:
-                expired_keys.append(key)
-
-        for key in expired_keys:
-            bucket = self._buckets.pop(key)
-            if bucket.count > 1:
-                await self._emit_summary(bucket)
+        summaries = self.expired(now)
+        if self.on_entry is not None:
+            for summary in summaries:
+                await self.on_entry(summary)
 
     async def flush_all(self) -> None:
         """Flush all pending buckets. Call on shutdown."""
-        keys = list(self._buckets.keys())
-        for key in keys:
-            bucket = self._buckets.pop(key)
-            if bucket.count > 1:
-                await self._emit_summary(bucket)
+        summaries = self.drain()
+        if self.on_entry is not None:
+            for summary in summaries:
+                await self.on_entry(summary)
+
+    def expired(self, now: datetime) -> list[LogEntry]:
+        """Drop buckets whose window has expired and return their summaries."""
+        summaries = self._expire(now)
+        self.metrics.entries_out += len(summaries)
+        return summaries
+
+    def drain(self) -> list[LogEntry]:
+        """Drop all pending buckets and return their summaries."""
+        buckets = list(self._buckets.values())
+        self._buckets.clear()
+        self._deadlines.clear()
+        summaries = [self._make_summary(bucket) for bucket in buckets if bucket.count > 1]
+        self.metrics.entries_out += len(summaries)
+        return summaries
 
-    async def _emit_summary(self, bucket: _DedupBucket) -> None:
-        """Emit a summary entry for suppressed duplicates.
+    @staticmethod
+    def _make_summary(bucket: _DedupBucket) -> LogEntry:
+        """Build the summary entry for a bucket's suppressed duplicates.
 
         The summary carries repeat_count = (number of suppressed copies) so
         downstream consumers like the summarizer can weight it properly
         without double-counting.  The original message is preserved as-is.
         """
-        if self.on_entry is None:
-            return
-
         # repeat_count = suppressed copies (first occurrence was already emitted)
         suppressed = bucket.count - 1
         original = bucket.first_entry
 
-        summary = LogEntry(
+        return LogEntry(
             id=uuid.uuid4().hex[:8],
             timestamp=bucket.last_seen,
             device_id=original.device_id,
@@ -164,5 +261,5 @@ class Deduplicator:
             message=original.message,
             source=original.source,
             repeat_count=suppressed,
+            noise=original.noise,
         )
-        await self.on_entry(summary)
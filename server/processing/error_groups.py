@@ -0,0 +1,256 @@
+"""Incremental error/warning pattern groups over the entries in memory.
+
+Cursor-delta summaries ("what happened since my last summary") used to
+re-extract the pattern of every error and warning after the cursor on every
+request. ErrorGroups does that work once per entry instead: it is registered
+as a listener on the in-memory log stores and files each stored entry under
+
+- (process, level, source) for the level counts,
+- (process, pattern) for errors and for warnings, with the entry's timestamp,
+- process for success messages (for resolution detection),
+
+each also keyed by device_id. Stores evict per device in seq order, so an
+evicted entry is almost always the first of its series.
+
+Each group is a series of (seq, timestamp, repeat_count) in seq order with a
+running total of repeat counts and two monotonic stacks holding each suffix's
+newest and oldest entry. A summary after seq N bisects each series for N,
+subtracts running totals for the count and bisects the stacks for first/last
+seen and resolution order (since_seq), so its cost is O(groups × log
+entries), not proportional to the entries after the cursor; appends keep the
+stacks up to date in amortized O(1). The stores' evict listeners remove
+entries as they leave memory, so the groups always describe what a summary
+over the stored entries would.
+"""
+
+from __future__ import annotations
+
+import bisect
+from collections.abc import Hashable
+from datetime import datetime, timedelta, timezone
+
+from server.models import LogEntry, LogLevel, LogSource, NoiseAction
+from server.processing.classifier import SUCCESS_KEYWORDS, extract_pattern
+from server.processing.rollups import PatternStats, RollupBucket
+from server.storage.merge import epoch_ns
+
+_ERROR_LEVELS = frozenset(LogLevel.at_least(LogLevel.ERROR))
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _from_ns(ns: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=ns // 1000)
+
+
+class _SeqSeries:
+    """One group's entries in seq order, with a running repeat-count total.
+
+    Removed entries at the front are skipped via `head` and compacted away
+    in bulk; removals elsewhere (another partition evicting) are deleted in
+    place. Timestamps needn't follow seq order: `maxima` holds the indices
+    whose timestamp is >= every later one, and `minima` those whose
+    timestamp is <= every later one, both in index order, so the newest and
+    oldest entry from any index on is the first stack index at or after it.
+    """
+
+    __slots__ = ("seqs", "stamps", "totals", "head", "maxima", "minima")
+
+    def __init__(self) -> None:
+        self.seqs: list[int] = []
+        self.stamps: list[int] = []
+        # totals[i] = sum of repeat counts of entries 0..i (including removed heads)
+        self.totals: list[int] = []
+        self.head = 0
+        self.maxima: list[int] = []
+        self.minima: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self.seqs) - self.head
+
+    def add(self, seq: int, ts: int, repeat: int) -> None:
+        if not self.seqs or seq > self.seqs[-1]:
+            self.seqs.append(seq)
+            self.stamps.append(ts)
+            self.totals.append((self.totals[-1] if self.totals else 0) + repeat)
+            self._push(len(self.seqs) - 1)
+            return
+        # Out of order (listeners of different stores interleaved) — rare
+        i = bisect.bisect_left(self.seqs, seq, self.head)
+        self.seqs.insert(i, seq)
+        self.stamps.insert(i, ts)
+        self.totals.insert(i, (self.totals[i - 1] if i > 0 else 0) + repeat)
+        for j in range(i + 1, len(self.totals)):
+            self.totals[j] += repeat
+        self._rebuild()
+
+    def _push(self, i: int) -> None:
+        """Add index i (the last) to the stacks."""
+        ts = self.stamps[i]
+        stamps, maxima, minima = self.stamps, self.maxima, self.minima
+        # Ties go to the later entry for maxima (newest (ts, seq)) and to the
+        # earlier one for minima (first (ts, seq))
+        while maxima and stamps[maxima[-1]] <= ts:
+            maxima.pop()
+        maxima.append(i)
+        while minima and stamps[minima[-1]] > ts:
+            minima.pop()
+        minima.append(i)
+
+    def _rebuild(self) -> None:
+        self.maxima.clear()
+        self.minima.clear()
+        for i in range(self.head, len(self.seqs)):
+            self._push(i)
+
+    def remove(self, seq: int) -> None:
+        i = bisect.bisect_left(self.seqs, seq, self.head)
+        if i == len(self.seqs) or self.seqs[i] != seq:
+            return
+        if i == self.head:
+            self.head += 1
+            if self.head >= 1024 and self.head * 2 >= len(self.seqs):
+                self._compact()
+            return
+        repeat = self.totals[i] - (self.totals[i - 1] if i > 0 else 0)
+        del self.seqs[i], self.stamps[i], self.totals[i]
+        for j in range(i, len(self.totals)):
+            self.totals[j] -= repeat
+        self._rebuild()
+
+    def _compact(self) -> None:
+        head = self.head
+        del self.seqs[:head], self.stamps[:head], self.totals[:head]
+        for stack in (self.maxima, self.minima):
+            stack[:] = [i - head for i in stack[bisect.bisect_left(stack, head):]]
+        self.head = 0
+
+    def start_after(self, seq: int | None) -> int:
+        """Index of the first live entry with a seq greater than seq."""
+        if seq is None:
+            return self.head
+        return bisect.bisect_right(self.seqs, seq, self.head)
+
+    def count_from(self, i: int) -> int:
+        """Total repeat count of entries i..end."""
+        return self.totals[-1] - (self.totals[i - 1] if i > 0 else 0)
+
+    def last_from(self, i: int) -> tuple[int, int]:
+        """Greatest (timestamp, seq) among entries i..end (i must be < len(seqs))."""
+        j = self.maxima[bisect.bisect_left(self.maxima, i)]
+        return self.stamps[j], self.seqs[j]
+
+    def first_from(self, i: int) -> tuple[int, int]:
+        """Least (timestamp, seq) among entries i..end (i must be < len(seqs))."""
+        j = self.minima[bisect.bisect_left(self.minima, i)]
+        return self.stamps[j], self.seqs[j]
+
+    def stats_from(self, i: int) -> PatternStats:
+        """PatternStats over entries i..end (i must be < len(seqs))."""
+        last = self.last_from(i)
+        stats = PatternStats.__new__(PatternStats)
+        stats.count = self.count_from(i)
+        stats.first_seen = _from_ns(self.first_from(i)[0])
+        stats.last_seen = _from_ns(last[0])
+        stats.last_key = last
+        return stats
+
+
+class ErrorGroups:
+    """Level counts, error/warning pattern groups and successes by seq.
+
+    Register add() as a listener and remove() as an evict listener on every
+    in-memory log store that summaries cover.
+    """
+
+    def __init__(self) -> None:
+        # Keys are (device_id, *summary key)
+        self._counts: dict[tuple[str, str, LogLevel, LogSource], _SeqSeries] = {}
+        self._errors: dict[tuple[str, str, str], _SeqSeries] = {}
+        self._warnings: dict[tuple[str, str, str], _SeqSeries] = {}
+        self._successes: dict[tuple[str, str], _SeqSeries] = {}
+        # seq → pattern of each stored error/warning, so eviction needn't re-extract
+        self._patterns: dict[int, str] = {}
+
+    def __len__(self) -> int:
+        """Number of entries tracked."""
+        return sum(len(series) for series in self._counts.values())
+
+    def add(self, entry: LogEntry) -> None:
+        """File a newly stored entry under its groups."""
+        if entry.noise == NoiseAction.EXCLUDE:
+            return
+        seq, ts, repeat = entry.seq, epoch_ns(entry.timestamp), entry.repeat_count
+        device, process = entry.device_id, entry.process
+        _series(self._counts, (device, process, entry.level, entry.source)).add(seq, ts, repeat)
+        if entry.level in _ERROR_LEVELS or entry.level == LogLevel.WARNING:
+            pattern = self._patterns[seq] = extract_pattern(entry.message)
+            groups = self._errors if entry.level in _ERROR_LEVELS else self._warnings
+            _series(groups, (device, process, pattern)).add(seq, ts, repeat)
+        elif SUCCESS_KEYWORDS.search(entry.message):
+            _series(self._successes, (device, process)).add(seq, ts, repeat)
+
+    def remove(self, entry: LogEntry) -> None:
+        """Drop an entry that left memory."""
+        if entry.noise == NoiseAction.EXCLUDE:
+            return
+        seq, device, process = entry.seq, entry.device_id, entry.process
+        _discard(self._counts, (device, process, entry.level, entry.source), seq)
+        pattern = self._patterns.pop(seq, None)
+        if pattern is not None:
+            groups = self._errors if entry.level in _ERROR_LEVELS else self._warnings
+            _discard(groups, (device, process, pattern), seq)
+        elif entry.level not in _ERROR_LEVELS and entry.level != LogLevel.WARNING:
+            _discard(self._successes, (device, process), seq)
+
+    def since_seq(self, after_seq: int | None = None) -> RollupBucket:
+        """Aggregate the tracked entries with seq > after_seq (None = all).
+
+        The result feeds generate_rollup_summary() like a rollup window.
+        """
+        bucket = RollupBucket()
+        newest = None
+        for (_, *key), series in self._counts.items():
+            i = series.start_after(after_seq)
+            if i < len(series.seqs):
+                bucket.counts[tuple(key)] += series.count_from(i)
+                last = series.last_from(i)[0]
+                newest = last if newest is None else max(newest, last)
+        for (_, process, pattern), series in self._errors.items():
+            i = series.start_after(after_seq)
+            if i < len(series.seqs):
+                stats = series.stats_from(i)
+                mine = bucket.errors.get((process, pattern))
+                if mine is None:
+                    bucket.errors[(process, pattern)] = stats
+                else:
+                    mine.merge(stats)
+        for (_, process, pattern), series in self._warnings.items():
+            i = series.start_after(after_seq)
+            if i < len(series.seqs):
+                bucket.warnings[(process, pattern)] += series.count_from(i)
+        for (_, process), series in self._successes.items():
+            i = series.start_after(after_seq)
+            if i < len(series.seqs):
+                # Resolution compares against the newest success
+                key = series.last_from(i)
+                if key > bucket.successes.get(process, (-1, -1)):
+                    bucket.successes[process] = key
+        if newest is not None:
+            bucket.last_seen = _from_ns(newest)
+        return bucket
+
+
+def _series(groups: dict, key: Hashable) -> _SeqSeries:
+    series = groups.get(key)
+    if series is None:
+        series = groups[key] = _SeqSeries()
+    return series
+
+
+def _discard(groups: dict, key: Hashable, seq: int) -> None:
+    series = groups.get(key)
+    if series is None:
+        return
+    series.remove(seq)
+    if not series:
+        del groups[key]
@@ -0,0 +1,270 @@
+"""Multi-process ingest for log floods.
+
+Streaming adapters (idevicesyslog, OSLog, simulator and device log streams)
+normally parse their output and build LogEntry objects on the event loop
+that also serves the HTTP API, so a debug-level log flood slows every other
+endpoint. With an IngestPool, an adapter only reads chunks of raw output
+(lists of lines, or unsplit bytes for the JSON adapters) and ships them to a
+worker process, which parses them with a parse-only copy of the adapter
+(parse_lines() or parse_chunk()) and returns the entries as compact tuples,
+one list per chunk.
+
+Each adapter stream is pinned to one worker, chosen by a hash of its
+device and adapter ID. Parsers can keep state across chunks (the simulator
+adapter's partial JSON objects), so keeping a stream on one worker keeps
+them correct; chunks of one stream are parsed and emitted in order.
+
+Back on the event loop, a task per stream rebuilds the entries without
+re-validating them and passes them to `on_batch`: the same pipeline
+(noise filter → rate limiter → deduplicator) that in-process adapters feed,
+so both modes filter, limit and deduplicate in the same order. The rate
+limits and noise patterns live on the event loop and change at runtime, and
+the rate limiter has to see entries before the deduplicator folds them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import time
+import zlib
+from collections.abc import Callable, Coroutine
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+from server.metrics import LatencyHistogram
+from server.models import IngestPoolStats, LogEntry, LogLevel, LogSource
+from server.sources import ChunkSourceAdapter, LineSourceAdapter
+
+if TYPE_CHECKING:
+    from server.sources import BaseSourceAdapter
+
+logger = logging.getLogger(__name__)
+
+BatchCallback = Callable[[list[LogEntry]], Coroutine[Any, Any, None]]
+
+# An entry as shipped back from a worker: (id, timestamp, device_id, process,
+# subsystem, category, pid, level, message, source, raw, repeat_count), with
+# level and source as their string values
+Record = tuple
+
+_LEVELS = {level.value: level for level in LogLevel}
+_SOURCES = {source.value: source for source in LogSource}
+
+
+def _pack(entry: LogEntry) -> Record:
+    return (
+        entry.id, entry.timestamp, entry.device_id, entry.process, entry.subsystem,
+        entry.category, entry.pid, entry.level.value, entry.message, entry.source.value,
+        entry.raw, entry.repeat_count,
+    )
+
+
+def _unpack(record: Record) -> LogEntry:
+    (entry_id, timestamp, device_id, process, subsystem, category, pid, level,
+     message, source, raw, repeat_count) = record
+    # The worker built these fields through LogEntry, so skip validating them again
+    return LogEntry.model_construct(
+        id=entry_id,
+        timestamp=timestamp,
+        device_id=device_id,
+        process=process,
+        subsystem=subsystem,
+        category=category,
+        pid=pid,
+        level=_LEVELS[level],
+        message=message,
+        source=_SOURCES[source],
+        raw=raw,
+        repeat_count=repeat_count,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Worker side (runs in the pool's processes)
+# ---------------------------------------------------------------------------
+
+# Stream key → parse-only adapter, per worker process
+_worker_streams: dict[int, BaseSourceAdapter] = {}
+
+
+def _worker_ingest(
+    key: int,
+    adapter_cls: type[BaseSourceAdapter],
+    parser_args: dict[str, Any],
+    raw: list[bytes] | bytes,
+) -> list[Record]:
+    """Parse one chunk of a stream's output: a list of lines, or raw bytes."""
+    parser = _worker_streams.get(key)
+    if parser is None:
+        parser = _worker_streams[key] = adapter_cls(**parser_args)
+    if isinstance(parser, ChunkSourceAdapter) and isinstance(raw, bytes):
+        entries = parser.parse_chunk(raw)
+    elif isinstance(parser, LineSourceAdapter) and isinstance(raw, list):
+        entries = parser.parse_lines(raw)
+    else:
+        raise TypeError(f"{adapter_cls.__name__} can't parse {type(raw).__name__} output")
+    return [_pack(entry) for entry in entries]
+
+
+def _worker_release(key: int) -> list[Record]:
+    """Drop a stream's parser."""
+    _worker_streams.pop(key, None)
+    return []
+
+
+# ---------------------------------------------------------------------------
+# Event loop side
+# ---------------------------------------------------------------------------
+
+
+class _Stream:
+    """One adapter's output: its worker and its in-order queue of results."""
+
+    __slots__ = ("key", "adapter", "shard", "results", "task")
+
+    def __init__(self, key: int, adapter: BaseSourceAdapter, shard: int, depth: int) -> None:
+        self.key = key
+        self.adapter = adapter
+        self.shard = shard
+        # Worker results in submission order; None ends the stream
+        self.results: asyncio.Queue[asyncio.Future[list[Record]] | None] = asyncio.Queue(depth)
+        self.task: asyncio.Task | None = None
+
+
+class IngestPool:
+    """Parses adapter output in worker processes.
+
+    Args:
+        workers: Worker processes. Each adapter stream uses one of them.
+        on_batch: Callback for the entries parsed from each chunk, normally
+            the noise filter's process_many like the adapters' own on_batch.
+        max_in_flight: Chunks per stream waiting for or in a worker before
+            feed() waits, so a flood can't queue unbounded memory.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        on_batch: BatchCallback | None = None,
+        max_in_flight: int = 8,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("IngestPool needs at least one worker")
+        self.workers = workers
+        self.on_batch = on_batch
+        self.max_in_flight = max_in_flight
+        self._executors: list[ProcessPoolExecutor] = []
+        self._streams: dict[int, _Stream] = {}
+        self._next_key = 1
+        self.lines_submitted = 0
+        self.entries_emitted = 0
+        # Chunk submission to worker results back, including time queued
+        self.round_trip = LatencyHistogram()
+
+    def start(self) -> None:
+        """Start the worker processes."""
+        if self._executors:
+            return
+        # spawn, not fork: the server process has threads and open sockets
+        context = multiprocessing.get_context("spawn")
+        self._executors = [
+            ProcessPoolExecutor(max_workers=1, mp_context=context) for _ in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Emit every stream's queued chunks and stop the workers."""
+        for stream in list(self._streams.values()):
+            await self._close(stream)
+        executors, self._executors = self._executors, []
+        for executor in executors:
+            await asyncio.to_thread(executor.shutdown)
+
+    async def feed(self, adapter: BaseSourceAdapter, raw: list[bytes] | bytes) -> None:
+        """Queue a chunk of an adapter's raw output for parsing.
+
+        raw is a list of lines for parse_lines(), or bytes for
+        parse_chunk(). Returns once the chunk is queued; waits while the
+        adapter already has max_in_flight chunks queued.
+        """
+        stream = self._streams.get(id(adapter))
+        if stream is None:
+            stream = self._open(adapter)
+        self.lines_submitted += raw.count(b"\n") if isinstance(raw, bytes) else len(raw)
+        start = time.perf_counter()
+        future = self._submit(
+            stream, _worker_ingest,
+            stream.key, type(adapter), adapter.parser_args(), raw,
+        )
+        future.add_done_callback(
+            lambda _: self.round_trip.observe(time.perf_counter() - start)
+        )
+        await stream.results.put(future)
+
+    def stats(self) -> IngestPoolStats:
+        return IngestPoolStats(
+            workers=self.workers,
+            streams=len(self._streams),
+            lines_submitted=self.lines_submitted,
+            entries_emitted=self.entries_emitted,
+            in_flight=sum(stream.results.qsize() for stream in self._streams.values()),
+            round_trip=self.round_trip.stats(),
+        )
+
+    async def release(self, adapter: BaseSourceAdapter) -> None:
+        """End an adapter's stream once its queued chunks are emitted.
+
+        Call when the adapter stops; a restarted adapter gets a fresh stream.
+        """
+        stream = self._streams.get(id(adapter))
+        if stream is not None:
+            await self._close(stream)
+
+    def _open(self, adapter: BaseSourceAdapter) -> _Stream:
+        shard = zlib.crc32(f"{adapter.device_id}/{adapter.adapter_id}".encode()) % self.workers
+        stream = _Stream(self._next_key, adapter, shard, self.max_in_flight)
+        self._next_key += 1
+        stream.task = asyncio.create_task(self._emit_loop(stream))
+        self._streams[id(adapter)] = stream
+        return stream
+
+    async def _close(self, stream: _Stream) -> None:
+        del self._streams[id(stream.adapter)]
+        try:
+            await stream.results.put(self._submit(stream, _worker_release, stream.key))
+        except Exception:
+            logger.exception("Ingest worker for %s failed", stream.adapter.adapter_id)
+        await stream.results.put(None)
+        assert stream.task is not None
+        await stream.task
+
+    def _submit(
+        self, stream: _Stream, fn: Callable[..., list[Record]], *args: Any,
+    ) -> asyncio.Future[list[Record]]:
+        if not self._executors:
+            raise RuntimeError("IngestPool is not started")
+        return asyncio.get_running_loop().run_in_executor(self._executors[stream.shard], fn, *args)
+
+    async def _emit_loop(self, stream: _Stream) -> None:
+        """Emit a stream's worker results in the order they were submitted.
+
+        A failed chunk is logged and skipped, so the stream keeps draining
+        and feed() never waits on a dead task.
+        """
+        while True:
+            future = await stream.results.get()
+            if future is None:
+                return
+            try:
+                records = await future
+                if not records:
+                    continue
+                entries = [_unpack(record) for record in records]
+                stream.adapter.entries_captured += len(entries)
+                stream.adapter.capture_rate.add(len(entries))
+                self.entries_emitted += len(entries)
+                if self.on_batch is not None:
+                    await self.on_batch(entries)
+            except Exception:
+                logger.exception("Ingest of %s output failed", stream.adapter.adapter_id)
@@ -0,0 +1,160 @@
+"""Noise filter pipeline stage.
+
+Sits between the source adapters and the deduplicator. Each entry is checked
+against the noise patterns (the built-in iOS chatter in classifier.py plus
+any added at runtime through the API) with a NoiseMatcher, and the matching
+pattern's action decides what happens to it:
+
+- drop: the entry is discarded before it reaches the deduplicator or the
+  store, so noise doesn't take up buffer space.
+- tag: the entry is stored with `noise` set, so clients can hide it
+  (`q=NOT noise:tag`).
+- exclude: like tag, and summaries, rollups and error groups skip it.
+
+A pattern can be scoped to one source (e.g. syslog), and then only applies
+to that source's entries. Every pattern counts its hits. The matchers are
+rebuilt whenever the pattern set changes: one with the unscoped patterns,
+plus one per source that has scoped patterns.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from collections.abc import Callable, Coroutine
+from dataclasses import dataclass
+from typing import Any
+
+from server.metrics import StageMetrics
+from server.models import LogEntry, LogSource, NoiseAction
+from server.processing.classifier import NOISE_PATTERNS, NoiseMatcher
+
+EntryCallback = Callable[[LogEntry], Coroutine[Any, Any, None]]
+BatchCallback = Callable[[list[LogEntry]], Coroutine[Any, Any, None]]
+
+
+@dataclass
+class NoisePattern:
+    """A named noise regex and the action for entries matching it."""
+
+    name: str
+    pattern: str
+    action: NoiseAction
+    builtin: bool = False
+    hits: int = 0
+    source: LogSource | None = None  # Only entries from this source; None for all
+
+
+class NoiseFilter:
+    """Drops or tags entries matching noise patterns, then passes them on.
+
+    Args:
+        on_entry: Callback for entries that survive process().
+        on_batch: Callback for the entries that survive process_many(), in
+            one call. Falls back to on_entry per entry when not set.
+        action: Action for the built-in patterns, or None to leave them out.
+    """
+
+    def __init__(
+        self,
+        on_entry: EntryCallback | None = None,
+        on_batch: BatchCallback | None = None,
+        action: NoiseAction | None = NoiseAction.TAG,
+    ) -> None:
+        self.on_entry = on_entry
+        self.on_batch = on_batch
+        self.checked = 0
+        self.matched = 0
+        self.dropped = 0
+        self.metrics = StageMetrics("noise")
+        self._patterns: dict[str, NoisePattern] = {}
+        if action is not None:
+            for name, text in NOISE_PATTERNS.items():
+                self._patterns[name] = NoisePattern(name, text, action, builtin=True)
+        self._rebuild()
+
+    def patterns(self) -> list[NoisePattern]:
+        return list(self._patterns.values())
+
+    def set_pattern(
+        self, name: str, pattern: str, action: NoiseAction, source: LogSource | None = None,
+    ) -> NoisePattern:
+        """Add a pattern, or replace the pattern, action or source of an existing one.
+
+        Raises ValueError if the regex is invalid or can't be combined with
+        the others.
+        """
+        previous = self._patterns.get(name)
+        updated = NoisePattern(
+            name, pattern, action,
+            builtin=previous is not None and previous.builtin and previous.pattern == pattern,
+            hits=previous.hits if previous is not None else 0,
+            source=source,
+        )
+        self._patterns[name] = updated
+        try:
+            self._rebuild()
+        except re.error as e:
+            if previous is None:
+                del self._patterns[name]
+            else:
+                self._patterns[name] = previous
+            self._rebuild()
+            raise ValueError(f"Invalid noise pattern {pattern!r}: {e}") from e
+        return updated
+
+    def remove_pattern(self, name: str) -> bool:
+        """Remove a pattern. Returns False if there was none by that name."""
+        if self._patterns.pop(name, None) is None:
+            return False
+        self._rebuild()
+        return True
+
+    def _rebuild(self) -> None:
+        patterns = self._patterns.values()
+        self._matcher = NoiseMatcher({p.name: p.pattern for p in patterns if p.source is None})
+        self._source_matchers = {
+            source: NoiseMatcher({
+                p.name: p.pattern for p in patterns if p.source is None or p.source == source
+            })
+            for source in {p.source for p in patterns if p.source is not None}
+        }
+
+    def classify(self, entry: LogEntry) -> bool:
+        """Tag an entry if it's noise. Returns False if it should be dropped."""
+        self.checked += 1
+        matcher = self._source_matchers.get(entry.source, self._matcher)
+        name = matcher.match(entry.message)
+        if name is None:
+            return True
+        pattern = self._patterns[name]
+        pattern.hits += 1
+        self.matched += 1
+        if pattern.action == NoiseAction.DROP:
+            self.dropped += 1
+            return False
+        entry.noise = pattern.action
+        return True
+
+    async def process(self, entry: LogEntry) -> None:
+        """Pass an entry on unless it's noise to drop."""
+        if self.keep([entry]) and self.on_entry is not None:
+            await self.on_entry(entry)
+
+    def keep(self, entries: list[LogEntry]) -> list[LogEntry]:
+        """Classify a batch and return the entries that aren't noise to drop."""
+        start = time.perf_counter()
+        kept = [entry for entry in entries if self.classify(entry)]
+        self.metrics.record(len(entries), len(kept), time.perf_counter() - start)
+        return kept
+
+    async def process_many(self, entries: list[LogEntry]) -> None:
+        """Pass on the entries of a batch that aren't noise to drop, in one call."""
+        kept = self.keep(entries)
+        if not kept:
+            return
+        if self.on_batch is not None:
+            await self.on_batch(kept)
+        elif self.on_entry is not None:
+            for entry in kept:
+                await self.on_entry(entry)
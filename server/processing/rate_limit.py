@@ -0,0 +1,314 @@
+"""Per-process rate limiting pipeline stage.
+
+Sits between the noise filter and the deduplicator. The deduplicator only
+folds exact repeats, so a process logging thousands of distinct lines per
+second (a debug build's Logger.debug calls) churns through the whole ring
+buffer in seconds. RateLimiter gives each (device_id, process, subsystem)
+a token bucket:
+
+- Every entry takes a token. Tokens refill at `rate` per second, up to
+  `burst`, measured on a monotonic clock at arrival: entry timestamps come
+  from device clocks that may be skewed, jump or go backwards, and a
+  timestamp far in the future would otherwise fill the bucket.
+- Entries arriving with the bucket empty are over the limit. One in
+  `sample_every` of them is still passed on so the flood stays visible;
+  the rest are suppressed and counted. Errors and faults always pass.
+- Every `summary_interval` seconds, a key with suppressed entries emits a
+  synthetic "N entries suppressed" entry carrying repeat_count = N, like
+  the deduplicator's summaries, so counts and summaries stay accurate.
+
+The default limit applies to every key; per-process overrides replace it
+for one process (all its subsystems). Both can be changed at runtime
+through the API. A rate of 0 turns limiting off, which is the default
+until a limit is configured.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from collections.abc import Callable, Coroutine
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from server.metrics import StageMetrics
+from server.models import LogEntry, LogLevel, LogSource
+
+EntryCallback = Callable[[LogEntry], Coroutine[Any, Any, None]]
+BatchCallback = Callable[[list[LogEntry]], Coroutine[Any, Any, None]]
+
+RateKey = tuple[str, str, str | None]  # (device_id, process, subsystem)
+
+_LEVEL_RANK = {level: i for i, level in enumerate(LogLevel)}
+_ALWAYS_PASS = frozenset(LogLevel.at_least(LogLevel.ERROR))
+
+
+@dataclass
+class RateLimit:
+    """A token bucket's sustained rate (entries/s) and burst size."""
+
+    rate: float
+    burst: int
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+
+class _Bucket:
+    """Tokens and suppressed entries for one (device, process, subsystem)."""
+
+    __slots__ = (
+        "key", "tokens", "updated", "suppressed", "suppressed_since", "passed_over",
+        "first_suppressed", "last_suppressed", "level", "source", "total_suppressed",
+    )
+
+    def __init__(self, key: RateKey, tokens: float, now: float) -> None:
+        self.key = key
+        self.tokens = tokens
+        self.updated = now  # Clock reading of the last refill
+        self.suppressed = 0  # Since the last summary
+        self.suppressed_since: float | None = None  # Clock reading of the first of those
+        self.passed_over = 0  # Over-limit entries seen, for sampling
+        # Entry timestamps of the first and last suppressed entries, for the summary
+        self.first_suppressed: datetime | None = None
+        self.last_suppressed: datetime | None = None
+        self.level = LogLevel.DEBUG  # Most severe suppressed level
+        self.source: LogSource | None = None
+        self.total_suppressed = 0
+
+
+class RateLimiter:
+    """Samples entries from (device, process, subsystem) keys over their rate.
+
+    Args:
+        on_entry: Callback for entries that pass, and for summaries.
+        on_batch: Callback for the entries that pass process_many(), in one
+            call. Falls back to on_entry per entry when not set.
+        rate: Default sustained entries/s per key (0 = no limit).
+        burst: Default bucket size: entries a key may log at once.
+        sample_every: Pass one in this many over-limit entries (0 = none).
+        summary_interval: Seconds between a key's suppression summaries.
+        idle_seconds: Keys idle this long with no summary pending are
+            forgotten.
+        clock: Monotonic clock, in seconds, that refills the buckets and
+            times summaries.
+    """
+
+    def __init__(
+        self,
+        on_entry: EntryCallback | None = None,
+        on_batch: BatchCallback | None = None,
+        rate: float = 0.0,
+        burst: int = 2_000,
+        sample_every: int = 100,
+        summary_interval: float = 5.0,
+        idle_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.on_entry = on_entry
+        self.on_batch = on_batch
+        self.default = RateLimit(rate, burst)
+        self.sample_every = sample_every
+        self._summary_interval = summary_interval
+        self._idle = idle_seconds
+        self._clock = clock
+        self._overrides: dict[str, RateLimit] = {}
+        self._buckets: dict[RateKey, _Bucket] = {}
+        self._flush_task: asyncio.Task | None = None
+        self.suppressed = 0
+        self.sampled = 0
+        self.metrics = StageMetrics("rate_limit")
+
+    # ------------------------------------------------------------------
+    # Limits
+    # ------------------------------------------------------------------
+
+    def limit_for(self, process: str) -> RateLimit:
+        return self._overrides.get(process, self.default)
+
+    def overrides(self) -> dict[str, RateLimit]:
+        return dict(self._overrides)
+
+    def set_limit(
+        self, rate: float, burst: int | None = None, process: str | None = None,
+    ) -> RateLimit:
+        """Set the default limit, or one process's override.
+
+        burst defaults to the current burst, or twice the rate if that's
+        larger. Raises ValueError for a negative rate or burst.
+        """
+        if rate < 0 or (burst is not None and burst < 0):
+            raise ValueError("rate and burst must not be negative")
+        current = self.limit_for(process) if process is not None else self.default
+        if burst is None:
+            burst = max(current.burst, int(rate * 2))
+        limit = RateLimit(rate, burst)
+        if process is None:
+            self.default = limit
+        else:
+            self._overrides[process] = limit
+        return limit
+
+    def remove_limit(self, process: str) -> bool:
+        """Drop a process's override. Returns False if it had none."""
+        return self._overrides.pop(process, None) is not None
+
+    def throttled(self) -> list[tuple[RateKey, int]]:
+        """Keys with suppressed entries, and how many they've had, most first."""
+        counts = [
+            (b.key, b.total_suppressed) for b in self._buckets.values() if b.total_suppressed
+        ]
+        return sorted(counts, key=lambda item: item[1], reverse=True)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the background timer that emits summaries for quiet keys."""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Stop the timer and emit every pending summary."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self._emit_many(self.summaries(None))
+
+    async def _flush_loop(self) -> None:
+        try:
+            while True:
+                await asyncio.sleep(self._summary_interval)
+                await self._emit_many(self.summaries(self._clock()))
+        except asyncio.CancelledError:
+            return
+
+    # ------------------------------------------------------------------
+    # Processing
+    # ------------------------------------------------------------------
+
+    async def process(self, entry: LogEntry) -> None:
+        """Pass an entry on unless its key is over the limit."""
+        out = self.admit([entry])
+        if self.on_entry is not None:
+            for passed in out:
+                await self.on_entry(passed)
+
+    async def process_many(self, entries: list[LogEntry]) -> None:
+        """Pass on the entries of a batch that are within their limits, in one call."""
+        await self._emit_many(self.admit(entries))
+
+    def admit(self, entries: list[LogEntry]) -> list[LogEntry]:
+        """Return the entries to pass on, with any summaries that are due."""
+        start = time.perf_counter()
+        out: list[LogEntry] = []
+        now = self._clock()
+        for entry in entries:
+            limit = self.limit_for(entry.process)
+            if not limit.enabled:
+                out.append(entry)
+                continue
+            if self._take(entry, limit, now, out):
+                out.append(entry)
+        self.metrics.record(len(entries), len(out), time.perf_counter() - start)
+        return out
+
+    def _take(
+        self, entry: LogEntry, limit: RateLimit, now: float, out: list[LogEntry],
+    ) -> bool:
+        """Spend a token for an entry arriving at clock reading now.
+
+        Returns False if it's suppressed.
+        """
+        key = (entry.device_id, entry.process, entry.subsystem)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(key, limit.burst, now)
+        elif now > bucket.updated:
+            bucket.tokens = min(limit.burst, bucket.tokens + (now - bucket.updated) * limit.rate)
+            bucket.updated = now
+        if self._summary_due(bucket, now):
+            out.append(self._summary(bucket))
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            return True
+        if entry.level in _ALWAYS_PASS:
+            return True
+        bucket.passed_over += 1
+        if self.sample_every and (bucket.passed_over - 1) % self.sample_every == 0:
+            self.sampled += 1
+            return True
+        self.suppressed += 1
+        bucket.total_suppressed += 1
+        bucket.suppressed += 1
+        if bucket.suppressed_since is None:
+            bucket.suppressed_since = now
+            bucket.first_suppressed = entry.timestamp
+            bucket.source = entry.source
+        bucket.last_suppressed = entry.timestamp
+        if _LEVEL_RANK[entry.level] > _LEVEL_RANK[bucket.level]:
+            bucket.level = entry.level
+        return False
+
+    def summaries(self, now: float | None) -> list[LogEntry]:
+        """Summaries for keys whose interval has passed by clock reading now.
+
+        Every pending summary if now is None. Also forgets keys that have
+        been idle with a full bucket.
+        """
+        out: list[LogEntry] = []
+        for key, bucket in list(self._buckets.items()):
+            if bucket.suppressed_since is None:
+                if now is not None and now - bucket.updated >= self._idle:
+                    del self._buckets[key]
+            elif now is None or self._summary_due(bucket, now):
+                out.append(self._summary(bucket))
+        return out
+
+    def _summary_due(self, bucket: _Bucket, now: float) -> bool:
+        since = bucket.suppressed_since
+        return since is not None and now - since >= self._summary_interval
+
+    def _summary(self, bucket: _Bucket) -> LogEntry:
+        """Build a key's suppression summary and reset its pending count."""
+        device_id, process, subsystem = bucket.key
+        assert bucket.first_suppressed is not None and bucket.last_suppressed is not None
+        assert bucket.source is not None
+        seconds = max(0.0, (bucket.last_suppressed - bucket.first_suppressed).total_seconds())
+        where = f"{process} ({subsystem})" if subsystem else process
+        summary = LogEntry(
+            id=uuid.uuid4().hex[:8],
+            timestamp=bucket.last_suppressed,
+            device_id=device_id,
+            process=process,
+            subsystem=subsystem,
+            level=bucket.level,
+            message=(
+                f"Rate limited: {bucket.suppressed} entries suppressed from {where} "
+                f"over {seconds:.1f}s"
+            ),
+            source=bucket.source,
+            repeat_count=bucket.suppressed,
+        )
+        bucket.suppressed = 0
+        bucket.suppressed_since = None
+        bucket.first_suppressed = None
+        bucket.level = LogLevel.DEBUG
+        return summary
+
+    async def _emit_many(self, entries: list[LogEntry]) -> None:
+        if not entries:
+            return
+        if self.on_batch is not None:
+            await self.on_batch(entries)
+        elif self.on_entry is not None:
+            for entry in entries:
+                await self.on_entry(entry)
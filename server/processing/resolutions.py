@@ -0,0 +1,140 @@
+"""Incremental error→success resolution tracking.
+
+detect_resolution answers "which errors in this list of entries were followed
+by a success message from the same process?" for one summary's entries.
+ResolutionTracker keeps the answer current as entries are stored instead: it
+is registered as a listener on the log stores and maintains one issue per
+(device_id, process, error pattern), with
+
+- the issue's occurrence count and first/last seen times,
+- whether it's resolved: a success message (SUCCESS_KEYWORDS) from the same
+  device and process after the issue's latest error resolves it, and a
+  later error of the same pattern reopens it.
+
+Unresolved issues are indexed by (device_id, process), so a success message
+touches only its own process's open issues. Issues are kept until
+`max_issues` exist; then the least recently active one is dropped. State
+covers every entry stored since startup (the SQLite store's recent history
+is replayed on startup), not just the entries still in memory.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import datetime
+
+from server.models import LogEntry, LogLevel, NoiseAction
+from server.processing.classifier import SUCCESS_KEYWORDS, extract_pattern
+
+_ERROR_LEVELS = frozenset(LogLevel.at_least(LogLevel.ERROR))
+
+IssueKey = tuple[str, str, str]  # (device_id, process, pattern)
+
+
+class Issue:
+    """An error pattern from one process, and whether it has been resolved."""
+
+    __slots__ = (
+        "device_id", "process", "pattern", "count", "first_seen", "last_seen",
+        "resolved_at", "resolution_message",
+    )
+
+    def __init__(self, device_id: str, process: str, pattern: str, first_seen: datetime) -> None:
+        self.device_id = device_id
+        self.process = process
+        self.pattern = pattern
+        self.count = 0
+        self.first_seen = first_seen
+        self.last_seen = first_seen
+        self.resolved_at: datetime | None = None
+        self.resolution_message: str | None = None
+
+    @property
+    def resolved(self) -> bool:
+        return self.resolved_at is not None
+
+
+class ResolutionTracker:
+    """Tracks resolved and unresolved error patterns as entries are stored.
+
+    Register add() as a listener on every log store whose entries count.
+
+    Args:
+        max_issues: Issues kept; the least recently active is dropped.
+    """
+
+    def __init__(self, max_issues: int = 10_000) -> None:
+        self.max_issues = max_issues
+        # Every issue, least recently active first
+        self._issues: OrderedDict[IssueKey, Issue] = OrderedDict()
+        # Unresolved issues by (device_id, process), then pattern
+        self._open: dict[tuple[str, str], dict[str, Issue]] = {}
+
+    def __len__(self) -> int:
+        return len(self._issues)
+
+    def add(self, entry: LogEntry) -> None:
+        """Count a stored error, or resolve its process's issues on a success."""
+        if entry.noise == NoiseAction.EXCLUDE:
+            return
+        owner = (entry.device_id, entry.process)
+        if entry.level in _ERROR_LEVELS:
+            self._error(owner, entry)
+        elif owner in self._open and SUCCESS_KEYWORDS.search(entry.message):
+            for issue in self._open.pop(owner).values():
+                issue.resolved_at = entry.timestamp
+                issue.resolution_message = entry.message
+
+    def _error(self, owner: tuple[str, str], entry: LogEntry) -> None:
+        pattern = extract_pattern(entry.message)
+        key = (*owner, pattern)
+        issue = self._issues.get(key)
+        if issue is None:
+            issue = self._issues[key] = Issue(*key, first_seen=entry.timestamp)
+            if len(self._issues) > self.max_issues:
+                _, oldest = self._issues.popitem(last=False)
+                self._close(oldest)
+        else:
+            self._issues.move_to_end(key)
+            issue.resolved_at = issue.resolution_message = None
+        self._open.setdefault(owner, {})[pattern] = issue
+        issue.count += entry.repeat_count
+        issue.first_seen = min(issue.first_seen, entry.timestamp)
+        issue.last_seen = max(issue.last_seen, entry.timestamp)
+
+    def _close(self, issue: Issue) -> None:
+        """Drop an issue from the unresolved index."""
+        owner = (issue.device_id, issue.process)
+        open_issues = self._open.get(owner)
+        if open_issues is not None and open_issues.pop(issue.pattern, None) is not None:
+            if not open_issues:
+                del self._open[owner]
+
+    def issues(
+        self,
+        resolved: bool | None = None,
+        device_id: str | None = None,
+        process: str | None = None,
+    ) -> list[Issue]:
+        """Issues matching the filters, most recently seen first.
+
+        Args:
+            resolved: Only resolved (True) or unresolved (False) issues.
+            device_id: Only issues from this device.
+            process: Only issues from this process.
+        """
+        if resolved is False:
+            candidates = [
+                issue for (device, proc), open_issues in self._open.items()
+                if (device_id is None or device == device_id)
+                and (process is None or proc == process)
+                for issue in open_issues.values()
+            ]
+        else:
+            candidates = [
+                issue for issue in self._issues.values()
+                if (resolved is None or issue.resolved)
+                and (device_id is None or issue.device_id == device_id)
+                and (process is None or issue.process == process)
+            ]
+        return sorted(candidates, key=lambda issue: issue.last_seen, reverse=True)
@@ -0,0 +1,248 @@
+"""Time-bucketed log rollups maintained at ingest time.
+
+Every stored entry is folded into a per-second bucket and a per-minute bucket
+keyed on the entry's timestamp. A bucket holds counts by (process, level,
+source), error patterns with first/last seen times, warning pattern counts,
+and the last success message per process (for resolution detection).
+
+Window summaries and histograms merge buckets instead of rescanning entries:
+a window is covered by per-second buckets at its ragged edges and per-minute
+buckets for the whole minutes in between, so a 1h summary touches at most
+~180 buckets however busy the device is. Windows are aligned to whole
+seconds. Counts are weighted by repeat_count, like the summarizer's.
+
+Entry timestamps come from device clocks and parsed local times, so some
+arrive in the future. Bucketing them there would move retention forward
+and reject every correctly stamped entry as too old, so an entry stamped
+more than `max_skew` ahead of the wall clock is bucketed at the wall clock
+plus `max_skew` instead.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+
+from server.models import LogEntry, LogLevel, LogSource, NoiseAction
+from server.processing.classifier import SUCCESS_KEYWORDS, extract_pattern
+from server.storage.merge import epoch_ns
+
+_ERROR_LEVELS = frozenset(LogLevel.at_least(LogLevel.ERROR))
+
+# Ordering key for resolution detection: (timestamp_ns, seq)
+_OrderKey = tuple[int, int]
+
+
+class PatternStats:
+    """Occurrences of one (process, error pattern) within a bucket."""
+
+    __slots__ = ("count", "first_seen", "last_seen", "last_key")
+
+    def __init__(self, entry: LogEntry, key: _OrderKey) -> None:
+        self.count = entry.repeat_count
+        self.first_seen = entry.timestamp
+        self.last_seen = entry.timestamp
+        self.last_key = key
+
+    def add(self, entry: LogEntry, key: _OrderKey) -> None:
+        self.count += entry.repeat_count
+        if entry.timestamp < self.first_seen:
+            self.first_seen = entry.timestamp
+        if entry.timestamp > self.last_seen:
+            self.last_seen = entry.timestamp
+        if key > self.last_key:
+            self.last_key = key
+
+    def merge(self, other: PatternStats) -> None:
+        self.count += other.count
+        self.first_seen = min(self.first_seen, other.first_seen)
+        self.last_seen = max(self.last_seen, other.last_seen)
+        self.last_key = max(self.last_key, other.last_key)
+
+    def copy(self) -> PatternStats:
+        clone = PatternStats.__new__(PatternStats)
+        clone.count = self.count
+        clone.first_seen = self.first_seen
+        clone.last_seen = self.last_seen
+        clone.last_key = self.last_key
+        return clone
+
+
+class RollupBucket:
+    """Aggregated counts for the entries in one time span."""
+
+    __slots__ = ("counts", "errors", "warnings", "successes", "last_seen")
+
+    def __init__(self) -> None:
+        self.counts: dict[tuple[str, LogLevel, LogSource], int] = defaultdict(int)
+        self.errors: dict[tuple[str, str], PatternStats] = {}
+        self.warnings: dict[tuple[str, str], int] = defaultdict(int)
+        self.successes: dict[str, _OrderKey] = {}
+        self.last_seen: datetime | None = None
+
+    def add(self, entry: LogEntry, pattern: str | None, success: bool, key: _OrderKey) -> None:
+        process = entry.process
+        self.counts[(process, entry.level, entry.source)] += entry.repeat_count
+        if entry.level in _ERROR_LEVELS:
+            stats = self.errors.get((process, pattern))
+            if stats is None:
+                self.errors[(process, pattern)] = PatternStats(entry, key)
+            else:
+                stats.add(entry, key)
+        elif entry.level == LogLevel.WARNING:
+            self.warnings[(process, pattern)] += entry.repeat_count
+        if success and key > self.successes.get(process, (-1, -1)):
+            self.successes[process] = key
+        if self.last_seen is None or entry.timestamp > self.last_seen:
+            self.last_seen = entry.timestamp
+
+    def merge(self, other: RollupBucket) -> None:
+        for key, count in other.counts.items():
+            self.counts[key] += count
+        for key, stats in other.errors.items():
+            mine = self.errors.get(key)
+            if mine is None:
+                self.errors[key] = stats.copy()
+            else:
+                mine.merge(stats)
+        for key, count in other.warnings.items():
+            self.warnings[key] += count
+        for process, key in other.successes.items():
+            if key > self.successes.get(process, (-1, -1)):
+                self.successes[process] = key
+        if other.last_seen is not None and (
+            self.last_seen is None or other.last_seen > self.last_seen
+        ):
+            self.last_seen = other.last_seen
+
+
+def _count_by(
+    buckets: Iterator[RollupBucket], by: str, process: str | None = None,
+) -> dict[str, int]:
+    """Total counts across buckets grouped by "level", "process" or "source"."""
+    field = {"process": 0, "level": 1, "source": 2}[by]
+    result: dict[str, int] = defaultdict(int)
+    for bucket in buckets:
+        for key, count in bucket.counts.items():
+            if process and key[0] != process:
+                continue
+            value = key[field]
+            result[value if field == 0 else value.value] += count
+    return dict(result)
+
+
+class LogRollups:
+    """Per-second and per-minute rollups of stored log entries.
+
+    Register add() as a listener on each log store that summaries cover.
+
+    Args:
+        retention: How far back (by entry timestamp) windows can reach. Must
+            cover the longest summary window.
+        max_skew: How far ahead of the wall clock an entry may be bucketed.
+    """
+
+    def __init__(
+        self,
+        retention: timedelta = timedelta(hours=1),
+        max_skew: timedelta = timedelta(minutes=1),
+    ) -> None:
+        # One spare minute so a window's leading edge is still complete
+        self.retention_seconds = int(retention.total_seconds()) + 60
+        self.max_skew_seconds = int(max_skew.total_seconds())
+        self._seconds: dict[int, RollupBucket] = {}
+        self._minutes: dict[int, RollupBucket] = {}
+        self._newest = 0
+
+    def add(self, entry: LogEntry) -> None:
+        """Fold a newly stored entry into its second and minute buckets."""
+        if entry.noise == NoiseAction.EXCLUDE:
+            return
+        ns = epoch_ns(entry.timestamp)
+        second = min(ns // 1_000_000_000, int(time.time()) + self.max_skew_seconds)
+        if second <= self._newest - self.retention_seconds:
+            return  # Older than anything a window can reach
+
+        pattern = None
+        success = False
+        if entry.level in _ERROR_LEVELS or entry.level == LogLevel.WARNING:
+            pattern = extract_pattern(entry.message)
+        else:
+            success = SUCCESS_KEYWORDS.search(entry.message) is not None
+        key = (ns, entry.seq)
+
+        bucket = self._seconds.get(second)
+        if bucket is None:
+            bucket = self._seconds[second] = RollupBucket()
+            if second > self._newest:
+                self._newest = second
+                self._prune()
+        bucket.add(entry, pattern, success, key)
+
+        minute = second // 60
+        bucket = self._minutes.get(minute)
+        if bucket is None:
+            bucket = self._minutes[minute] = RollupBucket()
+        bucket.add(entry, pattern, success, key)
+
+    def _prune(self) -> None:
+        cutoff = self._newest - self.retention_seconds
+        for second in [s for s in self._seconds if s <= cutoff]:
+            del self._seconds[second]
+        for minute in [m for m in self._minutes if (m + 1) * 60 <= cutoff]:
+            del self._minutes[minute]
+
+    def _buckets(self, start: int, end: int) -> Iterator[RollupBucket]:
+        """Yield the buckets covering seconds [start, end)."""
+        second = start
+        while second < end:
+            if second % 60 == 0 and second + 60 <= end:
+                # Whole minute — one per-minute bucket instead of 60
+                bucket = self._minutes.get(second // 60)
+                if bucket is not None:
+                    yield bucket
+                second += 60
+                continue
+            bucket = self._seconds.get(second)
+            if bucket is not None:
+                yield bucket
+            second += 1
+
+    def window(self, since: datetime, until: datetime | None = None) -> RollupBucket:
+        """Merge the buckets for entries timestamped in [since, until].
+
+        Both ends are widened to whole seconds.
+        """
+        start = epoch_ns(since) // 1_000_000_000
+        if until is None:
+            end = self._newest + 1
+        else:
+            end = epoch_ns(until) // 1_000_000_000 + 1
+        total = RollupBucket()
+        for bucket in self._buckets(start, end):
+            total.merge(bucket)
+        return total
+
+    def series(
+        self,
+        since: datetime,
+        until: datetime,
+        interval: int,
+        by: str,
+        process: str | None = None,
+    ) -> list[tuple[datetime, dict[str, int]]]:
+        """Counts grouped by `by` for each `interval`-second slot in [since, until].
+
+        Slots are aligned to multiples of the interval; empty slots are included.
+        """
+        start = epoch_ns(since) // 1_000_000_000 // interval * interval
+        end = epoch_ns(until) // 1_000_000_000 + 1
+        return [
+            (
+                datetime.fromtimestamp(slot, tz=timezone.utc),
+                _count_by(self._buckets(slot, min(slot + interval, end)), by, process),
+            )
+            for slot in range(start, end, interval)
+        ]
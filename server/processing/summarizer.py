@@ -9,6 +9,8 @@ Key features:
 - Detects error→success resolution sequences
 - Generates natural-language prose from templates
 - Cursor support for delta summaries
+- Window summaries from ingest-time rollups (see rollups.py)
+- Cursor-delta summaries from incrementally maintained groups (see error_groups.py)
 """
 
 from __future__ import annotations
@@ -18,8 +20,16 @@ import struct
 from collections import defaultdict
 from datetime import datetime, timedelta, timezone
 
-from server.models import LogEntry, LogLevel, LogSummaryResponse, TopIssue
-from server.processing.classifier import detect_resolution, extract_pattern
+from server.models import (
+    LogAnomaly,
+    LogEntry,
+    LogLevel,
+    LogSummaryResponse,
+    NoiseAction,
+    TopIssue,
+)
+from server.processing.classifier import SUCCESS_KEYWORDS, extract_pattern
+from server.processing.rollups import RollupBucket
 
 # Time windows accepted by the summary endpoint
 WINDOW_DURATIONS: dict[str, timedelta] = {
@@ -31,15 +41,23 @@ WINDOW_DURATIONS: dict[str, timedelta] = {
 }
 
 
-def make_cursor(ts: datetime) -> str:
-    """Encode a timestamp into an opaque cursor string."""
+def make_cursor(ts: datetime, seq: int | None = None) -> str:
+    """Encode a timestamp (and optionally a store sequence number) into an
+    opaque cursor string.
+
+    Cursors carrying a seq resume exactly after that entry; timestamp-only
+    cursors (the original format) are still accepted by parse_cursor.
+    """
     epoch_us = int(ts.timestamp() * 1_000_000)
-    raw = struct.pack(">Q", epoch_us)
+    if seq is None:
+        raw = struct.pack(">Q", epoch_us)
+    else:
+        raw = struct.pack(">QQ", epoch_us, seq)
     return "c_" + base64.urlsafe_b64encode(raw).decode().rstrip("=")
 
 
-def parse_cursor(cursor: str) -> datetime | None:
-    """Decode an opaque cursor back into a timestamp. Returns None if invalid."""
+def _decode_cursor(cursor: str) -> tuple[int, int | None] | None:
+    """Decode a cursor into (epoch_us, seq or None). Returns None if invalid."""
     if not cursor.startswith("c_"):
         return None
     try:
@@ -47,16 +65,34 @@ def parse_cursor(cursor: str) -> datetime | None:
         # Re-pad base64
         b64 += "=" * (-len(b64) % 4)
         raw = base64.urlsafe_b64decode(b64)
-        epoch_us = struct.unpack(">Q", raw)[0]
-        return datetime.fromtimestamp(epoch_us / 1_000_000, tz=timezone.utc)
+        if len(raw) == 16:
+            epoch_us, seq = struct.unpack(">QQ", raw)
+            return epoch_us, seq
+        return struct.unpack(">Q", raw)[0], None
     except Exception:
         return None
 
 
+def parse_cursor(cursor: str) -> datetime | None:
+    """Decode an opaque cursor back into a timestamp. Returns None if invalid."""
+    decoded = _decode_cursor(cursor)
+    if decoded is None:
+        return None
+    return datetime.fromtimestamp(decoded[0] / 1_000_000, tz=timezone.utc)
+
+
+def parse_cursor_seq(cursor: str) -> int | None:
+    """Return the sequence number in a cursor, or None for legacy/invalid cursors."""
+    decoded = _decode_cursor(cursor)
+    return decoded[1] if decoded else None
+
+
 def generate_summary(
     entries: list[LogEntry],
     window: str = "5m",
     process: str | None = None,
+    cursor_seq: int | None = None,
+    anomalies: list[LogAnomaly] | None = None,
 ) -> LogSummaryResponse:
     """Generate a structured summary from a list of log entries.
 
@@ -64,12 +100,17 @@ def generate_summary(
         entries: Log entries to summarize (should already be filtered by time window).
         window: The window label (e.g., "5m") for the response.
         process: If set, only summarize entries from this process.
+        cursor_seq: Store sequence number the next delta should resume after.
+            When omitted the cursor is timestamp-only.
+        anomalies: Current template rate anomalies (TemplateRates).
     """
     now = datetime.now(timezone.utc)
 
-    # Filter by process if requested
-    if process:
-        entries = [e for e in entries if e.process == process]
+    # Filter by process if requested, and drop noise excluded from summaries
+    entries = [
+        e for e in entries
+        if (not process or e.process == process) and e.noise != NoiseAction.EXCLUDE
+    ]
 
     # Count by level (weighted by repeat_count)
     error_levels = set(LogLevel.at_least(LogLevel.ERROR))
@@ -86,16 +127,35 @@ def generate_summary(
         elif e.level in warning_levels:
             warning_count += e.repeat_count
 
+    # Extract each distinct message's pattern once, shared by grouping and
+    # resolution detection
+    patterns: dict[str, str] = {}
+
+    def pattern_of(e: LogEntry) -> str:
+        pattern = patterns.get(e.message)
+        if pattern is None:
+            pattern = patterns[e.message] = extract_pattern(e.message)
+        return pattern
+
     # Group errors by pattern
     error_groups: dict[str, list[LogEntry]] = defaultdict(list)
     for e in entries:
         if e.level in error_levels:
-            pattern = extract_pattern(e.message)
-            error_groups[pattern].append(e)
+            error_groups[pattern_of(e)].append(e)
 
-    # Detect resolutions
-    resolutions = detect_resolution(entries, process=process)
-    resolved_patterns = {r["error_pattern"] for r in resolutions}
+    # A pattern is resolved once a process logs a success message after its
+    # last error of that pattern, as in generate_rollup_summary()
+    last_errors: dict[tuple[str, str], int] = {}
+    last_successes: dict[str, int] = {}
+    for i, e in enumerate(entries):
+        if e.level in error_levels:
+            last_errors[(e.process, pattern_of(e))] = i
+        elif e.level not in warning_levels and SUCCESS_KEYWORDS.search(e.message):
+            last_successes[e.process] = i
+    resolved_patterns = {
+        pattern for (entry_process, pattern), i in last_errors.items()
+        if last_successes.get(entry_process, -1) > i
+    }
 
     # Build top issues
     top_issues: list[TopIssue] = []
@@ -115,8 +175,7 @@ def generate_summary(
     warning_groups: dict[str, int] = defaultdict(int)
     for e in entries:
         if e.level in warning_levels:
-            pattern = extract_pattern(e.message)
-            warning_groups[pattern] += e.repeat_count
+            warning_groups[pattern_of(e)] += e.repeat_count
 
     # Generate prose summary
     summary = _build_prose(
@@ -127,6 +186,8 @@ def generate_summary(
         warning_count=warning_count,
         top_issues=top_issues,
         warning_groups=warning_groups,
+        anomalies=anomalies or [],
+        now=now,
     )
 
     # Cursor = timestamp of the latest entry (or now if empty)
@@ -135,12 +196,102 @@ def generate_summary(
     return LogSummaryResponse(
         window=window,
         generated_at=now,
-        cursor=make_cursor(cursor_ts),
+        cursor=make_cursor(cursor_ts, cursor_seq),
         summary=summary,
         error_count=error_count,
         warning_count=warning_count,
         total_count=total_count,
         top_issues=top_issues,
+        anomalies=anomalies or [],
+    )
+
+
+def generate_rollup_summary(
+    rollup: RollupBucket,
+    window: str = "5m",
+    process: str | None = None,
+    cursor_seq: int | None = None,
+    anomalies: list[LogAnomaly] | None = None,
+) -> LogSummaryResponse:
+    """Generate a summary from a window's merged rollup buckets.
+
+    Produces the same fields as generate_summary() without revisiting the
+    window's entries.
+
+    Args:
+        rollup: Buckets covering the window, merged (LogRollups.window()).
+        window: The window label (e.g., "5m") for the response.
+        process: If set, only summarize entries from this process.
+        cursor_seq: Store sequence number the next delta should resume after.
+        anomalies: Current template rate anomalies (TemplateRates).
+    """
+    now = datetime.now(timezone.utc)
+    error_levels = set(LogLevel.at_least(LogLevel.ERROR))
+
+    total_count = 0
+    error_count = 0
+    warning_count = 0
+    for (entry_process, level, _), count in rollup.counts.items():
+        if process and entry_process != process:
+            continue
+        total_count += count
+        if level in error_levels:
+            error_count += count
+        elif level == LogLevel.WARNING:
+            warning_count += count
+
+    # Group errors by pattern across processes; a pattern is resolved once a
+    # process logs a success message after its last error in the window
+    issues: dict[str, TopIssue] = {}
+    for (entry_process, pattern), stats in rollup.errors.items():
+        if process and entry_process != process:
+            continue
+        success = rollup.successes.get(entry_process)
+        resolved = success is not None and success > stats.last_key
+        issue = issues.get(pattern)
+        if issue is None:
+            issues[pattern] = TopIssue(
+                pattern=pattern,
+                count=stats.count,
+                first_seen=stats.first_seen,
+                last_seen=stats.last_seen,
+                resolved=resolved,
+            )
+        else:
+            issue.count += stats.count
+            issue.first_seen = min(issue.first_seen, stats.first_seen)
+            issue.last_seen = max(issue.last_seen, stats.last_seen)
+            issue.resolved = issue.resolved or resolved
+    top_issues = sorted(issues.values(), key=lambda i: (-i.count, i.first_seen))
+
+    warning_groups: dict[str, int] = defaultdict(int)
+    for (entry_process, pattern), count in rollup.warnings.items():
+        if process and entry_process != process:
+            continue
+        warning_groups[pattern] += count
+
+    summary = _build_prose(
+        window=window,
+        process=process,
+        total_count=total_count,
+        error_count=error_count,
+        warning_count=warning_count,
+        top_issues=top_issues,
+        warning_groups=warning_groups,
+        anomalies=anomalies or [],
+        now=now,
+    )
+
+    return LogSummaryResponse(
+        window=window,
+        generated_at=now,
+        cursor=make_cursor(rollup.last_seen or now, cursor_seq),
+        summary=summary,
+        error_count=error_count,
+        warning_count=warning_count,
+        total_count=total_count,
+        top_issues=top_issues,
+        anomalies=anomalies or [],
     )
 
 
@@ -152,11 +303,13 @@ def _build_prose(
     warning_count: int,
     top_issues: list[TopIssue],
     warning_groups: dict[str, int],
+    anomalies: list[LogAnomaly],
+    now: datetime,
 ) -> str:
     """Compose a natural-language summary from structured data."""
     if total_count == 0:
         subject = f"{process} had" if process else "There were"
-        return f"{subject} no log entries in the last {window}."
+        return f"{subject} no log entries in the last {window}." + _anomaly_prose(anomalies, now)
 
     # Opening sentence
     subject = process or "The system"
@@ -189,4 +342,20 @@ def _build_prose(
         descriptions = [f"{pat} ({cnt}x)" for pat, cnt in top_warnings]
         parts.append(f"{warning_count} warning(s): {', '.join(descriptions)}.")
 
-    return " ".join(parts)
+    return " ".join(parts) + _anomaly_prose(anomalies, now)
+
+
+def _anomaly_prose(anomalies: list[LogAnomaly], now: datetime) -> str:
+    """A sentence on the top anomalies (with a leading space), or ''."""
+    if not anomalies:
+        return ""
+    descriptions = []
+    for a in anomalies[:3]:
+        ago = max(0, int((now - a.started_at).total_seconds()))
+        if a.kind == "spike":
+            descriptions.append(
+                f"{a.template} from {a.process} started {ago}s ago at {a.ratio:g}x its baseline"
+            )
+        else:
+            descriptions.append(f"new: {a.template} from {a.process}, first seen {ago}s ago")
+    return f" Anomalies: {'; '.join(descriptions)}."
@@ -0,0 +1,177 @@
+"""Online log template mining (Drain).
+
+extract_pattern's regexes only strip numbers, UUIDs, hex addresses and IPs,
+so messages that differ in an identifier, a file path or a quoted value still
+produce distinct patterns. TemplateMiner learns templates from the messages
+themselves, following Drain (He et al., "Drain: An Online Log Parsing
+Approach with Fixed Depth Tree", ICWS 2017):
+
+- A message is split on whitespace. Tokens containing a digit are treated
+  as variables (<*>) up front.
+- A fixed-depth parse tree routes the message by its token count, then by
+  its first `depth` tokens, to a leaf holding the few templates of that
+  shape. Variable tokens, and new tokens once a node has `max_children`
+  children, go to a <*> child, which keeps the tree bounded.
+- The leaf's most similar template (the share of positions whose tokens are
+  equal) absorbs the message if the share is at least `similarity`; the
+  positions that differ become <*>. Otherwise the message starts a new
+  template.
+
+Each message costs O(tokens) plus one comparison per template in its leaf.
+The store's ingest hook stamps every entry's template_id at ingest. A
+template keeps its ID as it generalizes; IDs count up from 1 per server run
+(0 means "not mined"). Counts are cumulative since startup. Once
+`max_templates` exist, the least recently matched template is dropped.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import datetime
+
+from server.models import LogEntry
+
+WILDCARD = "<*>"
+
+
+class LogTemplate:
+    """A mined template with its occurrence stats."""
+
+    __slots__ = ("id", "tokens", "count", "first_seen", "last_seen", "examples", "leaf")
+
+    def __init__(self, template_id: int, tokens: list[str], leaf: list[LogTemplate]) -> None:
+        self.id = template_id
+        self.tokens = tokens
+        self.count = 0
+        self.first_seen: datetime | None = None
+        self.last_seen: datetime | None = None
+        self.examples: list[str] = []
+        # The parse-tree leaf list holding this template (for eviction)
+        self.leaf = leaf
+
+    @property
+    def template(self) -> str:
+        return " ".join(self.tokens)
+
+
+class _Node:
+    __slots__ = ("children", "templates")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _Node] = {}
+        self.templates: list[LogTemplate] = []
+
+
+def _mask(token: str) -> str:
+    return WILDCARD if any(c.isdigit() for c in token) else token
+
+
+class TemplateMiner:
+    """Assigns log messages to templates with a Drain parse tree.
+
+    Args:
+        depth: Leading tokens used to route a message through the tree.
+        similarity: Minimum share of equal tokens for a message to join a
+            template (0-1).
+        max_children: Children per tree node before new tokens share a <*> child.
+        max_templates: Templates kept; the least recently matched is dropped.
+        max_examples: Distinct example messages kept per template.
+    """
+
+    def __init__(
+        self,
+        depth: int = 2,
+        similarity: float = 0.5,
+        max_children: int = 100,
+        max_templates: int = 5_000,
+        max_examples: int = 3,
+    ) -> None:
+        self.depth = depth
+        self.similarity = similarity
+        self.max_children = max_children
+        self.max_templates = max_templates
+        self.max_examples = max_examples
+        self._roots: dict[int, _Node] = {}
+        # Templates by ID, least recently matched first
+        self._templates: OrderedDict[int, LogTemplate] = OrderedDict()
+        self._next_id = 1
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def get(self, template_id: int) -> LogTemplate | None:
+        return self._templates.get(template_id)
+
+    def templates(self) -> list[LogTemplate]:
+        """Every template, most frequent first."""
+        return sorted(self._templates.values(), key=lambda t: (-t.count, t.id))
+
+    def add(self, message: str) -> LogTemplate:
+        """Match a message to its template, creating or generalizing one."""
+        tokens = [_mask(token) for token in message.split()]
+        leaf = self._leaf(tokens)
+        template = self._best_match(leaf, tokens)
+        if template is None:
+            template = LogTemplate(self._next_id, tokens, leaf)
+            self._next_id += 1
+            leaf.append(template)
+            self._templates[template.id] = template
+            if len(self._templates) > self.max_templates:
+                _, oldest = self._templates.popitem(last=False)
+                oldest.leaf.remove(oldest)
+        else:
+            self._templates.move_to_end(template.id)
+            for i, token in enumerate(tokens):
+                if template.tokens[i] != token:
+                    template.tokens[i] = WILDCARD
+        if len(template.examples) < self.max_examples and message not in template.examples:
+            template.examples.append(message)
+        return template
+
+    def assign(self, entry: LogEntry) -> None:
+        """Stamp an entry with its template ID and count it (an ingest hook)."""
+        template = self.add(entry.message)
+        entry.template_id = template.id
+        template.count += entry.repeat_count
+        if template.first_seen is None or entry.timestamp < template.first_seen:
+            template.first_seen = entry.timestamp
+        if template.last_seen is None or entry.timestamp > template.last_seen:
+            template.last_seen = entry.timestamp
+
+    def _leaf(self, tokens: list[str]) -> list[LogTemplate]:
+        """Walk (and extend) the parse tree to the leaf for these tokens."""
+        node = self._roots.get(len(tokens))
+        if node is None:
+            node = self._roots[len(tokens)] = _Node()
+        for token in tokens[: self.depth]:
+            child = node.children.get(token)
+            if child is None:
+                key = token if len(node.children) < self.max_children else WILDCARD
+                child = node.children.get(key)
+                if child is None:
+                    child = node.children[key] = _Node()
+            node = child
+        return node.templates
+
+    def _best_match(self, leaf: list[LogTemplate], tokens: list[str]) -> LogTemplate | None:
+        """The most similar template in a leaf, if similar enough.
+
+        Ties go to the template with more wildcards (the more general one).
+        """
+        if not tokens:
+            return leaf[0] if leaf else None
+        best: LogTemplate | None = None
+        best_key = (-1.0, -1)
+        for template in leaf:
+            same = wildcards = 0
+            for mine, theirs in zip(template.tokens, tokens):
+                if mine == theirs:
+                    same += 1
+                elif mine == WILDCARD:
+                    wildcards += 1
+            key = (same / len(tokens), wildcards)
+            if key > best_key:
+                best, best_key = template, key
+        if best is None or best_key[0] < self.similarity:
+            return None
+        return best
@@ -4,22 +4,88 @@ All source adapters (idevicesyslog, oslog, crash watcher, etc.) inherit from thi
 Each adapter is responsible for:
 1. Spawning/connecting to its log source
 2. Parsing raw output into LogEntry objects
-3. Calling the on_entry callback for each parsed entry
+3. Calling the on_entry callback for each parsed entry (or on_batch for
+   the entries parsed from one chunk of output)
 4. Handling its own errors without crashing the server
+
+Adapters that read line-oriented subprocess output derive from
+LineSourceAdapter, implement parse_lines() and hand each chunk of lines to
+emit_lines(). Adapters whose output isn't line-oriented (the JSON `log
+stream` adapters) derive from ChunkSourceAdapter, implement parse_chunk()
+and hand each chunk read to emit_chunk() as is. With an ingest pool, those
+chunks are parsed in worker processes instead of on the event loop (see
+server/processing/ingest_pool.py).
 """
 
 from __future__ import annotations
 
 import abc
-from collections.abc import Callable, Coroutine
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Callable, Coroutine
 from datetime import datetime, timezone
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
+from server.metrics import EventRate, StageMetrics
 from server.models import LogEntry, SourceStatus
 
+if TYPE_CHECKING:
+    from server.processing.ingest_pool import IngestPool
+
 
 # Type alias for the callback that source adapters use to emit log entries
 EntryCallback = Callable[[LogEntry], Coroutine[Any, Any, None]]
+BatchCallback = Callable[[list[LogEntry]], Coroutine[Any, Any, None]]
+
+logger = logging.getLogger(__name__)
+
+# Bytes requested per read when draining a subprocess's stdout
+READ_CHUNK_SIZE = 64 * 1024
+
+# Longest line held back waiting for its newline (StreamReader's default limit)
+MAX_LINE_BYTES = 64 * 1024
+
+
+async def read_line_batches(
+    stream: asyncio.StreamReader,
+    chunk_size: int = READ_CHUNK_SIZE,
+    max_line: int = MAX_LINE_BYTES,
+) -> AsyncIterator[list[bytes]]:
+    """Yield the complete lines available in each chunk read from a stream.
+
+    A burst of output arrives as one list rather than one await per line.
+    Lines are split on newlines and returned without them; a final
+    unterminated line is yielded at EOF. An unterminated line longer than
+    max_line is yielded as is, with a warning, and the rest of it starts a
+    new line.
+    """
+    partial = b""
+    while True:
+        chunk = await stream.read(chunk_size)
+        if not chunk:
+            break
+        lines = (partial + chunk).split(b"\n")
+        partial = lines.pop()
+        if len(partial) > max_line:
+            logger.warning("Splitting a log line longer than %d bytes", max_line)
+            lines.append(partial)
+            partial = b""
+        if lines:
+            yield lines
+    if partial:
+        yield [partial]
+
+
+async def read_chunks(
+    stream: asyncio.StreamReader, chunk_size: int = READ_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """Yield each chunk read from a stream, unsplit, until EOF."""
+    while True:
+        chunk = await stream.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
 
 
 class BaseSourceAdapter(abc.ABC):
@@ -31,12 +97,19 @@ class BaseSourceAdapter(abc.ABC):
         adapter_type: str,
         device_id: str = "default",
         on_entry: EntryCallback | None = None,
+        on_batch: BatchCallback | None = None,
+        ingest_pool: IngestPool | None = None,
     ) -> None:
         self.adapter_id = adapter_id
         self.adapter_type = adapter_type
         self.device_id = device_id
         self.on_entry = on_entry
+        self.on_batch = on_batch
+        self.ingest_pool = ingest_pool
         self.entries_captured: int = 0
+        self.capture_rate = EventRate()
+        self.lines_read: int = 0
+        self.parse_metrics = StageMetrics("parse")
         self.started_at: datetime | None = None
         self._running: bool = False
         self._error: str | None = None
@@ -65,9 +138,33 @@ class BaseSourceAdapter(abc.ABC):
     async def emit(self, entry: LogEntry) -> None:
         """Emit a parsed log entry to the processing pipeline."""
         self.entries_captured += 1
+        self.capture_rate.add()
         if self.on_entry is not None:
             await self.on_entry(entry)
 
+    async def emit_many(self, entries: list[LogEntry]) -> None:
+        """Emit a batch of parsed entries, in order, to the processing pipeline.
+
+        Uses on_batch when set, otherwise on_entry for each entry.
+        """
+        if not entries:
+            return
+        self.entries_captured += len(entries)
+        self.capture_rate.add(len(entries))
+        if self.on_batch is not None:
+            await self.on_batch(entries)
+        elif self.on_entry is not None:
+            for entry in entries:
+                await self.on_entry(entry)
+
+    def parser_args(self) -> dict[str, Any]:
+        """Constructor arguments for a parse-only copy of this adapter.
+
+        Ingest workers build one per adapter to run parse_lines() or
+        parse_chunk().
+        """
+        return {"device_id": self.device_id}
+
     def status(self) -> SourceStatus:
         """Return the current status of this adapter."""
         if self._error:
@@ -83,6 +180,9 @@ class BaseSourceAdapter(abc.ABC):
             status=status_str,
             device_id=self.device_id,
             entries_captured=self.entries_captured,
+            entries_per_second=self.capture_rate.per_second(),
+            lines_read=self.lines_read,
+            parse=self.parse_metrics.stats() if self.parse_metrics.entries_in else None,
             started_at=self.started_at,
             error=self._error,
         )
@@ -90,3 +190,55 @@ class BaseSourceAdapter(abc.ABC):
     @staticmethod
     def _now() -> datetime:
         return datetime.now(timezone.utc)
+
+
+class LineSourceAdapter(BaseSourceAdapter):
+    """Base class for adapters that read line-oriented subprocess output."""
+
+    @abc.abstractmethod
+    def parse_lines(self, raw_lines: list[bytes]) -> list[LogEntry]:
+        """Parse a chunk of raw output lines (without newlines) into entries.
+
+        May keep state across chunks, so must be called in stream order.
+        """
+        ...
+
+    async def emit_lines(self, raw_lines: list[bytes]) -> None:
+        """Parse a chunk of raw output lines and emit the entries.
+
+        With an ingest pool the chunk goes to a worker process, which parses
+        it; the pool emits the results to its own on_batch.
+        """
+        self.lines_read += len(raw_lines)
+        if self.ingest_pool is not None:
+            await self.ingest_pool.feed(self, raw_lines)
+            return
+        start = time.perf_counter()
+        entries = self.parse_lines(raw_lines)
+        self.parse_metrics.record(len(raw_lines), len(entries), time.perf_counter() - start)
+        await self.emit_many(entries)
+
+
+class ChunkSourceAdapter(BaseSourceAdapter):
+    """Base class for adapters whose output isn't line-oriented."""
+
+    @abc.abstractmethod
+    def parse_chunk(self, chunk: bytes) -> list[LogEntry]:
+        """Parse a chunk of raw output, cut anywhere, into entries.
+
+        Keeps whatever the chunk ends with for the next one, so must be
+        called in stream order.
+        """
+        ...
+
+    async def emit_chunk(self, chunk: bytes) -> None:
+        """Parse a chunk of raw output and emit the entries, like emit_lines()."""
+        lines = chunk.count(b"\n")
+        self.lines_read += lines
+        if self.ingest_pool is not None:
+            await self.ingest_pool.feed(self, chunk)
+            return
+        start = time.perf_counter()
+        entries = self.parse_chunk(chunk)
+        self.parse_metrics.record(lines, len(entries), time.perf_counter() - start)
+        await self.emit_many(entries)
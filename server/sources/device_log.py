@@ -22,10 +22,14 @@ import logging
 import re
 import uuid
 from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any
 
 from server.device.tunneld import find_pymobiledevice3_binary, resolve_tunnel_udid
 from server.models import LogEntry, LogLevel, LogSource
-from server.sources import BaseSourceAdapter, EntryCallback
+from server.sources import BatchCallback, EntryCallback, LineSourceAdapter, read_line_batches
+
+if TYPE_CHECKING:
+    from server.processing.ingest_pool import IngestPool
 
 logger = logging.getLogger(__name__)
 
@@ -52,7 +56,7 @@ PMD3_LEVEL_MAP: dict[str, LogLevel] = {
 }
 
 
-class PhysicalDeviceLogAdapter(BaseSourceAdapter):
+class PhysicalDeviceLogAdapter(LineSourceAdapter):
     """Captures physical device logs via `pymobiledevice3 syslog live`."""
 
     def __init__(
@@ -62,12 +66,16 @@ class PhysicalDeviceLogAdapter(BaseSourceAdapter):
         on_entry: EntryCallback | None = None,
         process_filter: str | None = None,
         match_filter: str | None = None,
+        on_batch: BatchCallback | None = None,
+        ingest_pool: IngestPool | None = None,
     ) -> None:
         super().__init__(
             adapter_id=f"devlog-{udid[:8]}",
             adapter_type="pymobiledevice3_syslog",
             device_id=device_id,
             on_entry=on_entry,
+            on_batch=on_batch,
+            ingest_pool=ingest_pool,
         )
         self.udid = udid
         self.process_filter = process_filter
@@ -156,6 +164,9 @@ class PhysicalDeviceLogAdapter(BaseSourceAdapter):
             except asyncio.CancelledError:
                 pass
 
+        if self.ingest_pool is not None:
+            await self.ingest_pool.release(self)
+
         self._process = None
         self._read_task = None
         logger.info("PhysicalDeviceLog adapter stopped (udid=%s)", self.udid[:8])
@@ -166,21 +177,10 @@ class PhysicalDeviceLogAdapter(BaseSourceAdapter):
         assert self._process.stdout is not None
 
         try:
-            async for raw_line in self._process.stdout:
+            async for raw_lines in read_line_batches(self._process.stdout):
                 if not self._running:
                     break
-
-                line = raw_line.decode("utf-8", errors="replace").rstrip()
-                if not line:
-                    continue
-
-                # Skip the "[connected:...]" header line
-                if line.startswith("[connected:"):
-                    continue
-
-                entry = self._parse_line(line)
-                if entry is not None:
-                    await self.emit(entry)
+                await self.emit_lines(raw_lines)
         except asyncio.CancelledError:
             raise
         except Exception as e:
@@ -190,6 +190,26 @@ class PhysicalDeviceLogAdapter(BaseSourceAdapter):
         finally:
             self._running = False
 
+    def parser_args(self) -> dict[str, Any]:
+        return {"udid": self.udid, "device_id": self.device_id}
+
+    def parse_lines(self, raw_lines: list[bytes]) -> list[LogEntry]:
+        """Parse a chunk of pymobiledevice3 syslog output lines."""
+        entries: list[LogEntry] = []
+        for raw_line in raw_lines:
+            line = raw_line.decode("utf-8", errors="replace").rstrip()
+            if not line:
+                continue
+
+            # Skip the "[connected:...]" header line
+            if line.startswith("[connected:"):
+                continue
+
+            entry = self._parse_line(line)
+            if entry is not None:
+                entries.append(entry)
+        return entries
+
     def _parse_line(self, line: str) -> LogEntry | None:
         """Parse a single pymobiledevice3 syslog output line into a LogEntry."""
         match = PMD3_SYSLOG_PATTERN.match(line)
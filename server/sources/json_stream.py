@@ -0,0 +1,75 @@
+"""Incremental decoder for the JSON array that `log stream --style json` writes.
+
+Host `log stream` writes one compact object per line; `simctl spawn ... log
+stream` pretty-prints each object over a dozen lines. Both wrap the objects
+in one endless array (`[{...},{...}` — the closing bracket only comes at
+exit), so neither can be parsed line by line in general.
+
+JsonStreamDecoder keeps the undecoded tail of the output in a string and
+lets json's C scanner (JSONDecoder.raw_decode) find where each object ends:
+it jumps to the next `{` with str.find, which skips the array brackets,
+separators and any preamble, and decodes from there. An object that isn't
+complete yet fails to decode with the error on the buffer's last line; the
+tail from its `{` is kept for the next chunk. An error before the last line
+means a malformed object, which is skipped.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+from typing import Any
+
+_decoder = json.JSONDecoder()
+
+
+class JsonStreamDecoder:
+    """Splits chunks of a stream of JSON objects into decoded objects.
+
+    Objects may span chunks; whatever follows the last complete object is
+    carried over to the next feed(). Bytes are decoded as UTF-8 (invalid
+    sequences replaced), also across chunk boundaries.
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop any partial object, e.g. when the stream restarts."""
+        self._buffer = ""
+        self._text = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.malformed = 0
+
+    @property
+    def pending(self) -> int:
+        """Characters held back waiting for the rest of an object."""
+        return len(self._buffer)
+
+    def feed(self, chunk: bytes) -> list[tuple[dict[str, Any], str]]:
+        """Decode the objects completed by a chunk of raw output.
+
+        Returns (object, source text) pairs in stream order. Top-level
+        values that aren't objects are skipped.
+        """
+        buffer = self._buffer + self._text.decode(chunk)
+        objects: list[tuple[dict[str, Any], str]] = []
+        pos = 0
+        while True:
+            start = buffer.find("{", pos)
+            if start < 0:
+                pos = len(buffer)
+                break
+            try:
+                obj, end = _decoder.raw_decode(buffer, start)
+            except json.JSONDecodeError as e:
+                if buffer.find("\n", e.pos) < 0:
+                    # Stopped on the last line: the object isn't complete yet
+                    pos = start
+                    break
+                self.malformed += 1
+                pos = start + 1
+                continue
+            objects.append((obj, buffer[start:end]))
+            pos = end
+        self._buffer = buffer[pos:]
+        return objects
@@ -1,7 +1,7 @@
 """Source adapter for macOS `log stream` (OSLog / Unified Logging).
 
-Spawns `log stream --style json` as a subprocess and parses JSON output
-line-by-line into structured LogEntry objects.
+Spawns `log stream --style json` as a subprocess and decodes the JSON
+objects it streams (see json_stream.py) into structured LogEntry objects.
 
 OSLog messageType mapping:
     Default → INFO, Info → INFO, Debug → DEBUG, Error → ERROR, Fault → FAULT
@@ -19,9 +19,14 @@ import logging
 import re
 import uuid
 from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any
 
 from server.models import LogEntry, LogLevel, LogSource
-from server.sources import BaseSourceAdapter, EntryCallback
+from server.sources import BatchCallback, ChunkSourceAdapter, EntryCallback, read_chunks
+from server.sources.json_stream import JsonStreamDecoder
+
+if TYPE_CHECKING:
+    from server.processing.ingest_pool import IngestPool
 
 logger = logging.getLogger(__name__)
 
@@ -67,7 +72,7 @@ def extract_process_name(image_path: str) -> str:
     return image_path.rsplit("/", 1)[-1]
 
 
-class OslogAdapter(BaseSourceAdapter):
+class OslogAdapter(ChunkSourceAdapter):
     """Captures logs from macOS `log stream --style json` subprocess."""
 
     def __init__(
@@ -76,17 +81,22 @@ class OslogAdapter(BaseSourceAdapter):
         on_entry: EntryCallback | None = None,
         subsystem_filter: str | None = None,
         process_filter: str | None = None,
+        on_batch: BatchCallback | None = None,
+        ingest_pool: IngestPool | None = None,
     ) -> None:
         super().__init__(
             adapter_id="oslog",
             adapter_type="log_stream",
             device_id=device_id,
             on_entry=on_entry,
+            on_batch=on_batch,
+            ingest_pool=ingest_pool,
         )
         self.subsystem_filter = subsystem_filter
         self.process_filter = process_filter
         self._process: asyncio.subprocess.Process | None = None
         self._read_task: asyncio.Task | None = None
+        self._decoder = JsonStreamDecoder()
 
     def _build_command(self) -> list[str]:
         """Build the log stream command with appropriate filters."""
@@ -149,27 +159,24 @@ class OslogAdapter(BaseSourceAdapter):
             except asyncio.CancelledError:
                 pass
 
+        if self.ingest_pool is not None:
+            await self.ingest_pool.release(self)
+
         self._process = None
         self._read_task = None
         logger.info("OSLog adapter stopped")
 
     async def _read_loop(self) -> None:
-        """Read lines from log stream stdout and parse JSON objects."""
+        """Read chunks of log stream stdout and parse JSON objects."""
         assert self._process is not None
         assert self._process.stdout is not None
 
+        self._decoder.reset()
         try:
-            async for raw_line in self._process.stdout:
+            async for chunk in read_chunks(self._process.stdout):
                 if not self._running:
                     break
-
-                line = raw_line.decode("utf-8", errors="replace").rstrip()
-                if not line:
-                    continue
-
-                entry = self._parse_json_line(line)
-                if entry is not None:
-                    await self.emit(entry)
+                await self.emit_chunk(chunk)
         except asyncio.CancelledError:
             raise
         except Exception as e:
@@ -179,6 +186,23 @@ class OslogAdapter(BaseSourceAdapter):
         finally:
             self._running = False
 
+    def parse_chunk(self, chunk: bytes) -> list[LogEntry]:
+        """Parse a chunk of `log stream --style json` output.
+
+        Objects are normally one per line, but the stream decoder also
+        handles pretty-printed ones and carries a partial object over to
+        the next chunk.
+        """
+        return self._parse_events(self._decoder.feed(chunk))
+
+    def _parse_events(self, decoded: list[tuple[dict[str, Any], str]]) -> list[LogEntry]:
+        entries: list[LogEntry] = []
+        for data, raw in decoded:
+            entry = self._parse_event(data, raw)
+            if entry is not None:
+                entries.append(entry)
+        return entries
+
     def _parse_json_line(self, line: str) -> LogEntry | None:
         """Parse a single JSON line from `log stream --style json` output.
 
@@ -197,7 +221,10 @@ class OslogAdapter(BaseSourceAdapter):
 
         if not isinstance(data, dict):
             return None
+        return self._parse_event(data, line)
 
+    def _parse_event(self, data: dict[str, Any], raw: str) -> LogEntry | None:
+        """Build an entry from a decoded log stream event, or None to skip it."""
         # Skip non-log events (e.g., activity events)
         event_type = data.get("eventType", "")
         if event_type and event_type != "logEvent":
@@ -231,5 +258,5 @@ class OslogAdapter(BaseSourceAdapter):
             level=level,
             message=message,
             source=LogSource.OSLOG,
-            raw=line,
+            raw=raw,
         )
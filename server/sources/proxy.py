@@ -35,7 +35,7 @@ from server.models import (
     LogSource,
 )
 from server.proxy.flow_store import FlowStore
-from server.sources import BaseSourceAdapter, EntryCallback
+from server.sources import BaseSourceAdapter, BatchCallback, EntryCallback, read_line_batches
 
 logger = logging.getLogger(__name__)
 
@@ -111,12 +111,14 @@ class ProxyAdapter(BaseSourceAdapter):
         listen_host: str = "0.0.0.0",
         listen_port: int = 9101,
         local_capture_processes: list[str] | None = None,
+        on_batch: BatchCallback | None = None,
     ) -> None:
         super().__init__(
             adapter_id="proxy",
             adapter_type="mitmproxy",
             device_id=device_id,
             on_entry=on_entry,
+            on_batch=on_batch,
         )
         self.flow_store = flow_store or FlowStore()
         self.listen_host = listen_host
@@ -452,33 +454,40 @@ class ProxyAdapter(BaseSourceAdapter):
         assert self._process.stdout is not None
 
         try:
-            async for raw_line in self._process.stdout:
+            async for raw_lines in read_line_batches(self._process.stdout):
                 if not self._running:
                     break
 
-                line = raw_line.decode("utf-8", errors="replace").rstrip()
-                if not line:
-                    continue
+                # Flow summaries from one chunk go to the pipeline together
+                entries: list[LogEntry] = []
+                for raw_line in raw_lines:
+                    line = raw_line.decode("utf-8", errors="replace").rstrip()
+                    if not line:
+                        continue
 
-                try:
-                    data = json.loads(line)
-                except json.JSONDecodeError:
-                    logger.debug("Non-JSON line from mitmdump: %s", line[:200])
-                    continue
-
-                msg_type = data.get("type")
-                if msg_type == "flow":
-                    await self._handle_flow(data)
-                elif msg_type == "intercepted":
-                    self._handle_intercepted(data)
-                elif msg_type == "released":
-                    self._handle_released(data)
-                elif msg_type == "mock_hit":
-                    await self._handle_mock_hit(data)
-                elif msg_type == "status":
-                    self._handle_status_event(data)
-                elif msg_type == "error":
-                    logger.warning("Addon error: %s", data)
+                    try:
+                        data = json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.debug("Non-JSON line from mitmdump: %s", line[:200])
+                        continue
+
+                    msg_type = data.get("type")
+                    entry = None
+                    if msg_type == "flow":
+                        entry = await self._flow_entry(data)
+                    elif msg_type == "intercepted":
+                        self._handle_intercepted(data)
+                    elif msg_type == "released":
+                        self._handle_released(data)
+                    elif msg_type == "mock_hit":
+                        entry = await self._mock_hit_entry(data)
+                    elif msg_type == "status":
+                        self._handle_status_event(data)
+                    elif msg_type == "error":
+                        logger.warning("Addon error: %s", data)
+                    if entry is not None:
+                        entries.append(entry)
+                await self.emit_many(entries)
         except asyncio.CancelledError:
             raise
         except Exception as e:
@@ -504,18 +513,24 @@ class ProxyAdapter(BaseSourceAdapter):
 
     async def _handle_flow(self, data: dict) -> None:
         """Process a flow event from the addon."""
+        entry = await self._flow_entry(data)
+        if entry is not None:
+            await self.emit(entry)
+
+    async def _flow_entry(self, data: dict) -> LogEntry | None:
+        """Store a flow event's record and return its summary log entry."""
         flow = self._parse_flow(data)
         if flow is None:
-            return
+            return None
 
         # 1. Store full flow record
         await self.flow_store.add(flow)
 
-        # 2. Emit summary log entry into the processing pipeline
+        # 2. Summary log entry for the processing pipeline
         level = _classify_level(flow)
         message = _format_summary(flow)
 
-        entry = LogEntry(
+        return LogEntry(
             id=uuid.uuid4().hex[:8],
             timestamp=flow.timestamp,
             device_id=self.device_id,
@@ -525,7 +540,6 @@ class ProxyAdapter(BaseSourceAdapter):
             message=message,
             source=LogSource.PROXY,
         )
-        await self.emit(entry)
 
     def _handle_intercepted(self, data: dict) -> None:
         """Process an intercepted flow event — store in held_flows and signal waiters."""
@@ -564,15 +578,21 @@ class ProxyAdapter(BaseSourceAdapter):
 
     async def _handle_mock_hit(self, data: dict) -> None:
         """Process a mock hit — create FlowRecord and emit log entry."""
+        entry = await self._mock_hit_entry(data)
+        if entry is not None:
+            await self.emit(entry)
+
+    async def _mock_hit_entry(self, data: dict) -> LogEntry | None:
+        """Store a mock hit's FlowRecord and return its log entry."""
         flow = self._parse_flow(data)
         if flow is None:
-            return
+            return None
 
         await self.flow_store.add(flow)
 
         req = flow.request
         status = flow.response.status_code if flow.response else "?"
-        entry = LogEntry(
+        return LogEntry(
             id=uuid.uuid4().hex[:8],
             timestamp=flow.timestamp,
             device_id=self.device_id,
@@ -582,7 +602,6 @@ class ProxyAdapter(BaseSourceAdapter):
             message=f"MOCK: {req.method} {req.path} -> {status}",
             source=LogSource.PROXY,
         )
-        await self.emit(entry)
 
     def _handle_status_event(self, data: dict) -> None:
         """Handle status events from the addon that update local state mirrors."""
@@ -14,19 +14,24 @@ import asyncio
 import json
 import logging
 import uuid
+from typing import TYPE_CHECKING, Any
 
 from server.models import LogEntry, LogLevel, LogSource
-from server.sources import BaseSourceAdapter, EntryCallback
+from server.sources import BatchCallback, ChunkSourceAdapter, EntryCallback, read_chunks
+from server.sources.json_stream import JsonStreamDecoder
 from server.sources.oslog import (
     OSLOG_LEVEL_MAP,
     extract_process_name,
     parse_oslog_timestamp,
 )
 
+if TYPE_CHECKING:
+    from server.processing.ingest_pool import IngestPool
+
 logger = logging.getLogger(__name__)
 
 
-class SimulatorLogAdapter(BaseSourceAdapter):
+class SimulatorLogAdapter(ChunkSourceAdapter):
     """Captures simulator app logs via `xcrun simctl spawn <UDID> log stream`."""
 
     def __init__(
@@ -37,12 +42,16 @@ class SimulatorLogAdapter(BaseSourceAdapter):
         process_filter: str | None = None,
         subsystem_filter: str | None = None,
         level: str = "debug",
+        on_batch: BatchCallback | None = None,
+        ingest_pool: IngestPool | None = None,
     ) -> None:
         super().__init__(
             adapter_id=f"simlog-{udid[:8]}",
             adapter_type="simctl_log_stream",
             device_id=device_id,
             on_entry=on_entry,
+            on_batch=on_batch,
+            ingest_pool=ingest_pool,
         )
         self.udid = udid
         self.process_filter = process_filter
@@ -50,6 +59,7 @@ class SimulatorLogAdapter(BaseSourceAdapter):
         self.level = level
         self._process: asyncio.subprocess.Process | None = None
         self._read_task: asyncio.Task | None = None
+        self._decoder = JsonStreamDecoder()
 
     def _build_command(self) -> list[str]:
         """Build the simctl log stream command with filters."""
@@ -116,81 +126,24 @@ class SimulatorLogAdapter(BaseSourceAdapter):
             except asyncio.CancelledError:
                 pass
 
+        if self.ingest_pool is not None:
+            await self.ingest_pool.release(self)
+
         self._process = None
         self._read_task = None
         logger.info("SimulatorLog adapter stopped (udid=%s)", self.udid[:8])
 
     async def _read_loop(self) -> None:
-        """Read lines from simctl log stream stdout and parse JSON objects.
-
-        simctl spawn's log stream outputs pretty-printed JSON in an array,
-        unlike host-side `log stream` which outputs compact single-line JSON.
-        We accumulate characters and track brace depth (outside JSON strings)
-        to detect complete objects. Handles `},{` separators correctly.
-        """
+        """Read chunks of simctl log stream stdout and parse JSON objects."""
         assert self._process is not None
         assert self._process.stdout is not None
 
-        # Character-level accumulator for pretty-printed JSON
-        obj_chars: list[str] = []
-        brace_depth = 0
-        in_string = False
-        escape_next = False
-
+        self._decoder.reset()
         try:
-            async for raw_line in self._process.stdout:
+            async for chunk in read_chunks(self._process.stdout):
                 if not self._running:
                     break
-
-                line = raw_line.decode("utf-8", errors="replace").rstrip()
-
-                for ch in line:
-                    if escape_next:
-                        escape_next = False
-                        if brace_depth > 0:
-                            obj_chars.append(ch)
-                        continue
-
-                    if ch == "\\" and in_string:
-                        escape_next = True
-                        if brace_depth > 0:
-                            obj_chars.append(ch)
-                        continue
-
-                    if ch == '"' and not escape_next:
-                        if brace_depth > 0:
-                            in_string = not in_string
-                            obj_chars.append(ch)
-                        continue
-
-                    if in_string:
-                        obj_chars.append(ch)
-                        continue
-
-                    # Outside strings — track braces
-                    if ch == "{":
-                        brace_depth += 1
-                        obj_chars.append(ch)
-                    elif ch == "}":
-                        brace_depth -= 1
-                        obj_chars.append(ch)
-                        if brace_depth == 0:
-                            # Complete JSON object
-                            raw = "".join(obj_chars)
-                            obj_chars.clear()
-                            in_string = False
-                            escape_next = False
-
-                            entry = self._parse_json_line(raw)
-                            if entry is not None:
-                                await self.emit(entry)
-                    elif brace_depth > 0:
-                        obj_chars.append(ch)
-                    # else: outside object, skip (array brackets, commas, preamble)
-
-                # Add newline to preserve multi-line structure for JSON parsing
-                if brace_depth > 0:
-                    obj_chars.append("\n")
+                await self.emit_chunk(chunk)
 
         except asyncio.CancelledError:
             raise
@@ -201,6 +154,27 @@ class SimulatorLogAdapter(BaseSourceAdapter):
         finally:
             self._running = False
 
+    def parser_args(self) -> dict[str, Any]:
+        return {"udid": self.udid, "device_id": self.device_id}
+
+    def parse_chunk(self, chunk: bytes) -> list[LogEntry]:
+        """Parse a chunk of simctl log stream output into entries.
+
+        simctl spawn's log stream outputs pretty-printed JSON in an array,
+        unlike host-side `log stream` which outputs compact single-line JSON.
+        The stream decoder finds complete objects in either form, carrying
+        a partial object over to the next chunk.
+        """
+        return self._parse_events(self._decoder.feed(chunk))
+
+    def _parse_events(self, decoded: list[tuple[dict[str, Any], str]]) -> list[LogEntry]:
+        entries: list[LogEntry] = []
+        for data, raw in decoded:
+            entry = self._parse_event(data, raw)
+            if entry is not None:
+                entries.append(entry)
+        return entries
+
     def _parse_json_line(self, line: str) -> LogEntry | None:
         """Parse a JSON object from simctl log stream output.
 
@@ -218,7 +192,10 @@ class SimulatorLogAdapter(BaseSourceAdapter):
 
         if not isinstance(data, dict):
             return None
+        return self._parse_event(data, line)
 
+    def _parse_event(self, data: dict[str, Any], raw: str) -> LogEntry | None:
+        """Build an entry from a decoded log stream event, or None to skip it."""
         event_type = data.get("eventType", "")
         if event_type and event_type != "logEvent":
             return None
@@ -250,5 +227,5 @@ class SimulatorLogAdapter(BaseSourceAdapter):
             level=level,
             message=message,
             source=LogSource.SIMULATOR,
-            raw=line,
+            raw=raw,
         )
@@ -19,9 +19,13 @@ import logging
 import re
 import uuid
 from datetime import datetime, timezone
+from typing import TYPE_CHECKING
 
 from server.models import LogEntry, LogLevel, LogSource
-from server.sources import BaseSourceAdapter, EntryCallback
+from server.sources import BatchCallback, EntryCallback, LineSourceAdapter, read_line_batches
+
+if TYPE_CHECKING:
+    from server.processing.ingest_pool import IngestPool
 
 logger = logging.getLogger(__name__)
 
@@ -56,7 +60,7 @@ LEVEL_MAP: dict[str, LogLevel] = {
 }
 
 
-class SyslogAdapter(BaseSourceAdapter):
+class SyslogAdapter(LineSourceAdapter):
     """Captures logs from idevicesyslog subprocess."""
 
     def __init__(
@@ -65,12 +69,16 @@ class SyslogAdapter(BaseSourceAdapter):
         on_entry: EntryCallback | None = None,
         process_filter: str | None = None,
         udid: str | None = None,
+        on_batch: BatchCallback | None = None,
+        ingest_pool: IngestPool | None = None,
     ) -> None:
         super().__init__(
             adapter_id="syslog",
             adapter_type="idevicesyslog",
             device_id=device_id,
             on_entry=on_entry,
+            on_batch=on_batch,
+            ingest_pool=ingest_pool,
         )
         self.process_filter = process_filter
         self.udid = udid
@@ -127,6 +135,9 @@ class SyslogAdapter(BaseSourceAdapter):
             except asyncio.CancelledError:
                 pass
 
+        if self.ingest_pool is not None:
+            await self.ingest_pool.release(self)
+
         self._process = None
         self._read_task = None
         logger.info("idevicesyslog adapter stopped")
@@ -137,17 +148,10 @@ class SyslogAdapter(BaseSourceAdapter):
         assert self._process.stdout is not None
 
         try:
-            async for raw_line in self._process.stdout:
+            async for raw_lines in read_line_batches(self._process.stdout):
                 if not self._running:
                     break
-
-                line = raw_line.decode("utf-8", errors="replace").rstrip()
-                if not line:
-                    continue
-
-                entry = self._parse_line(line)
-                if entry is not None:
-                    await self.emit(entry)
+                await self.emit_lines(raw_lines)
         except asyncio.CancelledError:
             raise
         except Exception as e:
@@ -157,6 +161,19 @@ class SyslogAdapter(BaseSourceAdapter):
         finally:
             self._running = False
 
+    def parse_lines(self, raw_lines: list[bytes]) -> list[LogEntry]:
+        """Parse a chunk of idevicesyslog output lines."""
+        entries: list[LogEntry] = []
+        for raw_line in raw_lines:
+            line = raw_line.decode("utf-8", errors="replace").rstrip()
+            if not line:
+                continue
+
+            entry = self._parse_line(line)
+            if entry is not None:
+                entries.append(entry)
+        return entries
+
     def _parse_line(self, line: str) -> LogEntry | None:
         """Parse a single idevicesyslog output line into a LogEntry."""
         match = SYSLOG_PATTERN.match(line)
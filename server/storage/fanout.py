@@ -0,0 +1,200 @@
+"""Shared fan-out of newly stored log entries to SSE subscribers.
+
+Log stores call FanoutHub.publish for every entry they store. Subscribers with
+identical stream filters share one filter group, so each distinct filter is
+evaluated once per entry no matter how many agents are tailing the same
+device. Matching entries are queued per subscriber; the SSE handler drains
+whatever has accumulated as a batch, so a busy stream sends fewer, larger
+events instead of one event per entry.
+
+A subscriber that falls behind is never disconnected. Once its queue is full,
+new entries are dropped for that subscriber only and counted; the handler
+reports the count to the client as a `dropped` event and totals are
+available from stats().
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+from collections import deque
+from collections.abc import Callable
+from datetime import datetime, timezone
+
+from server.models import (
+    LogEntry,
+    LogLevel,
+    LogStreamParams,
+    StreamHubStats,
+    StreamSubscriberStats,
+)
+from server.storage.query_lang import compile_query
+
+
+def compile_stream_filter(params: LogStreamParams) -> Callable[[LogEntry], bool]:
+    """Build a predicate that applies stream filter params to an entry."""
+    min_levels: set[LogLevel] | None = None
+    if params.level is not None:
+        min_levels = set(LogLevel.at_least(params.level))
+    match_lower = params.match.lower() if params.match else None
+    exclude_lower = params.exclude.lower() if params.exclude else None
+    query = compile_query(params.q) if params.q else None
+
+    def matches(entry: LogEntry) -> bool:
+        if params.device_id and entry.device_id != params.device_id:
+            return False
+        if min_levels and entry.level not in min_levels:
+            return False
+        if params.process and entry.process != params.process:
+            return False
+        if params.subsystem and entry.subsystem != params.subsystem:
+            return False
+        if params.category and entry.category != params.category:
+            return False
+        if params.source and entry.source != params.source:
+            return False
+        if match_lower or exclude_lower:
+            message = entry.message.lower()
+            if match_lower and match_lower not in message:
+                return False
+            if exclude_lower and exclude_lower in message:
+                return False
+        if query and not query.matches(entry):
+            return False
+        return True
+
+    return matches
+
+
+class StreamSubscriber:
+    """One SSE connection's queue of matching entries."""
+
+    def __init__(self, subscriber_id: int, params: LogStreamParams, max_pending: int) -> None:
+        self.id = subscriber_id
+        self.params = params
+        self.connected_at = datetime.now(timezone.utc)
+        self.delivered = 0
+        self.dropped = 0
+        self._max_pending = max_pending
+        self._pending: deque[LogEntry] = deque()
+        self._unreported_drops = 0
+        self._wakeup = asyncio.Event()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def push(self, entry: LogEntry) -> None:
+        """Queue an entry, or count it as dropped if the queue is full."""
+        if len(self._pending) >= self._max_pending:
+            self.dropped += 1
+            self._unreported_drops += 1
+        else:
+            self._pending.append(entry)
+        self._wakeup.set()
+
+    async def next_batch(self, max_batch: int, timeout: float) -> tuple[list[LogEntry], int]:
+        """Wait for entries and return (batch, drops since the last call).
+
+        Returns ([], 0) if nothing arrives within the timeout.
+        """
+        if not self._pending and not self._unreported_drops:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                return [], 0
+
+        count = min(len(self._pending), max_batch)
+        batch = [self._pending.popleft() for _ in range(count)]
+        drops = self._unreported_drops
+        self._unreported_drops = 0
+        self.delivered += count
+        return batch, drops
+
+    def stats(self) -> StreamSubscriberStats:
+        return StreamSubscriberStats(
+            id=self.id,
+            filter=self.params.model_dump(mode="json", exclude_none=True),
+            connected_at=self.connected_at,
+            delivered=self.delivered,
+            dropped=self.dropped,
+            pending=len(self._pending),
+        )
+
+
+class _FilterGroup:
+    """Subscribers sharing one filter, evaluated once per entry."""
+
+    def __init__(self, params: LogStreamParams) -> None:
+        self.matches = compile_stream_filter(params)
+        self.subscribers: list[StreamSubscriber] = []
+
+
+class FanoutHub:
+    """Distributes stored log entries to SSE subscribers grouped by filter.
+
+    Args:
+        max_pending: Entries queued per subscriber before new ones are dropped.
+        max_batch: Most entries handed to a subscriber in one batch.
+    """
+
+    def __init__(self, max_pending: int = 1000, max_batch: int = 100) -> None:
+        self.max_pending = max_pending
+        self.max_batch = max_batch
+        self._groups: dict[str, _FilterGroup] = {}
+        self._ids = itertools.count(1)
+        self._published = 0
+        # Drops by subscribers that have since disconnected
+        self._closed_dropped = 0
+
+    @staticmethod
+    def _key(params: LogStreamParams) -> str:
+        return params.model_dump_json(exclude_none=True)
+
+    def subscribe(self, params: LogStreamParams) -> StreamSubscriber:
+        """Register a subscriber. Caller must call unsubscribe() when done."""
+        key = self._key(params)
+        group = self._groups.get(key)
+        if group is None:
+            self._groups[key] = group = _FilterGroup(params)
+        subscriber = StreamSubscriber(next(self._ids), params, self.max_pending)
+        group.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: StreamSubscriber) -> None:
+        key = self._key(subscriber.params)
+        group = self._groups.get(key)
+        if group is None:
+            return
+        try:
+            group.subscribers.remove(subscriber)
+        except ValueError:
+            return
+        self._closed_dropped += subscriber.dropped
+        if not group.subscribers:
+            del self._groups[key]
+
+    def publish(self, entry: LogEntry) -> None:
+        """Deliver a newly stored entry to every subscriber whose filter matches."""
+        self._published += 1
+        for group in self._groups.values():
+            if group.matches(entry):
+                for subscriber in group.subscribers:
+                    subscriber.push(entry)
+
+    @property
+    def dropped_total(self) -> int:
+        """Drops since startup, across connected and disconnected subscribers."""
+        return self._closed_dropped + sum(
+            s.dropped for g in self._groups.values() for s in g.subscribers
+        )
+
+    def stats(self) -> StreamHubStats:
+        subscribers = [s for g in self._groups.values() for s in g.subscribers]
+        return StreamHubStats(
+            published=self._published,
+            filter_groups=len(self._groups),
+            subscribers=[s.stats() for s in subscribers],
+            dropped=sum(s.dropped for s in subscribers),
+        )
@@ -0,0 +1,175 @@
+"""Lazy k-way merge of query results across log stores.
+
+The API merges the device buffer and the server buffer into one timeline.
+Rather than collecting every match from both and sorting, each store returns
+a LogScan: a match count plus a stream of (timestamp, handle) keys in
+timestamp order. merge_scans heap-merges the key streams, stops once it has
+offset+limit keys, and only then materializes the entries for that page.
+
+Stores keep entries in arrival order, which is usually but not always
+timestamp order (adapters' clocks differ, and batches interleave). A
+RingBuffer streams its keys lazily while its live entries are in timestamp
+order and sorts them (nearly sorted, so close to linear) otherwise; other
+stores sort their keys outright. Pages are therefore globally sorted by
+timestamp, ties in store order, as a full sort would give.
+
+Bulk exports are merged by sequence number instead (merge_exports), so an
+export can be resumed from the last seq it delivered.
+"""
+
+from __future__ import annotations
+
+import abc
+import heapq
+import itertools
+from collections import deque
+from collections.abc import AsyncIterator, Iterable, Iterator
+from datetime import datetime, timedelta, timezone
+from operator import itemgetter
+from typing import Any
+
+from server.models import LogEntry
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def epoch_ns(ts: datetime) -> int:
+    """Convert a datetime to integer nanoseconds since the epoch (naive = UTC)."""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return (ts - _EPOCH) // timedelta(microseconds=1) * 1000
+
+
+class LogScan(abc.ABC):
+    """Matches from one log store, produced lazily in store order.
+
+    Keys must be consumed without awaiting in between, so the store can't
+    change underneath the scan: in-memory stores build their scans
+    synchronously, and callers merge them before yielding to the event loop.
+    """
+
+    def __init__(self, total: int) -> None:
+        self.total = total
+
+    @abc.abstractmethod
+    def keys(self) -> Iterator[tuple[int, Any]]:
+        """Yield (timestamp_ns, handle) for each match, by timestamp then store order."""
+
+    @abc.abstractmethod
+    def materialize(self, handles: list[Any], encode: bool = False) -> list[LogEntry]:
+        """Return the entries for handles produced by keys(), in order."""
+
+
+class ListScan(LogScan):
+    """A scan over entries that are already materialized."""
+
+    def __init__(self, entries: list[LogEntry], total: int | None = None) -> None:
+        super().__init__(len(entries) if total is None else total)
+        self._entries = entries
+
+    def keys(self) -> Iterator[tuple[int, Any]]:
+        keys = [(epoch_ns(entry.timestamp), i) for i, entry in enumerate(self._entries)]
+        keys.sort(key=itemgetter(0))
+        return iter(keys)
+
+    def materialize(self, handles: list[Any], encode: bool = False) -> list[LogEntry]:
+        return [self._entries[i] for i in handles]
+
+
+def _tagged(index: int, keys: Iterable[tuple[int, Any]]) -> Iterator[tuple[int, int, Any]]:
+    for ts, handle in keys:
+        yield ts, index, handle
+
+
+class MergedScan(LogScan):
+    """Several scans presented as one, merged by timestamp.
+
+    For stores made of several buffers (see partitioned.py); handles are
+    (scan index, handle) pairs.
+    """
+
+    def __init__(self, scans: list[LogScan]) -> None:
+        super().__init__(sum(scan.total for scan in scans))
+        self._scans = scans
+
+    def keys(self) -> Iterator[tuple[int, Any]]:
+        merged = heapq.merge(
+            *(_tagged(i, scan.keys()) for i, scan in enumerate(self._scans)), key=itemgetter(0)
+        )
+        for ts, index, handle in merged:
+            yield ts, (index, handle)
+
+    def materialize(self, handles: list[Any], encode: bool = False) -> list[LogEntry]:
+        grouped: list[list[Any]] = [[] for _ in self._scans]
+        for index, handle in handles:
+            grouped[index].append(handle)
+        materialized = [
+            iter(scan.materialize(h, encode=encode)) if h else iter(())
+            for scan, h in zip(self._scans, grouped)
+        ]
+        return [next(materialized[index]) for index, _ in handles]
+
+
+def merge_scans(
+    scans: list[LogScan],
+    offset: int = 0,
+    limit: int | None = None,
+    encode: bool = False,
+) -> list[LogEntry]:
+    """Merge scans into one timestamp-ordered page of entries.
+
+    Args:
+        scans: One scan per store. Ties keep store order, then scan order.
+        offset: Merged matches to skip.
+        limit: Maximum entries to return (None = all remaining).
+        encode: Cache each returned entry's JSON (for entries headed straight
+            into a response).
+    """
+    stop = None if limit is None else offset + limit
+    if len(scans) == 1:
+        merged: Iterable[tuple[int, int, Any]] = _tagged(0, scans[0].keys())
+    else:
+        merged = heapq.merge(
+            *(_tagged(i, scan.keys()) for i, scan in enumerate(scans)), key=itemgetter(0)
+        )
+    page = list(itertools.islice(merged, offset, stop))
+
+    # Materialize per store, then restore merged order
+    handles: list[list[Any]] = [[] for _ in scans]
+    for _, index, handle in page:
+        handles[index].append(handle)
+    materialized = [
+        iter(scan.materialize(h, encode=encode)) if h else iter(())
+        for scan, h in zip(scans, handles)
+    ]
+    return [next(materialized[index]) for _, index, _ in page]
+
+
+async def merge_exports(
+    exports: list[AsyncIterator[list[LogEntry]]], batch_size: int = 1000,
+) -> AsyncIterator[list[LogEntry]]:
+    """Merge per-store export batches (each in seq order) into seq order.
+
+    Yields batches of at most batch_size entries; holds at most one pending
+    batch per store.
+    """
+    pending: list[deque[LogEntry]] = [deque() for _ in exports]
+
+    async def fill(i: int) -> bool:
+        while not pending[i]:
+            batch = await anext(exports[i], None)
+            if batch is None:
+                return False
+            pending[i].extend(batch)
+        return True
+
+    active = [i for i in range(len(exports)) if await fill(i)]
+    while active:
+        out: list[LogEntry] = []
+        # Emit in seq order until a store needs its next batch
+        while len(out) < batch_size and all(pending[i] for i in active):
+            i = min(active, key=lambda i: pending[i][0].seq)
+            out.append(pending[i].popleft())
+        if out:
+            yield out
+        active = [i for i in active if await fill(i)]
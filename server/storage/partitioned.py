@@ -0,0 +1,278 @@
+"""In-memory log store partitioned by device.
+
+Simulators, physical devices, syslog and proxy summaries all log into the same
+store, so with a single ring buffer one chatty simulator evicts every other
+device's history. PartitionedLogStore keeps one RingBuffer per device_id and
+shares capacity between them:
+
+- Every device is guaranteed its newest `quota` entries.
+- The rest of `max_size` is a shared overflow pool. A device may grow past
+  its quota while the store has room.
+- When the store is full, a device at or over its quota recycles its own
+  oldest entry. A device under its quota reclaims a slot from whichever
+  device is furthest over its quota.
+
+The store's capacity is max_size, or quota × devices if that is larger, so
+the quota holds however many devices connect. The optional byte budget is
+enforced the same way, evicting from the device furthest over its quota; it
+covers each partition's allocated column slots as well as its entries.
+
+Queries with a device_id (from params or a `q` device term) go straight to
+that device's buffer. Other queries merge the per-device results lazily:
+scans by timestamp (MergedScan), and exports and cursor reads by sequence
+number, so the merged timeline matches a single buffer's.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from datetime import datetime
+from operator import attrgetter
+
+from server.metrics import EventRate, StageMetrics
+from server.models import LogEntry, LogQueryParams
+from server.storage.merge import ListScan, LogScan, MergedScan, merge_exports, merge_scans
+from server.storage.query_lang import resolve_query
+from server.storage.ring_buffer import RingBuffer
+
+_seq_key = attrgetter("seq")
+
+
+class PartitionedLogStore:
+    """Per-device ring buffers behind the RingBuffer interface.
+
+    Args:
+        max_size: Total entries held across devices (grows to quota × devices
+            when that is larger).
+        quota: Entries guaranteed to each device.
+        max_bytes: Optional memory budget across all devices.
+        keep_raw: Store each entry's `raw` line (see RingBuffer).
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10_000,
+        quota: int = 2_000,
+        max_bytes: int | None = None,
+        keep_raw: bool = True,
+    ) -> None:
+        self._max_size = max_size
+        self._quota = quota
+        self._max_bytes = max_bytes
+        self._keep_raw = keep_raw
+        self._partitions: dict[str, RingBuffer] = {}
+        # Serializes appends (and the evictions they cause across partitions)
+        self._lock = asyncio.Lock()
+        self._subscribers: list[asyncio.Queue[LogEntry]] = []
+        self._ingest_hooks: list[Callable[[LogEntry], None]] = []
+        self._listeners: list[Callable[[LogEntry], None]] = []
+        self._evict_listeners: list[Callable[[LogEntry], None]] = []
+        # Appends (storing plus listeners) and evictions, for GET /logs/metrics
+        self.metrics = StageMetrics("store")
+        self.evictions = EventRate()
+
+    @property
+    def size(self) -> int:
+        return sum(part.size for part in self._partitions.values())
+
+    @property
+    def max_size(self) -> int:
+        return max(self._max_size, self._quota * len(self._partitions))
+
+    @property
+    def quota(self) -> int:
+        return self._quota
+
+    @property
+    def max_bytes(self) -> int | None:
+        return self._max_bytes
+
+    @property
+    def nbytes(self) -> int:
+        """Estimated memory held by stored entries."""
+        return sum(part.nbytes for part in self._partitions.values())
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the newest entry (0 if empty)."""
+        return max((part.last_seq for part in self._partitions.values()), default=0)
+
+    def partition_sizes(self) -> dict[str, int]:
+        """Number of entries held for each device."""
+        return {device_id: part.size for device_id, part in self._partitions.items()}
+
+    async def append(self, entry: LogEntry) -> None:
+        """Add an entry to its device's partition and notify subscribers."""
+        start = time.perf_counter()
+        async with self._lock:
+            await self._store(entry)
+        self._notify(entry)
+        self.metrics.record(1, 1, time.perf_counter() - start)
+
+    async def append_many(self, entries: list[LogEntry]) -> None:
+        """Add a batch of entries in order, then notify subscribers."""
+        if not entries:
+            return
+        start = time.perf_counter()
+        async with self._lock:
+            for entry in entries:
+                await self._store(entry)
+        for entry in entries:
+            self._notify(entry)
+        self.metrics.record(len(entries), len(entries), time.perf_counter() - start)
+
+    async def _store(self, entry: LogEntry) -> None:
+        for hook in self._ingest_hooks:
+            hook(entry)
+        part = self._partitions.get(entry.device_id)
+        if part is None:
+            # A lone device can use the whole store, so cap each partition at
+            # it; columns grow with the entries held, and the shared capacity
+            # check below keeps the total in bounds.
+            part = self._partitions[entry.device_id] = RingBuffer(
+                max_size=self._max_size, keep_raw=self._keep_raw,
+            )
+            part.add_evict_listener(self._evicted)
+        if self.size >= self.max_size:
+            await self._victim(part).evict_oldest()
+        await part.append(entry)
+        if self._max_bytes is not None:
+            while self.size > 1 and self.nbytes > self._max_bytes:
+                await self._victim(None).evict_oldest()
+
+    def _victim(self, part: RingBuffer | None) -> RingBuffer:
+        """Pick the partition that gives up its oldest entry to make room for part."""
+        if part is not None and part.size >= self._quota:
+            return part
+        return max(self._partitions.values(), key=lambda p: p.size - self._quota)
+
+    def _evicted(self, entry: LogEntry) -> None:
+        self.evictions.add()
+        for listener in self._evict_listeners:
+            listener(entry)
+
+    def _notify(self, entry: LogEntry) -> None:
+        for listener in self._listeners:
+            listener(entry)
+
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(entry)
+            except asyncio.QueueFull:
+                # Slow subscriber — drop the entry for them but keep the subscription
+                pass
+
+    def _route(self, params: LogQueryParams) -> list[RingBuffer]:
+        """The partitions that can hold matches for params."""
+        device_id = resolve_query(params)[0].device_id
+        if device_id:
+            part = self._partitions.get(device_id)
+            return [part] if part is not None else []
+        return list(self._partitions.values())
+
+    async def query(self, params: LogQueryParams) -> tuple[list[LogEntry], int]:
+        """Query with filters. Returns (entries, total_matching)."""
+        parts = self._route(params)
+        if len(parts) == 1:
+            return await parts[0].query(params)
+        scan = self.scan(params)
+        page = merge_scans([scan], params.offset, params.limit, encode=True)
+        return page, scan.total
+
+    async def filter_entries(self, params: LogQueryParams) -> list[LogEntry]:
+        """Apply query filters and return ALL matching entries in seq order."""
+        parts = self._route(params)
+        results = [await part.filter_entries(params) for part in parts]
+        return results[0] if len(results) == 1 else list(heapq.merge(*results, key=_seq_key))
+
+    def scan(self, params: LogQueryParams, limit: int | None = None) -> LogScan:
+        """Count matches and return a lazy scan over them for merge_scans.
+
+        Synchronous, like RingBuffer.scan.
+        """
+        scans = [part.scan(params, limit) for part in self._route(params)]
+        if not scans:
+            return ListScan([])
+        return scans[0] if len(scans) == 1 else MergedScan(scans)
+
+    async def export(
+        self, params: LogQueryParams, batch_size: int = 1000, end_seq: int | None = None,
+    ) -> AsyncIterator[list[LogEntry]]:
+        """Yield matching entries in seq order, up to batch_size at a time.
+
+        Covers entries up to end_seq (default: the newest entry when it starts).
+        """
+        if end_seq is None:
+            end_seq = self.last_seq
+        exports = [
+            part.export(params, batch_size=batch_size, end_seq=end_seq)
+            for part in self._route(params)
+        ]
+        async for batch in merge_exports(exports, batch_size=batch_size):
+            yield batch
+
+    async def _merged(
+        self, fetch: Callable[[RingBuffer], Awaitable[list[LogEntry]]],
+    ) -> list[LogEntry]:
+        """Run fetch on every partition and merge the results by seq."""
+        results = [await fetch(part) for part in list(self._partitions.values())]
+        return list(heapq.merge(*results, key=_seq_key))
+
+    async def get_since(self, since: datetime) -> list[LogEntry]:
+        """Get all entries at or after a given timestamp."""
+        return await self._merged(lambda part: part.get_since(since))
+
+    async def get_after(self, after: datetime) -> list[LogEntry]:
+        """Get all entries strictly after a given timestamp (for cursor deltas)."""
+        return await self._merged(lambda part: part.get_after(after))
+
+    async def get_after_seq(self, seq: int) -> list[LogEntry]:
+        """Get all entries with a sequence number greater than seq."""
+        return await self._merged(lambda part: part.get_after_seq(seq))
+
+    async def get_recent(self, count: int = 100) -> list[LogEntry]:
+        """Get the N most recent entries."""
+        merged = await self._merged(lambda part: part.get_recent(count))
+        return merged[-count:] if count else []
+
+    def add_ingest_hook(self, hook: Callable[[LogEntry], None]) -> None:
+        """Call hook(entry) synchronously before each entry is stored."""
+        self._ingest_hooks.append(hook)
+
+    def add_listener(self, listener: Callable[[LogEntry], None]) -> None:
+        """Call listener(entry) synchronously for every stored entry."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[LogEntry], None]) -> None:
+        try:
+            self._listeners.remove(listener)
+        except ValueError:
+            pass
+
+    def add_evict_listener(self, listener: Callable[[LogEntry], None]) -> None:
+        """Call listener(entry) for every entry evicted from any partition."""
+        self._evict_listeners.append(listener)
+
+    def subscribe(self) -> asyncio.Queue[LogEntry]:
+        """Create a subscription queue that receives new entries as they arrive.
+
+        Caller must call unsubscribe() when done.
+        """
+        queue: asyncio.Queue[LogEntry] = asyncio.Queue(maxsize=1000)
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue[LogEntry]) -> None:
+        """Remove a subscription queue."""
+        try:
+            self._subscribers.remove(queue)
+        except ValueError:
+            pass
+
+    async def clear(self) -> None:
+        """Clear all entries and drop every partition."""
+        async with self._lock:
+            self._partitions.clear()
@@ -0,0 +1,420 @@
+"""Log query language.
+
+A small filter language accepted as the `q` parameter of the log endpoints:
+
+    level>=error AND process:MyApp AND message~/timeout \\d+/
+    (process:MyApp OR process:MyAppExtension) NOT message:"heartbeat"
+
+Terms are `field op value`; a bare word or quoted string matches the message.
+Terms next to each other are ANDed; AND, OR, NOT (any case) and parentheses
+combine them, with NOT binding tightest and OR loosest.
+
+    Field                                      Operators
+    level                                      : = != > >= < <=  (by severity)
+    pid, template_id (or template)             : = != > >= < <=
+    process, subsystem, category, source,      : = (exact)  != (not equal)
+    device_id (or device), noise               ~ (regex search)
+    message (or msg)                           : (case-insensitive substring)
+                                               = (exact)  != (not equal)  ~ (regex)
+
+Values are bare words, "quoted strings" (backslash escapes), or /regexes/
+with an optional `i` flag for case-insensitive matching.
+
+A query is parsed and compiled once (compile_query caches by text). Stores
+push its top-level AND terms down into the matching LogQueryParams fields
+(see resolve_query) so indexes narrow the scan, then check the whole query
+per candidate: RingBuffer against its columns via predicate(), SQLite as a
+WHERE clause via to_sql(), and the stream hub against entries via matches().
+"""
+
+from __future__ import annotations
+
+import functools
+import re
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from server.models import LogEntry, LogLevel, LogQueryParams, LogSource, NoiseAction
+
+LEVEL_RANK: dict[LogLevel, int] = {lvl: i for i, lvl in enumerate(LogLevel)}
+
+_FIELD_ALIASES: dict[str, str] = {
+    "level": "level",
+    "pid": "pid",
+    "process": "process",
+    "subsystem": "subsystem",
+    "category": "category",
+    "source": "source",
+    "device_id": "device_id",
+    "device": "device_id",
+    "message": "message",
+    "msg": "message",
+    "template_id": "template_id",
+    "template": "template_id",
+    "noise": "noise",
+}
+_ORDERED_FIELDS = {"level", "pid", "template_id"}
+_ORDERED_OPS = {":", "=", "!=", ">", ">=", "<", "<="}
+_STRING_OPS = {":", "=", "!=", "~"}
+
+_TOKEN = re.compile(
+    r"""\s*(?:
+        (?P<lparen>\() | (?P<rparen>\)) |
+        (?P<field>[A-Za-z_]+)(?P<op>>=|<=|!=|=|:|~|>|<)
+            (?P<value>"(?:[^"\\]|\\.)*"|/(?:[^/\\]|\\.)*/i?(?=[\s()]|$)|[^\s()]+) |
+        (?P<quoted>"(?:[^"\\]|\\.)*") |
+        (?P<word>[^\s()]+)
+    )""",
+    re.VERBOSE,
+)
+
+
+class QuerySyntaxError(ValueError):
+    """Raised for a query that can't be parsed."""
+
+
+# ---------------------------------------------------------------------------
+# Syntax tree
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class Term:
+    """One comparison. Values are normalized: level → severity rank, pid →
+    int (-1 for none), regexes → pattern text with inline flags."""
+
+    field: str
+    op: str
+    value: Any
+
+
+@dataclass(frozen=True)
+class And:
+    children: tuple[Node, ...]
+
+
+@dataclass(frozen=True)
+class Or:
+    children: tuple[Node, ...]
+
+
+@dataclass(frozen=True)
+class Not:
+    child: Node
+
+
+Node = Term | And | Or | Not
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+
+
+def _unquote(text: str) -> str:
+    return re.sub(r"\\(.)", r"\1", text[1:-1])
+
+
+def _make_term(field_name: str, op: str, raw: str) -> Node:
+    field = _FIELD_ALIASES.get(field_name.lower())
+    if field is None:
+        raise QuerySyntaxError(
+            f"Unknown field '{field_name}' (expected one of: {', '.join(_FIELD_ALIASES)})"
+        )
+
+    is_regex = raw.startswith("/") and len(raw) >= 2 and raw.rstrip("i").endswith("/")
+    if raw.startswith('"'):
+        value = _unquote(raw)
+    elif is_regex:
+        value = raw[1 : raw.rindex("/")].replace("\\/", "/")
+    else:
+        value = raw
+
+    if field in _ORDERED_FIELDS:
+        if op not in _ORDERED_OPS:
+            raise QuerySyntaxError(f"Operator '{op}' is not supported for {field}")
+        op = "=" if op == ":" else op
+        if field == "level":
+            try:
+                return Term(field, op, LEVEL_RANK[LogLevel(value.lower())])
+            except ValueError:
+                levels = ", ".join(lvl.value for lvl in LogLevel)
+                raise QuerySyntaxError(f"Unknown level '{value}' (expected one of: {levels})")
+        try:
+            return Term(field, op, int(value))
+        except ValueError:
+            raise QuerySyntaxError(f"{field} must be an integer, got '{value}'")
+
+    if op not in _STRING_OPS:
+        raise QuerySyntaxError(f"Operator '{op}' is not supported for {field}")
+    if op == "~" or is_regex:
+        if is_regex and raw.endswith("i"):
+            value = "(?i)" + value
+        try:
+            re.compile(value)
+        except re.error as e:
+            raise QuerySyntaxError(f"Invalid regex for {field}: {e}")
+        if op == "!=":
+            return Not(Term(field, "~", value))
+        return Term(field, "~", value)
+    if field == "source" and value not in {s.value for s in LogSource}:
+        sources = ", ".join(s.value for s in LogSource)
+        raise QuerySyntaxError(f"Unknown source '{value}' (expected one of: {sources})")
+    if field == "noise" and value and value not in {a.value for a in NoiseAction}:
+        actions = ", ".join(a.value for a in NoiseAction if a != NoiseAction.DROP)
+        raise QuerySyntaxError(f"Unknown noise action '{value}' (expected one of: {actions})")
+    if field == "message" and op == ":":
+        return Term(field, ":", value.lower())
+    return Term(field, "=" if op == ":" else op, value)
+
+
+def _tokenize(text: str) -> list[tuple[str, Any]]:
+    tokens: list[tuple[str, Any]] = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if match is None or match.end() == pos:
+            raise QuerySyntaxError(f"Unexpected input at position {pos}: {text[pos:pos + 20]!r}")
+        pos = match.end()
+        if match["lparen"]:
+            tokens.append(("(", None))
+        elif match["rparen"]:
+            tokens.append((")", None))
+        elif match["field"]:
+            tokens.append(("term", _make_term(match["field"], match["op"], match["value"])))
+        elif match["quoted"]:
+            tokens.append(("term", Term("message", ":", _unquote(match["quoted"]).lower())))
+        else:
+            word = match["word"]
+            if word.upper() in ("AND", "OR", "NOT"):
+                tokens.append((word.upper(), None))
+            else:
+                tokens.append(("term", Term("message", ":", word.lower())))
+    return tokens
+
+
+class _Parser:
+    def __init__(self, tokens: list[tuple[str, Any]]) -> None:
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self) -> str | None:
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def parse(self) -> Node:
+        if not self.tokens:
+            raise QuerySyntaxError("Empty query")
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise QuerySyntaxError(f"Unexpected '{self.peek()}'")
+        return node
+
+    def parse_or(self) -> Node:
+        children = [self.parse_and()]
+        while self.peek() == "OR":
+            self.pos += 1
+            children.append(self.parse_and())
+        return children[0] if len(children) == 1 else Or(tuple(children))
+
+    def parse_and(self) -> Node:
+        children = [self.parse_not()]
+        while self.peek() not in (None, "OR", ")"):
+            if self.peek() == "AND":
+                self.pos += 1
+            children.append(self.parse_not())
+        return children[0] if len(children) == 1 else And(tuple(children))
+
+    def parse_not(self) -> Node:
+        kind = self.peek()
+        if kind == "NOT":
+            self.pos += 1
+            return Not(self.parse_not())
+        if kind == "(":
+            self.pos += 1
+            node = self.parse_or()
+            if self.peek() != ")":
+                raise QuerySyntaxError("Missing ')'")
+            self.pos += 1
+            return node
+        if kind == "term":
+            node = self.tokens[self.pos][1]
+            self.pos += 1
+            return node
+        raise QuerySyntaxError(f"Expected a term, got {kind or 'end of query'!r}")
+
+
+def parse_query(text: str) -> Node:
+    """Parse query text into a syntax tree. Raises QuerySyntaxError."""
+    return _Parser(_tokenize(text)).parse()
+
+
+# ---------------------------------------------------------------------------
+# Compilation
+# ---------------------------------------------------------------------------
+
+# Field accessors for LogEntry objects, returning normalized values
+ENTRY_GETTERS: dict[str, Callable[[LogEntry], Any]] = {
+    "level": lambda e: LEVEL_RANK[e.level],
+    "pid": lambda e: -1 if e.pid is None else e.pid,
+    "process": lambda e: e.process,
+    "subsystem": lambda e: e.subsystem,
+    "category": lambda e: e.category,
+    "source": lambda e: e.source.value,
+    "device_id": lambda e: e.device_id,
+    "message": lambda e: e.message,
+    "template_id": lambda e: e.template_id,
+    "noise": lambda e: e.noise.value if e.noise else "",
+}
+
+_COMPARATORS: dict[str, Callable[[Any, Any], bool]] = {
+    "=": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+}
+
+_SQL_COLUMNS: dict[str, str] = {
+    "level": "level",
+    "pid": "coalesce(pid, -1)",
+    "process": "process",
+    "subsystem": "subsystem",
+    "category": "category",
+    "source": "source",
+    "device_id": "device_id",
+    "message": "message",
+    "template_id": "template_id",
+    "noise": "coalesce(noise, '')",
+}
+
+
+def _compile_node(
+    node: Node, getters: Mapping[str, Callable[[Any], Any]],
+) -> Callable[[Any], bool]:
+    if isinstance(node, And):
+        parts = [_compile_node(child, getters) for child in node.children]
+        return lambda record: all(part(record) for part in parts)
+    if isinstance(node, Or):
+        parts = [_compile_node(child, getters) for child in node.children]
+        return lambda record: any(part(record) for part in parts)
+    if isinstance(node, Not):
+        inner = _compile_node(node.child, getters)
+        return lambda record: not inner(record)
+
+    get = getters[node.field]
+    value = node.value
+    if node.op == "~":
+        search = re.compile(value).search
+        return lambda record: search(get(record)) is not None
+    if node.op == ":":  # message substring, value already lowercased
+        return lambda record: value in get(record).lower()
+    compare = _COMPARATORS[node.op]
+    return lambda record: compare(get(record), value)
+
+
+def _to_sql(node: Node, args: list[Any]) -> str:
+    if isinstance(node, (And, Or)):
+        joiner = " AND " if isinstance(node, And) else " OR "
+        return "(" + joiner.join(_to_sql(child, args) for child in node.children) + ")"
+    if isinstance(node, Not):
+        return f"NOT {_to_sql(node.child, args)}"
+
+    column = _SQL_COLUMNS[node.field]
+    args.append(node.value)
+    if node.op == "~":
+        return f"({column} REGEXP ?)"
+    if node.op == ":":
+        return f"(instr(lower({column}), ?) > 0)"
+    return f"({column} {node.op} ?)"
+
+
+class CompiledQuery:
+    """A parsed query, ready to evaluate against entries or store records."""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.root = parse_query(text)
+        self.matches: Callable[[LogEntry], bool] = _compile_node(self.root, ENTRY_GETTERS)
+
+    def predicate(self, getters: Mapping[str, Callable[[Any], Any]]) -> Callable[[Any], bool]:
+        """Compile against a store's own record accessors.
+
+        getters maps each field to a function returning its normalized value
+        for a record (see ENTRY_GETTERS).
+        """
+        return _compile_node(self.root, getters)
+
+    def to_sql(self) -> tuple[str, list[Any]]:
+        """Return (WHERE clause, args) over the SQLite store's columns."""
+        args: list[Any] = []
+        return _to_sql(self.root, args), args
+
+    def conjuncts(self) -> tuple[Node, ...]:
+        """The top-level AND terms."""
+        return self.root.children if isinstance(self.root, And) else (self.root,)
+
+
+@functools.lru_cache(maxsize=256)
+def compile_query(text: str) -> CompiledQuery:
+    """Parse and compile query text, cached by text. Raises QuerySyntaxError."""
+    return CompiledQuery(text)
+
+
+_LEVELS: list[LogLevel] = list(LogLevel)
+
+
+def resolve_query(params: LogQueryParams) -> tuple[LogQueryParams, CompiledQuery | None]:
+    """Push a query's top-level AND terms down into params' indexed fields.
+
+    Returns (params, query). params has `q` cleared and every pushable term
+    copied into the matching field, so the store's indexes narrow the scan.
+    query is the compiled query if it still has to be checked per entry, or
+    None when the pushed-down fields express it exactly.
+    """
+    if not params.q:
+        return params, None
+    query = compile_query(params.q)
+    updates: dict[str, Any] = {"q": None}
+    exact = True
+    for node in query.conjuncts():
+        pushed = _push_term(node, params, updates)
+        exact = exact and pushed
+    return params.model_copy(update=updates), None if exact else query
+
+
+def _push_term(node: Node, params: LogQueryParams, updates: dict[str, Any]) -> bool:
+    """Copy one AND term into updates if a params field can carry it.
+
+    Returns True if the field now expresses the term exactly.
+    """
+    if not isinstance(node, Term):
+        return False
+    field, op, value = node.field, node.op, node.value
+
+    if field in ("process", "subsystem", "device_id", "source") and op == "=" and value:
+        if getattr(params, field) or field in updates:
+            return False
+        updates[field] = LogSource(value) if field == "source" else value
+        return True
+    if field == "level" and op in ("=", ">=", ">"):
+        floor = value + 1 if op == ">" else value
+        if floor >= len(_LEVELS):
+            return False
+        if params.level is not None or "level" in updates:
+            return False
+        updates["level"] = _LEVELS[floor]
+        return op != "="  # exact level still needs the upper bound checked
+    if field == "message" and op == ":":
+        if params.search or "search" in updates:
+            return False
+        updates["search"] = value
+        return True
+    if field == "message" and op == "~":
+        if params.regex or "regex" in updates:
+            return False
+        updates["regex"] = value
+        return True
+    return False
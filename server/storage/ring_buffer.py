@@ -3,6 +3,38 @@
 Provides fast append and query operations over a fixed-size circular buffer.
 When the buffer is full, oldest entries are overwritten.
 
+Entries are not kept as LogEntry models. Each field lives in its own column
+(array-backed for numbers, plain lists for strings): timestamps are epoch-ns
+ints, levels and sources are one-byte codes, device/process/subsystem/category
+strings are interned so every entry from the same process shares one string,
+and `raw` is only stored when it differs from `message` (or not at all with
+keep_raw=False). LogEntry models are materialized only for the entries a
+caller actually gets back. Columns start small and double as the buffer
+fills, so a buffer sized for a busy device costs little while it's nearly
+empty; the allocated slots count toward nbytes. An optional byte budget
+(max_bytes) evicts the oldest entries by estimated size in addition to the
+entry-count cap, and stops the columns growing past it.
+
+Each slot can also hold the entry's serialized JSON. It is filled when the
+entry is appended while someone is streaming, or the first time a query
+returns it, and attached to every entry materialized afterwards — so SSE and
+repeated polls don't re-serialize the same entry. Cached JSON counts toward
+the byte budget.
+
+Every stored entry is assigned a monotonic position. Per-field posting lists
+(device_id, process, source, level, subsystem) map each distinct value to the
+positions holding it, so selective queries only visit matching entries instead
+of scanning the whole buffer. Posting lists are kept in position order and
+trimmed from the left as entries are evicted. Message text is covered by a
+trigram index (see text_index.py) used for `search` and `regex` filters.
+
+Entries are also stamped with a store-wide sequence number (see sequence.py).
+Sequence numbers increase with position, so cursor lookups ("everything
+after seq N") bisect in O(log n). Timestamps are not guaranteed to be ordered
+— adapters with different clocks share a buffer — so each slot also records
+the running maximum timestamp up to that position; bisecting that
+non-decreasing series gives a safe starting point for `since` lookups.
+
 The storage interface is designed to be swappable — a SQLite implementation
 can replace this later without changing the API layer.
 """
@@ -10,54 +42,226 @@ can replace this later without changing the API layer.
 from __future__ import annotations
 
 import asyncio
-import threading
+import bisect
+import heapq
+import itertools
+import re
+import sys
+from array import array
 from collections import deque
-from datetime import datetime
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+from datetime import datetime, timedelta, timezone
+from operator import itemgetter
+from typing import Any
+
+from server.models import LogEntry, LogLevel, LogQueryParams, LogSource, NoiseAction
+from server.storage.merge import LogScan, epoch_ns
+from server.storage.query_lang import resolve_query
+from server.storage.sequence import next_seq
+from server.storage.text_index import BLOCK_SIZE, TrigramIndex, required_literals
+
+# Entry attributes with a posting list. All are exact-match filters.
+INDEXED_FIELDS: tuple[str, ...] = ("device_id", "process", "source", "level", "subsystem")
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_LEVELS: list[LogLevel] = list(LogLevel)
+_LEVEL_CODE: dict[LogLevel, int] = {lvl: i for i, lvl in enumerate(_LEVELS)}
+_SOURCES: list[LogSource] = list(LogSource)
+_SOURCE_CODE: dict[LogSource, int] = {src: i for i, src in enumerate(_SOURCES)}
+# Noise column codes: 0 = not noise
+_NOISE: list[NoiseAction | None] = [None, *NoiseAction]
+_NOISE_CODE: dict[NoiseAction | None, int] = {action: i for i, action in enumerate(_NOISE)}
+_NOISE_VALUES: list[str] = ["", *(action.value for action in NoiseAction)]
+
+# Column storage cost of one slot, allocated whether or not it holds an entry:
+# eight list references (id, device_id, process, subsystem, category, message,
+# raw, json) and the numeric columns (ts, ts_max, seq, pid, repeat_count,
+# template_id, level, source, noise, size).
+_SLOT_BYTES = 8 * 8 + (8 + 8 + 8 + 4 + 4 + 4 + 1 + 1 + 1 + 4)
+
+# Estimated per-entry cost on top of its slot, excluding the message/id/raw
+# strings: one posting-list reference per indexed field, the position int
+# those references share, and the amortized trigram-index cost (measured at
+# roughly 80 bytes for ~100-character messages).
+_FIXED_ENTRY_BYTES = len(INDEXED_FIELDS) * 8 + 32 + 80
+
+# Slots allocated for an empty buffer. Columns double as the buffer fills (up
+# to max_size) and halve once it's three-quarters empty.
+_MIN_CAPACITY = 8
+
+_LIST_COLUMNS = (
+    "_ids", "_device_ids", "_processes", "_subsystems", "_categories", "_messages",
+    "_raws", "_jsons",
+)
+_ARRAY_COLUMNS = {
+    "_ts": "q", "_ts_max": "q", "_seqs": "q", "_pids": "i", "_repeats": "I",
+    "_template_ids": "I", "_levels": "B", "_sources": "B", "_noise": "B", "_sizes": "I",
+}
 
-from server.models import LogEntry, LogLevel, LogQueryParams, LogSource
+
+def _from_ns(ns: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=ns // 1000)
 
 
 class RingBuffer:
-    """Thread-safe ring buffer for log entries with query support."""
+    """Thread-safe ring buffer for log entries with query support.
+
+    Args:
+        max_size: Maximum number of entries held.
+        max_bytes: Optional memory budget. When set, the oldest entries are
+            evicted until the estimated size of the stored entries fits.
+        keep_raw: Store each entry's `raw` line. When False, raw lines are
+            dropped and entries come back with `raw=""`.
+    """
 
-    def __init__(self, max_size: int = 10_000) -> None:
-        self._buffer: deque[LogEntry] = deque(maxlen=max_size)
+    def __init__(
+        self,
+        max_size: int = 10_000,
+        max_bytes: int | None = None,
+        keep_raw: bool = True,
+    ) -> None:
+        self._max_size = max_size
+        self._max_bytes = max_bytes
+        self._keep_raw = keep_raw
+        self._bytes = 0
+        # Column storage, declared here for type checkers; see _allocate()
+        self._ids: list[str | None]
+        self._device_ids: list[str | None]
+        self._processes: list[str | None]
+        self._subsystems: list[str | None]
+        self._categories: list[str | None]
+        self._messages: list[str | None]
+        self._raws: list[str | None]  # None means "same as message"
+        self._jsons: list[bytes | None]
+        self._ts: array[int]
+        self._ts_max: array[int]  # Running maximum timestamp at each slot
+        self._seqs: array[int]
+        self._pids: array[int]  # -1 = no pid
+        self._repeats: array[int]
+        self._template_ids: array[int]
+        self._levels: array[int]
+        self._sources: array[int]
+        self._noise: array[int]
+        self._sizes: array[int]
+        self._allocate(min(max_size, _MIN_CAPACITY))
+        self._latest_ns: int | None = None
+        # Newest position whose timestamp is below the previous entry's; the
+        # live entries are in timestamp order while it's <= _head
+        self._last_inversion = 0
+        # Positions are monotonic: the oldest live entry is at _head, the next
+        # append goes to _next. An entry's slot is its position modulo max_size.
+        self._head = 0
+        self._next = 0
+        self._index: dict[str, dict[Any, deque[int]]] = {f: {} for f in INDEXED_FIELDS}
+        self._text_index = TrigramIndex()
         self._lock = asyncio.Lock()
         self._subscribers: list[asyncio.Queue[LogEntry]] = []
+        self._ingest_hooks: list[Callable[[LogEntry], None]] = []
+        self._listeners: list[Callable[[LogEntry], None]] = []
+        self._evict_listeners: list[Callable[[LogEntry], None]] = []
+
+    def _allocate(self, capacity: int) -> None:
+        """Create empty column storage for `capacity` slots."""
+        self._capacity = capacity
+        for name in _LIST_COLUMNS:
+            setattr(self, name, [None] * capacity)
+        for name, typecode in _ARRAY_COLUMNS.items():
+            setattr(self, name, array(typecode, bytes(array(typecode).itemsize * capacity)))
+
+    def _resize(self, capacity: int) -> None:
+        """Move the live entries into columns of a new capacity.
+
+        Positions don't change, so posting lists and the text index stay valid.
+        """
+        old_capacity = self._capacity
+        old = {name: getattr(self, name) for name in (*_LIST_COLUMNS, *_ARRAY_COLUMNS)}
+        self._allocate(capacity)
+        for name, column in old.items():
+            new = getattr(self, name)
+            pos = self._head
+            while pos < self._next:
+                src, dst = pos % old_capacity, pos % capacity
+                run = min(self._next - pos, old_capacity - src, capacity - dst)
+                new[dst:dst + run] = column[src:src + run]
+                pos += run
 
     @property
     def size(self) -> int:
-        return len(self._buffer)
+        return self._next - self._head
 
     @property
     def max_size(self) -> int:
-        return self._buffer.maxlen  # type: ignore[return-value]
+        return self._max_size
+
+    @property
+    def max_bytes(self) -> int | None:
+        return self._max_bytes
+
+    @property
+    def nbytes(self) -> int:
+        """Estimated memory held by the allocated slots and stored entries."""
+        return self._capacity * _SLOT_BYTES + self._bytes
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the newest entry (0 if empty)."""
+        if self._next == self._head:
+            return 0
+        return self._seqs[(self._next - 1) % self._capacity]
 
     async def append(self, entry: LogEntry) -> None:
         """Add an entry to the buffer and notify all subscribers."""
         async with self._lock:
-            self._buffer.append(entry)
+            self._store(entry)
+            if self._subscribers:
+                # Serialize once for every subscriber (and later queries)
+                entry.json_bytes = self._entry(self._next - 1, encode=True).json_bytes
+        self._notify(entry)
+
+    async def append_many(self, entries: list[LogEntry]) -> None:
+        """Add a batch of entries under one lock, then notify subscribers.
+
+        Equivalent to appending each entry in order, without a lock round
+        trip per entry.
+        """
+        if not entries:
+            return
+        async with self._lock:
+            encode = bool(self._subscribers)
+            for entry in entries:
+                self._store(entry)
+                if encode:
+                    entry.json_bytes = self._entry(self._next - 1, encode=True).json_bytes
+        for entry in entries:
+            self._notify(entry)
 
-        # Notify SSE subscribers (non-blocking)
-        dead_subs: list[asyncio.Queue[LogEntry]] = []
+    async def evict_oldest(self) -> None:
+        """Drop the oldest entry, if any (for stores sharing capacity across buffers)."""
+        async with self._lock:
+            if self._next > self._head:
+                self._evict_oldest()
+
+    def _notify(self, entry: LogEntry) -> None:
+        for listener in self._listeners:
+            listener(entry)
+
+        # Notify queue subscribers (non-blocking)
         for queue in self._subscribers:
             try:
                 queue.put_nowait(entry)
             except asyncio.QueueFull:
-                # Subscriber is too slow — drop the entry for them
-                dead_subs.append(queue)
-
-        for dead in dead_subs:
-            self._subscribers.remove(dead)
+                # Subscriber is too slow — drop the entry for them, but keep
+                # the subscription so the stream resumes once it catches up
+                pass
 
     async def query(self, params: LogQueryParams) -> tuple[list[LogEntry], int]:
         """Query the buffer with filters. Returns (entries, total_matching)."""
         async with self._lock:
-            results = self._filter(params)
-            total = len(results)
-            # Apply pagination
-            paginated = results[params.offset : params.offset + params.limit]
-            return paginated, total
+            positions = self._filter(params)
+            total = len(positions)
+            # Apply pagination — only the returned page is materialized
+            page = positions[params.offset : params.offset + params.limit]
+            return [self._entry(pos, encode=True) for pos in page], total
 
     async def filter_entries(self, params: LogQueryParams) -> list[LogEntry]:
         """Apply query filters and return ALL matching entries (no pagination).
@@ -65,23 +269,101 @@ class RingBuffer:
         Use when merging results across buffers — caller handles pagination.
         """
         async with self._lock:
-            return self._filter(params)
+            return [self._entry(pos) for pos in self._filter(params)]
+
+    def scan(self, params: LogQueryParams, limit: int | None = None) -> LogScan:
+        """Count matches and return a lazy scan over them for merge_scans.
+
+        Synchronous, so a caller can scan several stores and merge them
+        without the buffers changing in between (appends and evictions only
+        happen between awaits). Pagination fields in params are ignored;
+        `limit` is unused here (the scan is lazy) but accepted for parity
+        with other stores.
+        """
+        return _BufferScan(self, params, self._count(params))
+
+    async def export(
+        self, params: LogQueryParams, batch_size: int = 1000, end_seq: int | None = None,
+    ) -> AsyncIterator[list[LogEntry]]:
+        """Yield matching entries in seq order, up to batch_size at a time.
+
+        The export covers entries up to end_seq (default: the newest entry
+        when it starts). The lock is held only while each batch is collected,
+        so ingest continues in between; entries evicted before their batch is
+        reached are skipped. Pagination fields in params are ignored.
+        """
+        if end_seq is None:
+            end_seq = self.last_seq
+        cursor = params.after_seq
+        while True:
+            batch: list[LogEntry] = []
+            async with self._lock:
+                n = self._capacity
+                # Each batch resumes by bisecting to the seq cursor
+                for pos in self._iter_matches(params.model_copy(update={"after_seq": cursor})):
+                    if self._seqs[pos % n] > end_seq:
+                        break
+                    batch.append(self._entry(pos))
+                    if len(batch) >= batch_size:
+                        break
+            if not batch:
+                return
+            yield batch
+            if len(batch) < batch_size:
+                return
+            cursor = batch[-1].seq
 
     async def get_since(self, since: datetime) -> list[LogEntry]:
         """Get all entries at or after a given timestamp."""
+        since_ns = epoch_ns(since)
         async with self._lock:
-            return [e for e in self._buffer if e.timestamp >= since]
+            start = self._position_since(since_ns)
+            return [
+                self._entry(pos) for pos in range(start, self._next)
+                if self._ts[pos % self._capacity] >= since_ns
+            ]
 
     async def get_after(self, after: datetime) -> list[LogEntry]:
         """Get all entries strictly after a given timestamp (for cursor deltas)."""
+        after_ns = epoch_ns(after)
         async with self._lock:
-            return [e for e in self._buffer if e.timestamp > after]
+            start = self._position_since(after_ns)
+            return [
+                self._entry(pos) for pos in range(start, self._next)
+                if self._ts[pos % self._capacity] > after_ns
+            ]
+
+    async def get_after_seq(self, seq: int) -> list[LogEntry]:
+        """Get all entries with a sequence number greater than seq."""
+        async with self._lock:
+            start = self._position_after_seq(seq)
+            return [self._entry(pos) for pos in range(start, self._next)]
 
     async def get_recent(self, count: int = 100) -> list[LogEntry]:
         """Get the N most recent entries."""
         async with self._lock:
-            items = list(self._buffer)
-            return items[-count:]
+            start = max(self._head, self._next - count)
+            return [self._entry(pos) for pos in range(start, self._next)]
+
+    def add_ingest_hook(self, hook: Callable[[LogEntry], None]) -> None:
+        """Call hook(entry) synchronously before each entry is stored, so it can
+        annotate the entry (e.g. TemplateMiner.assign)."""
+        self._ingest_hooks.append(hook)
+
+    def add_listener(self, listener: Callable[[LogEntry], None]) -> None:
+        """Call listener(entry) synchronously for every stored entry."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[LogEntry], None]) -> None:
+        try:
+            self._listeners.remove(listener)
+        except ValueError:
+            pass
+
+    def add_evict_listener(self, listener: Callable[[LogEntry], None]) -> None:
+        """Call listener(entry) synchronously for every entry evicted to make
+        room (e.g. SegmentStore.add to spill it to disk)."""
+        self._evict_listeners.append(listener)
 
     def subscribe(self) -> asyncio.Queue[LogEntry]:
         """Create a subscription queue for real-time SSE streaming.
@@ -100,34 +382,386 @@ class RingBuffer:
         except ValueError:
             pass
 
-    def _filter(self, params: LogQueryParams) -> list[LogEntry]:
-        """Apply query filters to the buffer. Must be called under lock."""
-        results: list[LogEntry] = []
+    def _entry(self, pos: int, encode: bool = False) -> LogEntry:
+        """Materialize the entry stored at a live position.
+
+        Args:
+            pos: Live buffer position.
+            encode: Also serialize the entry to JSON and cache it in the
+                slot if it isn't cached yet. Use for entries headed straight
+                into a response.
+        """
+        slot = pos % self._capacity
+        message = self._messages[slot]
+        raw = self._raws[slot]
+        pid = self._pids[slot]
+        entry = LogEntry.model_construct(
+            id=self._ids[slot],
+            timestamp=_from_ns(self._ts[slot]),
+            device_id=self._device_ids[slot],
+            process=self._processes[slot],
+            subsystem=self._subsystems[slot],
+            category=self._categories[slot],
+            pid=None if pid < 0 else pid,
+            level=_LEVELS[self._levels[slot]],
+            message=message,
+            source=_SOURCES[self._sources[slot]],
+            raw=message if raw is None else raw,
+            repeat_count=self._repeats[slot],
+            seq=self._seqs[slot],
+            template_id=self._template_ids[slot],
+            noise=_NOISE[self._noise[slot]],
+        )
+        cached = self._jsons[slot]
+        if cached is not None:
+            entry.json_bytes = cached
+        elif encode:
+            data = entry.json_bytes
+            self._jsons[slot] = data
+            nbytes = sys.getsizeof(data)
+            self._sizes[slot] += nbytes
+            self._bytes += nbytes
+        return entry
+
+    def _indexed_values(self, slot: int) -> tuple[Any, ...]:
+        """Values of INDEXED_FIELDS for the entry in a slot, in field order."""
+        return (
+            self._device_ids[slot],
+            self._processes[slot],
+            _SOURCES[self._sources[slot]],
+            _LEVELS[self._levels[slot]],
+            self._subsystems[slot],
+        )
+
+    def _position_after_seq(self, seq: int) -> int:
+        """First live position whose entry has a sequence number > seq."""
+        lo, hi = self._head, self._next
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._seqs[mid % self._capacity] <= seq:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _position_since(self, since_ns: int) -> int:
+        """First live position that can hold an entry with timestamp >= since.
+
+        Every earlier position has a running-max timestamp below `since`, so
+        none of them can match. Later positions still need a per-entry check.
+        """
+        lo, hi = self._head, self._next
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._ts_max[mid % self._capacity] < since_ns:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _store(self, entry: LogEntry) -> None:
+        """Write an entry into the next slot, evicting the oldest if full."""
+        for hook in self._ingest_hooks:
+            hook(entry)
+        message = entry.message
+        if not self._keep_raw:
+            raw: str | None = ""
+        elif entry.raw == message:
+            raw = None
+        else:
+            raw = entry.raw
+        nbytes = _FIXED_ENTRY_BYTES + sys.getsizeof(message) + sys.getsizeof(entry.id)
+        if raw:
+            nbytes += sys.getsizeof(raw)
+
+        if self._next - self._head == self._capacity:
+            capacity = min(self._capacity * 2, self._max_size)
+            growth = (capacity - self._capacity) * _SLOT_BYTES
+            if capacity > self._capacity and (
+                self._max_bytes is None or self.nbytes + growth + nbytes <= self._max_bytes
+            ):
+                self._resize(capacity)
+            else:
+                self._evict_oldest()
+        if self._max_bytes is not None:
+            while self._next > self._head and self.nbytes + nbytes > self._max_bytes:
+                self._evict_oldest()
+
+        pos = self._next
+        slot = pos % self._capacity
+        entry.seq = next_seq()
+        ts = epoch_ns(entry.timestamp)
+        if pos > self._head and ts < self._ts[(pos - 1) % self._capacity]:
+            self._last_inversion = pos
+        if self._latest_ns is None or ts > self._latest_ns:
+            self._latest_ns = ts
+
+        device_id = sys.intern(entry.device_id)
+        process = sys.intern(entry.process)
+        subsystem = sys.intern(entry.subsystem)
+        self._ids[slot] = entry.id
+        self._device_ids[slot] = device_id
+        self._processes[slot] = process
+        self._subsystems[slot] = subsystem
+        self._categories[slot] = sys.intern(entry.category)
+        self._messages[slot] = message
+        self._raws[slot] = raw
+        self._ts[slot] = ts
+        self._ts_max[slot] = self._latest_ns
+        self._seqs[slot] = entry.seq
+        self._pids[slot] = -1 if entry.pid is None else entry.pid
+        self._repeats[slot] = entry.repeat_count
+        self._template_ids[slot] = entry.template_id
+        self._levels[slot] = _LEVEL_CODE[entry.level]
+        self._sources[slot] = _SOURCE_CODE[entry.source]
+        self._noise[slot] = _NOISE_CODE[entry.noise]
+        self._sizes[slot] = nbytes
+        self._bytes += nbytes
+        self._next += 1
+
+        for field, value in zip(
+            INDEXED_FIELDS, (device_id, process, entry.source, entry.level, subsystem)
+        ):
+            postings = self._index[field]
+            positions = postings.get(value)
+            if positions is None:
+                postings[value] = positions = deque()
+            positions.append(pos)
+
+        self._text_index.add(pos, message)
+
+    def _evict_oldest(self) -> None:
+        """Drop the oldest entry and trim it from every posting list."""
+        pos = self._head
+        slot = pos % self._capacity
+        if self._evict_listeners:
+            evicted = self._entry(pos)
+            for listener in self._evict_listeners:
+                listener(evicted)
+        values = self._indexed_values(slot)
+        self._bytes -= self._sizes[slot]
+        # Release the strings; numeric columns are simply overwritten later
+        self._ids[slot] = None
+        self._messages[slot] = None
+        self._raws[slot] = None
+        self._jsons[slot] = None
+        self._head += 1
+        if self._head % BLOCK_SIZE == 0:
+            self._text_index.evict_before(self._head)
+
+        for field, value in zip(INDEXED_FIELDS, values):
+            postings = self._index[field]
+            positions = postings[value]
+            # Posting lists are position-ordered, so the evicted entry is
+            # always at the head of each of its lists.
+            positions.popleft()
+            if not positions:
+                del postings[value]
+
+        if self._capacity > _MIN_CAPACITY and self.size * 4 <= self._capacity:
+            self._resize(max(self._capacity // 2, _MIN_CAPACITY))
+
+    def _candidates(self, params: LogQueryParams) -> Iterable[int]:
+        """Pick the cheapest position stream that covers every match.
+
+        Each exact-match filter contributes its posting list; a level floor
+        contributes the merge of the posting lists for every accepted level;
+        `search` and `regex` contribute the trigram index's candidate blocks.
+        The shortest stream drives the scan — remaining filters are verified
+        per candidate by _filter.
+        """
+        # Lower position bound from cursor/time filters, found by bisection
+        start = self._head
+        if params.after_seq is not None:
+            start = max(start, self._position_after_seq(params.after_seq))
+        if params.since is not None:
+            start = max(start, self._position_since(epoch_ns(params.since)))
+        if start >= self._next:
+            return ()
+
+        streams: list[tuple[int, Iterable[int]]] = []
+
+        def tail(positions: deque[int]) -> Iterable[int]:
+            if start == self._head:
+                return positions
+            return itertools.islice(positions, bisect.bisect_left(positions, start), None)
+
+        for field, value in (
+            ("device_id", params.device_id),
+            ("process", params.process),
+            ("subsystem", params.subsystem),
+            ("source", params.source),
+        ):
+            if not value:
+                continue
+            positions = self._index[field].get(value)
+            if positions is None:
+                return ()
+            streams.append((len(positions), tail(positions)))
 
-        min_levels: set[LogLevel] | None = None
         if params.level is not None:
-            min_levels = set(LogLevel.at_least(params.level))
+            level_postings = self._index["level"]
+            lists = [
+                level_postings[lvl]
+                for lvl in LogLevel.at_least(params.level)
+                if lvl in level_postings
+            ]
+            if not lists:
+                return ()
+            if len(lists) == 1:
+                streams.append((len(lists[0]), tail(lists[0])))
+            else:
+                merged = heapq.merge(*(tail(p) for p in lists))
+                streams.append((sum(len(p) for p in lists), merged))
+
+        literals: list[str] = []
+        if params.search:
+            literals.append(params.search)
+        if params.regex:
+            literals.extend(required_literals(params.regex))
+        if literals:
+            blocks = self._text_index.candidate_blocks(literals)
+            if blocks is not None:
+                streams.append((len(blocks) * BLOCK_SIZE, self._block_positions(blocks, start)))
+
+        streams.append((self._next - start, range(start, self._next)))
+        return min(streams, key=lambda s: s[0])[1]
+
+    def _block_positions(self, blocks: list[int], start: int) -> Iterable[int]:
+        """Expand trigram candidate blocks into live positions >= start."""
+        for block in blocks:
+            lo = max(block * BLOCK_SIZE, start)
+            hi = min((block + 1) * BLOCK_SIZE, self._next)
+            yield from range(lo, hi)
+
+    def _filter(self, params: LogQueryParams) -> list[int]:
+        """Return the positions of matching entries. Must be called under lock."""
+        return list(self._iter_matches(params))
 
-        for entry in self._buffer:
-            if params.device_id and entry.device_id != params.device_id:
+    def _count(self, params: LogQueryParams) -> int:
+        """Count matching entries, straight from the indexes when possible."""
+        resolved, query = resolve_query(params)
+        exact = [
+            (field, value)
+            for field, value in (
+                ("device_id", resolved.device_id),
+                ("process", resolved.process),
+                ("subsystem", resolved.subsystem),
+                ("source", resolved.source),
+            )
+            if value
+        ]
+        unindexed = (
+            resolved.since or resolved.until or resolved.after_seq is not None
+            or resolved.search or resolved.regex
+        )
+        if query is None and not unindexed and len(exact) + (resolved.level is not None) <= 1:
+            if exact:
+                field, value = exact[0]
+                return len(self._index[field].get(value, ()))
+            if resolved.level is not None:
+                level_postings = self._index["level"]
+                return sum(
+                    len(level_postings.get(lvl, ())) for lvl in LogLevel.at_least(resolved.level)
+                )
+            return self.size
+        return sum(1 for _ in self._iter_matches(params))
+
+    def _iter_matches(self, params: LogQueryParams) -> Iterator[int]:
+        """Yield the positions of matching entries in order."""
+        params, query = resolve_query(params)
+        matches_query = query.predicate(self._query_getters()) if query else None
+        n = self._capacity
+        min_level = _LEVEL_CODE[params.level] if params.level is not None else None
+        source = _SOURCE_CODE[params.source] if params.source else None
+        since = epoch_ns(params.since) if params.since else None
+        until = epoch_ns(params.until) if params.until else None
+        search = params.search.lower() if params.search else None
+        regex = re.compile(params.regex) if params.regex else None
+
+        for pos in self._candidates(params):
+            slot = pos % n
+            if params.device_id and self._device_ids[slot] != params.device_id:
+                continue
+            if since is not None and self._ts[slot] < since:
+                continue
+            if until is not None and self._ts[slot] > until:
+                continue
+            if min_level is not None and self._levels[slot] < min_level:
                 continue
-            if params.since and entry.timestamp < params.since:
+            if params.process and self._processes[slot] != params.process:
                 continue
-            if params.until and entry.timestamp > params.until:
+            if params.subsystem and self._subsystems[slot] != params.subsystem:
                 continue
-            if min_levels and entry.level not in min_levels:
+            if source is not None and self._sources[slot] != source:
                 continue
-            if params.process and entry.process != params.process:
+            if search and search not in self._messages[slot].lower():  # type: ignore[union-attr]
                 continue
-            if params.source and entry.source != params.source:
+            if regex and not regex.search(self._messages[slot]):  # type: ignore[arg-type]
                 continue
-            if params.search and params.search.lower() not in entry.message.lower():
+            if matches_query and not matches_query(slot):
                 continue
-            results.append(entry)
+            yield pos
 
-        return results
+    def _query_getters(self) -> dict[str, Callable[[int], Any]]:
+        """Column accessors by slot for compiling query language predicates."""
+        pids = self._pids
+        sources = self._sources
+        noise = self._noise
+        return {
+            "level": self._levels.__getitem__,  # level codes are severity ranks
+            "pid": pids.__getitem__,  # -1 for none, as the query language expects
+            "process": self._processes.__getitem__,
+            "subsystem": self._subsystems.__getitem__,
+            "category": self._categories.__getitem__,
+            "source": lambda slot: _SOURCES[sources[slot]].value,
+            "device_id": self._device_ids.__getitem__,
+            "message": self._messages.__getitem__,
+            "template_id": self._template_ids.__getitem__,
+            "noise": lambda slot: _NOISE_VALUES[noise[slot]],
+        }
 
     async def clear(self) -> None:
         """Clear all entries from the buffer."""
         async with self._lock:
-            self._buffer.clear()
+            self._allocate(min(self._max_size, _MIN_CAPACITY))
+            self._latest_ns = None
+            self._last_inversion = 0
+            self._bytes = 0
+            self._head = 0
+            self._next = 0
+            for postings in self._index.values():
+                postings.clear()
+            self._text_index.clear()
+
+
+class _BufferScan(LogScan):
+    """Lazy scan over a RingBuffer's matches, bounded to entries present at creation."""
+
+    def __init__(self, buffer: RingBuffer, params: LogQueryParams, total: int) -> None:
+        super().__init__(total)
+        self._buffer = buffer
+        self._params = params
+        self._end = buffer._next
+
+    def keys(self) -> Iterator[tuple[int, Any]]:
+        """Yield keys lazily while the buffer is in timestamp order, else sort them."""
+        buffer = self._buffer
+        ts = buffer._ts
+        n = buffer._capacity
+        if buffer._last_inversion > buffer._head:
+            keys = []
+            for pos in buffer._iter_matches(self._params):
+                if pos >= self._end:
+                    break
+                keys.append((ts[pos % n], pos))
+            keys.sort(key=itemgetter(0))
+            yield from keys
+            return
+        for pos in buffer._iter_matches(self._params):
+            if pos >= self._end:
+                break
+            yield ts[pos % n], pos
+
+    def materialize(self, handles: list[Any], encode: bool = False) -> list[LogEntry]:
+        return [self._buffer._entry(pos, encode=encode) for pos in handles]
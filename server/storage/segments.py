@@ -0,0 +1,275 @@
+"""Compressed on-disk spillover for entries evicted from the in-memory store.
+
+The ring buffer drops its oldest entries when it fills up. With spillover
+enabled, every evicted entry is handed to a SegmentStore instead, which
+batches them into blocks of `block_size` entries, compresses each block
+(zlib over newline-separated entry JSON) and appends it to the current
+segment file under ~/.quern/logs/. Segment files are append-only; a new one
+is started once the current one reaches `segment_bytes`, and the oldest
+segments are deleted to keep the directory under `max_bytes`.
+
+Each segment `<first seq>.seg` has a sparse index `<first seq>.idx` with one
+JSON line per block: its byte range, entry count and seq/timestamp bounds.
+The indexes are loaded into memory, so a query only decompresses the blocks
+whose bounds overlap its `since`/`until`/`after_seq` range. Entries still
+waiting to fill a block are kept in memory and searched too.
+
+Blocks are written synchronously as entries are evicted (a block is a few
+tens of KB compressed); reads run in a worker thread. Blocks are immutable
+once indexed, and a block whose index line or data was torn by a crash is
+skipped when the indexes are loaded.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import re
+import zlib
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from server.models import LogEntry, LogLevel, LogQueryParams
+from server.storage.merge import ListScan, LogScan, epoch_ns
+from server.storage.query_lang import resolve_query
+from server.storage.sequence import advance_to
+
+logger = logging.getLogger("quern-debug-server.segments")
+
+SEGMENT_SUFFIX = ".seg"
+INDEX_SUFFIX = ".idx"
+
+
+@dataclass(frozen=True)
+class SegmentBlock:
+    """Index entry for one compressed block of a segment file."""
+
+    offset: int
+    length: int
+    count: int
+    min_seq: int
+    max_seq: int
+    min_ns: int
+    max_ns: int
+
+
+def _entry_filter(params: LogQueryParams) -> Callable[[LogEntry], bool]:
+    """Build a predicate applying query params (except pagination) to an entry."""
+    params, query = resolve_query(params)
+    since_ns = epoch_ns(params.since) if params.since else None
+    until_ns = epoch_ns(params.until) if params.until else None
+    min_levels = set(LogLevel.at_least(params.level)) if params.level else None
+    search = params.search.lower() if params.search else None
+    regex = re.compile(params.regex) if params.regex else None
+
+    def matches(entry: LogEntry) -> bool:
+        if params.after_seq is not None and entry.seq <= params.after_seq:
+            return False
+        if since_ns is not None or until_ns is not None:
+            ts = epoch_ns(entry.timestamp)
+            if since_ns is not None and ts < since_ns:
+                return False
+            if until_ns is not None and ts > until_ns:
+                return False
+        if params.device_id and entry.device_id != params.device_id:
+            return False
+        if min_levels and entry.level not in min_levels:
+            return False
+        if params.process and entry.process != params.process:
+            return False
+        if params.subsystem and entry.subsystem != params.subsystem:
+            return False
+        if params.source and entry.source != params.source:
+            return False
+        if search and search not in entry.message.lower():
+            return False
+        if regex and not regex.search(entry.message):
+            return False
+        if query and not query.matches(entry):
+            return False
+        return True
+
+    return matches
+
+
+class SegmentStore:
+    """Append-only compressed segments of evicted log entries.
+
+    Args:
+        directory: Where segment and index files are kept.
+        block_size: Entries per compressed block.
+        segment_bytes: Start a new segment file once the current one is this big.
+        max_bytes: Delete the oldest segments to keep the total under this.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        block_size: int = 1000,
+        segment_bytes: int = 16 * 1024 * 1024,
+        max_bytes: int = 512 * 1024 * 1024,
+    ) -> None:
+        self.directory = directory
+        self.block_size = block_size
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        # Segment path → its blocks, oldest segment first
+        self._segments: dict[Path, list[SegmentBlock]] = {}
+        self._sizes: dict[Path, int] = {}
+        self._current: Path | None = None
+        self._pending: list[LogEntry] = []
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of segment data on disk."""
+        return sum(self._sizes.values())
+
+    @property
+    def size(self) -> int:
+        """Number of spilled entries (on disk or waiting to fill a block)."""
+        on_disk = sum(b.count for blocks in self._segments.values() for b in blocks)
+        return on_disk + len(self._pending)
+
+    def open(self) -> None:
+        """Load the indexes of segments written by earlier runs.
+
+        Sequence numbering resumes after the newest spilled entry so seq
+        cursors stay valid across restarts. New blocks go to a new segment.
+        """
+        if not self.directory.is_dir():
+            return
+        max_seq = 0
+        for index_path in sorted(self.directory.glob(f"*{INDEX_SUFFIX}")):
+            path = index_path.with_suffix(SEGMENT_SUFFIX)
+            try:
+                size = path.stat().st_size
+                lines = index_path.read_text().splitlines()
+            except OSError:
+                continue
+            blocks: list[SegmentBlock] = []
+            for line in lines:
+                try:
+                    block = SegmentBlock(**json.loads(line))
+                except (ValueError, TypeError):
+                    continue  # Torn index line
+                if block.offset + block.length <= size:
+                    blocks.append(block)
+                    max_seq = max(max_seq, block.max_seq)
+            if blocks:
+                self._segments[path] = blocks
+                self._sizes[path] = size
+        advance_to(max_seq)
+        logger.info("Loaded %d spilled log segments from %s", len(self._segments), self.directory)
+
+    def add(self, entry: LogEntry) -> None:
+        """Spill an evicted entry. Writes a block once block_size are waiting."""
+        self._pending.append(entry)
+        if len(self._pending) >= self.block_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write waiting entries as a block, even if it isn't full."""
+        if not self._pending:
+            return
+        entries, self._pending = self._pending, []
+        data = zlib.compress(b"\n".join(entry.json_bytes for entry in entries))
+        seqs = [entry.seq for entry in entries]
+        stamps = [epoch_ns(entry.timestamp) for entry in entries]
+
+        path = self._current
+        if path is None or self._sizes.get(path, 0) >= self.segment_bytes:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self._current = self.directory / f"{min(seqs):012d}{SEGMENT_SUFFIX}"
+            self._segments[path] = []
+            self._sizes[path] = 0
+
+        block = SegmentBlock(
+            offset=self._sizes[path],
+            length=len(data),
+            count=len(entries),
+            min_seq=min(seqs),
+            max_seq=max(seqs),
+            min_ns=min(stamps),
+            max_ns=max(stamps),
+        )
+        try:
+            with path.open("ab") as f:
+                f.write(data)
+            with path.with_suffix(INDEX_SUFFIX).open("a") as f:
+                f.write(json.dumps(asdict(block)) + "\n")
+        except OSError as e:
+            logger.warning("Failed to spill %d log entries to %s: %s", len(entries), path, e)
+            return
+        self._segments[path].append(block)
+        self._sizes[path] += len(data)
+        self._enforce_budget()
+
+    def _enforce_budget(self) -> None:
+        """Delete the oldest segments until the total fits max_bytes."""
+        while self.nbytes > self.max_bytes and len(self._segments) > 1:
+            path = next(iter(self._segments))
+            del self._segments[path]
+            del self._sizes[path]
+            path.unlink(missing_ok=True)
+            path.with_suffix(INDEX_SUFFIX).unlink(missing_ok=True)
+
+    def close(self) -> None:
+        """Write any waiting entries."""
+        self.flush()
+
+    def _candidates(self, params: LogQueryParams) -> list[tuple[Path, SegmentBlock]]:
+        """Blocks whose seq/timestamp bounds overlap the query's range."""
+        since_ns = epoch_ns(params.since) if params.since else None
+        until_ns = epoch_ns(params.until) if params.until else None
+        return [
+            (path, block)
+            for path, blocks in self._segments.items()
+            for block in blocks
+            if (params.after_seq is None or block.max_seq > params.after_seq)
+            and (since_ns is None or block.max_ns >= since_ns)
+            and (until_ns is None or block.min_ns <= until_ns)
+        ]
+
+    @staticmethod
+    def _read(
+        blocks: list[tuple[Path, SegmentBlock]], matches: Callable[[LogEntry], bool],
+    ) -> list[LogEntry]:
+        results: list[LogEntry] = []
+        for path, block in blocks:
+            try:
+                with path.open("rb") as f:
+                    f.seek(block.offset)
+                    data = zlib.decompress(f.read(block.length))
+            except (OSError, zlib.error):
+                continue  # Segment deleted by retention since the query started
+            for line in data.split(b"\n"):
+                entry = LogEntry.model_validate_json(line)
+                if matches(entry):
+                    results.append(entry)
+        return results
+
+    async def filter_entries(self, params: LogQueryParams) -> list[LogEntry]:
+        """Return every spilled entry matching params (no pagination), in seq order.
+
+        Entries spilled while the blocks were being read (a buffer evicting
+        during the await) are picked up synchronously at the end, so a caller
+        that scans the in-memory buffers right after this returns sees every
+        entry in exactly one place.
+        """
+        matches = _entry_filter(params)
+        blocks = self._candidates(params)
+        results = await asyncio.to_thread(self._read, blocks, matches) if blocks else []
+        # Blocks flushed during the read; usually none, at most a few
+        seen = {id(block) for _, block in blocks}
+        late = [(path, block) for path, block in self._candidates(params) if id(block) not in seen]
+        if late:
+            results.extend(self._read(late, matches))
+        results.extend(entry for entry in self._pending if matches(entry))
+        results.sort(key=lambda entry: entry.seq)
+        return results
+
+    async def scan(self, params: LogQueryParams, limit: int | None = None) -> LogScan:
+        """Matching spilled entries as a scan for merge_scans."""
+        return ListScan(await self.filter_entries(params))
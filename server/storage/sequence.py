@@ -0,0 +1,33 @@
+"""Store-wide entry sequence numbers.
+
+Every log store stamps entries with the next number from one shared counter,
+so sequence numbers are monotonic across the device buffer and the server
+buffer alike. That lets a single integer act as a cursor over both: "give me
+everything after seq N" needs no per-buffer bookkeeping and, unlike a
+timestamp, never skips or repeats entries that share a timestamp.
+"""
+
+from __future__ import annotations
+
+_last_seq = 0
+
+
+def next_seq() -> int:
+    """Return the next sequence number."""
+    global _last_seq
+    _last_seq += 1
+    return _last_seq
+
+
+def current_seq() -> int:
+    """Return the most recently issued sequence number (0 if none yet)."""
+    return _last_seq
+
+
+def advance_to(seq: int) -> None:
+    """Ensure future sequence numbers are greater than seq.
+
+    Used by persistent stores that resume numbering after a restart.
+    """
+    global _last_seq
+    _last_seq = max(_last_seq, seq)
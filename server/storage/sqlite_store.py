@@ -0,0 +1,726 @@
+"""Disk-backed SQLite log store.
+
+Drop-in replacement for RingBuffer that keeps hours of logs across server
+restarts instead of a fixed number of entries in RAM. Exposes the same
+append/query/filter_entries/scan/get_since/get_after/get_after_seq/
+get_recent/subscribe surface, so the API layer and summarizer don't know
+which store they're talking to.
+
+Layout:
+- The database runs in WAL mode so reads never block the writer.
+- Entries are written to time-partitioned tables (``logs_<bucket>``, one per
+  ``partition_seconds`` of entry time). Retention, and the ``max_size``
+  entry cap, drop whole partitions, which is far cheaper than DELETE-ing
+  rows; only a newest partition over the cap by itself has rows deleted.
+- Each partition has an FTS5 table over ``message`` (trigram tokenizer when
+  available) so substring searches don't scan every row.
+- Appends are buffered in memory and written in batches by a background
+  writer. Reads flush pending rows first, so callers always see their writes.
+
+Requires the optional ``aiosqlite`` dependency (``pip install .[sqlite]``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import time
+from collections.abc import AsyncIterator, Callable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from server.metrics import EventRate, StageMetrics
+from server.models import LogEntry, LogLevel, LogQueryParams, LogSource, NoiseAction
+from server.storage.merge import ListScan, LogScan
+from server.storage.query_lang import resolve_query
+from server.storage.sequence import advance_to, next_seq
+from server.storage.text_index import required_literals
+
+if TYPE_CHECKING:
+    import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_LEVELS: list[LogLevel] = list(LogLevel)
+_LEVEL_RANK: dict[LogLevel, int] = {lvl: i for i, lvl in enumerate(_LEVELS)}
+_PARTITION_RE = re.compile(r"^logs_(\d+)$")
+
+_COLUMNS = (
+    "seq, ts_us, id, device_id, process, subsystem, category, pid, level, "
+    "message, source, raw, repeat_count, template_id, noise"
+)
+
+# Columns added after the first release, with their definitions (see _migrate)
+_ADDED_COLUMNS: dict[str, str] = {
+    "template_id": "INTEGER NOT NULL DEFAULT 0",
+    "noise": "TEXT",
+}
+
+
+def _to_us(ts: datetime) -> int:
+    """Convert a datetime to integer microseconds since the epoch."""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return (ts - _EPOCH) // timedelta(microseconds=1)
+
+
+def _from_us(ts_us: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=ts_us)
+
+
+def _row_to_entry(row: Any) -> LogEntry:
+    (seq, ts_us, entry_id, device_id, process, subsystem, category, pid,
+     level, message, source, raw, repeat_count, template_id, noise) = row
+    return LogEntry.model_construct(
+        id=entry_id,
+        timestamp=_from_us(ts_us),
+        device_id=device_id,
+        process=process,
+        subsystem=subsystem,
+        category=category,
+        pid=pid,
+        level=_LEVELS[level],
+        message=message,
+        source=LogSource(source),
+        raw=raw,
+        repeat_count=repeat_count,
+        seq=seq,
+        template_id=template_id,
+        noise=NoiseAction(noise) if noise else None,
+    )
+
+
+def _regexp(pattern: str, value: str | None) -> bool:
+    """SQL REGEXP implementation (SQLite has the operator but no function)."""
+    return value is not None and re.search(pattern, value) is not None
+
+
+def _fts_phrase(text: str) -> str:
+    """Quote text as a single FTS5 phrase (substring match with trigrams)."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+class SqliteLogStore:
+    """SQLite-backed log store with the RingBuffer API.
+
+    Args:
+        path: Database file. Created (with parent directories) if missing.
+        retention: How long to keep entries, measured on entry timestamps.
+        max_size: Entry cap. Oldest partitions are dropped while the store
+            holds more, then the newest one's oldest rows if still over.
+        partition_seconds: Width of each time partition table.
+        batch_size: Pending appends that trigger an immediate write.
+        flush_interval: Maximum delay before pending appends are written.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        retention: timedelta = timedelta(hours=6),
+        max_size: int = 2_000_000,
+        partition_seconds: int = 3600,
+        batch_size: int = 500,
+        flush_interval: float = 0.25,
+    ) -> None:
+        self.path = Path(path)
+        self.retention = retention
+        self._max_size = max_size
+        self.partition_seconds = partition_seconds
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._db: aiosqlite.Connection | None = None
+        self._open_lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
+        self._pending: list[tuple[Any, ...]] = []
+        self._pending_event = asyncio.Event()
+        self._writer_task: asyncio.Task | None = None
+        self._partitions: set[int] = set()
+        self._fts = False
+        self._last_seq = 0
+        self._count = 0
+        self._last_retention_check = 0.0
+        self._subscribers: list[asyncio.Queue[LogEntry]] = []
+        self._ingest_hooks: list[Callable[[LogEntry], None]] = []
+        self._listeners: list[Callable[[LogEntry], None]] = []
+        # Appends (queueing plus listeners) and retention drops, for GET /logs/metrics
+        self.metrics = StageMetrics("store")
+        self.evictions = EventRate()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def open(self) -> None:
+        """Open the database and start the background writer.
+
+        Safe to call more than once; every public method opens lazily.
+        """
+        async with self._open_lock:
+            if self._db is not None:
+                return
+            try:
+                import aiosqlite
+            except ImportError as e:
+                raise RuntimeError(
+                    "SQLite log store requires aiosqlite. "
+                    "Install it: pip install 'quern-debug-server[sqlite]'"
+                ) from e
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = await aiosqlite.connect(self.path)
+            await db.execute("PRAGMA journal_mode=WAL")
+            await db.execute("PRAGMA synchronous=NORMAL")
+            await db.create_function("regexp", 2, _regexp, deterministic=True)
+            self._fts = await self._probe_fts(db)
+
+            async with db.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'logs_%'"
+            ) as cursor:
+                async for (name,) in cursor:
+                    match = _PARTITION_RE.match(name)
+                    if match:
+                        self._partitions.add(int(match.group(1)))
+
+            max_seq = 0
+            for bucket in self._partitions:
+                table = self._table(bucket)
+                await self._migrate(db, table)
+                async with db.execute(f"SELECT count(*), max(seq) FROM {table}") as cursor:
+                    count, part_max = await cursor.fetchone()
+                self._count += count
+                max_seq = max(max_seq, part_max or 0)
+            # Resume the shared counter past anything already on disk
+            advance_to(max_seq)
+            self._last_seq = max_seq
+
+            self._db = db
+            self._writer_task = asyncio.create_task(self._writer_loop())
+            logger.info(
+                "SQLite log store opened at %s (%d entries, %d partitions, fts=%s)",
+                self.path, self._count, len(self._partitions), self._fts,
+            )
+
+    async def close(self) -> None:
+        """Write pending entries, stop the writer, and close the database."""
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+        if self._db is not None:
+            await self._flush()
+            await self._db.close()
+            self._db = None
+
+    @staticmethod
+    async def _migrate(db: aiosqlite.Connection, table: str) -> None:
+        """Add columns introduced since the partition table was created."""
+        async with db.execute(f"PRAGMA table_info({table})") as cursor:
+            columns = {row[1] async for row in cursor}
+        for column, definition in _ADDED_COLUMNS.items():
+            if column not in columns:
+                await db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    @staticmethod
+    async def _probe_fts(db: aiosqlite.Connection) -> bool:
+        """Check whether this SQLite build has FTS5 with the trigram tokenizer."""
+        try:
+            await db.execute(
+                "CREATE VIRTUAL TABLE temp._fts_probe USING fts5(x, tokenize='trigram')"
+            )
+            await db.execute("DROP TABLE temp._fts_probe")
+            return True
+        except Exception:
+            logger.warning("FTS5 trigram tokenizer unavailable — search will scan messages")
+            return False
+
+    # ------------------------------------------------------------------
+    # RingBuffer surface
+    # ------------------------------------------------------------------
+
+    @property
+    def size(self) -> int:
+        return self._count
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the newest entry (0 if empty)."""
+        return self._last_seq
+
+    async def append(self, entry: LogEntry) -> None:
+        """Queue an entry for the next batch write and notify subscribers."""
+        await self.open()
+        start = time.perf_counter()
+        self._queue(entry)
+        self._notify(entry)
+        self.metrics.record(1, 1, time.perf_counter() - start)
+
+    async def append_many(self, entries: list[LogEntry]) -> None:
+        """Queue a batch of entries for writing, then notify subscribers."""
+        if not entries:
+            return
+        await self.open()
+        start = time.perf_counter()
+        for entry in entries:
+            self._queue(entry)
+        for entry in entries:
+            self._notify(entry)
+        self.metrics.record(len(entries), len(entries), time.perf_counter() - start)
+
+    def _queue(self, entry: LogEntry) -> None:
+        for hook in self._ingest_hooks:
+            hook(entry)
+        seq = next_seq()
+        entry.seq = self._last_seq = seq
+        self._pending.append((
+            seq,
+            _to_us(entry.timestamp),
+            entry.id,
+            entry.device_id,
+            entry.process,
+            entry.subsystem,
+            entry.category,
+            entry.pid,
+            _LEVEL_RANK[entry.level],
+            entry.message,
+            entry.source.value,
+            entry.raw,
+            entry.repeat_count,
+            entry.template_id,
+            entry.noise.value if entry.noise else None,
+        ))
+        self._count += 1
+        if len(self._pending) >= self.batch_size:
+            self._pending_event.set()
+
+    def _notify(self, entry: LogEntry) -> None:
+        for listener in self._listeners:
+            listener(entry)
+
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(entry)
+            except asyncio.QueueFull:
+                pass  # Slow subscriber — drop the entry, keep the subscription
+
+    async def query(self, params: LogQueryParams) -> tuple[list[LogEntry], int]:
+        """Query with filters. Returns (entries, total_matching)."""
+        sql, args = await self._select(params)
+        if sql is None:
+            return [], 0
+        assert self._db is not None
+        async with self._db.execute(f"SELECT count(*) FROM ({sql})", args) as cursor:
+            (total,) = await cursor.fetchone()
+        rows = await self._fetch(
+            f"{sql} ORDER BY seq LIMIT ? OFFSET ?", [*args, params.limit, params.offset]
+        )
+        return [_row_to_entry(r) for r in rows], total
+
+    async def filter_entries(self, params: LogQueryParams) -> list[LogEntry]:
+        """Apply query filters and return ALL matching entries (no pagination)."""
+        sql, args = await self._select(params)
+        if sql is None:
+            return []
+        rows = await self._fetch(f"{sql} ORDER BY seq", args)
+        return [_row_to_entry(r) for r in rows]
+
+    async def scan(self, params: LogQueryParams, limit: int | None = None) -> LogScan:
+        """Count matches and fetch up to `limit` of them (None = all) for merge_scans."""
+        sql, args = await self._select(params)
+        if sql is None:
+            return ListScan([])
+        assert self._db is not None
+        async with self._db.execute(f"SELECT count(*) FROM ({sql})", args) as cursor:
+            (total,) = await cursor.fetchone()
+        # By timestamp, so a LIMIT keeps the rows merge_scans would take first
+        if limit is None:
+            rows = await self._fetch(f"{sql} ORDER BY ts_us, seq", args)
+        else:
+            rows = await self._fetch(f"{sql} ORDER BY ts_us, seq LIMIT ?", [*args, limit])
+        return ListScan([_row_to_entry(r) for r in rows], total)
+
+    async def export(
+        self, params: LogQueryParams, batch_size: int = 1000, end_seq: int | None = None,
+    ) -> AsyncIterator[list[LogEntry]]:
+        """Yield matching entries in seq order, up to batch_size at a time.
+
+        Covers entries up to end_seq (default: the newest entry when it
+        starts); each batch is a keyset query resuming after the previous
+        batch's last seq.
+        """
+        await self.open()
+        if end_seq is None:
+            end_seq = self._last_seq
+        cursor = params.after_seq
+        while True:
+            sql, args = await self._select(params.model_copy(update={"after_seq": cursor}))
+            if sql is None:
+                return
+            rows = await self._fetch(
+                f"SELECT * FROM ({sql}) WHERE seq <= ? ORDER BY seq LIMIT ?",
+                [*args, end_seq, batch_size],
+            )
+            if not rows:
+                return
+            batch = [_row_to_entry(r) for r in rows]
+            yield batch
+            if len(batch) < batch_size:
+                return
+            cursor = batch[-1].seq
+
+    async def get_since(self, since: datetime) -> list[LogEntry]:
+        """Get all entries at or after a given timestamp."""
+        return await self.filter_entries(LogQueryParams(since=since))
+
+    async def get_after(self, after: datetime) -> list[LogEntry]:
+        """Get all entries strictly after a given timestamp (for cursor deltas)."""
+        sql, args = await self._select(LogQueryParams(since=after))
+        if sql is None:
+            return []
+        rows = await self._fetch(
+            f"SELECT * FROM ({sql}) WHERE ts_us > ? ORDER BY seq", [*args, _to_us(after)]
+        )
+        return [_row_to_entry(r) for r in rows]
+
+    async def get_after_seq(self, seq: int) -> list[LogEntry]:
+        """Get all entries with a sequence number greater than seq."""
+        return await self.filter_entries(LogQueryParams(after_seq=seq))
+
+    async def get_recent(self, count: int = 100) -> list[LogEntry]:
+        """Get the N most recent entries."""
+        sql, args = await self._select(LogQueryParams())
+        if sql is None:
+            return []
+        rows = await self._fetch(f"{sql} ORDER BY seq DESC LIMIT ?", [*args, count])
+        rows.reverse()
+        return [_row_to_entry(r) for r in rows]
+
+    def add_ingest_hook(self, hook: Callable[[LogEntry], None]) -> None:
+        """Call hook(entry) synchronously before each entry is queued for writing."""
+        self._ingest_hooks.append(hook)
+
+    def add_listener(self, listener: Callable[[LogEntry], None]) -> None:
+        """Call listener(entry) synchronously for every appended entry."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[LogEntry], None]) -> None:
+        try:
+            self._listeners.remove(listener)
+        except ValueError:
+            pass
+
+    def subscribe(self) -> asyncio.Queue[LogEntry]:
+        """Create a subscription queue for real-time SSE streaming."""
+        queue: asyncio.Queue[LogEntry] = asyncio.Queue(maxsize=1000)
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue[LogEntry]) -> None:
+        """Remove a subscription queue."""
+        try:
+            self._subscribers.remove(queue)
+        except ValueError:
+            pass
+
+    async def clear(self) -> None:
+        """Drop every partition and all pending entries."""
+        await self.open()
+        assert self._db is not None
+        async with self._write_lock:
+            self._pending.clear()
+            for bucket in sorted(self._partitions):
+                await self._drop_partition(bucket)
+            await self._db.commit()
+            self._count = 0
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    async def _writer_loop(self) -> None:
+        """Write pending entries in batches and enforce retention."""
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._pending_event.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._pending_event.clear()
+                try:
+                    await self._flush()
+                    await self._enforce_retention()
+                except Exception:
+                    logger.exception("SQLite log store write failed")
+        except asyncio.CancelledError:
+            return
+
+    async def _flush(self) -> None:
+        """Write all pending rows in one transaction.
+
+        If the write fails the transaction is rolled back and the rows are
+        kept for the next flush, up to `batch_size` × 100 of them; older
+        ones beyond that are dropped and logged.
+        """
+        if not self._pending or self._db is None:
+            return
+        async with self._write_lock:
+            rows, self._pending = self._pending, []
+            by_bucket: dict[int, list[tuple[Any, ...]]] = {}
+            for row in rows:
+                bucket = row[1] // 1_000_000 // self.partition_seconds
+                by_bucket.setdefault(bucket, []).append(row)
+
+            created: list[int] = []
+            placeholders = ", ".join("?" * 15)
+            try:
+                for bucket, bucket_rows in by_bucket.items():
+                    if bucket not in self._partitions:
+                        created.append(bucket)
+                    await self._ensure_partition(bucket)
+                    table = self._table(bucket)
+                    await self._db.executemany(
+                        f"INSERT INTO {table} ({_COLUMNS}) VALUES ({placeholders})",
+                        bucket_rows,
+                    )
+                    if self._fts:
+                        await self._db.executemany(
+                            f"INSERT INTO {table}_fts (rowid, message) VALUES (?, ?)",
+                            [(row[0], row[9]) for row in bucket_rows],
+                        )
+                await self._db.commit()
+            except Exception:
+                await self._db.rollback()
+                # A rolled-back CREATE TABLE has to be redone on retry
+                self._partitions.difference_update(created)
+                self._pending[:0] = rows
+                limit = self.batch_size * 100
+                if len(self._pending) > limit:
+                    lost = len(self._pending) - limit
+                    del self._pending[:lost]
+                    self._count -= lost
+                    logger.error("SQLite log store dropped %d unwritten entries", lost)
+                raise
+
+    async def _ensure_partition(self, bucket: int) -> None:
+        if bucket in self._partitions:
+            return
+        assert self._db is not None
+        table = self._table(bucket)
+        await self._db.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "seq INTEGER PRIMARY KEY, ts_us INTEGER NOT NULL, id TEXT NOT NULL, "
+            "device_id TEXT NOT NULL, process TEXT NOT NULL, subsystem TEXT NOT NULL, "
+            "category TEXT NOT NULL, pid INTEGER, level INTEGER NOT NULL, "
+            "message TEXT NOT NULL, source TEXT NOT NULL, raw TEXT NOT NULL, "
+            "repeat_count INTEGER NOT NULL, template_id INTEGER NOT NULL DEFAULT 0, noise TEXT)"
+        )
+        await self._db.execute(f"CREATE INDEX IF NOT EXISTS {table}_ts ON {table} (ts_us)")
+        await self._db.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_process ON {table} (process)"
+        )
+        if self._fts:
+            await self._db.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5("
+                f"message, content='{table}', content_rowid='seq', tokenize='trigram')"
+            )
+        self._partitions.add(bucket)
+
+    async def _drop_partition(self, bucket: int) -> None:
+        assert self._db is not None
+        table = self._table(bucket)
+        await self._db.execute(f"DROP TABLE IF EXISTS {table}_fts")
+        await self._db.execute(f"DROP TABLE IF EXISTS {table}")
+        self._partitions.discard(bucket)
+
+    async def _enforce_retention(self) -> None:
+        """Drop partitions older than the retention window or beyond the entry cap."""
+        # drop_excess trims to exactly max_size, so this only fires on new rows
+        if self._count > self._max_size:
+            await self.drop_excess()
+        now = time.monotonic()
+        if now - self._last_retention_check < 60:
+            return
+        self._last_retention_check = now
+        await self.drop_expired()
+
+    async def drop_excess(self) -> int:
+        """Drop the oldest partitions while more than max_size entries are held.
+
+        If the newest partition alone holds more than max_size (a flood within
+        one partition), its oldest rows by seq are deleted down to the cap.
+        Returns the number of entries removed.
+        """
+        await self.open()
+        assert self._db is not None
+        await self._flush()
+        removed = 0
+        async with self._write_lock:
+            buckets = sorted(self._partitions)
+            for bucket in buckets[:-1]:
+                if self._count - removed <= self._max_size:
+                    break
+                async with self._db.execute(
+                    f"SELECT count(*) FROM {self._table(bucket)}"
+                ) as cursor:
+                    (count,) = await cursor.fetchone()
+                removed += count
+                await self._drop_partition(bucket)
+            excess = self._count - removed - self._max_size
+            if excess > 0 and buckets:
+                removed += await self._trim_partition(buckets[-1], excess)
+            await self._db.commit()
+        self._count -= removed
+        self.evictions.add(removed)
+        if removed:
+            logger.debug("Dropped %d log entries over the %d entry cap", removed, self._max_size)
+        return removed
+
+    async def _trim_partition(self, bucket: int, count: int) -> int:
+        """Delete a partition's `count` oldest rows by seq. Returns the number deleted."""
+        assert self._db is not None
+        table = self._table(bucket)
+        if self._fts:
+            # External-content FTS rows are removed with the 'delete' command
+            await self._db.execute(
+                f"INSERT INTO {table}_fts ({table}_fts, rowid, message) "
+                f"SELECT 'delete', seq, message FROM {table} ORDER BY seq LIMIT ?",
+                (count,),
+            )
+        cursor = await self._db.execute(
+            f"DELETE FROM {table} WHERE seq IN (SELECT seq FROM {table} ORDER BY seq LIMIT ?)",
+            (count,),
+        )
+        await cursor.close()
+        return cursor.rowcount
+
+    async def drop_expired(self, now: datetime | None = None) -> int:
+        """Drop expired partitions immediately. Returns the number of entries removed."""
+        await self.open()
+        assert self._db is not None
+        await self._flush()
+        now = now or datetime.now(timezone.utc)
+        cutoff_s = _to_us(now - self.retention) // 1_000_000
+        expired = [
+            b for b in self._partitions if (b + 1) * self.partition_seconds <= cutoff_s
+        ]
+        if not expired:
+            return 0
+
+        removed = 0
+        async with self._write_lock:
+            for bucket in expired:
+                async with self._db.execute(
+                    f"SELECT count(*) FROM {self._table(bucket)}"
+                ) as cursor:
+                    (count,) = await cursor.fetchone()
+                removed += count
+                await self._drop_partition(bucket)
+            await self._db.commit()
+        self._count -= removed
+        self.evictions.add(removed)
+        logger.debug("Dropped %d expired log partition(s), %d entries", len(expired), removed)
+        return removed
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _table(bucket: int) -> str:
+        return f"logs_{bucket}"
+
+    async def _fetch(self, sql: str, args: list[Any]) -> list[Any]:
+        assert self._db is not None
+        async with self._db.execute(sql, args) as cursor:
+            return list(await cursor.fetchall())
+
+    async def _select(self, params: LogQueryParams) -> tuple[str | None, list[Any]]:
+        """Build a UNION ALL over the partitions that can hold matching rows.
+
+        Returns (None, []) when no partition can match.
+        """
+        await self.open()
+        await self._flush()
+        params, query = resolve_query(params)
+
+        clauses: list[str] = []
+        args: list[Any] = []
+        for column, value in (
+            ("device_id", params.device_id),
+            ("process", params.process),
+            ("subsystem", params.subsystem),
+        ):
+            if value:
+                clauses.append(f"{column} = ?")
+                args.append(value)
+        if params.source:
+            clauses.append("source = ?")
+            args.append(params.source.value)
+        if params.level is not None:
+            clauses.append("level >= ?")
+            args.append(_LEVEL_RANK[params.level])
+        if params.since:
+            clauses.append("ts_us >= ?")
+            args.append(_to_us(params.since))
+        if params.until:
+            clauses.append("ts_us <= ?")
+            args.append(_to_us(params.until))
+        if params.after_seq is not None:
+            clauses.append("seq > ?")
+            args.append(params.after_seq)
+
+        search = params.search or ""
+        # FTS trigram phrases only narrow candidates; the instr() and REGEXP
+        # checks decide the match
+        fts_terms: list[str] = []
+        if search:
+            clauses.append("instr(lower(message), ?) > 0")
+            args.append(search.lower())
+            if self._fts and len(search) >= 3:
+                fts_terms.append(search)
+        if params.regex:
+            clauses.append("message REGEXP ?")
+            args.append(params.regex)
+            if self._fts:
+                fts_terms.extend(required_literals(params.regex))
+        if query is not None:
+            clause, query_args = query.to_sql()
+            clauses.append(clause)
+            args.extend(query_args)
+        fts_query = " AND ".join(_fts_phrase(term) for term in fts_terms)
+
+        lo = _to_us(params.since) // 1_000_000 // self.partition_seconds if params.since else None
+        hi = _to_us(params.until) // 1_000_000 // self.partition_seconds if params.until else None
+        buckets = [
+            b for b in sorted(self._partitions)
+            if (lo is None or b >= lo) and (hi is None or b <= hi)
+        ]
+        if not buckets:
+            return None, []
+
+        selects: list[str] = []
+        all_args: list[Any] = []
+        for bucket in buckets:
+            table = self._table(bucket)
+            where = list(clauses)
+            part_args = list(args)
+            if fts_query:
+                where.append(f"seq IN (SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH ?)")
+                part_args.append(fts_query)
+            sql = f"SELECT {_COLUMNS} FROM {table}"
+            if where:
+                sql += " WHERE " + " AND ".join(where)
+            selects.append(sql)
+            all_args.extend(part_args)
+
+        return " UNION ALL ".join(selects), all_args
@@ -0,0 +1,260 @@
+"""Trigram index over log messages for substring and regex search.
+
+The index maps every lowercased 3-character substring ("trigram") of a
+message to the buffer blocks containing it. A block is a run of BLOCK_SIZE
+consecutive buffer positions, so a common trigram costs one posting per block
+rather than one per entry — memory stays a small fraction of the buffer even
+for 100k+ entries.
+
+A search for "timeout" looks up the blocks holding each of "tim", "ime",
+"meo", "eou" and "out", intersects them, and only verifies entries inside the
+surviving blocks. Regex searches use the same machinery with the literal
+substrings every match must contain (see required_literals).
+
+Postings are appended in block order and trimmed from the left as the buffer
+evicts whole blocks, mirroring the per-field posting lists in RingBuffer.
+Trimming is batched (see TrigramIndex.evict_before) so the index doesn't have
+to remember which trigrams each block contained.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import deque
+from collections.abc import Iterable
+
+BLOCK_SIZE = 64
+
+_QUANTIFIER_RE = re.compile(r"\{(\d*)(,?)(\d*)\}")
+_VERBOSE_FLAG_RE = re.compile(r"\(\?[a-zA-Z]*x")
+
+
+def trigrams(text: str) -> set[str]:
+    """Return the set of 3-character substrings of already-lowercased text."""
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """Block-granular trigram postings for a position-addressed buffer."""
+
+    def __init__(self) -> None:
+        self._postings: dict[str, deque[int]] = {}
+        self._first_live = 0
+        self._swept_to = 0
+        self._live_blocks = 0
+        self._block = -1
+
+    def add(self, pos: int, message: str) -> None:
+        """Index the message stored at a buffer position."""
+        block = pos // BLOCK_SIZE
+        if block != self._block:
+            # Reuse one int object for every posting in the block
+            self._block = block
+            self._live_blocks += 1
+        block = self._block
+        postings = self._postings
+        for gram in trigrams(message.lower()):
+            blocks = postings.get(gram)
+            if blocks is None:
+                postings[gram] = blocks = deque()
+            elif blocks[-1] == block:
+                continue
+            blocks.append(block)
+
+    def evict_before(self, head: int) -> None:
+        """Drop every block that lies entirely before the buffer head.
+
+        Evicted blocks are hidden immediately but only removed from the
+        postings in periodic sweeps, once the stale blocks add up to half
+        the live ones — keeping per-block trigram sets around just to trim
+        eagerly would cost more memory than the postings themselves.
+        """
+        first_live = head // BLOCK_SIZE
+        if first_live <= self._first_live:
+            return
+        self._live_blocks -= first_live - self._first_live
+        self._first_live = first_live
+        if first_live - self._swept_to < max(self._live_blocks // 2, 16):
+            return
+        stale: list[str] = []
+        for gram, blocks in self._postings.items():
+            while blocks and blocks[0] < first_live:
+                blocks.popleft()
+            if not blocks:
+                stale.append(gram)
+        for gram in stale:
+            del self._postings[gram]
+        self._swept_to = first_live
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._first_live = 0
+        self._swept_to = 0
+        self._live_blocks = 0
+        self._block = -1
+
+    def candidate_blocks(self, literals: Iterable[str]) -> list[int] | None:
+        """Return the live blocks that may contain every literal, in order.
+
+        Returns None when no literal is long enough to use the index (the
+        caller must scan everything) and [] when some trigram is absent
+        from the buffer entirely.
+        """
+        grams: set[str] = set()
+        for literal in literals:
+            grams |= trigrams(literal.lower())
+        if not grams:
+            return None
+
+        lists: list[deque[int]] = []
+        for gram in grams:
+            blocks = self._postings.get(gram)
+            if blocks is None:
+                return []
+            lists.append(blocks)
+
+        lists.sort(key=len)
+        first_live = self._first_live
+        others = [set(blocks) for blocks in lists[1:]]
+        return [
+            b for b in lists[0]
+            if b >= first_live and all(b in other for other in others)
+        ]
+
+
+def required_literals(pattern: str) -> list[str]:
+    """Extract literal substrings that every match of a regex must contain.
+
+    Deliberately conservative: anything it doesn't fully understand
+    (alternation, groups, classes, verbose mode) just ends the current literal
+    run, so the result may be empty but never excludes a true match.
+    """
+    if "|" in pattern or _VERBOSE_FLAG_RE.search(pattern):
+        return []
+
+    literals: list[str] = []
+    current: list[str] = []
+
+    def flush() -> None:
+        if current:
+            literals.append("".join(current))
+            current.clear()
+
+    i = 0
+    n = len(pattern)
+    while i < n:
+        ch = pattern[i]
+        if ch == "\\":
+            nxt = pattern[i + 1] if i + 1 < n else ""
+            if not nxt or nxt.isalnum():
+                # \d, \w, \b, \x41, backreferences, ... — not a literal
+                flush()
+                i = _skip_escape(pattern, i)
+                i = _skip_quantifier(pattern, i)[0]
+                continue
+            literal = nxt
+            i += 2
+        elif ch == "[":
+            flush()
+            i = _skip_class(pattern, i)
+            i = _skip_quantifier(pattern, i)[0]
+            continue
+        elif ch == "(":
+            flush()
+            i = _skip_group(pattern, i)
+            i = _skip_quantifier(pattern, i)[0]
+            continue
+        elif ch in ".^$)*+?{":
+            flush()
+            i += 1
+            continue
+        else:
+            literal = ch
+            i += 1
+
+        i, min_repeat = _skip_quantifier(pattern, i)
+        if min_repeat is None:
+            current.append(literal)
+        elif min_repeat == 0:
+            flush()
+        else:
+            # Repeated char: it is present, but what follows isn't adjacent
+            current.append(literal)
+            flush()
+
+    flush()
+    return [lit for lit in literals if len(lit) >= 3]
+
+
+def _skip_quantifier(pattern: str, i: int) -> tuple[int, int | None]:
+    """Skip a quantifier at i. Returns (next index, minimum repeat or None)."""
+    if i >= len(pattern):
+        return i, None
+    ch = pattern[i]
+    if ch in "*?":
+        min_repeat = 0
+        i += 1
+    elif ch == "+":
+        min_repeat = 1
+        i += 1
+    elif ch == "{":
+        match = _QUANTIFIER_RE.match(pattern, i)
+        if not match or not (match.group(1) or match.group(2)):
+            return i, None
+        min_repeat = int(match.group(1) or 0)
+        i = match.end()
+    else:
+        return i, None
+    # Lazy / possessive modifiers
+    if i < len(pattern) and pattern[i] in "?+":
+        i += 1
+    return i, min_repeat
+
+
+def _skip_escape(pattern: str, i: int) -> int:
+    """Return the index just past the alphanumeric escape starting at i."""
+    kind = pattern[i + 1] if i + 1 < len(pattern) else ""
+    i += 2
+    if kind and kind in "xuU":
+        return i + {"x": 2, "u": 4, "U": 8}[kind]
+    if kind == "N":
+        end = pattern.find("}", i)
+        return len(pattern) if end < 0 else end + 1
+    if kind.isdigit():
+        # Backreference or octal escape
+        while i < len(pattern) and pattern[i].isdigit():
+            i += 1
+    return i
+
+
+def _skip_class(pattern: str, i: int) -> int:
+    """Return the index just past the character class starting at i."""
+    i += 1
+    if i < len(pattern) and pattern[i] == "^":
+        i += 1
+    if i < len(pattern) and pattern[i] == "]":
+        i += 1
+    while i < len(pattern) and pattern[i] != "]":
+        i += 2 if pattern[i] == "\\" else 1
+    return i + 1
+
+
+def _skip_group(pattern: str, i: int) -> int:
+    """Return the index just past the group starting at i."""
+    depth = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch == "[":
+            i = _skip_class(pattern, i)
+            continue
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
@@ -0,0 +1,111 @@
+"""Tests for streaming template-rate anomaly detection."""
+
+from datetime import datetime, timedelta, timezone
+
+from server.models import LogEntry, LogLevel, LogSource, NoiseAction
+from server.processing.anomalies import TemplateRates
+from server.processing.summarizer import generate_summary
+from server.processing.templates import TemplateMiner
+
+BASE = datetime(2026, 2, 7, 14, 0, 0, tzinfo=timezone.utc)
+
+
+def _make_entry(
+    message: str, offset: float, process: str = "MyApp", level: LogLevel = LogLevel.ERROR,
+) -> LogEntry:
+    return LogEntry(
+        id="test",
+        timestamp=BASE + timedelta(seconds=offset),
+        process=process,
+        level=level,
+        message=message,
+        source=LogSource.SYSLOG,
+    )
+
+
+def _feed(rates: TemplateRates, entries: list[LogEntry]) -> None:
+    assert rates.templates is not None
+    for entry in sorted(entries, key=lambda e: e.timestamp):
+        rates.templates.assign(entry)
+        rates.add(entry)
+
+
+def _steady(message: str, start: float, end: float, per_minute: float, **kwargs) -> list[LogEntry]:
+    step = 60 / per_minute
+    count = int((end - start) / step)
+    return [_make_entry(message.format(i=i), start + i * step, **kwargs) for i in range(count)]
+
+
+def test_spike_against_baseline():
+    rates = TemplateRates(templates=TemplateMiner())
+    # 10 minutes at 1/min, then 40/min for 30 seconds
+    _feed(rates, _steady("Connection {i} timed out", 0, 600, per_minute=1))
+    assert rates.anomalies(now=BASE + timedelta(seconds=600)) == []
+    _feed(rates, _steady("Connection {i} timed out", 600, 630, per_minute=40))
+
+    (anomaly,) = rates.anomalies(now=BASE + timedelta(seconds=630))
+    assert anomaly.kind == "spike"
+    assert anomaly.process == "MyApp"
+    assert anomaly.template == "Connection <*> timed out"
+    assert anomaly.level == LogLevel.ERROR
+    assert 600 <= (anomaly.started_at - BASE).total_seconds() < 630
+    assert 0.8 <= anomaly.baseline_per_minute <= 1.5
+    assert anomaly.rate_per_minute >= 30
+    assert anomaly.ratio >= 20
+
+    # A minute later it has subsided
+    assert rates.anomalies(now=BASE + timedelta(seconds=700)) == []
+
+
+def test_steady_rate_is_not_a_spike():
+    rates = TemplateRates(templates=TemplateMiner())
+    _feed(rates, _steady("Frame {i} dropped", 0, 1200, per_minute=120))
+    assert rates.anomalies(now=BASE + timedelta(seconds=1200)) == []
+
+
+def test_new_templates_after_warmup():
+    rates = TemplateRates(templates=TemplateMiner(), warmup=60, new_seconds=300)
+    _feed(rates, [_make_entry("Startup chatter", 0), _make_entry("More startup", 30)])
+    _feed(rates, [_make_entry("Keychain item missing", 200, level=LogLevel.WARNING)])
+
+    (anomaly,) = rates.anomalies(now=BASE + timedelta(seconds=260))
+    assert (anomaly.kind, anomaly.template, anomaly.count) == ("new", "Keychain item missing", 1)
+    assert anomaly.started_at == anomaly.first_seen == BASE + timedelta(seconds=200)
+    assert rates.anomalies(now=BASE + timedelta(seconds=260), process="Other") == []
+
+    assert rates.anomalies(now=BASE + timedelta(seconds=600)) == []
+
+
+def test_skips_excluded_noise_and_unmined_entries():
+    rates = TemplateRates(templates=TemplateMiner(), warmup=0)
+    noisy = _make_entry("tcp_connection event", 0)
+    noisy.template_id = 1
+    noisy.noise = NoiseAction.EXCLUDE
+    rates.add(noisy)
+    rates.add(_make_entry("not mined", 1))
+    assert len(rates) == 0
+
+
+def test_summary_reports_anomalies():
+    rates = TemplateRates(templates=TemplateMiner(), warmup=0)
+    entries = [_make_entry("Disk full", 0)]
+    _feed(rates, entries)
+    anomalies = rates.anomalies(now=BASE + timedelta(seconds=5))
+
+    summary = generate_summary(entries, window="1h", anomalies=anomalies)
+    assert summary.anomalies == anomalies
+    assert "Anomalies: new: Disk full from MyApp, first seen" in summary.summary
+    assert generate_summary(entries, window="1h").anomalies == []
+
+
+def test_future_timestamps_are_capped_at_wall_clock():
+    rates = TemplateRates(templates=TemplateMiner(), warmup=0, new_seconds=300)
+    now = datetime.now(timezone.utc)
+    ahead = _make_entry("Keychain item missing", 0)
+    ahead.timestamp = now + timedelta(days=1)
+    _feed(rates, [ahead])
+
+    (anomaly,) = rates.anomalies(now=now)
+    assert anomaly.first_seen <= now + timedelta(seconds=61)
+    # It stops counting as new once new_seconds pass, not a day later
+    assert rates.anomalies(now=now + timedelta(seconds=400)) == []
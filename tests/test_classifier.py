@@ -69,6 +69,25 @@ def test_extract_pattern_same_template_for_variants():
     assert a == b
 
 
+def test_extract_pattern_collapses_number_runs():
+    assert extract_pattern("frame = (0 0; 375 812)") == "frame = (<N> ; <N> )"
+    assert extract_pattern("Retrying in 1.5, 3, 6 seconds") == "Retrying in <N> seconds"
+
+
+def test_extract_pattern_token_precedence():
+    """UUIDs, hex and IPs win over the numbers inside them."""
+    path = "/Application/0A1B2C3D-1234-5678-9ABC-DEF012345678/MyApp.app"
+    assert extract_pattern(path) == "/Application/<UUID>/MyApp.app"
+    assert extract_pattern("ptr 0x7f8a at 10.0.0.1 id 7") == "ptr <HEX> at <IP> id <N>"
+
+
+def test_extract_pattern_is_cached():
+    extract_pattern.cache_clear()
+    extract_pattern("Request 123 failed")
+    extract_pattern("Request 123 failed")
+    assert extract_pattern.cache_info().hits == 1
+
+
 # ---------------------------------------------------------------------------
 # Noise detection
 # ---------------------------------------------------------------------------
@@ -142,3 +161,15 @@ def test_detect_resolution_different_processes_not_resolved():
     ]
     resolutions = detect_resolution(entries)
     assert len(resolutions) == 0
+
+
+def test_detect_resolution_process_names_with_colons():
+    """Process names containing ':' don't leak into patterns or match prefixes."""
+    entries = [
+        _make_entry("fetch failed", process="App:Widget", level=LogLevel.ERROR, timestamp=_ts(0)),
+        _make_entry("fetch failed", process="App", level=LogLevel.ERROR, timestamp=_ts(1)),
+        _make_entry("sync completed", process="App", timestamp=_ts(2)),
+    ]
+    resolutions = detect_resolution(entries)
+    assert [r["error_pattern"] for r in resolutions] == ["fetch failed"]
+    assert resolutions[0]["first_error"] == _ts(1).isoformat()
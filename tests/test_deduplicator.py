@@ -177,3 +177,85 @@ async def test_single_occurrence_no_summary_on_flush():
     # Only the original entry, no summary
     assert len(emitted) == 1
     assert emitted[0].repeat_count == 1
+
+
+@pytest.mark.asyncio
+async def test_process_many_matches_per_entry_processing():
+    """A batch yields the same entries, in order, as processing one at a time."""
+    entries = [
+        _make_entry("error A", timestamp=_ts(0)),
+        _make_entry("error A", timestamp=_ts(1)),
+        _make_entry("error B", timestamp=_ts(2)),
+        _make_entry("error A", timestamp=_ts(10)),  # window expired → summary, then new
+        _make_entry("error B", timestamp=_ts(11)),
+    ]
+
+    single: list[LogEntry] = []
+
+    async def capture(entry: LogEntry) -> None:
+        single.append(entry)
+
+    dedup = Deduplicator(on_entry=capture, window_seconds=5.0)
+    for entry in entries:
+        await dedup.process(entry)
+
+    batches: list[list[LogEntry]] = []
+
+    async def capture_batch(batch: list[LogEntry]) -> None:
+        batches.append(batch)
+
+    batched = Deduplicator(on_batch=capture_batch, window_seconds=5.0)
+    await batched.process_many(entries)
+
+    assert len(batches) == 1
+    assert [(e.message, e.repeat_count, e.timestamp) for e in batches[0]] == [
+        (e.message, e.repeat_count, e.timestamp) for e in single
+    ]
+    assert [(e.message, e.repeat_count) for e in single] == [
+        ("error A", 1),
+        ("error B", 1),
+        ("error A", 1),  # summary of the suppressed repeat
+        ("error A", 1),
+        ("error B", 1),
+    ]
+    assert single[2].timestamp == _ts(1)
+
+
+@pytest.mark.asyncio
+async def test_repeats_extend_window():
+    """A repeat pushes expiry back to window_seconds after the latest copy."""
+    emitted: list[LogEntry] = []
+
+    async def capture(entry: LogEntry) -> None:
+        emitted.append(entry)
+
+    dedup = Deduplicator(on_entry=capture, window_seconds=5.0)
+    await dedup.process(_make_entry("error A", timestamp=_ts(0)))
+    await dedup.process(_make_entry("error A", timestamp=_ts(4)))
+    await dedup.process(_make_entry("error B", timestamp=_ts(6)))
+    assert [e.message for e in emitted] == ["error A", "error B"]
+
+    await dedup.process(_make_entry("error C", timestamp=_ts(9)))
+    assert [(e.message, e.repeat_count) for e in emitted] == [
+        ("error A", 1), ("error B", 1), ("error A", 1), ("error C", 1),
+    ]
+    assert emitted[2].timestamp == _ts(4)
+
+
+@pytest.mark.asyncio
+async def test_expiry_follows_timestamps_going_backwards():
+    """A repeat stamped earlier (another clock) moves the deadline earlier too."""
+    emitted: list[LogEntry] = []
+
+    async def capture(entry: LogEntry) -> None:
+        emitted.append(entry)
+
+    dedup = Deduplicator(on_entry=capture, window_seconds=5.0)
+    await dedup.process(_make_entry("error A", timestamp=_ts(10)))
+    await dedup.process(_make_entry("error A", timestamp=_ts(2)))
+    await dedup.process(_make_entry("error B", timestamp=_ts(7)))
+
+    assert [(e.message, e.repeat_count) for e in emitted] == [
+        ("error A", 1), ("error A", 1), ("error B", 1),
+    ]
+    assert len(dedup._buckets) == 1
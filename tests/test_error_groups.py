@@ -0,0 +1,106 @@
+"""Tests for incrementally maintained error/warning pattern groups."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from server.models import LogEntry, LogLevel, LogSource
+from server.processing.error_groups import ErrorGroups
+from server.processing.summarizer import generate_rollup_summary, generate_summary
+from server.storage.partitioned import PartitionedLogStore
+
+_BASE = datetime(2026, 2, 7, 14, 0, 0, tzinfo=timezone.utc)
+
+_MESSAGES = [
+    (LogLevel.ERROR, "Connection failed to 10.0.0.{i}:443"),
+    (LogLevel.WARNING, "Slow frame took {i} ms"),
+    (LogLevel.INFO, "Connection succeeded"),
+    (LogLevel.FAULT, "Disk full on volume {i}"),
+    (LogLevel.DEBUG, "Heartbeat {i}"),
+    (LogLevel.ERROR, "Token expired for user {i}"),
+    (LogLevel.INFO, "Sync completed"),
+]
+
+
+def _make_entry(i: int, device_id: str = "sim-1", process: str = "MyApp") -> LogEntry:
+    level, template = _MESSAGES[i % len(_MESSAGES)]
+    return LogEntry(
+        id=f"grp{i}",
+        timestamp=_BASE + timedelta(seconds=i),
+        device_id=device_id,
+        process=process,
+        level=level,
+        message=template.format(i=i),
+        source=LogSource.SIMULATOR,
+        repeat_count=1 + i % 3,
+    )
+
+
+def _comparable(summary):
+    data = summary.model_dump(exclude={"generated_at", "cursor"})
+    data["top_issues"] = sorted(data["top_issues"], key=lambda i: i["pattern"])
+    return data
+
+
+@pytest.mark.asyncio
+async def test_groups_match_entry_summary_across_evictions():
+    store = PartitionedLogStore(max_size=60, quota=15)
+    groups = ErrorGroups()
+    store.add_listener(groups.add)
+    store.add_evict_listener(groups.remove)
+
+    devices = ["sim-1", "sim-1", "sim-1", "sim-2", "device-a"]
+    processes = ["MyApp", "Auth", "SpringBoard"]
+    for i in range(400):
+        await store.append(_make_entry(
+            i, device_id=devices[i % len(devices)], process=processes[i % 7 % 3],
+        ))
+
+    stored = await store.get_after_seq(0)
+    assert len(groups) == len(stored) == store.size
+    for cursor in (None, stored[0].seq, stored[len(stored) // 2].seq, stored[-1].seq):
+        entries = [e for e in stored if cursor is None or e.seq > cursor]
+        for process in (None, "MyApp", "Auth"):
+            expected = generate_summary(entries, process=process)
+            actual = generate_rollup_summary(groups.since_seq(cursor), process=process)
+            assert _comparable(actual) == _comparable(expected), (cursor, process)
+
+
+def test_remove_handles_out_of_order_entries():
+    groups = ErrorGroups()
+    entries = [_make_entry(i) for i in range(0, 14)]
+    for seq, entry in enumerate(entries, start=1):
+        entry.seq = seq
+    # Stores' listeners may interleave slightly out of seq order
+    for entry in entries[7:] + entries[:7]:
+        groups.add(entry)
+    for entry in entries[3:10]:
+        groups.remove(entry)
+
+    remaining = entries[:3] + entries[10:]
+    assert len(groups) == len(remaining)
+    expected = generate_summary(remaining)
+    assert _comparable(generate_rollup_summary(groups.since_seq())) == _comparable(expected)
+
+    for entry in remaining:
+        groups.remove(entry)
+    assert len(groups) == 0
+    assert generate_rollup_summary(groups.since_seq()).total_count == 0
+
+
+def test_series_suffix_stats_with_skewed_timestamps():
+    from server.processing.error_groups import _SeqSeries
+
+    series = _SeqSeries()
+    stamps = [(i * 7919) % 50 for i in range(2500)]
+    for seq, ts in enumerate(stamps, start=1):
+        series.add(seq, ts, 1)
+    # Evict past the compaction threshold, then check every suffix by brute force
+    for seq in range(1, 1201):
+        series.remove(seq)
+    pairs = list(zip(stamps, range(1, len(stamps) + 1)))
+    for cursor in range(1200, len(stamps), 37):
+        i = series.start_after(cursor)
+        assert series.last_from(i) == max(pairs[cursor:])
+        assert series.first_from(i) == min(pairs[cursor:])
+        assert series.count_from(i) == len(stamps) - cursor
@@ -0,0 +1,138 @@
+"""Tests for the shared SSE fan-out hub."""
+
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from server.models import LogEntry, LogLevel, LogSource, LogStreamParams
+from server.storage.fanout import FanoutHub, compile_stream_filter
+from server.storage.ring_buffer import RingBuffer
+
+
+def _make_entry(
+    message: str = "test message",
+    level: LogLevel = LogLevel.INFO,
+    process: str = "TestApp",
+    source: LogSource = LogSource.SYSLOG,
+) -> LogEntry:
+    return LogEntry(
+        id="fan123",
+        timestamp=datetime.now(timezone.utc),
+        process=process,
+        level=level,
+        message=message,
+        source=source,
+    )
+
+
+def test_compile_stream_filter():
+    matches = compile_stream_filter(LogStreamParams(
+        level=LogLevel.WARNING, process="MyApp", match="TIMEOUT", exclude="retry",
+    ))
+    assert matches(_make_entry("Request timeout", level=LogLevel.ERROR, process="MyApp"))
+    assert not matches(_make_entry("Request timeout", level=LogLevel.INFO, process="MyApp"))
+    assert not matches(_make_entry("Request timeout", level=LogLevel.ERROR, process="Other"))
+    assert not matches(_make_entry("timeout, will retry", level=LogLevel.ERROR, process="MyApp"))
+
+
+
+def test_compile_stream_filter_with_query():
+    matches = compile_stream_filter(LogStreamParams(
+        process="MyApp", q="level>=error OR message:crash",
+    ))
+    assert matches(_make_entry("Request failed", level=LogLevel.ERROR, process="MyApp"))
+    assert matches(_make_entry("About to crash", process="MyApp"))
+    assert not matches(_make_entry("All good", process="MyApp"))
+    assert not matches(_make_entry("About to crash", process="Other"))
+
+
+@pytest.mark.asyncio
+async def test_identical_filters_share_a_group():
+    hub = FanoutHub()
+    a = hub.subscribe(LogStreamParams(process="MyApp"))
+    b = hub.subscribe(LogStreamParams(process="MyApp"))
+    c = hub.subscribe(LogStreamParams(level=LogLevel.ERROR))
+    assert hub.stats().filter_groups == 2
+
+    hub.publish(_make_entry("hello", process="MyApp"))
+    for sub in (a, b):
+        batch, dropped = await sub.next_batch(max_batch=10, timeout=0.1)
+        assert [e.message for e in batch] == ["hello"] and dropped == 0
+    assert await c.next_batch(max_batch=10, timeout=0.01) == ([], 0)
+
+    hub.unsubscribe(a)
+    hub.unsubscribe(b)
+    hub.unsubscribe(c)
+    assert hub.stats().filter_groups == 0
+
+
+@pytest.mark.asyncio
+async def test_batches_and_counts_drops_without_unsubscribing():
+    hub = FanoutHub(max_pending=5, max_batch=3)
+    sub = hub.subscribe(LogStreamParams())
+
+    for i in range(8):
+        hub.publish(_make_entry(f"msg {i}"))
+
+    batch, dropped = await sub.next_batch(hub.max_batch, timeout=0.1)
+    assert [e.message for e in batch] == ["msg 0", "msg 1", "msg 2"]
+    assert dropped == 3
+    batch, dropped = await sub.next_batch(hub.max_batch, timeout=0.1)
+    assert [e.message for e in batch] == ["msg 3", "msg 4"]
+    assert dropped == 0
+
+    # Still subscribed: new entries keep flowing
+    hub.publish(_make_entry("after"))
+    batch, _ = await sub.next_batch(hub.max_batch, timeout=0.1)
+    assert [e.message for e in batch] == ["after"]
+
+    stats = hub.stats()
+    assert stats.published == 9
+    assert stats.dropped == 3
+    assert stats.subscribers[0].delivered == 6
+    assert stats.subscribers[0].pending == 0
+
+
+@pytest.mark.asyncio
+async def test_next_batch_wakes_on_publish():
+    hub = FanoutHub()
+    sub = hub.subscribe(LogStreamParams())
+
+    async def publish_later():
+        await asyncio.sleep(0.01)
+        hub.publish(_make_entry("late"))
+
+    task = asyncio.create_task(publish_later())
+    batch, _ = await sub.next_batch(hub.max_batch, timeout=1.0)
+    await task
+    assert [e.message for e in batch] == ["late"]
+
+
+@pytest.mark.asyncio
+async def test_ring_buffer_listener_feeds_hub():
+    buf = RingBuffer(max_size=10)
+    hub = FanoutHub()
+    buf.add_listener(hub.publish)
+    sub = hub.subscribe(LogStreamParams(source=LogSource.SYSLOG))
+
+    await buf.append(_make_entry("stored"))
+    batch, _ = await sub.next_batch(hub.max_batch, timeout=0.1)
+    assert batch[0].message == "stored"
+    assert batch[0].seq == buf.last_seq
+
+    buf.remove_listener(hub.publish)
+    await buf.append(_make_entry("not published"))
+    assert hub.stats().published == 1
+
+
+def test_dropped_total_counts_disconnected_subscribers():
+    hub = FanoutHub(max_pending=1)
+    subscriber = hub.subscribe(LogStreamParams())
+    for i in range(3):
+        hub.publish(_make_entry(f"m{i}"))
+    assert hub.dropped_total == 2
+
+    hub.unsubscribe(subscriber)
+    assert hub.stats().dropped == 0
+    assert hub.dropped_total == 2
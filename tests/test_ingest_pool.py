@@ -0,0 +1,151 @@
+"""Tests for the multi-process ingest pool."""
+
+import asyncio
+
+import pytest
+
+from server.models import LogEntry, LogLevel, LogSource, NoiseAction
+from server.processing.deduplicator import Deduplicator
+from server.processing.ingest_pool import IngestPool
+from server.processing.noise import NoiseFilter
+from server.processing.rate_limit import RateLimiter
+from server.sources.simulator_log import SimulatorLogAdapter
+from server.sources.syslog import SyslogAdapter
+
+SAMPLE_UDID = "43B500A9-1234-5678-9ABC-DEF012345678"
+
+
+def _syslog_lines(count: int) -> list[bytes]:
+    return [
+        f"Feb  7 14:23:{i % 60:02d} iPhone MyApp[12] <Error>: request {i % 4} failed".encode()
+        for i in range(count)
+    ]
+
+
+def _fields(entries: list[LogEntry]) -> list[tuple]:
+    return [(e.process, e.pid, e.level, e.message, e.repeat_count) for e in entries]
+
+
+@pytest.fixture
+async def pool():
+    emitted: list[LogEntry] = []
+
+    async def on_batch(entries: list[LogEntry]) -> None:
+        emitted.extend(entries)
+
+    pool = IngestPool(workers=2, on_batch=on_batch)
+    pool.emitted = emitted
+    pool.start()
+    yield pool
+    await pool.stop()
+
+
+@pytest.mark.asyncio
+async def test_matches_in_process_parse(pool):
+    lines = _syslog_lines(250)
+    local = SyslogAdapter(device_id="iphone")
+    expected = local.parse_lines(lines[:100]) + local.parse_lines(lines[100:])
+
+    adapter = SyslogAdapter(device_id="iphone", ingest_pool=pool)
+    await adapter.emit_lines(lines[:100])
+    await adapter.emit_lines(lines[100:])
+    await pool.release(adapter)
+
+    assert _fields(pool.emitted) == _fields(expected)
+    assert {e.device_id for e in pool.emitted} == {"iphone"}
+    assert {e.source for e in pool.emitted} == {LogSource.SYSLOG}
+    assert adapter.entries_captured == len(expected)
+    assert pool.lines_submitted == 250
+
+
+@pytest.mark.asyncio
+async def test_parser_state_carries_across_chunks(pool):
+    adapter = SimulatorLogAdapter(udid=SAMPLE_UDID, ingest_pool=pool)
+    await adapter.emit_chunk(b'[{\n  "eventMessage" : "hello pretty",\n')
+    await adapter.emit_chunk(
+        b'  "eventType" : "logEvent",\n'
+        b'  "messageType" : "Error",\n'
+        b'  "processImagePath" : "/path/to/TestApp"\n'
+        b'}]\n'
+    )
+    await pool.release(adapter)
+
+    (entry,) = pool.emitted
+    assert (entry.message, entry.process) == ("hello pretty", "TestApp")
+    assert entry.level == LogLevel.ERROR
+    assert entry.source == LogSource.SIMULATOR
+
+
+@pytest.mark.asyncio
+async def test_raw_chunks_are_parsed_in_workers(pool):
+    adapter = SimulatorLogAdapter(udid=SAMPLE_UDID, ingest_pool=pool)
+    stream = (
+        b'[{\n  "eventMessage" : "first",\n  "eventType" : "logEvent"\n},'
+        b'{\n  "eventMessage" : "second",\n  "eventType" : "logEvent"\n}]\n'
+    )
+    for i in range(0, len(stream), 16):
+        await adapter.emit_chunk(stream[i:i + 16])
+    await pool.release(adapter)
+
+    assert [e.message for e in pool.emitted] == ["first", "second"]
+    assert adapter.lines_read == pool.lines_submitted == stream.count(b"\n")
+
+
+def _pipeline(stored: list[LogEntry]) -> NoiseFilter:
+    """noise filter → rate limiter → deduplicator → stored, as create_app wires it."""
+    async def store(entries: list[LogEntry]) -> None:
+        stored.extend(entries)
+
+    dedup = Deduplicator(on_batch=store)
+    limiter = RateLimiter(on_batch=dedup.process_many, rate=1, burst=3, sample_every=0)
+    noise = NoiseFilter(on_batch=limiter.process_many)
+    noise.set_pattern("tick", "tick", NoiseAction.DROP)
+    return noise
+
+
+@pytest.mark.asyncio
+async def test_pooled_entries_take_the_in_process_pipeline():
+    lines = [
+        f"Feb  7 14:23:01 iPhone MyApp[12] <Notice>: {msg}".encode()
+        for msg in ["tick", "same", "same", "tick", "same", "other", "same", "last"]
+    ]
+    local_stored: list[LogEntry] = []
+    local = SyslogAdapter(device_id="a", on_batch=_pipeline(local_stored).process_many)
+    await local.emit_lines(lines)
+
+    pooled_stored: list[LogEntry] = []
+    pool = IngestPool(workers=1, on_batch=_pipeline(pooled_stored).process_many)
+    pool.start()
+    try:
+        adapter = SyslogAdapter(device_id="a", ingest_pool=pool)
+        await adapter.emit_lines(lines)
+        await pool.release(adapter)
+    finally:
+        await pool.stop()
+
+    # Noise is dropped first and the limiter's 3 tokens go to the repeats before
+    # they're folded, so "other" and "last" are suppressed
+    assert [e.message for e in local_stored] == ["same"]
+    assert _fields(pooled_stored) == _fields(local_stored)
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_callback_keeps_the_stream_draining():
+    calls = 0
+
+    async def on_batch(entries: list[LogEntry]) -> None:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("store failed")
+
+    pool = IngestPool(workers=1, on_batch=on_batch, max_in_flight=1)
+    pool.start()
+    try:
+        adapter = SyslogAdapter(device_id="a", ingest_pool=pool)
+        for i in range(5):
+            await asyncio.wait_for(adapter.emit_lines(_syslog_lines(3)), timeout=30)
+        await pool.release(adapter)
+    finally:
+        await pool.stop()
+    assert calls == 5
@@ -1,5 +1,6 @@
 """Integration tests — create app, inject entries, query endpoints."""
 
+import json
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
@@ -8,7 +9,7 @@ from httpx import ASGITransport, AsyncClient
 
 from server.config import ServerConfig
 from server.main import create_app
-from server.models import LogEntry, LogLevel, LogSource
+from server.models import LogEntry, LogLevel, LogSource, LogStreamParams
 from server.models import FlowRecord, FlowRequest, FlowResponse, FlowTiming
 from server.proxy.flow_store import FlowStore
 
@@ -167,6 +168,155 @@ async def test_summary_cursor_delta(app, auth_headers):
         assert data2["total_count"] == 1
 
 
+@pytest.mark.asyncio
+async def test_summary_cursor_delta_same_timestamp(app, auth_headers):
+    """Entries sharing the cursor's timestamp still show up in the next delta."""
+    buffer = app.state.ring_buffer
+    server_buffer = app.state.server_buffer
+
+    now = datetime.now(timezone.utc)
+    await buffer.append(_make_entry("first", timestamp=now))
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp1 = await client.get(
+            "/api/v1/logs/summary", headers=auth_headers, params={"window": "5m"}
+        )
+        cursor = resp1.json()["cursor"]
+
+        # Same timestamp, in both buffers — a timestamp cursor would skip these
+        await buffer.append(_make_entry("second", timestamp=now))
+        await server_buffer.append(_make_entry("third", timestamp=now))
+
+        resp2 = await client.get(
+            "/api/v1/logs/summary",
+            headers=auth_headers,
+            params={"window": "5m", "since_cursor": cursor},
+        )
+        assert resp2.json()["total_count"] == 2
+
+        resp3 = await client.get(
+            "/api/v1/logs/summary",
+            headers=auth_headers,
+            params={"window": "5m", "since_cursor": resp2.json()["cursor"]},
+        )
+        assert resp3.json()["total_count"] == 0
+
+        last_seq = (await buffer.get_recent(1))[0].seq
+        resp = await client.get(
+            "/api/v1/logs/query",
+            headers=auth_headers,
+            params={"after_seq": last_seq - 1},
+        )
+        assert [e["message"] for e in resp.json()["entries"]] == ["second", "third"]
+
+
+@pytest.mark.asyncio
+async def test_query_response_uses_cached_json(app, auth_headers):
+    buffer = app.state.ring_buffer
+    await buffer.append(_make_entry("quoted \"text\"\nwith newline"))
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get(
+            "/api/v1/logs/query", headers=auth_headers, params={"source": "syslog"}
+        )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/json"
+    data = resp.json()
+    assert data["total"] == 1 and data["has_more"] is False
+    entry = LogEntry.model_validate(data["entries"][0])
+    assert entry.message == "quoted \"text\"\nwith newline"
+    assert entry.seq > 0
+
+
+def test_sse_log_event_matches_sse_starlette_encoding():
+    from sse_starlette.sse import ServerSentEvent
+
+    from server.api.logs import _sse_log_event
+
+    entry = _make_entry("line one\nline two")
+    expected = ServerSentEvent(data=entry.model_dump_json(), event="log").encode()
+    assert _sse_log_event(entry) == expected
+
+
+@pytest.mark.asyncio
+async def test_stream_stats_endpoint(app, auth_headers):
+    hub = app.state.log_hub
+    sub = hub.subscribe(LogStreamParams(process="MyApp"))
+    await app.state.ring_buffer.append(_make_entry("to the hub"))
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/api/v1/logs/stream/stats", headers=auth_headers)
+    hub.unsubscribe(sub)
+
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["published"] == 1
+    assert data["filter_groups"] == 1
+    assert data["subscribers"][0]["filter"] == {"process": "MyApp"}
+    assert data["subscribers"][0]["pending"] == 1
+
+
+@pytest.mark.asyncio
+async def test_histogram_endpoint(app, auth_headers):
+    now = datetime.now(timezone.utc) - timedelta(seconds=5)
+    await app.state.ring_buffer.append(_make_entry("a", level=LogLevel.ERROR, timestamp=now))
+    await app.state.ring_buffer.append(_make_entry("b", timestamp=now))
+    await app.state.server_buffer.append(_make_entry("c", timestamp=now))
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get(
+            "/api/v1/logs/histogram",
+            headers=auth_headers,
+            params={"window": "1m", "interval": "1s", "by": "level"},
+        )
+        bad = await client.get(
+            "/api/v1/logs/histogram", headers=auth_headers, params={"by": "thread"},
+        )
+
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["interval"] == "1s" and data["by"] == "level"
+    assert len(data["points"]) in (60, 61)
+    assert sum(p["total"] for p in data["points"]) == 3
+    assert [p["counts"] for p in data["points"] if p["total"]] == [{"error": 1, "info": 2}]
+    assert bad.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_export_endpoint_streams_ndjson(app, auth_headers):
+    for i in range(5):
+        await app.state.ring_buffer.append(_make_entry(f"device {i}"))
+    await app.state.server_buffer.append(_make_entry("server"))
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/api/v1/logs/export", headers=auth_headers)
+        lines = [json.loads(line) for line in resp.text.splitlines()]
+        assert resp.headers["content-type"] == "application/x-ndjson"
+        assert [e["message"] for e in lines][-1] == "server"
+        assert int(resp.headers["x-quern-export-seq"]) == lines[-1]["seq"]
+
+        resumed = await client.get(
+            "/api/v1/logs/export",
+            headers=auth_headers,
+            params={"after_seq": lines[2]["seq"], "compression": "gzip"},
+        )
+        assert resumed.headers["content-encoding"] == "gzip"
+        assert "quern-logs.ndjson.gz" in resumed.headers["content-disposition"]
+        assert [json.loads(line)["message"] for line in resumed.text.splitlines()] == [
+            "device 3", "device 4", "server",
+        ]
+
+        bad = await client.get(
+            "/api/v1/logs/export", headers=auth_headers, params={"compression": "lzma"},
+        )
+        assert bad.status_code == 422
+
+
 @pytest.mark.asyncio
 async def test_errors_endpoint(app, auth_headers):
     buffer = app.state.ring_buffer
@@ -665,3 +815,309 @@ async def test_query_source_syslog_skips_server_buffer(app, auth_headers):
         data = resp.json()
         assert data["total"] == 1
         assert data["entries"][0]["message"] == "device log"
+
+
+@pytest.mark.asyncio
+async def test_query_regex_and_invalid_regex(app, auth_headers):
+    await app.state.ring_buffer.append(_make_entry("timeout after 30ms"))
+    await app.state.ring_buffer.append(_make_entry("timeout after soon"))
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get(
+            "/api/v1/logs/query", headers=auth_headers, params={"regex": r"after \d+ms"},
+        )
+        assert resp.json()["total"] == 1
+
+        resp = await client.get(
+            "/api/v1/logs/query", headers=auth_headers, params={"regex": "("},
+        )
+        assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_query_language_endpoints(app, auth_headers):
+    buffer = app.state.ring_buffer
+    await buffer.append(_make_entry("Request timeout", level=LogLevel.ERROR))
+    await buffer.append(_make_entry("heartbeat", level=LogLevel.ERROR))
+    await buffer.append(_make_entry("Token expired", level=LogLevel.ERROR, process="Auth"))
+    await buffer.append(_make_entry("All good"))
+
+    q = "level>=error AND process:MyApp AND NOT message:heartbeat"
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/api/v1/logs/query", headers=auth_headers, params={"q": q})
+        assert [e["message"] for e in resp.json()["entries"]] == ["Request timeout"]
+
+        resp = await client.get("/api/v1/logs/errors", headers=auth_headers, params={"q": q})
+        assert [e["message"] for e in resp.json()["entries"]] == ["Request timeout"]
+
+        resp = await client.get(
+            "/api/v1/logs/summary", headers=auth_headers, params={"q": "process:Auth"},
+        )
+        assert resp.json()["total_count"] == 1
+
+        resp = await client.get(
+            "/api/v1/logs/query", headers=auth_headers, params={"q": "level>=loud"},
+        )
+        assert resp.status_code == 400
+        assert "Invalid query" in resp.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_templates_endpoint(app, auth_headers):
+    buffer = app.state.ring_buffer
+    for path in ("/tmp/a.json", "/tmp/b.json", "/tmp/c.json"):
+        await buffer.append(_make_entry(f"Failed to load {path} from cache"))
+    await buffer.append(_make_entry("Sync completed"))
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/api/v1/logs/templates", headers=auth_headers)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["total"] == 2
+        top = data["templates"][0]
+        assert (top["template"], top["count"]) == ("Failed to load <*> from cache", 3)
+        assert len(top["examples"]) == 3
+
+        resp = await client.get(
+            "/api/v1/logs/templates", headers=auth_headers, params={"search": "SYNC"},
+        )
+        assert [t["template"] for t in resp.json()["templates"]] == ["Sync completed"]
+
+        resp = await client.get(
+            "/api/v1/logs/query", headers=auth_headers, params={"q": f"template:{top['id']}"},
+        )
+        entries = resp.json()["entries"]
+        assert len(entries) == 3
+        assert {e["template_id"] for e in entries} == {top["id"]}
+
+
+@pytest.mark.asyncio
+async def test_noise_endpoints_and_summary_exclusion(app, auth_headers):
+    buffer = app.state.ring_buffer
+    noise = app.state.noise_filter
+    noise.on_entry = buffer.append
+    now = datetime.now(timezone.utc)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.post(
+            "/api/v1/logs/noise", headers=auth_headers,
+            json={"name": "heartbeat", "pattern": r"heartbeat \d+ missed", "action": "exclude"},
+        )
+        assert resp.status_code == 200
+        assert resp.json()["builtin"] is False
+
+        await noise.process(_make_entry("Heartbeat 4 missed", level=LogLevel.ERROR,
+                                        timestamp=now))
+        await noise.process(_make_entry("deny(1) mach-lookup com.apple.analyticsd",
+                                        timestamp=now + timedelta(seconds=1)))
+        await noise.process(_make_entry("HTTP 500 from /feed", level=LogLevel.ERROR,
+                                        timestamp=now + timedelta(seconds=2)))
+
+        resp = await client.get("/api/v1/logs/noise", headers=auth_headers)
+        data = resp.json()
+        assert (data["checked"], data["matched"], data["dropped"]) == (3, 2, 0)
+        hits = {p["name"]: p["hits"] for p in data["patterns"]}
+        assert hits["heartbeat"] == hits["sandbox-mach-lookup"] == 1
+
+        resp = await client.get(
+            "/api/v1/logs/query", headers=auth_headers, params={"q": "noise:exclude"},
+        )
+        assert [e["message"] for e in resp.json()["entries"]] == ["Heartbeat 4 missed"]
+
+        # The excluded error is stored but left out of the summary
+        resp = await client.get(
+            "/api/v1/logs/summary", headers=auth_headers, params={"window": "5m"},
+        )
+        data = resp.json()
+        assert (data["total_count"], data["error_count"]) == (2, 1)
+
+        resp = await client.post(
+            "/api/v1/logs/noise", headers=auth_headers,
+            json={"name": "broken", "pattern": "(unclosed"},
+        )
+        assert resp.status_code == 400
+
+        resp = await client.delete("/api/v1/logs/noise/heartbeat", headers=auth_headers)
+        assert resp.status_code == 200
+        resp = await client.delete("/api/v1/logs/noise/heartbeat", headers=auth_headers)
+        assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_filter_exclude_patterns_drop_entries(app, auth_headers):
+    buffer = app.state.ring_buffer
+    noise = app.state.noise_filter
+    noise.on_entry = buffer.append
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.post(
+            "/api/v1/logs/filter", headers=auth_headers,
+            json={"source": "syslog", "exclude_patterns": ["[Chatty]"]},
+        )
+        assert resp.json()["status"] == "applied"
+        resp = await client.post(
+            "/api/v1/logs/filter", headers=auth_headers,
+            json={"source": "nope", "exclude_patterns": ["x"]},
+        )
+        assert resp.status_code == 400
+
+    await noise.process(_make_entry("[Chatty] tick"))
+    await noise.process(_make_entry("Sync completed"))
+    # Only syslog entries are excluded
+    simulator = _make_entry("[Chatty] from the simulator")
+    simulator.source = LogSource.SIMULATOR
+    await noise.process(simulator)
+    assert [e.message for e in await buffer.get_recent(10)] == [
+        "Sync completed", "[Chatty] from the simulator",
+    ]
+    assert noise.dropped == 1
+    (pattern,) = [p for p in noise.patterns() if p.name == "exclude:syslog:[Chatty]"]
+    assert pattern.source == LogSource.SYSLOG
+
+
+@pytest.mark.asyncio
+async def test_issues_endpoint(app, auth_headers):
+    buffer = app.state.ring_buffer
+    now = datetime.now(timezone.utc)
+    await buffer.append(_make_entry("HTTP 401 Unauthorized", level=LogLevel.ERROR, timestamp=now))
+    await buffer.append(_make_entry("Disk full", level=LogLevel.ERROR, process="Uploader",
+                                    timestamp=now + timedelta(seconds=1)))
+    await buffer.append(_make_entry("Token refresh succeeded",
+                                    timestamp=now + timedelta(seconds=2)))
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/api/v1/logs/issues", headers=auth_headers)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert (data["total"], data["resolved_count"], data["unresolved_count"]) == (2, 1, 1)
+
+        resp = await client.get(
+            "/api/v1/logs/issues", headers=auth_headers, params={"state": "resolved"},
+        )
+        (issue,) = resp.json()["issues"]
+        assert (issue["process"], issue["pattern"]) == ("MyApp", "HTTP <N> Unauthorized")
+        assert issue["resolution_message"] == "Token refresh succeeded"
+
+        resp = await client.get(
+            "/api/v1/logs/issues", headers=auth_headers,
+            params={"state": "unresolved", "process": "Uploader"},
+        )
+        assert [i["pattern"] for i in resp.json()["issues"]] == ["Disk full"]
+
+        resp = await client.get(
+            "/api/v1/logs/issues", headers=auth_headers, params={"state": "open"},
+        )
+        assert resp.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(app, auth_headers):
+    noise = app.state.noise_filter
+    dedup = app.state.deduplicator
+    noise.on_entry, noise.on_batch = dedup.process, dedup.process_many
+    now = datetime.now(timezone.utc)
+    await noise.process_many([
+        _make_entry("tick", timestamp=now),
+        _make_entry("tick", timestamp=now + timedelta(milliseconds=1)),
+        _make_entry("tick", timestamp=now + timedelta(milliseconds=2)),
+        _make_entry("HTTP 500 from /feed", level=LogLevel.ERROR, timestamp=now),
+    ])
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/api/v1/logs/metrics", headers=auth_headers)
+        assert resp.status_code == 200
+        data = resp.json()
+        stages = {s["name"]: s for s in data["stages"]}
+        assert list(stages) == ["noise", "rate_limit", "dedup", "store"]
+        assert (stages["noise"]["entries_in"], stages["noise"]["entries_out"]) == (4, 4)
+        assert (stages["dedup"]["entries_in"], stages["dedup"]["entries_out"]) == (4, 2)
+        assert stages["store"]["entries_in"] == 2
+        assert stages["dedup"]["latency"]["count"] == 1
+        assert data["dedup_suppressed"] == 2
+        assert data["buffer"]["size"] == 2
+        assert data["buffer"]["partitions"] == {"default": 2}
+        assert data["stream_dropped_total"] == 0
+        assert data["ingest_pool"] is None
+
+        resp = await client.get("/api/v1/logs/sources", headers=auth_headers)
+        assert resp.json()["buffer"]["size"] == 2
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_endpoints(app, auth_headers):
+    limiter = app.state.rate_limiter
+    limiter.on_entry = app.state.ring_buffer.append
+    now = datetime.now(timezone.utc)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.post(
+            "/api/v1/logs/rate-limit", headers=auth_headers,
+            json={"process": "Chatty", "rate": 1, "burst": 2},
+        )
+        assert resp.status_code == 200
+        assert resp.json() == {"process": "Chatty", "rate": 1.0, "burst": 2}
+
+        for i in range(10):
+            ts = now + timedelta(milliseconds=i)
+            await limiter.process(_make_entry(f"spam {i}", process="Chatty", timestamp=ts))
+            await limiter.process(_make_entry(f"fine {i}", timestamp=ts))
+
+        resp = await client.get("/api/v1/logs/rate-limit", headers=auth_headers)
+        data = resp.json()
+        assert data["default"]["rate"] == 0.0
+        assert data["overrides"] == [{"process": "Chatty", "rate": 1.0, "burst": 2}]
+        assert data["suppressed"] + data["sampled"] == 8
+        assert data["throttled"][0]["process"] == "Chatty"
+
+        resp = await client.get(
+            "/api/v1/logs/query", headers=auth_headers, params={"process": "Chatty"},
+        )
+        assert resp.json()["total"] == 2 + data["sampled"]
+        resp = await client.get(
+            "/api/v1/logs/query", headers=auth_headers, params={"process": "MyApp"},
+        )
+        assert resp.json()["total"] == 10
+
+        resp = await client.post(
+            "/api/v1/logs/rate-limit", headers=auth_headers, json={"rate": -1},
+        )
+        assert resp.status_code == 422
+        resp = await client.delete("/api/v1/logs/rate-limit/Chatty", headers=auth_headers)
+        assert resp.status_code == 200
+        resp = await client.delete("/api/v1/logs/rate-limit/Chatty", headers=auth_headers)
+        assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_anomalies_endpoint_and_summary(app, auth_headers):
+    buffer = app.state.ring_buffer
+    app.state.log_rates.warmup = 0
+    now = datetime.now(timezone.utc)
+    await buffer.append(_make_entry("Keychain item missing", level=LogLevel.ERROR, timestamp=now))
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/api/v1/logs/anomalies", headers=auth_headers)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["total"] == 1
+        assert data["anomalies"][0]["kind"] == "new"
+        assert data["anomalies"][0]["template"] == "Keychain item missing"
+
+        resp = await client.get(
+            "/api/v1/logs/anomalies", headers=auth_headers, params={"kind": "spike"},
+        )
+        assert resp.json()["total"] == 0
+
+        resp = await client.get("/api/v1/logs/summary", headers=auth_headers)
+        data = resp.json()
+        assert [a["template"] for a in data["anomalies"]] == ["Keychain item missing"]
+        assert "Anomalies: new: Keychain item missing from MyApp" in data["summary"]
@@ -0,0 +1,74 @@
+"""Tests for the incremental log stream JSON decoder."""
+
+import json
+
+from server.sources.json_stream import JsonStreamDecoder
+from server.sources.oslog import OslogAdapter
+
+
+def _event(i: int) -> dict:
+    return {
+        "eventMessage": f'msg {i} {{"nested": [1, 2]}} \\ "quoted"',
+        "eventType": "logEvent",
+        "timestamp": "2026-02-07 14:23:01.000000-0800",
+        "messageType": "Default",
+        "processImagePath": "/path/to/TestApp",
+    }
+
+
+def _pretty_stream(count: int) -> bytes:
+    objects = [json.dumps(_event(i), indent=2, separators=(",", " : ")) for i in range(count)]
+    return ("Filtering the log data\n[" + ",".join(objects) + "]\n").encode()
+
+
+def test_pretty_printed_objects_split_at_every_byte():
+    stream = _pretty_stream(3)
+    expected = [_event(i) for i in range(3)]
+    for size in (1, 7, 64, len(stream)):
+        decoder = JsonStreamDecoder()
+        decoded = []
+        for i in range(0, len(stream), size):
+            decoded += [obj for obj, _ in decoder.feed(stream[i:i + size])]
+        assert decoded == expected
+        assert decoder.pending == 0
+
+
+def test_compact_lines_and_raw_text():
+    lines = [b"["] + [json.dumps(_event(i)).encode() + b"," for i in range(2)] + [b"]"]
+    decoder = JsonStreamDecoder()
+    ((first, raw), (second, _)) = decoder.feed(b"\n".join(lines) + b"\n")
+    assert (first, second) == (_event(0), _event(1))
+    assert raw == json.dumps(_event(0))
+
+
+def test_multibyte_characters_split_across_chunks():
+    data = json.dumps({"eventMessage": "café ✓"}, ensure_ascii=False).encode()
+    decoder = JsonStreamDecoder()
+    assert decoder.feed(data[:-4]) == []
+    ((obj, _),) = decoder.feed(data[-4:])
+    assert obj["eventMessage"] == "café ✓"
+
+
+def test_malformed_object_is_skipped():
+    decoder = JsonStreamDecoder()
+    decoded = decoder.feed(b'{"a": 1,\n oops\n}\n{"b": 2}\n')
+    assert [obj for obj, _ in decoded] == [{"b": 2}]
+    assert decoder.malformed == 1
+    assert decoder.pending == 0
+
+
+def test_oslog_parses_objects_across_chunks():
+    lines = _pretty_stream(4).splitlines(keepends=True)
+    adapter = OslogAdapter(device_id="mac")
+    entries = adapter.parse_chunk(b"".join(lines[:9])) + adapter.parse_chunk(b"".join(lines[9:]))
+    assert [e.message for e in entries] == [_event(i)["eventMessage"] for i in range(4)]
+    assert entries[0].raw.startswith("{\n")
+
+
+def test_oslog_parses_raw_chunks_cut_anywhere():
+    stream = _pretty_stream(4)
+    adapter = OslogAdapter(device_id="mac")
+    entries = []
+    for i in range(0, len(stream), 50):
+        entries += adapter.parse_chunk(stream[i:i + 50])
+    assert [e.message for e in entries] == [_event(i)["eventMessage"] for i in range(4)]
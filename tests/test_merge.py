@@ -0,0 +1,174 @@
+"""Tests for merging query results across log stores."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from server.models import LogEntry, LogLevel, LogQueryParams, LogSource
+from server.storage.merge import ListScan, merge_exports, merge_scans
+from server.storage.ring_buffer import RingBuffer
+
+
+def _ts(offset_seconds: float) -> datetime:
+    return datetime(2026, 2, 7, 14, 0, 0, tzinfo=timezone.utc) + timedelta(seconds=offset_seconds)
+
+
+def _make_entry(
+    message: str,
+    offset: float,
+    level: LogLevel = LogLevel.INFO,
+    source: LogSource = LogSource.SYSLOG,
+    process: str = "MyApp",
+) -> LogEntry:
+    return LogEntry(
+        id="merge1",
+        timestamp=_ts(offset),
+        process=process,
+        level=level,
+        message=message,
+        source=source,
+    )
+
+
+def test_merge_list_scans_by_timestamp():
+    a = ListScan([_make_entry("a0", 0), _make_entry("a2", 2), _make_entry("a4", 4)])
+    b = ListScan([_make_entry("b1", 1), _make_entry("b2", 2), _make_entry("b5", 5)])
+
+    merged = merge_scans([a, b])
+    # Equal timestamps keep scan order
+    assert [e.message for e in merged] == ["a0", "b1", "a2", "b2", "a4", "b5"]
+    page = merge_scans([a, b], offset=2, limit=3)
+    assert [e.message for e in page] == ["a2", "b2", "a4"]
+    assert merge_scans([a, b], offset=10, limit=5) == []
+
+
+class _CountingScan(ListScan):
+    def __init__(self, entries):
+        super().__init__(entries)
+        self.keys_read = 0
+        self.materialized = 0
+
+    def keys(self):
+        for key in super().keys():
+            self.keys_read += 1
+            yield key
+
+    def materialize(self, handles, encode=False):
+        self.materialized += len(handles)
+        return super().materialize(handles, encode)
+
+
+def test_merge_stops_after_page():
+    a = _CountingScan([_make_entry(f"a{i}", 2 * i) for i in range(1000)])
+    b = _CountingScan([_make_entry(f"b{i}", 2 * i + 1) for i in range(1000)])
+
+    page = merge_scans([a, b], offset=10, limit=5)
+    assert [e.message for e in page] == ["a5", "b5", "a6", "b6", "a7"]
+    assert a.keys_read < 20 and b.keys_read < 20
+    assert a.materialized + b.materialized == 5
+
+
+@pytest.mark.asyncio
+async def test_buffer_scans_match_full_sort():
+    device = RingBuffer(max_size=300)
+    server = RingBuffer(max_size=100)
+    for i in range(500):
+        level = LogLevel.ERROR if i % 5 == 0 else LogLevel.INFO
+        await device.append(_make_entry(f"device {i}", i * 0.5, level=level))
+        if i % 3 == 0:
+            await server.append(
+                _make_entry(f"server {i}", i * 0.5 + 0.1, level=level, source=LogSource.SERVER)
+            )
+
+    for params in [
+        LogQueryParams(),
+        LogQueryParams(level=LogLevel.ERROR),
+        LogQueryParams(search="1"),
+        LogQueryParams(since=_ts(200), level=LogLevel.ERROR),
+        LogQueryParams(process="Nope"),
+    ]:
+        expected = await device.filter_entries(params) + await server.filter_entries(params)
+        expected.sort(key=lambda e: e.timestamp)
+
+        scans = [device.scan(params), server.scan(params)]
+        assert sum(s.total for s in scans) == len(expected)
+        assert merge_scans(scans) == expected
+        scans = [device.scan(params), server.scan(params)]
+        assert merge_scans(scans, offset=7, limit=20) == expected[7:27]
+
+
+@pytest.mark.asyncio
+async def test_interleaved_timestamps_merge_in_timestamp_order():
+    # Two adapters with skewed clocks feeding one buffer, in arrival order
+    device = RingBuffer(max_size=50)
+    server = RingBuffer(max_size=50)
+    for i in range(40):
+        await device.append(_make_entry(f"sim {i}", i))
+        await device.append(_make_entry(f"phone {i}", i - 7.5))
+        await server.append(_make_entry(f"server {i}", 40 - i, source=LogSource.SERVER))
+    unsorted = [_make_entry("c3", 3), _make_entry("c1", 1), _make_entry("c2", 2)]
+
+    params = LogQueryParams()
+    expected = (
+        await device.filter_entries(params) + await server.filter_entries(params) + unsorted
+    )
+    expected.sort(key=lambda e: e.timestamp)
+
+    scans = [device.scan(params), server.scan(params), ListScan(unsorted)]
+    assert merge_scans(scans) == expected
+    scans = [device.scan(params), server.scan(params), ListScan(unsorted)]
+    assert merge_scans(scans, offset=5, limit=10) == expected[5:15]
+
+    # Once the out-of-order entries are evicted the scan is lazy again
+    for i in range(50):
+        await device.append(_make_entry(f"late {i}", 100 + i))
+    assert device._last_inversion <= device._head
+    page = merge_scans([device.scan(params)], limit=3)
+    assert [e.message for e in page] == ["late 0", "late 1", "late 2"]
+
+
+@pytest.mark.asyncio
+async def test_scan_ignores_entries_appended_after_creation():
+    buf = RingBuffer(max_size=100)
+    await buf.append(_make_entry("before", 0))
+    scan = buf.scan(LogQueryParams())
+    await buf.append(_make_entry("after", 1))
+    assert [e.message for e in merge_scans([scan])] == ["before"]
+
+
+@pytest.mark.asyncio
+async def test_buffer_export_batches_resume_and_snapshot():
+    buffer = RingBuffer(max_size=100)
+    for i in range(25):
+        level = LogLevel.ERROR if i % 2 else LogLevel.INFO
+        await buffer.append(_make_entry(f"m{i}", i, level=level))
+
+    batches = []
+    async for batch in buffer.export(LogQueryParams(level=LogLevel.ERROR), batch_size=5):
+        batches.append([e.message for e in batch])
+        # Appended mid-export: past the snapshot, not exported
+        await buffer.append(_make_entry("late", 99, level=LogLevel.ERROR))
+    assert [len(b) for b in batches] == [5, 5, 2]
+    assert batches[0][:2] == ["m1", "m3"]
+
+    seqs = [e.seq for b in [x async for x in buffer.export(LogQueryParams())] for e in b]
+    resumed = [
+        e.seq for b in [x async for x in buffer.export(LogQueryParams(after_seq=seqs[9]))]
+        for e in b
+    ]
+    assert resumed == seqs[10:]
+
+
+@pytest.mark.asyncio
+async def test_merge_exports_orders_by_seq():
+    device = RingBuffer(max_size=100)
+    server = RingBuffer(max_size=100)
+    for i in range(10):
+        # Interleave stores; timestamps deliberately out of seq order
+        await (server if i % 3 == 0 else device).append(_make_entry(f"m{i}", 10 - i))
+
+    exports = [device.export(LogQueryParams(), batch_size=2),
+               server.export(LogQueryParams(), batch_size=2)]
+    batches = [b async for b in merge_exports(exports, batch_size=4)]
+    assert [e.message for b in batches for e in b] == [f"m{i}" for i in range(10)]
+    assert all(len(b) <= 4 for b in batches)
@@ -0,0 +1,52 @@
+"""Tests for the ingest pipeline metrics primitives."""
+
+from server.metrics import LATENCY_BOUNDS, EventRate, LatencyHistogram, StageMetrics
+
+
+def test_histogram_quantiles_are_bucket_bounds():
+    hist = LatencyHistogram()
+    for _ in range(98):
+        hist.observe(0.0003)
+    hist.observe(0.02)
+    hist.observe(3.0)
+
+    assert hist.count == 100
+    assert hist.quantile(0.5) == 0.0005
+    assert hist.quantile(0.99) == 0.025
+    assert hist.quantile(1.0) == 3.0  # Overflow reports the max
+    stats = hist.stats()
+    assert stats.max_ms == 3000.0
+    assert stats.buckets["le_0.5ms"] == 98
+    assert stats.buckets["overflow"] == 1
+    assert sum(stats.buckets.values()) == 100
+    assert len(stats.buckets) == len(LATENCY_BOUNDS) + 1
+
+
+def test_empty_histogram():
+    stats = LatencyHistogram().stats()
+    assert (stats.count, stats.mean_ms, stats.p99_ms) == (0, 0.0, 0.0)
+
+
+def test_stage_metrics_accumulate():
+    stage = StageMetrics("dedup")
+    stage.record(10, 4, 0.001)
+    stage.record(5, 5, 0.002)
+    stats = stage.stats()
+    assert (stats.name, stats.entries_in, stats.entries_out) == ("dedup", 15, 9)
+    assert stats.latency.count == 2
+    assert round(stats.latency.mean_ms, 6) == 1.5
+
+
+def test_event_rate(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("server.metrics.time.monotonic", lambda: clock[0])
+    rate = EventRate(window=10)
+    rate.add(5)
+    assert rate.per_second() == 5.0
+    clock[0] += 4
+    rate.add(5)
+    assert rate.per_second() == 2.0  # 10 events over 5 seconds
+    clock[0] += 20
+    assert rate.per_second() == 0.0
+    assert rate.total == 10
+
@@ -0,0 +1,100 @@
+"""Tests for the noise matcher and the noise filter pipeline stage."""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from server.models import LogEntry, LogSource, NoiseAction
+from server.processing.classifier import NOISE_PATTERNS, NoiseMatcher, is_noise
+from server.processing.noise import NoiseFilter
+from server.storage.ring_buffer import RingBuffer
+
+
+def _make_entry(message: str) -> LogEntry:
+    return LogEntry(
+        id="noise123",
+        timestamp=datetime.now(timezone.utc),
+        process="MyApp",
+        message=message,
+        source=LogSource.SIMULATOR,
+    )
+
+
+def test_matcher_names_the_matching_pattern():
+    matcher = NoiseMatcher(NOISE_PATTERNS)
+    assert matcher.match("deny(1) mach-lookup com.apple.analyticsd") == "sandbox-mach-lookup"
+    # The leftmost match wins
+    assert matcher.match("Sandbox: MyApp(12) deny(1) mach-lookup x") == "sandbox-deny"
+    assert matcher.match("boringssl_context_handle_fatal_alert(1991)") == "boringssl"
+    assert matcher.match("CoreData: ANNOTATION: fetch took 0.1s") == "coredata-annotation"
+    assert matcher.match("Failed to fetch user profile") is None
+    assert is_noise(_make_entry("nw_path_evaluator_evaluate [C12]"))
+    assert not is_noise(_make_entry("Sync completed"))
+
+
+def test_matcher_without_literals_skips_prefilter():
+    matcher = NoiseMatcher({"digits": r"^\d+$", "word": "chatter"})
+    assert matcher.match("12345") == "digits"
+    assert matcher.match("some CHATTER here") == "word"
+    assert matcher.match("12a") is None
+
+
+@pytest.mark.asyncio
+async def test_actions_and_counters():
+    buffer = RingBuffer(max_size=100)
+    noise = NoiseFilter(on_entry=buffer.append, on_batch=buffer.append_many)
+    noise.set_pattern("heartbeat", "heartbeat", NoiseAction.DROP)
+    noise.set_pattern("sandbox-deny", r"Sandbox:.*deny\(", NoiseAction.EXCLUDE)
+
+    await noise.process(_make_entry("heartbeat ok"))
+    await noise.process_many([
+        _make_entry("Sandbox: MyApp(1) deny(1) file-read-data /x"),
+        _make_entry("TCP Conn 0x600 event 3"),
+        _make_entry("Sync completed"),
+    ])
+
+    stored = await buffer.get_recent(10)
+    assert [(e.message, e.noise) for e in stored] == [
+        ("Sandbox: MyApp(1) deny(1) file-read-data /x", NoiseAction.EXCLUDE),
+        ("TCP Conn 0x600 event 3", NoiseAction.TAG),
+        ("Sync completed", None),
+    ]
+    assert (noise.checked, noise.matched, noise.dropped) == (4, 3, 1)
+    hits = {p.name: p.hits for p in noise.patterns() if p.hits}
+    assert hits == {"heartbeat": 1, "sandbox-deny": 1, "tcp-conn-event": 1}
+    # Replacing a built-in's regex makes it a user pattern; its hits carry over
+    assert not next(p for p in noise.patterns() if p.name == "sandbox-deny").builtin
+
+
+def test_builtins_can_be_turned_off_and_removed():
+    assert NoiseFilter(action=None).patterns() == []
+    noise = NoiseFilter(action=NoiseAction.DROP)
+    assert {p.action for p in noise.patterns()} == {NoiseAction.DROP}
+    assert noise.remove_pattern("boringssl")
+    assert not noise.remove_pattern("boringssl")
+    assert noise.classify(_make_entry("boringssl_session_errorlog"))
+
+
+def test_invalid_pattern_rolls_back():
+    noise = NoiseFilter(action=None)
+    noise.set_pattern("ok", "chatter", NoiseAction.TAG)
+    with pytest.raises(ValueError, match="Invalid noise pattern"):
+        noise.set_pattern("ok", "(unclosed", NoiseAction.TAG)
+    assert [p.pattern for p in noise.patterns()] == ["chatter"]
+    entry = _make_entry("more chatter")
+    assert noise.classify(entry)
+    assert entry.noise == NoiseAction.TAG
+
+
+def test_source_scoped_patterns():
+    noise = NoiseFilter(action=None)
+    noise.set_pattern("chatty", "chatty", NoiseAction.TAG)
+    noise.set_pattern("tick", "tick", NoiseAction.DROP, source=LogSource.SYSLOG)
+
+    simulator = _make_entry("tick from chatty")
+    syslog = _make_entry("tick from chatty")
+    syslog.source = LogSource.SYSLOG
+    assert noise.keep([simulator, syslog]) == [simulator]
+    # Unscoped patterns still apply to the scoped source
+    assert simulator.noise == NoiseAction.TAG
+    assert noise.keep([_make_entry("tick")]) != []
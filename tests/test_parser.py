@@ -101,3 +101,17 @@ def test_parse_no_device_error(adapter: SyslogAdapter):
     assert entry.process == "locationd"
     assert entry.level == LogLevel.ERROR
     assert entry.message == "GPS signal lost"
+
+
+@pytest.mark.asyncio
+async def test_emit_lines_records_parse_metrics(adapter: SyslogAdapter):
+    await adapter.emit_lines([
+        b"Feb  7 14:23:01 iPhone MyApp[1234] <Error>: something failed",
+        b"",
+    ])
+
+    status = adapter.status()
+    assert (status.lines_read, status.entries_captured) == (2, 1)
+    assert (status.parse.entries_in, status.parse.entries_out) == (2, 1)
+    assert status.parse.latency.count == 1
+    assert status.entries_per_second > 0
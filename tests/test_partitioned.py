@@ -0,0 +1,141 @@
+"""Tests for the per-device partitioned log store."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from server.models import LogEntry, LogLevel, LogQueryParams, LogSource
+from server.storage.merge import merge_scans
+from server.storage.partitioned import PartitionedLogStore
+
+_BASE = datetime(2026, 2, 7, 14, 0, 0, tzinfo=timezone.utc)
+
+
+def _make_entry(
+    message: str,
+    device_id: str = "sim-1",
+    level: LogLevel = LogLevel.INFO,
+    offset: float = 0,
+) -> LogEntry:
+    return LogEntry(
+        id="part123",
+        timestamp=_BASE + timedelta(seconds=offset),
+        device_id=device_id,
+        process="MyApp",
+        level=level,
+        message=message,
+        source=LogSource.SIMULATOR,
+    )
+
+
+@pytest.mark.asyncio
+async def test_chatty_device_cannot_evict_quota():
+    store = PartitionedLogStore(max_size=10, quota=3)
+    for i in range(3):
+        await store.append(_make_entry(f"quiet {i}", device_id="sim-quiet"))
+    for i in range(50):
+        await store.append(_make_entry(f"chatty {i}", device_id="sim-chatty"))
+
+    assert store.size == 10
+    assert store.partition_sizes() == {"sim-quiet": 3, "sim-chatty": 7}
+    quiet = await store.filter_entries(LogQueryParams(device_id="sim-quiet"))
+    assert [e.message for e in quiet] == ["quiet 0", "quiet 1", "quiet 2"]
+    chatty = await store.filter_entries(LogQueryParams(device_id="sim-chatty"))
+    assert chatty[-1].message == "chatty 49"
+
+
+@pytest.mark.asyncio
+async def test_device_under_quota_reclaims_from_overflow():
+    store = PartitionedLogStore(max_size=10, quota=3)
+    for i in range(10):
+        await store.append(_make_entry(f"a {i}", device_id="a"))
+    assert store.partition_sizes() == {"a": 10}
+
+    # A new device takes back its quota from the borrower, then recycles its own
+    for i in range(5):
+        await store.append(_make_entry(f"b {i}", device_id="b"))
+    assert store.partition_sizes() == {"a": 7, "b": 3}
+    b = await store.filter_entries(LogQueryParams(device_id="b"))
+    assert [e.message for e in b] == ["b 2", "b 3", "b 4"]
+
+
+@pytest.mark.asyncio
+async def test_capacity_grows_with_devices_beyond_max_size():
+    store = PartitionedLogStore(max_size=4, quota=2)
+    for device in ("a", "b", "c"):
+        for i in range(5):
+            await store.append(_make_entry(f"{device} {i}", device_id=device))
+    assert store.max_size == 6
+    assert store.partition_sizes() == {"a": 2, "b": 2, "c": 2}
+
+
+@pytest.mark.asyncio
+async def test_byte_budget_evicts_from_largest_borrower():
+    store = PartitionedLogStore(max_size=1000, quota=2, max_bytes=3_000)
+    await store.append(_make_entry("quiet", device_id="quiet"))
+    for i in range(100):
+        await store.append(_make_entry(f"chatty {i}", device_id="chatty"))
+
+    assert store.nbytes <= 3_000
+    assert store.partition_sizes()["quiet"] == 1
+    assert store.partition_sizes()["chatty"] > 1
+
+
+@pytest.mark.asyncio
+async def test_unfiltered_queries_merge_partitions():
+    store = PartitionedLogStore(max_size=100, quota=10)
+    entries = [
+        _make_entry("a0", device_id="a", offset=0),
+        _make_entry("b0", device_id="b", offset=1, level=LogLevel.ERROR),
+        _make_entry("a1", device_id="a", offset=2, level=LogLevel.ERROR),
+        _make_entry("b1", device_id="b", offset=3),
+    ]
+    await store.append_many(entries)
+
+    results, total = await store.query(LogQueryParams(limit=2, offset=1))
+    assert total == 4
+    assert [e.message for e in results] == ["b0", "a1"]
+
+    errors = await store.filter_entries(LogQueryParams(level=LogLevel.ERROR))
+    assert [e.message for e in errors] == ["b0", "a1"]
+
+    scan = store.scan(LogQueryParams())
+    assert scan.total == 4
+    assert [e.message for e in merge_scans([scan])] == ["a0", "b0", "a1", "b1"]
+
+    assert [e.message for e in await store.get_after_seq(entries[0].seq)] == ["b0", "a1", "b1"]
+    assert [e.message for e in await store.get_recent(3)] == ["b0", "a1", "b1"]
+    assert store.last_seq == entries[-1].seq
+
+    batches = [b async for b in store.export(LogQueryParams(), batch_size=3)]
+    assert [[e.message for e in b] for b in batches] == [["a0", "b0", "a1"], ["b1"]]
+
+
+@pytest.mark.asyncio
+async def test_device_filter_routes_to_one_partition():
+    store = PartitionedLogStore(max_size=100, quota=10)
+    await store.append(_make_entry("a0", device_id="a"))
+    await store.append(_make_entry("b0", device_id="b"))
+
+    assert len(store._route(LogQueryParams(device_id="a"))) == 1
+    assert len(store._route(LogQueryParams(q="device:b OR level>=error"))) == 2
+
+    results, total = await store.query(LogQueryParams(q="device:b"))
+    assert (total, [e.message for e in results]) == (1, ["b0"])
+    assert await store.filter_entries(LogQueryParams(device_id="missing")) == []
+    assert store.scan(LogQueryParams(device_id="missing")).total == 0
+
+
+@pytest.mark.asyncio
+async def test_listeners_see_every_entry():
+    store = PartitionedLogStore(max_size=100, quota=10)
+    seen: list[str] = []
+    store.add_listener(lambda e: seen.append(e.message))
+    queue = store.subscribe()
+
+    await store.append(_make_entry("a0", device_id="a"))
+    await store.append_many([_make_entry("b0", device_id="b"), _make_entry("a1", device_id="a")])
+
+    assert seen == ["a0", "b0", "a1"]
+    assert queue.qsize() == 3
+    store.unsubscribe(queue)
@@ -0,0 +1,149 @@
+"""Tests for the log query language."""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from server.models import LogEntry, LogLevel, LogQueryParams, LogSource, NoiseAction
+from server.storage.query_lang import (
+    And,
+    Not,
+    Or,
+    QuerySyntaxError,
+    Term,
+    compile_query,
+    parse_query,
+    resolve_query,
+)
+
+
+def _make_entry(
+    message: str = "test message",
+    level: LogLevel = LogLevel.INFO,
+    process: str = "MyApp",
+    source: LogSource = LogSource.SYSLOG,
+    pid: int | None = None,
+    subsystem: str = "",
+) -> LogEntry:
+    return LogEntry(
+        id="q123",
+        timestamp=datetime.now(timezone.utc),
+        process=process,
+        subsystem=subsystem,
+        pid=pid,
+        level=level,
+        message=message,
+        source=source,
+    )
+
+
+def test_parse_precedence():
+    node = parse_query("process:A OR process:B level>=error NOT msg:heartbeat")
+    assert node == Or((
+        Term("process", "=", "A"),
+        And((
+            Term("process", "=", "B"),
+            Term("level", ">=", 4),
+            Not(Term("message", ":", "heartbeat")),
+        )),
+    ))
+
+    node = parse_query('(process:A or process:B) and "Time Out"')
+    assert node == And((
+        Or((Term("process", "=", "A"), Term("process", "=", "B"))),
+        Term("message", ":", "time out"),
+    ))
+
+
+def test_parse_regex_terms():
+    assert parse_query(r"message~/timeout \d+/i") == Term("message", "~", r"(?i)timeout \d+")
+    assert parse_query("process~^Spring") == Term("process", "~", "^Spring")
+    assert parse_query("process!=/^Spring/") == Not(Term("process", "~", "^Spring"))
+    assert parse_query("(process~/^Spring/)") == Term("process", "~", "^Spring")
+
+
+def test_path_values_are_not_regexes():
+    assert parse_query("subsystem:/usr/lib/foo") == Term("subsystem", "=", "/usr/lib/foo")
+    assert parse_query("message:/var/mobile level>=error") == And((
+        Term("message", ":", "/var/mobile"),
+        Term("level", ">=", 4),
+    ))
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "colour:red",
+    "level>=loud",
+    "pid:abc",
+    "template:abc",
+    "noise:loud",
+    "process>A",
+    "level~/err/",
+    "source:carrier-pigeon",
+    "message~/(unclosed/",
+    "(process:A",
+    "process:A)",
+    "process:A AND",
+    "NOT",
+])
+def test_syntax_errors(text):
+    with pytest.raises(QuerySyntaxError):
+        parse_query(text)
+
+
+def test_matches():
+    query = compile_query("level>=warning AND process:MyApp AND NOT message:retry")
+    assert query.matches(_make_entry("Timeout", level=LogLevel.ERROR))
+    assert not query.matches(_make_entry("Timeout", level=LogLevel.INFO))
+    assert not query.matches(_make_entry("Timeout", level=LogLevel.ERROR, process="Other"))
+    assert not query.matches(_make_entry("Timeout, RETRY", level=LogLevel.ERROR))
+
+    assert compile_query("pid<100").matches(_make_entry(pid=42))
+    assert not compile_query("pid>=0").matches(_make_entry())
+    assert not compile_query("template:3").matches(_make_entry())
+    assert compile_query("template_id=0").matches(_make_entry())
+    noisy = _make_entry()
+    noisy.noise = NoiseAction.TAG
+    assert compile_query("noise:tag").matches(noisy)
+    assert compile_query("NOT noise:tag").matches(_make_entry())
+    assert compile_query('noise=""').matches(_make_entry())
+    assert compile_query("source:proxy").matches(_make_entry(source=LogSource.PROXY))
+    assert compile_query("level=info").matches(_make_entry())
+    assert not compile_query("level=info").matches(_make_entry(level=LogLevel.ERROR))
+
+
+def test_compile_query_is_cached():
+    assert compile_query("process:MyApp") is compile_query("process:MyApp")
+
+
+def test_resolve_pushes_down_exact_terms():
+    params, query = resolve_query(LogQueryParams(
+        q="process:MyApp subsystem:com.app.net level>=error timeout message~/\\d+ms/",
+    ))
+    assert query is None
+    assert params.q is None
+    assert params.process == "MyApp"
+    assert params.subsystem == "com.app.net"
+    assert params.level == LogLevel.ERROR
+    assert params.search == "timeout"
+    assert params.regex == r"\d+ms"
+
+    params, query = resolve_query(LogQueryParams(q="level>warning"))
+    assert params.level == LogLevel.ERROR and query is None
+
+
+def test_resolve_keeps_residual_query():
+    # OR, NOT and upper bounds can't be expressed by params
+    for text in ["process:A OR process:B", "NOT process:A", "level<error", "level=error"]:
+        _, query = resolve_query(LogQueryParams(q=text))
+        assert query is not None, text
+
+    # Conflicting field already set: keep params, check the term per entry
+    params, query = resolve_query(LogQueryParams(process="A", q="process:B"))
+    assert params.process == "A"
+    assert query is not None
+
+    # Exact level pushes its floor but still needs the upper bound
+    params, query = resolve_query(LogQueryParams(q="level=error"))
+    assert params.level == LogLevel.ERROR
+    assert query is not None
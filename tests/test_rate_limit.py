@@ -0,0 +1,172 @@
+"""Tests for the per-process rate limiter."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from server.models import LogEntry, LogLevel, LogSource
+from server.processing.rate_limit import RateLimiter
+
+
+def _ts(offset_seconds: float = 0) -> datetime:
+    base = datetime(2026, 2, 7, 14, 0, 0, tzinfo=timezone.utc)
+    return base + timedelta(seconds=offset_seconds)
+
+
+def _make_entry(
+    message: str = "debug line",
+    process: str = "MyApp",
+    subsystem: str | None = "com.example.app",
+    level: LogLevel = LogLevel.DEBUG,
+    offset: float = 0,
+) -> LogEntry:
+    return LogEntry(
+        id="test",
+        timestamp=_ts(offset),
+        process=process,
+        subsystem=subsystem,
+        level=level,
+        message=message,
+        source=LogSource.SIMULATOR,
+    )
+
+
+class _Clock:
+    """A monotonic clock the tests advance by hand."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _flood(count: int, per_second: float, **kwargs) -> list[LogEntry]:
+    return [_make_entry(f"line {i}", offset=i / per_second, **kwargs) for i in range(count)]
+
+
+def _admit_arriving(
+    limiter: RateLimiter, clock: _Clock, entries: list[LogEntry], per_second: float,
+) -> list[LogEntry]:
+    """Admit entries one at a time, as if they arrived per_second apart."""
+    out: list[LogEntry] = []
+    start = clock.now
+    for i, entry in enumerate(entries):
+        clock.now = start + i / per_second
+        out += limiter.admit([entry])
+    return out
+
+
+def test_disabled_by_default():
+    entries = _flood(5000, per_second=5000)
+    assert RateLimiter().admit(entries) == entries
+
+
+def test_under_limit_passes_everything():
+    clock = _Clock()
+    limiter = RateLimiter(rate=100, burst=10, clock=clock)
+    entries = _flood(50, per_second=50)
+    assert _admit_arriving(limiter, clock, entries, per_second=50) == entries
+    assert limiter.suppressed == 0
+
+
+def test_flood_is_sampled_and_summarized():
+    clock = _Clock()
+    limiter = RateLimiter(
+        rate=10, burst=20, sample_every=50, summary_interval=5.0, clock=clock,
+    )
+    # 1,000 entries/s for 1s: the burst, ~10 refilled tokens, then samples
+    out = _admit_arriving(limiter, clock, _flood(1000, per_second=1000), per_second=1000)
+
+    passed = [e for e in out if e.repeat_count == 1]
+    within_limit = len(passed) - limiter.sampled
+    assert 20 <= within_limit <= 31
+    over_limit = 1000 - within_limit
+    assert limiter.sampled == -(-over_limit // 50)  # The 1st, 51st, ... over the limit
+    assert limiter.suppressed == 1000 - len(passed)
+
+    # Nothing summarized until the interval passes; stop() flushes it
+    assert not [e for e in out if e.repeat_count > 1]
+    (summary,) = limiter.summaries(None)
+    assert summary.repeat_count == limiter.suppressed
+    assert summary.message.startswith(f"Rate limited: {limiter.suppressed} entries suppressed")
+    assert "MyApp (com.example.app)" in summary.message
+    assert (summary.process, summary.subsystem, summary.source) == (
+        "MyApp", "com.example.app", LogSource.SIMULATOR,
+    )
+    assert limiter.summaries(None) == []
+
+
+def test_summary_emitted_inline_after_interval():
+    clock = _Clock()
+    limiter = RateLimiter(rate=1, burst=1, sample_every=0, summary_interval=2.0, clock=clock)
+    # 3 seconds at 10/s
+    out = _admit_arriving(limiter, clock, _flood(30, per_second=10), per_second=10)
+    summaries = [e for e in out if e.message.startswith("Rate limited")]
+    assert len(summaries) == 1
+    assert summaries[0].repeat_count > 0
+    assert sum(e.repeat_count for e in out) + limiter.summaries(None)[0].repeat_count == 30
+
+
+def test_errors_always_pass():
+    limiter = RateLimiter(rate=1, burst=1, sample_every=0)
+    out = limiter.admit(_flood(20, per_second=100, level=LogLevel.ERROR))
+    assert len(out) == 20
+    assert limiter.suppressed == 0
+
+
+def test_keys_are_limited_independently():
+    limiter = RateLimiter(rate=1, burst=5, sample_every=0)
+    out = limiter.admit(
+        _flood(10, per_second=100, subsystem="a") + _flood(10, per_second=100, subsystem="b")
+        + _flood(10, per_second=100, process="Other")
+    )
+    assert len(out) == 15
+    assert {key: n for key, n in limiter.throttled()} == {
+        ("default", "MyApp", "a"): 5,
+        ("default", "MyApp", "b"): 5,
+        ("default", "Other", "com.example.app"): 5,
+    }
+
+
+def test_runtime_limits_and_overrides():
+    limiter = RateLimiter(rate=1, burst=1, sample_every=0)
+    limiter.set_limit(0, process="MyApp")
+    assert len(limiter.admit(_flood(10, per_second=100))) == 10
+    assert len(limiter.admit(_flood(10, per_second=100, process="Other"))) == 1
+
+    assert limiter.remove_limit("MyApp")
+    assert not limiter.remove_limit("MyApp")
+    limit = limiter.set_limit(50)
+    assert (limit.rate, limit.burst) == (50, 100)
+    with pytest.raises(ValueError):
+        limiter.set_limit(-1)
+
+
+def test_refill_follows_arrival_not_entry_timestamps():
+    clock = _Clock()
+    limiter = RateLimiter(rate=1, burst=2, sample_every=0, clock=clock)
+    # A device clock an hour ahead, then jumping back, refills nothing
+    skewed = [_make_entry(f"line {i}", offset=3600 * (-1) ** i * i) for i in range(10)]
+    assert len(limiter.admit(skewed)) == 2
+
+    # Time passing on the local clock does
+    clock.now = 3.0
+    assert len(limiter.admit(_flood(10, per_second=1000))) == 2
+
+
+@pytest.mark.asyncio
+async def test_process_many_forwards_and_stop_flushes():
+    batches: list[list[LogEntry]] = []
+
+    async def on_batch(entries: list[LogEntry]) -> None:
+        batches.append(entries)
+
+    limiter = RateLimiter(on_batch=on_batch, rate=1, burst=2, sample_every=0)
+    await limiter.process_many(_flood(10, per_second=100))
+    assert [len(batch) for batch in batches] == [2]
+
+    await limiter.stop()
+    (summary,) = batches[-1]
+    assert summary.repeat_count == 8
+    assert limiter.metrics.entries_in == 10
@@ -0,0 +1,92 @@
+"""Tests for incremental error→success resolution tracking."""
+
+from datetime import datetime, timedelta, timezone
+
+from server.models import LogEntry, LogLevel, LogSource, NoiseAction
+from server.processing.classifier import detect_resolution
+from server.processing.resolutions import ResolutionTracker
+
+_BASE = datetime(2026, 2, 7, 14, 0, 0, tzinfo=timezone.utc)
+
+
+def _make_entry(
+    message: str,
+    level: LogLevel = LogLevel.INFO,
+    offset: float = 0,
+    process: str = "MyApp",
+    device_id: str = "default",
+    repeat_count: int = 1,
+) -> LogEntry:
+    return LogEntry(
+        id="res123",
+        timestamp=_BASE + timedelta(seconds=offset),
+        device_id=device_id,
+        process=process,
+        level=level,
+        message=message,
+        source=LogSource.SIMULATOR,
+        repeat_count=repeat_count,
+    )
+
+
+def test_success_resolves_only_its_own_process():
+    tracker = ResolutionTracker()
+    tracker.add(_make_entry("HTTP 401 Unauthorized", LogLevel.ERROR, 0))
+    tracker.add(_make_entry("HTTP 401 Unauthorized", LogLevel.ERROR, 1, repeat_count=3))
+    tracker.add(_make_entry("Socket 9 closed", LogLevel.ERROR, 2, process="Other"))
+    tracker.add(_make_entry("Token refresh succeeded", offset=3))
+    tracker.add(_make_entry("Sync completed", offset=4, device_id="iphone"))
+
+    resolved = tracker.issues(resolved=True)
+    assert [(i.process, i.pattern, i.count) for i in resolved] == [
+        ("MyApp", "HTTP <N> Unauthorized", 4),
+    ]
+    assert resolved[0].resolved_at == _BASE + timedelta(seconds=3)
+    assert resolved[0].resolution_message == "Token refresh succeeded"
+    assert [i.process for i in tracker.issues(resolved=False)] == ["Other"]
+    assert len(tracker.issues()) == 2
+
+
+def test_recurring_error_reopens_issue():
+    tracker = ResolutionTracker()
+    tracker.add(_make_entry("Fetch failed", LogLevel.ERROR, 0))
+    tracker.add(_make_entry("Fetch succeeded", offset=1))
+    tracker.add(_make_entry("Fetch failed", LogLevel.ERROR, 2))
+
+    (issue,) = tracker.issues()
+    assert not issue.resolved and issue.resolution_message is None
+    assert (issue.count, issue.first_seen, issue.last_seen) == (
+        2, _BASE, _BASE + timedelta(seconds=2),
+    )
+    assert tracker.issues(resolved=False, process="MyApp") == [issue]
+    assert tracker.issues(resolved=False, device_id="iphone") == []
+
+
+def test_oldest_issue_dropped_and_excluded_noise_ignored():
+    tracker = ResolutionTracker(max_issues=2)
+    for offset, message in enumerate(("Error A", "Error B", "Error C")):
+        tracker.add(_make_entry(message, LogLevel.ERROR, offset))
+    assert [i.pattern for i in tracker.issues()] == ["Error C", "Error B"]
+    assert [i.pattern for i in tracker.issues(resolved=False)] == ["Error C", "Error B"]
+
+    noisy = _make_entry("Error D", LogLevel.ERROR, 5)
+    noisy.noise = NoiseAction.EXCLUDE
+    tracker.add(noisy)
+    assert len(tracker) == 2
+
+
+def test_matches_detect_resolution():
+    entries = [
+        _make_entry("Request 1 failed", LogLevel.ERROR, 0),
+        _make_entry("Disk 2 full", LogLevel.FAULT, 1),
+        _make_entry("Upload failed", LogLevel.ERROR, 2, process="Uploader"),
+        _make_entry("Reconnected successfully", offset=3),
+        _make_entry("Request 2 failed", LogLevel.ERROR, 4),
+    ]
+    tracker = ResolutionTracker()
+    for entry in entries:
+        tracker.add(entry)
+    detected = {r["error_pattern"] for r in detect_resolution(entries)}
+    assert detected == {"Request <N> failed", "Disk <N> full"}
+    # The request error recurred after the success, so only the disk issue is still resolved
+    assert [i.pattern for i in tracker.issues(resolved=True)] == ["Disk <N> full"]
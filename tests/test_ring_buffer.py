@@ -1,10 +1,11 @@
 """Tests for the ring buffer storage."""
 
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 import pytest
 
 from server.models import LogEntry, LogLevel, LogQueryParams, LogSource
+from server.storage.query_lang import compile_query
 from server.storage.ring_buffer import RingBuffer
 
 
@@ -156,3 +157,429 @@ async def test_subscribe_receives_new_entries():
     assert entry.message == "live entry"
 
     buf.unsubscribe(queue)
+
+
+# ---------------------------------------------------------------------------
+# Posting-list indexes
+# ---------------------------------------------------------------------------
+
+
+def _brute_force(entries: list[LogEntry], params: LogQueryParams) -> list[LogEntry]:
+    """Reference implementation: full scan with the same filter semantics."""
+    min_levels = set(LogLevel.at_least(params.level)) if params.level else None
+    out = []
+    for e in entries:
+        if params.device_id and e.device_id != params.device_id:
+            continue
+        if params.since and e.timestamp < params.since:
+            continue
+        if params.after_seq is not None and e.seq <= params.after_seq:
+            continue
+        if min_levels and e.level not in min_levels:
+            continue
+        if params.process and e.process != params.process:
+            continue
+        if params.subsystem and e.subsystem != params.subsystem:
+            continue
+        if params.source and e.source != params.source:
+            continue
+        if params.search and params.search.lower() not in e.message.lower():
+            continue
+        out.append(e)
+    return out
+
+
+@pytest.mark.asyncio
+async def test_query_by_subsystem_and_device():
+    buf = RingBuffer(max_size=100)
+
+    await buf.append(LogEntry(
+        id="a", timestamp=datetime.now(timezone.utc), device_id="sim-1",
+        process="MyApp", subsystem="com.app.net", message="net", source=LogSource.SIMULATOR,
+    ))
+    await buf.append(LogEntry(
+        id="b", timestamp=datetime.now(timezone.utc), device_id="sim-2",
+        process="MyApp", subsystem="com.app.net", message="net", source=LogSource.SIMULATOR,
+    ))
+    await buf.append(LogEntry(
+        id="c", timestamp=datetime.now(timezone.utc), device_id="sim-1",
+        process="MyApp", subsystem="com.app.ui", message="ui", source=LogSource.SIMULATOR,
+    ))
+
+    results, total = await buf.query(LogQueryParams(subsystem="com.app.net", device_id="sim-1"))
+    assert total == 1
+    assert results[0].id == "a"
+
+    results, total = await buf.query(LogQueryParams(device_id="sim-3"))
+    assert total == 0
+
+
+@pytest.mark.asyncio
+async def test_indexes_track_eviction():
+    """Evicted entries must disappear from every posting list."""
+    buf = RingBuffer(max_size=3)
+
+    await buf.append(_make_entry("old error", level=LogLevel.ERROR, process="Gone"))
+    await buf.append(_make_entry("a", process="Kept"))
+    await buf.append(_make_entry("b", process="Kept"))
+    await buf.append(_make_entry("c", process="Kept"))  # evicts "old error"
+
+    results, total = await buf.query(LogQueryParams(process="Gone"))
+    assert total == 0
+    results, total = await buf.query(LogQueryParams(level=LogLevel.ERROR))
+    assert total == 0
+    results, total = await buf.query(LogQueryParams(process="Kept"))
+    assert [e.message for e in results] == ["a", "b", "c"]
+    assert "Gone" not in buf._index["process"]
+
+
+@pytest.mark.asyncio
+async def test_indexed_query_matches_full_scan():
+    """Index-driven results equal a brute-force scan after many wraparounds."""
+    buf = RingBuffer(max_size=50)
+    processes = ["MyApp", "SpringBoard", "nsurlsessiond"]
+    levels = list(LogLevel)
+    sources = [LogSource.SYSLOG, LogSource.OSLOG, LogSource.PROXY]
+
+    for i in range(237):
+        await buf.append(LogEntry(
+            id=str(i),
+            timestamp=datetime.now(timezone.utc),
+            device_id=f"dev-{i % 2}",
+            process=processes[i % 3],
+            subsystem=f"sub-{i % 4}",
+            level=levels[i % len(levels)],
+            message=f"message {i} {'timeout' if i % 5 == 0 else 'ok'}",
+            source=sources[i % 3],
+        ))
+
+    live = await buf.get_recent(buf.max_size)
+    assert len(live) == 50
+
+    for params in [
+        LogQueryParams(process="MyApp"),
+        LogQueryParams(level=LogLevel.WARNING),
+        LogQueryParams(level=LogLevel.ERROR, device_id="dev-1"),
+        LogQueryParams(source=LogSource.OSLOG, subsystem="sub-2"),
+        LogQueryParams(process="SpringBoard", search="TIMEOUT"),
+        LogQueryParams(search="timeout"),
+    ]:
+        results = await buf.filter_entries(params)
+        assert [e.id for e in results] == [e.id for e in _brute_force(live, params)]
+
+
+@pytest.mark.asyncio
+async def test_search_uses_trigram_index_across_eviction():
+    """Search stays correct while whole index blocks are evicted."""
+    buf = RingBuffer(max_size=150)
+    for i in range(1000):
+        word = "timeout" if i % 7 == 0 else "ok"
+        await buf.append(_make_entry(f"request {i} {word}"))
+
+    live = await buf.get_recent(buf.max_size)
+    for search in ["TIMEOUT", "request 99", "nothing-here", "ok"]:
+        results = await buf.filter_entries(LogQueryParams(search=search))
+        assert results == _brute_force(live, LogQueryParams(search=search))
+
+
+@pytest.mark.asyncio
+async def test_query_regex():
+    buf = RingBuffer(max_size=100)
+
+    await buf.append(_make_entry("timeout after 30ms"))
+    await buf.append(_make_entry("timeout after soon"))
+    await buf.append(_make_entry("HTTP 404 Not Found"))
+    await buf.append(_make_entry("HTTP 500 Server Error"))
+
+    results, total = await buf.query(LogQueryParams(regex=r"timeout after \d+ms"))
+    assert [e.message for e in results] == ["timeout after 30ms"]
+
+    results, total = await buf.query(LogQueryParams(regex=r"HTTP (404|500)"))
+    assert total == 2
+
+    results, total = await buf.query(LogQueryParams(regex=r"^HTTP 5"))
+    assert [e.message for e in results] == ["HTTP 500 Server Error"]
+
+
+@pytest.mark.asyncio
+async def test_entries_get_increasing_seq():
+    buf = RingBuffer(max_size=5)
+    for i in range(8):
+        await buf.append(_make_entry(f"msg {i}"))
+
+    live = await buf.get_recent(10)
+    seqs = [e.seq for e in live]
+    assert seqs == sorted(seqs)
+    assert len(set(seqs)) == 5
+    assert buf.last_seq == seqs[-1]
+
+    # Everything after the third live entry, even if evicted positions came before
+    after = await buf.get_after_seq(seqs[2])
+    assert [e.message for e in after] == ["msg 6", "msg 7"]
+    assert await buf.get_after_seq(buf.last_seq) == []
+    assert len(await buf.get_after_seq(0)) == 5
+
+
+@pytest.mark.asyncio
+async def test_get_after_seq_keeps_equal_timestamps():
+    """Entries sharing a timestamp are not skipped by a seq cursor."""
+    buf = RingBuffer(max_size=100)
+    ts = datetime(2026, 2, 7, 14, 0, 0, tzinfo=timezone.utc)
+    await buf.append(_make_entry("a", timestamp=ts))
+    cursor = buf.last_seq
+    await buf.append(_make_entry("b", timestamp=ts))
+
+    assert await buf.get_after(ts) == []
+    assert [e.message for e in await buf.get_after_seq(cursor)] == ["b"]
+
+
+@pytest.mark.asyncio
+async def test_since_bisect_handles_out_of_order_timestamps():
+    base = datetime(2026, 2, 7, 14, 0, 0, tzinfo=timezone.utc)
+    buf = RingBuffer(max_size=50)
+    entries = []
+    # Interleave two clocks so timestamps are not monotonic by position
+    for i in range(120):
+        offset = i if i % 2 == 0 else i - 30
+        entry = _make_entry(f"msg {i}", timestamp=base + timedelta(seconds=offset),
+                            level=LogLevel.ERROR if i % 3 == 0 else LogLevel.INFO)
+        entries.append(entry)
+        await buf.append(entry)
+
+    live = await buf.get_recent(buf.max_size)
+    for seconds in [0, 50, 75, 90, 100, 200]:
+        since = base + timedelta(seconds=seconds)
+        assert await buf.get_since(since) == [e for e in live if e.timestamp >= since]
+        assert await buf.get_after(since) == [e for e in live if e.timestamp > since]
+        params = LogQueryParams(since=since, level=LogLevel.ERROR)
+        assert await buf.filter_entries(params) == _brute_force(live, params)
+
+
+@pytest.mark.asyncio
+async def test_query_after_seq_with_filters():
+    buf = RingBuffer(max_size=100)
+    for i in range(40):
+        await buf.append(_make_entry(f"msg {i}", process="A" if i % 2 else "B"))
+    live = await buf.get_recent(buf.max_size)
+    cursor = live[24].seq
+
+    results = await buf.filter_entries(LogQueryParams(after_seq=cursor, process="A"))
+    assert [e.message for e in results] == [f"msg {i}" for i in range(25, 40, 2)]
+    results = await buf.filter_entries(LogQueryParams(after_seq=cursor, search="msg 3"))
+    assert [e.message for e in results] == [f"msg {i}" for i in range(30, 40)]
+
+
+# ---------------------------------------------------------------------------
+# Compact storage
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_entries_round_trip_through_compact_storage():
+    buf = RingBuffer(max_size=10)
+    ts = datetime(2026, 2, 7, 14, 0, 0, 123456, tzinfo=timezone.utc)
+    original = LogEntry(
+        id="abc12345",
+        timestamp=ts,
+        device_id="SIM-1",
+        process="MyApp",
+        subsystem="com.myapp.net",
+        category="http",
+        pid=4321,
+        level=LogLevel.WARNING,
+        message="slow response",
+        source=LogSource.OSLOG,
+        raw="<raw line>",
+        repeat_count=3,
+    )
+    await buf.append(original)
+    await buf.append(_make_entry("no pid, raw defaults"))
+
+    first, second = await buf.get_recent(2)
+    assert first == original
+    assert first.timestamp == ts
+    assert second.pid is None
+    assert second.raw == ""
+
+
+@pytest.mark.asyncio
+async def test_drop_raw():
+    buf = RingBuffer(max_size=10, keep_raw=False)
+    await buf.append(LogEntry(
+        id="1", timestamp=datetime.now(timezone.utc), message="msg",
+        source=LogSource.SYSLOG, raw="full raw line",
+    ))
+    assert (await buf.get_recent(1))[0].raw == ""
+
+
+@pytest.mark.asyncio
+async def test_byte_budget_evicts_oldest():
+    buf = RingBuffer(max_size=10_000, max_bytes=50_000)
+    for i in range(2000):
+        await buf.append(_make_entry(f"message number {i} " + "x" * 100))
+
+    assert buf.nbytes <= 50_000
+    assert 0 < buf.size < 2000
+    recent = await buf.get_recent(buf.max_size)
+    assert recent[-1].message.startswith("message number 1999 ")
+    assert len(recent) == buf.size
+
+    # Queries stay consistent with what's left after size-based eviction
+    params = LogQueryParams(search="number 19")
+    assert await buf.filter_entries(params) == _brute_force(recent, params)
+
+    await buf.clear()
+    # Only the empty buffer's slots are left
+    assert buf.nbytes == RingBuffer(max_size=10_000).nbytes and buf.size == 0
+
+
+@pytest.mark.asyncio
+async def test_columns_grow_with_entries_and_count_toward_nbytes():
+    buf = RingBuffer(max_size=500_000)
+    empty = buf.nbytes
+    assert empty < 2_000
+    for i in range(100):
+        await buf.append(_make_entry(f"message {i}"))
+    assert buf.nbytes < empty + 100 * 1_000
+
+    # Growing and shrinking moves entries without changing their positions
+    seqs = [e.seq for e in await buf.get_recent(100)]
+    params = LogQueryParams(search="message 9")
+    assert [e.seq for e in await buf.filter_entries(params)] == [
+        e.seq for e in await buf.get_recent(100) if "message 9" in e.message
+    ]
+    for _ in range(90):
+        await buf.evict_oldest()
+    assert [e.seq for e in await buf.get_recent(100)] == seqs[90:]
+    assert buf._capacity < 64
+
+
+@pytest.mark.asyncio
+async def test_oversized_entry_still_stored():
+    """An entry bigger than the whole budget replaces everything but is kept."""
+    buf = RingBuffer(max_size=100, max_bytes=1_000)
+    await buf.append(_make_entry("small"))
+    await buf.append(_make_entry("y" * 5_000))
+    assert buf.size == 1
+    assert (await buf.get_recent(1))[0].message == "y" * 5_000
+
+
+@pytest.mark.asyncio
+async def test_json_cache_filled_by_query_and_reused():
+    buf = RingBuffer(max_size=10)
+    await buf.append(_make_entry("cached"))
+    before = buf.nbytes
+
+    (first,), _ = await buf.query(LogQueryParams())
+    assert first.json_bytes == first.model_dump_json().encode()
+    assert buf.nbytes > before
+
+    # Later materializations reuse the same bytes object
+    (again,) = await buf.get_recent(1)
+    assert again.json_bytes is first.json_bytes
+
+
+def test_json_cache_dropped_when_a_field_changes():
+    entry = _make_entry("mutable")
+    assert b'"seq":0' in entry.json_bytes
+    entry.seq = 5
+    assert entry.json_bytes == entry.model_dump_json().encode()
+    assert b'"seq":5' in entry.json_bytes
+
+
+@pytest.mark.asyncio
+async def test_json_serialized_once_for_subscribers():
+    buf = RingBuffer(max_size=10, keep_raw=False)
+    queue = buf.subscribe()
+    entry = LogEntry(
+        id="1", timestamp=datetime.now(timezone.utc), message="msg",
+        source=LogSource.SYSLOG, raw="dropped raw",
+    )
+    await buf.append(entry)
+
+    delivered = queue.get_nowait()
+    stored = (await buf.get_recent(1))[0]
+    # Subscribers see the stored form (raw dropped), shared with queries
+    assert delivered.json_bytes is stored.json_bytes
+    assert b'"raw":""' in delivered.json_bytes
+    buf.unsubscribe(queue)
+
+
+@pytest.mark.asyncio
+async def test_scan_total_matches_filtered_count():
+    buf = RingBuffer(max_size=200)
+    for i in range(500):
+        await buf.append(_make_entry(
+            f"msg {i}",
+            level=[LogLevel.DEBUG, LogLevel.INFO, LogLevel.ERROR][i % 3],
+            process=f"P{i % 4}",
+            device_id=f"D{i % 2}",
+        ))
+
+    for params in [
+        LogQueryParams(),
+        LogQueryParams(process="P1"),
+        LogQueryParams(device_id="D0"),
+        LogQueryParams(level=LogLevel.INFO),
+        LogQueryParams(process="P1", level=LogLevel.ERROR),
+        LogQueryParams(process="missing"),
+        LogQueryParams(search="msg 4"),
+    ]:
+        scan = buf.scan(params)
+        assert scan.total == len(await buf.filter_entries(params))
+
+
+@pytest.mark.asyncio
+async def test_append_many_matches_append():
+    batched = RingBuffer(max_size=4)
+    single = RingBuffer(max_size=4)
+    seen: list[str] = []
+    batched.add_listener(lambda e: seen.append(e.message))
+    queue = batched.subscribe()
+
+    entries = [_make_entry(f"msg {i}") for i in range(6)]
+    await batched.append_many(entries)
+    for i in range(6):
+        await single.append(_make_entry(f"msg {i}"))
+
+    assert [e.message for e in await batched.get_recent(10)] == ["msg 2", "msg 3", "msg 4", "msg 5"]
+    assert [e.message for e in await single.get_recent(10)] == ["msg 2", "msg 3", "msg 4", "msg 5"]
+    assert seen == [f"msg {i}" for i in range(6)]
+    assert queue.qsize() == 6
+    assert [e.seq for e in entries] == sorted(e.seq for e in entries)
+
+
+@pytest.mark.asyncio
+async def test_query_language_matches_entry_predicate():
+    """q results (index pushdown + column predicate) equal a per-entry check."""
+    buf = RingBuffer(max_size=60)
+    processes = ["MyApp", "SpringBoard", "nsurlsessiond"]
+    levels = list(LogLevel)
+    for i in range(250):
+        await buf.append(LogEntry(
+            id=str(i),
+            timestamp=datetime.now(timezone.utc),
+            device_id=f"dev-{i % 2}",
+            process=processes[i % 3],
+            subsystem=f"sub-{i % 4}",
+            pid=None if i % 6 == 0 else i % 50,
+            level=levels[i % len(levels)],
+            message=f"message {i} {'Timeout' if i % 5 == 0 else 'ok'}",
+            source=LogSource.SYSLOG,
+        ))
+
+    live = await buf.get_recent(buf.max_size)
+    for q in [
+        "process:MyApp level>=error",
+        "process:MyApp OR process:SpringBoard",
+        "NOT process:MyApp timeout",
+        "level=warning device:dev-1",
+        "level<error message~/ok$/",
+        "pid>=40 OR pid<0",
+        "subsystem~/sub-[12]/ AND NOT level:debug",
+    ]:
+        params = LogQueryParams(q=q)
+        results = await buf.filter_entries(params)
+        expected = [e for e in live if compile_query(q).matches(e)]
+        assert [e.id for e in results] == [e.id for e in expected], q
+        assert buf.scan(params).total == len(expected), q
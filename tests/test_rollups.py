@@ -0,0 +1,153 @@
+"""Tests for ingest-time log rollups and rollup-backed summaries."""
+
+from datetime import datetime, timedelta, timezone
+
+from server.models import LogEntry, LogLevel, LogSource
+from server.processing.rollups import LogRollups
+from server.processing.summarizer import generate_rollup_summary, generate_summary
+
+
+def _ts(offset_seconds: float = 0) -> datetime:
+    base = datetime(2026, 2, 7, 14, 0, 0, tzinfo=timezone.utc)
+    return base + timedelta(seconds=offset_seconds)
+
+
+def _make_entry(
+    message: str,
+    level: LogLevel = LogLevel.INFO,
+    process: str = "MyApp",
+    offset: float = 0,
+    source: LogSource = LogSource.SYSLOG,
+    repeat_count: int = 1,
+    seq: int = 0,
+) -> LogEntry:
+    return LogEntry(
+        id="test",
+        timestamp=_ts(offset),
+        process=process,
+        level=level,
+        message=message,
+        source=source,
+        repeat_count=repeat_count,
+        seq=seq,
+    )
+
+
+def _entries() -> list[LogEntry]:
+    specs = [
+        ("Connection failed to 10.0.0.1:443", LogLevel.ERROR, "MyApp", 0, 1),
+        ("Connection failed to 10.0.0.2:443", LogLevel.ERROR, "MyApp", 30, 3),
+        ("Slow frame 42ms", LogLevel.WARNING, "MyApp", 45, 1),
+        ("Token expired for user 7", LogLevel.ERROR, "Auth", 70, 1),
+        ("Connection succeeded", LogLevel.INFO, "MyApp", 95, 1),
+        ("Disk full", LogLevel.FAULT, "backupd", 130, 2),
+        ("Heartbeat", LogLevel.DEBUG, "MyApp", 150, 1),
+    ]
+    return [
+        _make_entry(msg, level, process, offset, repeat_count=n, seq=i + 1)
+        for i, (msg, level, process, offset, n) in enumerate(specs)
+    ]
+
+
+def _rollups(entries: list[LogEntry]) -> LogRollups:
+    rollups = LogRollups()
+    for entry in entries:
+        rollups.add(entry)
+    return rollups
+
+
+def _comparable(summary):
+    data = summary.model_dump(exclude={"generated_at", "cursor"})
+    data["top_issues"] = sorted(data["top_issues"], key=lambda i: i["pattern"])
+    return data
+
+
+def test_rollup_summary_matches_entry_summary():
+    entries = _entries()
+    rollups = _rollups(entries)
+
+    for process in (None, "MyApp", "Auth"):
+        expected = generate_summary(entries, window="5m", process=process)
+        actual = generate_rollup_summary(rollups.window(_ts(0)), window="5m", process=process)
+        assert _comparable(actual) == _comparable(expected)
+
+    summary = generate_rollup_summary(rollups.window(_ts(0)))
+    resolved = {i.pattern: i.resolved for i in summary.top_issues}
+    assert resolved["Connection failed to <IP>"] is True
+    assert resolved["Token expired for user <N>"] is False
+
+
+def test_rollup_window_spans_minutes_and_seconds():
+    entries = _entries()
+    rollups = _rollups(entries)
+
+    # [45s, 150s] — ragged edges from second buckets, 60..119 from a minute bucket
+    window = rollups.window(_ts(45), _ts(150))
+    expected = generate_summary([e for e in entries if _ts(45) <= e.timestamp <= _ts(150)])
+    assert generate_rollup_summary(window).total_count == expected.total_count == 6
+    assert generate_rollup_summary(rollups.window(_ts(131))).total_count == 1
+
+
+def test_rollup_resolution_requires_success_after_error():
+    rollups = _rollups([
+        _make_entry("Sync completed", process="MyApp", offset=0, seq=1),
+        _make_entry("Sync error 500", LogLevel.ERROR, process="MyApp", offset=1, seq=2),
+    ])
+    summary = generate_rollup_summary(rollups.window(_ts(0)))
+    assert [i.resolved for i in summary.top_issues] == [False]
+
+
+def test_resolution_compares_against_the_last_error():
+    entries = [
+        _make_entry("Sync error 500", LogLevel.ERROR, process="MyApp", offset=0, seq=1),
+        _make_entry("Sync completed", process="MyApp", offset=1, seq=2),
+        _make_entry("Sync error 502", LogLevel.ERROR, process="MyApp", offset=2, seq=3),
+    ]
+    summary = generate_rollup_summary(_rollups(entries).window(_ts(0)))
+    assert [i.resolved for i in summary.top_issues] == [False]
+    assert _comparable(summary) == _comparable(generate_summary(entries))
+
+    entries.append(_make_entry("Sync completed", process="MyApp", offset=3, seq=4))
+    summary = generate_rollup_summary(_rollups(entries).window(_ts(0)))
+    assert [i.resolved for i in summary.top_issues] == [True]
+    assert _comparable(summary) == _comparable(generate_summary(entries))
+
+
+def test_series_counts_by_field():
+    rollups = _rollups(_entries())
+    series = rollups.series(_ts(0), _ts(179), 60, "level")
+    assert [start for start, _ in series] == [_ts(0), _ts(60), _ts(120)]
+    assert series[0][1] == {"error": 4, "warning": 1}
+    assert series[1][1] == {"error": 1, "info": 1}
+    assert series[2][1] == {"fault": 2, "debug": 1}
+
+    by_process = rollups.series(_ts(0), _ts(179), 60, "process", process="MyApp")
+    assert [counts for _, counts in by_process] == [{"MyApp": 5}, {"MyApp": 1}, {"MyApp": 1}]
+    by_source = rollups.series(_ts(0), _ts(9), 10, "source")
+    assert by_source == [(_ts(0), {"syslog": 1})]
+
+
+def test_old_buckets_are_pruned():
+    rollups = LogRollups(retention=timedelta(minutes=5))
+    rollups.add(_make_entry("old", offset=0))
+    rollups.add(_make_entry("new", offset=3600))
+    rollups.add(_make_entry("too late", offset=1))
+
+    assert generate_rollup_summary(rollups.window(_ts(0))).total_count == 1
+    assert len(rollups._seconds) == 1
+    assert len(rollups._minutes) == 1
+
+
+def test_future_timestamps_do_not_push_retention_forward():
+    rollups = LogRollups(retention=timedelta(minutes=5))
+    now = datetime.now(timezone.utc)
+    ahead = _make_entry("local time read as UTC", level=LogLevel.ERROR)
+    ahead.timestamp = now + timedelta(days=1)
+    rollups.add(ahead)
+    for i in range(5):
+        entry = _make_entry(f"normal {i}", level=LogLevel.ERROR)
+        entry.timestamp = now - timedelta(seconds=i)
+        rollups.add(entry)
+
+    window = rollups.window(now - timedelta(minutes=5))
+    assert generate_rollup_summary(window).total_count == 6
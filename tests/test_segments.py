@@ -0,0 +1,164 @@
+"""Tests for compressed on-disk spillover of evicted log entries."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from server.config import ServerConfig
+from server.main import create_app
+from server.models import LogEntry, LogLevel, LogQueryParams, LogSource
+from server.storage.ring_buffer import RingBuffer
+from server.storage.segments import INDEX_SUFFIX, SEGMENT_SUFFIX, SegmentStore
+from server.storage.sequence import current_seq
+
+_BASE = datetime(2026, 2, 7, 14, 0, 0, tzinfo=timezone.utc)
+
+
+def _make_entry(
+    message: str,
+    offset: float = 0,
+    level: LogLevel = LogLevel.INFO,
+    device_id: str = "default",
+) -> LogEntry:
+    return LogEntry(
+        id="seg123",
+        timestamp=_BASE + timedelta(seconds=offset),
+        device_id=device_id,
+        process="MyApp",
+        level=level,
+        message=message,
+        source=LogSource.SYSLOG,
+    )
+
+
+async def _fill(spill: SegmentStore, count: int, max_size: int = 10) -> RingBuffer:
+    buf = RingBuffer(max_size=max_size)
+    buf.add_evict_listener(spill.add)
+    for i in range(count):
+        level = LogLevel.ERROR if i % 10 == 0 else LogLevel.INFO
+        await buf.append(_make_entry(f"entry {i}", offset=i, level=level))
+    return buf
+
+
+@pytest.mark.asyncio
+async def test_evicted_entries_spill_in_blocks(tmp_path):
+    spill = SegmentStore(tmp_path, block_size=25)
+    buf = await _fill(spill, 110)
+
+    assert buf.size == 10
+    assert spill.size == 100
+    assert len(list(tmp_path.glob(f"*{SEGMENT_SUFFIX}"))) == 1
+    index_lines = next(tmp_path.glob(f"*{INDEX_SUFFIX}")).read_text().splitlines()
+    assert len(index_lines) == 4
+
+    entries = await spill.filter_entries(LogQueryParams(since=_BASE))
+    assert [e.message for e in entries] == [f"entry {i}" for i in range(100)]
+    assert entries[0].timestamp == _BASE
+    assert entries[0].seq < entries[-1].seq
+
+
+@pytest.mark.asyncio
+async def test_sparse_index_skips_blocks_outside_range(tmp_path):
+    spill = SegmentStore(tmp_path, block_size=25)
+    await _fill(spill, 110)
+
+    params = LogQueryParams(since=_BASE + timedelta(seconds=60), level=LogLevel.ERROR)
+    assert len(spill._candidates(params)) == 2
+    entries = await spill.filter_entries(params)
+    assert [e.message for e in entries] == ["entry 60", "entry 70", "entry 80", "entry 90"]
+
+    all_entries = await spill.filter_entries(LogQueryParams(since=_BASE))
+    cursor = all_entries[49].seq
+    assert len(spill._candidates(LogQueryParams(after_seq=cursor))) == 2
+    after = await spill.filter_entries(LogQueryParams(after_seq=cursor, q="message~/9$/"))
+    assert [e.message for e in after] == [f"entry {i}" for i in range(59, 100, 10)]
+
+
+@pytest.mark.asyncio
+async def test_pending_entries_are_searched(tmp_path):
+    spill = SegmentStore(tmp_path, block_size=1000)
+    await _fill(spill, 15)
+    assert not list(tmp_path.iterdir())
+    entries = await spill.filter_entries(LogQueryParams(since=_BASE))
+    assert len(entries) == 5
+
+    spill.close()
+    assert len(list(tmp_path.glob(f"*{SEGMENT_SUFFIX}"))) == 1
+
+
+@pytest.mark.asyncio
+async def test_entries_spilled_during_a_read_are_included(tmp_path):
+    spill = SegmentStore(tmp_path, block_size=10)
+    buf = await _fill(spill, 30)
+
+    task = asyncio.create_task(spill.filter_entries(LogQueryParams(since=_BASE)))
+    await asyncio.sleep(0)  # The task is now reading blocks in a thread
+    for i in range(30, 45):
+        await buf.append(_make_entry(f"entry {i}", offset=i))
+    entries = await task
+
+    # Evicted while the blocks were read: one new block plus pending entries
+    assert [e.message for e in entries] == [f"entry {i}" for i in range(35)]
+    scan = buf.scan(LogQueryParams(since=_BASE))
+    assert scan.total + len(entries) == 45
+
+
+@pytest.mark.asyncio
+async def test_reopen_loads_index_and_skips_torn_blocks(tmp_path):
+    spill = SegmentStore(tmp_path, block_size=10)
+    await _fill(spill, 40)
+    last_seq = current_seq()
+
+    index = next(tmp_path.glob(f"*{INDEX_SUFFIX}"))
+    with index.open("a") as f:
+        f.write('{"offset": 999999, "length"')  # Torn write
+
+    reopened = SegmentStore(tmp_path, block_size=10)
+    reopened.open()
+    assert reopened.size == 30
+    assert current_seq() >= last_seq
+    entries = await reopened.filter_entries(LogQueryParams(since=_BASE))
+    assert [e.message for e in entries] == [f"entry {i}" for i in range(30)]
+
+
+@pytest.mark.asyncio
+async def test_budget_deletes_oldest_segments(tmp_path):
+    spill = SegmentStore(tmp_path, block_size=10, segment_bytes=1, max_bytes=1)
+    await _fill(spill, 60)
+
+    # One block per segment; only the newest segment survives the budget
+    assert len(list(tmp_path.glob(f"*{SEGMENT_SUFFIX}"))) == 1
+    entries = await spill.filter_entries(LogQueryParams(since=_BASE))
+    assert [e.message for e in entries] == [f"entry {i}" for i in range(40, 50)]
+
+
+@pytest.mark.asyncio
+async def test_query_endpoint_falls_through_to_segments(tmp_path):
+    config = ServerConfig(
+        api_key="test-key-12345",
+        ring_buffer_size=10,
+        device_log_quota=10,
+        log_spill=True,
+        log_spill_dir=tmp_path,
+    )
+    app = create_app(config=config, enable_oslog=False, enable_crash=False, enable_proxy=False)
+    app.state.log_spill.block_size = 20
+    for i in range(50):
+        await app.state.ring_buffer.append(_make_entry(f"entry {i}", offset=i))
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        headers = {"Authorization": "Bearer test-key-12345"}
+        resp = await client.get("/api/v1/logs/query", headers=headers)
+        assert resp.json()["total"] == 10
+
+        resp = await client.get(
+            "/api/v1/logs/query",
+            headers=headers,
+            params={"since": (_BASE + timedelta(seconds=5)).isoformat(), "limit": 3},
+        )
+        data = resp.json()
+        assert data["total"] == 45
+        assert [e["message"] for e in data["entries"]] == ["entry 5", "entry 6", "entry 7"]
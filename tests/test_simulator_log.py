@@ -212,18 +212,15 @@ async def test_read_loop_emits_entries():
     mock_proc = AsyncMock()
     mock_proc.returncode = None
 
-    # Create an async iterator that yields one line
+    # Create a stream whose reads return one line each
     class MockStdout:
         def __init__(self):
             self._lines = [sample_line]
             self._index = 0
 
-        def __aiter__(self):
-            return self
-
-        async def __anext__(self):
+        async def read(self, n=-1):
             if self._index >= len(self._lines):
-                raise StopAsyncIteration
+                return b""
             line = self._lines[self._index]
             self._index += 1
             return line
@@ -279,12 +276,9 @@ async def test_read_loop_pretty_printed_json():
             self._lines = lines
             self._index = 0
 
-        def __aiter__(self):
-            return self
-
-        async def __anext__(self):
+        async def read(self, n=-1):
             if self._index >= len(self._lines):
-                raise StopAsyncIteration
+                return b""
             line = self._lines[self._index]
             self._index += 1
             return line
@@ -305,3 +299,78 @@ async def test_read_loop_pretty_printed_json():
     assert len(emitted) == 1
     assert emitted[0].message == "hello pretty"
     assert emitted[0].source == LogSource.SIMULATOR
+
+
+@pytest.mark.asyncio
+async def test_read_line_batches_joins_partial_lines():
+    """Lines split across reads are rejoined; each read yields one batch."""
+    import asyncio
+
+    from server.sources import read_line_batches
+
+    stream = asyncio.StreamReader()
+    stream.feed_data(b"one\ntw")
+    stream.feed_data(b"o\nthree\nfour")
+    stream.feed_eof()
+
+    batches = [batch async for batch in read_line_batches(stream, chunk_size=6)]
+    assert [line for batch in batches for line in batch] == [b"one", b"two", b"three", b"four"]
+
+    stream = asyncio.StreamReader()
+    stream.feed_data(b"one\ntwo\nthree\n")
+    stream.feed_eof()
+    batches = [batch async for batch in read_line_batches(stream)]
+    assert batches == [[b"one", b"two", b"three"]]
+
+
+@pytest.mark.asyncio
+async def test_read_line_batches_caps_unterminated_lines(caplog):
+    """A line that never ends is yielded once it outgrows max_line."""
+    import asyncio
+
+    from server.sources import read_line_batches
+
+    stream = asyncio.StreamReader()
+    for _ in range(4):
+        stream.feed_data(b"x" * 6)
+    stream.feed_data(b"x\nnext\n")
+    stream.feed_eof()
+
+    batches = [batch async for batch in read_line_batches(stream, chunk_size=6, max_line=10)]
+    assert [line for batch in batches for line in batch] == [b"x" * 12, b"x" * 12, b"x", b"next"]
+    assert "longer than 10 bytes" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_read_loop_emits_chunk_as_one_batch():
+    """Objects completed within one stdout read reach on_batch together."""
+    import asyncio
+
+    obj = (
+        '{"eventMessage":"msg %d","eventType":"logEvent",'
+        '"timestamp":"2026-02-07 14:23:01.000000-0800","messageType":"Default",'
+        '"processID":42,"processImagePath":"/path/to/TestApp"}'
+    )
+    stream = asyncio.StreamReader()
+    stream.feed_data(("[" + obj % 1 + ",\n" + obj % 2 + ",\n" + obj % 3 + "]\n").encode())
+    stream.feed_eof()
+
+    batches = []
+
+    async def on_batch(entries):
+        batches.append([e.message for e in entries])
+
+    mock_proc = AsyncMock()
+    mock_proc.returncode = None
+    mock_proc.stdout = stream
+    mock_proc.terminate = MagicMock()
+    mock_proc.wait = AsyncMock()
+
+    with patch("asyncio.create_subprocess_exec", return_value=mock_proc):
+        adapter = SimulatorLogAdapter(udid=SAMPLE_UDID, on_batch=on_batch)
+        await adapter.start()
+        await asyncio.sleep(0.1)
+        await adapter.stop()
+
+    assert batches == [["msg 1", "msg 2", "msg 3"]]
+    assert adapter.entries_captured == 3
@@ -0,0 +1,315 @@
+"""Tests for the disk-backed SQLite log store."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from server.models import LogEntry, LogLevel, LogQueryParams, LogSource, NoiseAction
+from server.storage.sqlite_store import SqliteLogStore
+
+pytest.importorskip("aiosqlite")
+
+
+def _ts(offset_seconds: float = 0) -> datetime:
+    base = datetime(2026, 2, 7, 14, 0, 0, tzinfo=timezone.utc)
+    return base + timedelta(seconds=offset_seconds)
+
+
+def _make_entry(
+    message: str = "test message",
+    level: LogLevel = LogLevel.INFO,
+    process: str = "TestApp",
+    source: LogSource = LogSource.SYSLOG,
+    timestamp: datetime | None = None,
+    device_id: str = "default",
+) -> LogEntry:
+    return LogEntry(
+        id="test123",
+        timestamp=timestamp or _ts(),
+        device_id=device_id,
+        process=process,
+        level=level,
+        message=message,
+        source=source,
+    )
+
+
+@pytest.fixture
+async def store(tmp_path):
+    s = SqliteLogStore(tmp_path / "logs.db")
+    yield s
+    await s.close()
+
+
+@pytest.mark.asyncio
+async def test_append_and_query(store):
+    await store.append(_make_entry("first", timestamp=_ts(0)))
+    await store.append(_make_entry("second", level=LogLevel.ERROR, timestamp=_ts(1)))
+    await store.append(_make_entry("third", process="Other", timestamp=_ts(2)))
+
+    assert store.size == 3
+
+    results, total = await store.query(LogQueryParams(level=LogLevel.ERROR))
+    assert total == 1
+    assert results[0].message == "second"
+    assert results[0].timestamp == _ts(1)
+    assert results[0].level == LogLevel.ERROR
+    assert results[0].source == LogSource.SYSLOG
+
+    results, total = await store.query(LogQueryParams(process="TestApp", limit=1, offset=1))
+    assert total == 2
+    assert [e.message for e in results] == ["second"]
+
+
+@pytest.mark.asyncio
+async def test_search_is_case_insensitive_substring(store):
+    await store.append(_make_entry("HTTP 401 Unauthorized"))
+    await store.append(_make_entry("Request succeeded"))
+    await store.append(_make_entry("HTTP 500 Server Error"))
+
+    results = await store.filter_entries(LogQueryParams(search="http"))
+    assert len(results) == 2
+    # Short terms fall back to a plain substring scan
+    results = await store.filter_entries(LogQueryParams(search="50"))
+    assert [e.message for e in results] == ["HTTP 500 Server Error"]
+
+
+@pytest.mark.asyncio
+async def test_time_filters_span_partitions(store):
+    # Two hours apart → two partition tables
+    await store.append(_make_entry("early", timestamp=_ts(0)))
+    await store.append(_make_entry("late", timestamp=_ts(7200)))
+
+    assert [e.message for e in await store.get_since(_ts(3600))] == ["late"]
+    assert [e.message for e in await store.get_after(_ts(0))] == ["late"]
+    assert [e.message for e in await store.get_recent(10)] == ["early", "late"]
+    assert len(store._partitions) == 2
+
+
+@pytest.mark.asyncio
+async def test_persists_across_reopen(tmp_path):
+    path = tmp_path / "logs.db"
+    first = SqliteLogStore(path)
+    await first.append(_make_entry("kept", timestamp=_ts(0)))
+    await first.close()
+
+    second = SqliteLogStore(path)
+    try:
+        await second.append(_make_entry("new", timestamp=_ts(1)))
+        recent = await second.get_recent(10)
+        assert [e.message for e in recent] == ["kept", "new"]
+        assert second.size == 2
+    finally:
+        await second.close()
+
+
+@pytest.mark.asyncio
+async def test_retention_drops_old_partitions(tmp_path):
+    store = SqliteLogStore(tmp_path / "logs.db", retention=timedelta(hours=1))
+    try:
+        await store.append(_make_entry("old", timestamp=_ts(0)))
+        await store.append(_make_entry("fresh", timestamp=_ts(3 * 3600)))
+
+        removed = await store.drop_expired(now=_ts(3 * 3600 + 60))
+        assert removed == 1
+        assert store.size == 1
+        assert [e.message for e in await store.get_recent(10)] == ["fresh"]
+    finally:
+        await store.close()
+
+
+@pytest.mark.asyncio
+async def test_entry_cap_drops_oldest_partitions(tmp_path):
+    store = SqliteLogStore(tmp_path / "logs.db", max_size=3)
+    try:
+        for hour in range(3):
+            await store.append(_make_entry(f"h{hour}a", timestamp=_ts(hour * 3600)))
+            await store.append(_make_entry(f"h{hour}b", timestamp=_ts(hour * 3600 + 1)))
+        assert store.max_size == 3
+
+        assert await store.drop_excess() == 4
+        assert store.size == 2
+        assert [e.message for e in await store.get_recent(10)] == ["h2a", "h2b"]
+    finally:
+        await store.close()
+
+
+@pytest.mark.asyncio
+async def test_entry_cap_trims_the_newest_partition(tmp_path):
+    store = SqliteLogStore(tmp_path / "logs.db", max_size=3)
+    try:
+        for i in range(5):
+            await store.append(_make_entry(f"flood {i}", timestamp=_ts(i)))
+
+        assert await store.drop_excess() == 2
+        assert store.size == 3
+        assert [e.message for e in await store.get_recent(10)] == [
+            "flood 2", "flood 3", "flood 4",
+        ]
+        assert [e.message for e in await store.filter_entries(
+            LogQueryParams(search="flood"),
+        )] == ["flood 2", "flood 3", "flood 4"]
+        # At the cap, nothing more to drop
+        assert await store.drop_excess() == 0
+    finally:
+        await store.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_write_keeps_pending_rows(store):
+    await store.open()
+    await store.append(_make_entry("kept"))
+    real_db = store._db
+
+    class FailingDb:
+        def __getattr__(self, name):
+            return getattr(real_db, name)
+
+        async def executemany(self, *args):
+            raise RuntimeError("disk I/O error")
+
+    store._db = FailingDb()
+    with pytest.raises(RuntimeError):
+        await store._flush()
+    store._db = real_db
+
+    assert len(store._pending) == 1
+    assert [e.message for e in await store.get_recent(10)] == ["kept"]
+
+
+@pytest.mark.asyncio
+async def test_subscribe_receives_new_entries(store):
+    queue = store.subscribe()
+    await store.append(_make_entry("live entry"))
+    assert queue.get_nowait().message == "live entry"
+    store.unsubscribe(queue)
+
+
+@pytest.mark.asyncio
+async def test_create_app_uses_sqlite_store(tmp_path):
+    from httpx import ASGITransport, AsyncClient
+
+    from server.config import ServerConfig
+    from server.main import create_app
+
+    config = ServerConfig(
+        api_key="test-key-12345", log_store="sqlite", log_db_path=tmp_path / "logs.db",
+    )
+    app = create_app(config=config, enable_oslog=False, enable_crash=False, enable_proxy=False)
+    store = app.state.ring_buffer
+    assert isinstance(store, SqliteLogStore)
+
+    try:
+        await store.append(_make_entry("from sqlite", timestamp=datetime.now(timezone.utc)))
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            resp = await client.get(
+                "/api/v1/logs/query",
+                headers={"Authorization": "Bearer test-key-12345"},
+                params={"source": "syslog"},
+            )
+        assert resp.json()["entries"][0]["message"] == "from sqlite"
+    finally:
+        await store.close()
+
+
+@pytest.mark.asyncio
+async def test_regex_filter(store):
+    await store.append(_make_entry("timeout after 30ms"))
+    await store.append(_make_entry("timeout after soon"))
+
+    results = await store.filter_entries(LogQueryParams(regex=r"timeout after \d+ms"))
+    assert [e.message for e in results] == ["timeout after 30ms"]
+
+
+@pytest.mark.asyncio
+async def test_seq_cursor_survives_reopen(tmp_path):
+    path = tmp_path / "logs.db"
+    first = SqliteLogStore(path)
+    await first.append(_make_entry("a", timestamp=_ts(0)))
+    await first.append(_make_entry("b", timestamp=_ts(0)))
+    cursor = first.last_seq
+    await first.close()
+
+    second = SqliteLogStore(path)
+    try:
+        await second.append(_make_entry("c", timestamp=_ts(0)))
+        after = await second.get_after_seq(cursor)
+        assert [e.message for e in after] == ["c"]
+        assert after[0].seq > cursor
+        recent = await second.get_recent(10)
+        assert [e.seq for e in recent] == sorted(e.seq for e in recent)
+    finally:
+        await second.close()
+
+
+@pytest.mark.asyncio
+async def test_export_batches_in_seq_order(store):
+    for i in range(7):
+        await store.append(_make_entry(f"m{i}", timestamp=_ts(i * 3000)))
+
+    batches = [b async for b in store.export(LogQueryParams(), batch_size=3)]
+    assert [[e.message for e in b] for b in batches] == [
+        ["m0", "m1", "m2"], ["m3", "m4", "m5"], ["m6"],
+    ]
+    resumed = [b async for b in store.export(LogQueryParams(after_seq=batches[1][-1].seq))]
+    assert [e.message for b in resumed for e in b] == ["m6"]
+
+
+@pytest.mark.asyncio
+async def test_query_language_filter(store):
+    await store.append(_make_entry("Request timeout", level=LogLevel.ERROR, timestamp=_ts(0)))
+    await store.append(_make_entry("heartbeat", level=LogLevel.ERROR, timestamp=_ts(1)))
+    await store.append(_make_entry("Request timeout", process="Other", timestamp=_ts(2)))
+    await store.append(_make_entry("done", level=LogLevel.WARNING, timestamp=_ts(3)))
+
+    results = await store.filter_entries(
+        LogQueryParams(q="level>=warning AND NOT message:heartbeat")
+    )
+    assert [e.message for e in results] == ["Request timeout", "done"]
+
+    results, total = await store.query(
+        LogQueryParams(q="process:Other OR (level=warning message~/^d/)")
+    )
+    assert total == 2
+    assert [e.message for e in results] == ["Request timeout", "done"]
+
+
+@pytest.mark.asyncio
+async def test_template_ids_persist_and_old_tables_migrate(tmp_path):
+    import sqlite3
+
+    path = tmp_path / "logs.db"
+    bucket = int(_ts(0).timestamp()) // 3600
+    db = sqlite3.connect(path)
+    db.execute(
+        f"CREATE TABLE logs_{bucket} (seq INTEGER PRIMARY KEY, ts_us INTEGER NOT NULL, "
+        "id TEXT NOT NULL, device_id TEXT NOT NULL, process TEXT NOT NULL, "
+        "subsystem TEXT NOT NULL, category TEXT NOT NULL, pid INTEGER, "
+        "level INTEGER NOT NULL, message TEXT NOT NULL, source TEXT NOT NULL, "
+        "raw TEXT NOT NULL, repeat_count INTEGER NOT NULL)"
+    )
+    db.execute(
+        f"INSERT INTO logs_{bucket} VALUES "
+        f"(1, {int(_ts(0).timestamp() * 1e6)}, 'x', 'default', 'TestApp', '', '', NULL, "
+        "2, 'from an older version', 'syslog', '', 1)"
+    )
+    db.commit()
+    db.close()
+
+    store = SqliteLogStore(path)
+    store.add_ingest_hook(lambda e: setattr(e, "template_id", 42))
+    try:
+        entry = _make_entry("mined", timestamp=_ts(3600))
+        entry.noise = NoiseAction.TAG
+        await store.append(entry)
+        recent = await store.get_recent(10)
+        assert [(e.message, e.template_id, e.noise) for e in recent] == [
+            ("from an older version", 0, None), ("mined", 42, NoiseAction.TAG),
+        ]
+        results, _ = await store.query(LogQueryParams(q="template:42"))
+        assert [e.message for e in results] == ["mined"]
+        results, _ = await store.query(LogQueryParams(q="noise:tag"))
+        assert [e.message for e in results] == ["mined"]
+    finally:
+        await store.close()
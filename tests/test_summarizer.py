@@ -3,7 +3,12 @@
 from datetime import datetime, timedelta, timezone
 
 from server.models import LogEntry, LogLevel, LogSource
-from server.processing.summarizer import generate_summary, make_cursor, parse_cursor
+from server.processing.summarizer import (
+    generate_summary,
+    make_cursor,
+    parse_cursor,
+    parse_cursor_seq,
+)
 
 
 def _ts(offset_seconds: float = 0) -> datetime:
@@ -45,6 +50,20 @@ def test_cursor_roundtrip():
     assert abs((decoded - ts).total_seconds()) < 0.001
 
 
+def test_cursor_with_seq_roundtrip():
+    ts = datetime(2026, 2, 7, 14, 23, 1, 234567, tzinfo=timezone.utc)
+    cursor = make_cursor(ts, seq=4242)
+
+    assert parse_cursor_seq(cursor) == 4242
+    decoded = parse_cursor(cursor)
+    assert decoded is not None
+    assert abs((decoded - ts).total_seconds()) < 0.001
+
+    # Legacy timestamp-only cursors carry no seq
+    assert parse_cursor_seq(make_cursor(ts)) is None
+    assert parse_cursor_seq("not_a_cursor") is None
+
+
 def test_parse_cursor_invalid():
     assert parse_cursor("not_a_cursor") is None
     assert parse_cursor("c_!!!invalid!!!") is None
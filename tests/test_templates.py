@@ -0,0 +1,107 @@
+"""Tests for the Drain-style online template miner."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from server.models import LogEntry, LogQueryParams, LogSource
+from server.processing.templates import TemplateMiner
+from server.storage.partitioned import PartitionedLogStore
+
+_BASE = datetime(2026, 2, 7, 14, 0, 0, tzinfo=timezone.utc)
+
+
+def _make_entry(message: str, offset: float = 0, repeat_count: int = 1) -> LogEntry:
+    return LogEntry(
+        id="tpl123",
+        timestamp=_BASE + timedelta(seconds=offset),
+        process="MyApp",
+        message=message,
+        source=LogSource.SIMULATOR,
+        repeat_count=repeat_count,
+    )
+
+
+def test_variable_tokens_become_wildcards():
+    miner = TemplateMiner()
+    a = miner.add("Loading file /var/mobile/a.plist failed")
+    b = miner.add("Loading file /var/mobile/b.plist failed")
+    assert a is b
+    assert a.template == "Loading file <*> failed"
+
+    quoted = miner.add('Failed to decode "name" for key profile')
+    assert miner.add('Failed to decode "email" for key profile') is quoted
+    assert quoted.template == "Failed to decode <*> for key profile"
+    assert quoted.examples == [
+        'Failed to decode "name" for key profile',
+        'Failed to decode "email" for key profile',
+    ]
+
+
+def test_numeric_tokens_masked_up_front():
+    miner = TemplateMiner()
+    first = miner.add("Connection 12 closed after 3.5s")
+    assert first.template == "Connection <*> closed after <*>"
+    assert miner.add("Connection 7 closed after 0.2s") is first
+    assert len(miner) == 1
+
+
+def test_dissimilar_messages_get_separate_templates():
+    miner = TemplateMiner()
+    failed = miner.add("Connection failed")
+    succeeded = miner.add("Connection succeeded")
+    other_length = miner.add("Connection failed twice")
+    assert len({failed.id, succeeded.id, other_length.id}) == 3
+    assert failed.template == "Connection failed"
+
+
+def test_max_children_routes_overflow_to_wildcard():
+    miner = TemplateMiner(max_children=2)
+    for word in ("alpha", "beta", "gamma", "delta"):
+        miner.add(f"{word} started ok")
+    # gamma and delta share the <*> child, where they merge
+    assert [t.template for t in miner.templates()] == [
+        "alpha started ok", "beta started ok", "<*> started ok",
+    ]
+
+
+def test_least_recently_matched_template_dropped():
+    miner = TemplateMiner(max_templates=2)
+    keep = miner.add("Sync completed")
+    dropped = miner.add("Cache warmed")
+    miner.add("Sync completed")
+    miner.add("Token expired now")
+    assert miner.get(dropped.id) is None
+    assert miner.get(keep.id) is keep
+    # A dropped template's messages start a fresh one
+    assert miner.add("Cache warmed").id not in (dropped.id, keep.id)
+
+
+@pytest.mark.asyncio
+async def test_ingest_hook_stamps_stored_entries():
+    store = PartitionedLogStore(max_size=100, quota=10)
+    miner = TemplateMiner()
+    store.add_ingest_hook(miner.assign)
+    seen: list[int] = []
+    store.add_listener(lambda e: seen.append(e.template_id))
+
+    await store.append(_make_entry("Request 1 failed with 500", offset=5))
+    await store.append_many([
+        _make_entry("Request 2 failed with 502", offset=1, repeat_count=3),
+        _make_entry("Sync completed", offset=2),
+    ])
+
+    stored = await store.get_recent(3)
+    assert [e.template_id for e in stored] == seen
+    assert seen[0] == seen[1] != seen[2] != 0
+    template = miner.get(seen[0])
+    assert template.count == 4
+    assert (template.first_seen, template.last_seen) == (
+        _BASE + timedelta(seconds=1), _BASE + timedelta(seconds=5),
+    )
+
+    results, total = await store.query(LogQueryParams(q=f"template:{seen[0]}"))
+    assert total == 2
+    assert {e.message for e in results} == {
+        "Request 1 failed with 500", "Request 2 failed with 502",
+    }
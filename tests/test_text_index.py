@@ -0,0 +1,79 @@
+"""Tests for the trigram text index and regex literal extraction."""
+
+import re
+
+import pytest
+
+from server.storage.text_index import BLOCK_SIZE, TrigramIndex, required_literals, trigrams
+
+
+def test_trigrams():
+    assert trigrams("abcd") == {"abc", "bcd"}
+    assert trigrams("ab") == set()
+
+
+@pytest.mark.parametrize(
+    "pattern, expected",
+    [
+        (r"timeout after \d+ms", ["timeout after "]),
+        (r"HTTP 40\d", ["HTTP 40"]),
+        (r"conn.*refused", ["conn", "refused"]),
+        (r"colou?r changed", ["colo", "r changed"]),
+        (r"retry(ing)? failed", ["retry", " failed"]),
+        (r"file\.swift:\d+", ["file.swift:"]),
+        (r"[Ee]rror code", ["rror code"]),
+        (r"\x41bcdef", ["bcdef"]),
+        (r"aaa+bbb", ["aaa", "bbb"]),
+        (r"foo|bar", []),
+        (r"(?x) spaced out", []),
+        (r"ab", []),
+    ],
+)
+def test_required_literals(pattern, expected):
+    assert required_literals(pattern) == expected
+    # Every literal must really appear in a string the regex matches
+    sample = {
+        r"timeout after \d+ms": "timeout after 30ms",
+        r"HTTP 40\d": "HTTP 404",
+        r"conn.*refused": "connection refused",
+        r"colou?r changed": "color changed",
+        r"retry(ing)? failed": "retry failed",
+        r"file\.swift:\d+": "file.swift:12",
+        r"[Ee]rror code": "Error code",
+        r"\x41bcdef": "Abcdef",
+        r"aaa+bbb": "aaaaabbb",
+    }.get(pattern)
+    if sample is not None:
+        assert re.search(pattern, sample)
+        assert all(lit in sample for lit in expected)
+
+
+def test_candidate_blocks_intersects_and_evicts():
+    index = TrigramIndex()
+    index.add(0, "Connection timeout")
+    index.add(BLOCK_SIZE, "Request succeeded")
+    index.add(2 * BLOCK_SIZE, "Another TIMEOUT")
+
+    assert index.candidate_blocks(["timeout"]) == [0, 2]
+    assert index.candidate_blocks(["succeeded"]) == [1]
+    assert index.candidate_blocks(["missing"]) == []
+    assert index.candidate_blocks(["ab"]) is None
+
+    index.evict_before(BLOCK_SIZE)
+    assert index.candidate_blocks(["timeout"]) == [2]
+    assert index.candidate_blocks(["connection"]) == []
+
+
+def test_lazy_eviction_sweeps_stale_postings():
+    index = TrigramIndex()
+    for block in range(100):
+        index.add(block * BLOCK_SIZE, f"unique{block:03d} shared text")
+
+    index.evict_before(10 * BLOCK_SIZE)
+    # Hidden immediately, even before the postings are swept
+    assert index.candidate_blocks(["unique005"]) == []
+    assert index.candidate_blocks(["shared"]) == list(range(10, 100))
+
+    index.evict_before(80 * BLOCK_SIZE)
+    assert "005" not in index._postings
+    assert index.candidate_blocks(["shared"]) == list(range(80, 100))